@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+import osf.utils.fields
+from osf.utils.migrations import backfill_guid_string
+
+
+def add_guid_strings(state, schema):
+    backfill_guid_string(state, 'addons_wiki', 'nodewikipage')
+
+
+def remove_guid_strings(state, schema):
+    # The column is dropped by reversing the AddField operation
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('addons_wiki', '0005_auto_20170713_1125'),
+        ('osf', '0081_guid_string'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='nodewikipage',
+            name='guid_string',
+            field=osf.utils.fields.LowercaseCharField(blank=True, db_index=True, max_length=255, null=True),
+        ),
+        migrations.RunPython(add_guid_strings, remove_guid_strings),
+    ]
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from osf.utils.migrations import compress_wiki_versions, decompress_wiki_versions
+
+
+def compress_versions(state, schema):
+    compress_wiki_versions(state)
+
+
+def decompress_versions(state, schema):
+    decompress_wiki_versions(state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('addons_wiki', '0006_nodewikipage_guid_string'),
+    ]
+
+    operations = [
+        # `content` is now a property; the field keeps its column
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RenameField(
+                    model_name='nodewikipage',
+                    old_name='content',
+                    new_name='_content',
+                ),
+                migrations.AlterField(
+                    model_name='nodewikipage',
+                    name='_content',
+                    field=models.TextField(blank=True, db_column='content', default=''),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='nodewikipage',
+            name='delta',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='nodewikipage',
+            name='snapshot',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='addons_wiki.NodeWikiPage'),
+        ),
+        migrations.RunPython(compress_versions, decompress_versions),
+    ]
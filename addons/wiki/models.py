@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import datetime
 import functools
+import hashlib
 import logging
 
 import markdown
@@ -10,13 +11,16 @@ from bleach.callbacks import nofollow
 from bleach import Cleaner
 from functools import partial
 from bleach.linkifier import LinkifyFilter
-from django.db import models
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import connection, models
 from framework.forms.utils import sanitize
 from markdown.extensions import codehilite, fenced_code, wikilinks
-from osf.models import AbstractNode, NodeLog
-from osf.models.base import BaseModel, GuidMixin
+from osf.models import AbstractNode, Guid, NodeLog
+from osf.models.base import BaseModel, GuidMixin, generate_guids
 from osf.utils.fields import NonNaiveDateTimeField
 from website import settings
+from addons.wiki import settings as wiki_settings
 from addons.wiki import utils as wiki_utils
 from website.exceptions import NodeStateError
 from website.util import api_v2_url
@@ -82,14 +86,74 @@ def build_wiki_url(node, label, base, end):
     return '/{pid}/wiki/{wname}/'.format(pid=node._id, wname=label)
 
 
+# Bump whenever build_html_output, the cleaning in NodeWikiPage.html or
+# WIKI_WHITELIST change, so that pages rendered the old way are not served.
+RENDERER_VERSION = 1
+
+def _render_cache_key(kind, content, node):
+    """Rendered output only depends on the content, the node (wiki links
+    point at `/<node._id>/wiki/<page>/`) and the renderer, so the key is made
+    of those and entries never need invalidating: editing, renaming or moving
+    a page simply makes it use another key.
+    """
+    if isinstance(content, unicode):
+        content = content.encode('utf-8')
+    digest = hashlib.sha1(content).hexdigest()
+    return 'wiki-{}:{}:{}:{}'.format(kind, RENDERER_VERSION, node._id, digest)
+
+def cached_render(kind, content, node, render):
+    key = _render_cache_key(kind, content, node)
+    output = cache.get(key)
+    if output is None:
+        output = render()
+        cache.set(key, output, wiki_settings.RENDER_CACHE_TIMEOUT)
+    return output
+
+
 class NodeWikiPage(GuidMixin, BaseModel):
     page_name = models.CharField(max_length=200, validators=[validate_page_name, ])
     version = models.IntegerField(default=1)
     date = NonNaiveDateTimeField(auto_now_add=True)
-    content = models.TextField(default='', blank=True)
+    # The full content of snapshots; empty for versions stored as a delta
+    # against `snapshot`. Use `content` rather than these fields.
+    _content = models.TextField(db_column='content', default='', blank=True)
+    delta = models.BinaryField(null=True, blank=True)
+    snapshot = models.ForeignKey('self', null=True, blank=True, related_name='+', on_delete=models.CASCADE)
     user = models.ForeignKey('osf.OSFUser', null=True, blank=True, on_delete=models.CASCADE)
     node = models.ForeignKey('osf.AbstractNode', null=True, blank=True, on_delete=models.CASCADE)
 
+    _patched_content = None
+
+    @property
+    def content(self):
+        if self.snapshot_id is None:
+            return self._content
+        if self._patched_content is None:
+            self._patched_content = wiki_utils.patch_content(self.snapshot._content, self.delta)
+        return self._patched_content
+
+    @content.setter
+    def content(self, value):
+        self._content = value
+        self.delta = None
+        self.snapshot = None
+        self._patched_content = None
+
+    def set_content(self, content, previous=None):
+        """Set the content of a new version, stored as a delta against the
+        snapshot of `previous`, the version it replaces, where worthwhile.
+        """
+        self.content = content
+        if previous is None:
+            return
+        snapshot = previous.snapshot or previous
+        delta = wiki_utils.make_delta(content, self.version, snapshot._content, snapshot.version)
+        if delta is not None:
+            self._content = ''
+            self.delta = delta
+            self.snapshot = snapshot
+            self._patched_content = content
+
     @property
     def is_current(self):
         key = wiki_utils.to_mongo_key(self.page_name)
@@ -144,6 +208,9 @@ class NodeWikiPage(GuidMixin, BaseModel):
 
     def html(self, node):
         """The cleaned HTML of the page"""
+        return cached_render('html', self.content, node, functools.partial(self._render_html, node))
+
+    def _render_html(self, node):
         html_output = build_html_output(self.content, node=node)
         try:
             cleaner = Cleaner(
@@ -160,8 +227,7 @@ class NodeWikiPage(GuidMixin, BaseModel):
 
     def raw_text(self, node):
         """ The raw text of the page, suitable for using in a test search"""
-
-        return sanitize(self.html(node), tags=[], strip=True)
+        return cached_render('text', self.content, node, lambda: sanitize(self.html(node), tags=[], strip=True))
 
     def get_draft(self, node):
         """
@@ -224,6 +290,8 @@ class NodeWikiPage(GuidMixin, BaseModel):
         if not node:
             raise ValueError('Invalid node')
         clone = self.clone()
+        # The clone does not share a snapshot with this page, so it is stored in full
+        clone.content = self.content
         clone.node = node
         clone.user = self.user
         clone.save()
@@ -231,7 +299,9 @@ class NodeWikiPage(GuidMixin, BaseModel):
 
     @classmethod
     def clone_wiki_versions(cls, node, copy, user, save=True):
-        """Clone wiki pages for a forked or registered project.
+        """Clone wiki pages for a forked or registered project. All versions of
+        all pages are copied with one insert into each of the page and guid
+        tables, keeping deltas pointed at the copies of their snapshots.
         :param node: The Node that was forked/registered
         :param copy: The fork/registration
         :param user: The user who forked or registered the node
@@ -241,19 +311,56 @@ class NodeWikiPage(GuidMixin, BaseModel):
         copy.wiki_pages_versions = {}
         copy.wiki_pages_current = {}
 
-        for key in node.wiki_pages_versions:
+        wiki_ids = [wiki_id for versions in node.wiki_pages_versions.values() for wiki_id in versions]
+        pages = {
+            page.guid_string: page
+            for page in cls.objects.filter(guid_string__in=wiki_ids).select_related('snapshot')
+        }
+        ids = _allocate_ids(cls, len(pages))
+        clones = {
+            wiki_id: cls(id=pk, guid_string=guid, page_name=page.page_name, version=page.version, user_id=page.user_id, node=copy)
+            for (wiki_id, page), pk, guid in zip(pages.items(), ids, generate_guids(len(pages)))
+        }
+        for wiki_id, page in pages.items():
+            clone = clones[wiki_id]
+            snapshot = page.snapshot and clones.get(page.snapshot.guid_string)
+            if snapshot:
+                clone._content, clone.delta, clone.snapshot = '', page.delta, snapshot
+            else:
+                clone.content = page.content
+        cls.objects.bulk_create(clones.values())
+        content_type = ContentType.objects.get_for_model(cls)
+        Guid.objects.bulk_create([
+            Guid(_id=clone.guid_string, content_type=content_type, object_id=clone.id) for clone in clones.values()
+        ])
+
+        for key, versions in node.wiki_pages_versions.items():
             copy.wiki_pages_versions[key] = []
-            for wiki_id in node.wiki_pages_versions[key]:
-                node_wiki = NodeWikiPage.load(wiki_id)
-                cloned_wiki = node_wiki.clone_wiki(copy._id)
-                copy.wiki_pages_versions[key].append(cloned_wiki._id)
-                if node_wiki.is_current:
-                    copy.wiki_pages_current[key] = cloned_wiki._id
+            for wiki_id in versions:
+                if wiki_id not in clones:
+                    continue
+                copy.wiki_pages_versions[key].append(clones[wiki_id].guid_string)
+                if node.wiki_pages_current.get(key) == wiki_id:
+                    copy.wiki_pages_current[key] = clones[wiki_id].guid_string
         if save:
             copy.save()
         return copy
 
 
+def _allocate_ids(model, count):
+    """Reserve `count` primary keys of `model`, so that rows referring to
+    each other can be created in a single insert.
+    """
+    if not count:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+            [model._meta.db_table, count]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
 class NodeSettings(BaseNodeSettings):
     complete = True
     has_auth = True
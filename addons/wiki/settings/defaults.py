@@ -13,3 +13,11 @@ SHAREJS_DB_URL = os.environ.get('SHAREJS_DB_URL', 'mongodb://{}:{}/{}'.format(se
 
 # TODO: Change to release date for wiki change
 WIKI_CHANGE_DATE = datetime.datetime.utcfromtimestamp(1423760098).replace(tzinfo=pytz.utc)
+
+# Seconds to keep rendered pages in the shared cache. Entries are keyed by
+# content, so this only bounds how long unused renders take up space.
+RENDER_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Every SNAPSHOT_INTERVAL-th version of a page is stored in full, the ones in
+# between as deltas against it.
+SNAPSHOT_INTERVAL = 10
@@ -1,9 +1,17 @@
+import mock
 import pytest
+from django.apps import apps
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
+from addons.wiki import models as wiki_models
+from addons.wiki import settings as wiki_settings
 from addons.wiki.exceptions import NameMaximumLengthError
 
 from addons.wiki.models import NodeWikiPage
 from addons.wiki.tests.factories import NodeWikiFactory
+from framework.auth import Auth
+from osf.utils.migrations import compress_wiki_versions
 from osf_tests.factories import NodeFactory, UserFactory, ProjectFactory
 from tests.base import OsfTestCase
 
@@ -48,6 +56,136 @@ class TestNodeWikiPageModel:
         assert ver.is_current is False
 
 
+class TestNodeWikiPageRenderCache:
+
+    @pytest.fixture()
+    def wiki(self):
+        return NodeWikiFactory(content='See [[other page]]\n\n```python\nprint(1)\n```')
+
+    @pytest.fixture()
+    def build_html_output(self):
+        with mock.patch.object(wiki_models, 'build_html_output', side_effect=wiki_models.build_html_output) as mock_build:
+            yield mock_build
+
+    def test_rendered_once(self, wiki, build_html_output):
+        html = wiki.html(wiki.node)
+        assert '/{}/wiki/other page/'.format(wiki.node._id) in html
+        assert wiki.html(wiki.node) == html
+        assert NodeWikiPage.load(wiki._id).html(wiki.node) == html
+        assert build_html_output.call_count == 1
+
+    def test_raw_text_cached(self, wiki, build_html_output):
+        text = wiki.raw_text(wiki.node)
+        assert 'other page' in text and '<' not in text
+        with mock.patch.object(wiki_models, 'sanitize', side_effect=Exception('should not get here')):
+            assert wiki.raw_text(wiki.node) == text
+        assert build_html_output.call_count == 1
+
+    def test_edited_content_rendered_again(self, wiki, build_html_output):
+        wiki.html(wiki.node)
+        wiki.content = 'New content'
+        assert 'New content' in wiki.html(wiki.node)
+        assert build_html_output.call_count == 2
+
+    def test_links_of_other_node(self, wiki, build_html_output):
+        fork = ProjectFactory()
+        html = wiki.html(fork)
+        assert '/{}/wiki/other page/'.format(fork._id) in html
+        assert '/{}/wiki/'.format(wiki.node._id) not in html
+        assert build_html_output.call_count == 1
+
+    def test_renamed_page_links_unchanged(self, wiki, build_html_output):
+        html = wiki.html(wiki.node)
+        wiki.rename('renamed')
+        assert wiki.html(wiki.node) == html
+
+    def test_renderer_version_in_key(self, wiki, build_html_output):
+        wiki.html(wiki.node)
+        with mock.patch.object(wiki_models, 'RENDERER_VERSION', wiki_models.RENDERER_VERSION + 1):
+            wiki.html(wiki.node)
+        assert build_html_output.call_count == 2
+
+
+def page_content(version):
+    lines = ['Line {} of a long page'.format(i) for i in range(100)]
+    lines[version] = 'Edited in version {}'.format(version)
+    return '\n'.join(lines)
+
+
+class TestNodeWikiPageVersions:
+
+    @pytest.fixture()
+    def project(self):
+        return ProjectFactory()
+
+    @pytest.fixture()
+    def versions(self, project):
+        auth = Auth(project.creator)
+        for version in range(1, wiki_settings.SNAPSHOT_INTERVAL + 2):
+            project.update_node_wiki('home', page_content(version), auth)
+        return [NodeWikiPage.load(wiki_id) for wiki_id in project.wiki_pages_versions['home']]
+
+    def test_versions_stored_as_deltas(self, versions):
+        first, last = versions[0], versions[-1]
+        assert first.snapshot is None
+        assert first._content == page_content(1)
+        for page in versions[1:-1]:
+            assert page.snapshot == first
+            assert page._content == ''
+            assert len(page.delta) < 200
+        # Every SNAPSHOT_INTERVAL-th version is stored in full
+        assert last.snapshot is None
+        assert last._content == page_content(wiki_settings.SNAPSHOT_INTERVAL + 1)
+
+    def test_content_reconstructed(self, versions):
+        assert [page.content for page in versions] == [page_content(page.version) for page in versions]
+
+    def test_rewrite_stored_in_full(self, project, versions):
+        project.update_node_wiki('home', 'Something else entirely', Auth(project.creator))
+        page = project.get_wiki_page('home')
+        assert page.snapshot is None
+        assert page.content == 'Something else entirely'
+
+    def test_set_content_stores_in_full(self, versions):
+        page = versions[1]
+        page.content = 'New content'
+        page.save()
+        page = NodeWikiPage.load(page._id)
+        assert page.snapshot is None
+        assert page.content == 'New content'
+
+    def test_fork_inserts_once(self, project, versions):
+        project.update_node_wiki('other', 'Other page', Auth(project.creator))
+        fork = ProjectFactory()
+        with CaptureQueriesContext(connection) as ctx:
+            NodeWikiPage.clone_wiki_versions(project, fork, fork.creator, save=False)
+        inserts = [query['sql'] for query in ctx.captured_queries if query['sql'].startswith('INSERT')]
+        assert len(inserts) == 2
+
+        assert fork.wiki_pages_current['home'] == fork.wiki_pages_versions['home'][-1]
+        clones = [NodeWikiPage.load(wiki_id) for wiki_id in fork.wiki_pages_versions['home']]
+        assert [clone.content for clone in clones] == [page.content for page in versions]
+        assert all(clone.node == fork for clone in clones)
+        assert clones[1].snapshot == clones[0]
+        assert NodeWikiPage.load(fork.wiki_pages_current['other']).content == 'Other page'
+
+    def test_clone_wiki_stores_in_full(self, project, versions):
+        fork = ProjectFactory()
+        clone = versions[1].clone_wiki(fork._id)
+        assert clone.snapshot is None
+        assert NodeWikiPage.load(clone._id).content == page_content(2)
+
+    def test_compress_existing_versions(self, project, versions):
+        NodeWikiPage.objects.filter(node=project).update(snapshot=None, delta=None)
+        for page in versions:
+            NodeWikiPage.objects.filter(id=page.id).update(_content=page_content(page.version))
+
+        compress_wiki_versions(apps, batch_size=1)
+        compressed = [NodeWikiPage.load(page._id) for page in versions]
+        assert [page.snapshot_id for page in compressed] == [page.snapshot_id for page in versions]
+        assert [page.content for page in compressed] == [page_content(page.version) for page in versions]
+
+
 class TestNodeWikiPage(OsfTestCase):
 
     def setUp(self):
@@ -15,6 +15,10 @@ from tests.base import OsfTestCase
 pytestmark = pytest.mark.django_db
 
 
+def viewed_targets(user):
+    return list(user.comment_read_states.values_list('root_target___id', flat=True))
+
+
 class TestUpdateNodeWiki(OsfTestCase):
 
     def setUp(self):
@@ -104,24 +108,21 @@ class TestUpdateNodeWiki(OsfTestCase):
         wiki = NodeWikiFactory(node=project, page_name='test')
         comment = CommentFactory(node=project, target=Guid.load(wiki._id), user=UserFactory())
 
-        # user views comments -- sets user.comments_viewed_timestamp
+        # user views comments -- records when user read them
         url = project.api_url_for('update_comments_timestamp')
         res = self.app.put_json(url, {
             'page': 'wiki',
             'rootId': wiki._id
         }, auth=self.user.auth)
         assert res.status_code == 200
-        self.user.reload()
-        assert wiki._id in self.user.comments_viewed_timestamp
+        assert viewed_targets(self.user) == [wiki._id]
 
         # user updates the wiki
         project.update_node_wiki('test', 'Updating wiki', self.auth)
         comment.reload()
-        self.user.reload()
 
         new_version_id = project.wiki_pages_current['test']
-        assert new_version_id in self.user.comments_viewed_timestamp
-        assert wiki._id not in self.user.comments_viewed_timestamp
+        assert viewed_targets(self.user) == [new_version_id]
         assert comment.target.referent._id == new_version_id
 
     # Regression test for https://openscience.atlassian.net/browse/OSF-6138
@@ -133,32 +134,28 @@ class TestUpdateNodeWiki(OsfTestCase):
         wiki = NodeWikiFactory(node=project, page_name='test')
         comment = CommentFactory(node=project, target=Guid.load(wiki._id), user=self.user)
 
-        # user views comments -- sets user.comments_viewed_timestamp
+        # user views comments -- records when user read them
         url = project.api_url_for('update_comments_timestamp')
         res = self.app.put_json(url, {
             'page': 'wiki',
             'rootId': wiki._id
         }, auth=self.user.auth)
         assert res.status_code == 200
-        self.user.reload()
-        assert wiki._id in self.user.comments_viewed_timestamp
+        assert viewed_targets(self.user) == [wiki._id]
 
-        # contributor views comments -- sets contributor.comments_viewed_timestamp
+        # contributor views comments -- records when contributor read them
         res = self.app.put_json(url, {
             'page': 'wiki',
             'rootId': wiki._id
         }, auth=contributor.auth)
-        contributor.reload()
-        assert wiki._id in contributor.comments_viewed_timestamp
+        assert viewed_targets(contributor) == [wiki._id]
 
         # user updates the wiki
         project.update_node_wiki('test', 'Updating wiki', self.auth)
         comment.reload()
-        contributor.reload()
 
         new_version_id = project.wiki_pages_current['test']
-        assert new_version_id in contributor.comments_viewed_timestamp
-        assert wiki._id not in contributor.comments_viewed_timestamp
+        assert viewed_targets(contributor) == [new_version_id]
         assert comment.target.referent._id == new_version_id
 
     # Regression test for https://openscience.atlassian.net/browse/OSF-8584
@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
+import difflib
+import json
 import os
 import urllib
 import uuid
+import zlib
 
 import ssl
 from pymongo import MongoClient
@@ -255,3 +258,42 @@ def serialize_wiki_widget(node):
     }
     wiki_widget_data.update(wiki.config.to_json())
     return wiki_widget_data
+
+
+# Older wiki versions are stored as compressed deltas against a full snapshot
+# of an earlier version of the same page. A delta is a list of line ranges
+# copied from the snapshot and of runs of inserted text, e.g.
+# [[0, 12], "new line\n", [14, 20]].
+
+def diff_content(base, content):
+    """Return the compressed delta turning `base` into `content`."""
+    base_lines = base.splitlines(True)
+    lines = content.splitlines(True)
+    ops = []
+    matcher = difflib.SequenceMatcher(None, base_lines, lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append(u''.join(lines[j1:j2]))
+    return zlib.compress(json.dumps(ops, separators=(',', ':')))
+
+def patch_content(base, delta):
+    """Return the content stored as `delta` against `base`."""
+    base_lines = base.splitlines(True)
+    return u''.join(
+        u''.join(base_lines[op[0]:op[1]]) if isinstance(op, list) else op
+        for op in json.loads(zlib.decompress(bytes(delta)))
+    )
+
+def make_delta(content, version, snapshot_content, snapshot_version):
+    """Return the delta to store `content` with, or None when the version is
+    better stored as a full snapshot: when it is too many versions away from
+    `snapshot_version`, or when the delta is not much smaller than the content.
+    """
+    if not 0 < version - snapshot_version < wiki_settings.SNAPSHOT_INTERVAL:
+        return None
+    delta = diff_content(snapshot_content, content)
+    if len(delta) * 2 > len(content.encode('utf-8')):
+        return None
+    return delta
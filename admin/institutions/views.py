@@ -13,7 +13,8 @@ from django.contrib.auth.mixins import PermissionRequiredMixin
 from admin.base import settings
 from admin.base.forms import ImportFileForm
 from admin.institutions.forms import InstitutionForm
-from osf.models import Institution, Node
+from osf.models import Institution, InstitutionSummary, Node
+from website.search.search import get_institution_nodes_progress
 
 
 class InstitutionList(PermissionRequiredMixin, ListView):
@@ -55,7 +56,8 @@ class InstitutionDisplay(PermissionRequiredMixin, DetailView):
         fields = institution_dict
         kwargs['change_form'] = InstitutionForm(initial=fields)
         kwargs['import_form'] = ImportFileForm()
-        kwargs['node_count'] = institution.nodes.count()
+        kwargs['summary'] = InstitutionSummary.get_latest(institution.id)
+        kwargs['search_progress'] = get_institution_nodes_progress(institution.id)
 
         return kwargs
 
@@ -73,6 +75,14 @@ class InstitutionDetail(PermissionRequiredMixin, View):
         return view(request, *args, **kwargs)
 
 
+class InstitutionSearchProgress(PermissionRequiredMixin, View):
+    permission_required = 'osf.view_institution'
+    raise_exception = True
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(get_institution_nodes_progress(self.kwargs['institution_id']) or {})
+
+
 class ImportInstitution(PermissionRequiredMixin, View):
     permission_required = 'osf.change_institution'
     raise_exception = True
@@ -226,7 +226,7 @@ class AdminNodeLogView(PermissionRequiredMixin, ListView):
         node = self.get_object()
         query = Q(node_id__in=list(Node.objects.get_children(node).values_list('id', flat=True)) + [node.id])
         return NodeLog.objects.filter(query).order_by('-date').include(
-            'node__guids', 'user__guids', 'original_node__guids', limit_includes=10
+            'node', 'user', 'original_node', limit_includes=10
         )
 
     def get_context_data(self, **kwargs):
@@ -303,7 +303,7 @@ class UserMergeAccounts(PermissionRequiredMixin, FormView):
         user = self.get_object()
         guid_to_be_merged = form.cleaned_data['user_guid_to_be_merged']
 
-        user_to_be_merged = OSFUser.objects.get(guids___id=guid_to_be_merged)
+        user_to_be_merged = OSFUser.objects.get(guid_string=guid_to_be_merged)
         user.merge_user(user_to_be_merged)
 
         return redirect(reverse_user(user._id))
@@ -323,7 +323,7 @@ class UserSearchList(PermissionRequiredMixin, ListView):
 
     def get_queryset(self):
         query = OSFUser.objects.filter(fullname__icontains=self.kwargs['name']).only(
-            'guids', 'fullname', 'username', 'date_confirmed', 'date_disabled'
+            'guid_string', 'fullname', 'username', 'date_confirmed', 'date_disabled'
         )
         return query
 
@@ -1,5 +1,7 @@
 import json
 
+import mock
+
 from nose import tools as nt
 from django.test import RequestFactory
 from django.contrib.auth.models import Permission
@@ -78,11 +80,43 @@ class TestInstitutionDisplay(AdminTestCase):
         nt.assert_is_instance(res['change_form'], InstitutionForm)
         nt.assert_is_instance(res['import_form'], ImportFileForm)
 
+    @mock.patch('admin.institutions.views.get_institution_nodes_progress')
+    def test_context_data_search_progress(self, mock_progress):
+        mock_progress.return_value = {'total': 10, 'processed': 5, 'done': False}
+        res = self.view.get_context_data()
+        mock_progress.assert_called_once_with(self.institution.id)
+        nt.assert_equal(res['search_progress'], {'total': 10, 'processed': 5, 'done': False})
+
     def test_get(self, *args, **kwargs):
         res = self.view.get(self.request, *args, **kwargs)
         nt.assert_equal(res.status_code, 200)
 
 
+class TestInstitutionSearchProgress(AdminTestCase):
+    def setUp(self):
+        super(TestInstitutionSearchProgress, self).setUp()
+
+        self.user = AuthUserFactory()
+        self.institution = InstitutionFactory()
+
+        self.request = RequestFactory().get('/fake_path')
+        self.view = views.InstitutionSearchProgress()
+        self.view = setup_user_view(self.view, self.request, user=self.user)
+
+        self.view.kwargs = {'institution_id': self.institution.id}
+
+    @mock.patch('admin.institutions.views.get_institution_nodes_progress')
+    def test_get(self, mock_progress):
+        mock_progress.return_value = {'total': 10, 'processed': 10, 'done': True}
+        res = self.view.get(self.request)
+        nt.assert_equal(json.loads(res.content), {'total': 10, 'processed': 10, 'done': True})
+
+    @mock.patch('admin.institutions.views.get_institution_nodes_progress', return_value=None)
+    def test_get_without_update(self, mock_progress):
+        res = self.view.get(self.request)
+        nt.assert_equal(json.loads(res.content), {})
+
+
 class TestInstitutionDelete(AdminTestCase):
     def setUp(self):
         self.user = AuthUserFactory()
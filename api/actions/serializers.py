@@ -95,7 +95,7 @@ class BaseActionSerializer(JSONAPISerializer):
         read_only=True,
         related_view='users:user-detail',
         related_view_kwargs={'user_id': '<creator._id>'},
-        filter_key='creator__guids___id',
+        filter_key='creator__guid_string',
         always_embed=True,
     )
 
@@ -162,7 +162,7 @@ class ReviewActionSerializer(BaseActionSerializer):
         read_only=True,
         related_view='users:user-detail',
         related_view_kwargs={'user_id': '<creator._id>'},
-        filter_key='creator__guids___id',
+        filter_key='creator__guid_string',
         always_embed=True,
     ))
 
@@ -172,7 +172,7 @@ class ReviewActionSerializer(BaseActionSerializer):
         required=True,
         related_view='preprints:preprint-detail',
         related_view_kwargs={'preprint_id': '<target._id>'},
-        filter_key='target__guids___id',
+        filter_key='target__guid_string',
     )
 
     def get_action_url(self, obj):
@@ -25,9 +25,7 @@ from osf.models import PreprintProvider, ReviewAction
 def get_review_actions_queryset():
     return ReviewAction.objects.include(
         'creator',
-        'creator__guids',
         'target',
-        'target__guids',
         'target__provider',
     ).filter(is_deleted=False)
 
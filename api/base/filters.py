@@ -17,7 +17,7 @@ from django.db.models import QuerySet as DjangoQuerySet
 from django.db.models import Q, Exists, OuterRef
 from rest_framework import serializers as ser
 from rest_framework.filters import OrderingFilter
-from osf.models import Subject, PreprintProvider, Node
+from osf.models import Contributor, Subject, PreprintProvider, Node
 from osf.models.base import GuidMixin
 from osf.utils.workflows import DefaultStates
 
@@ -413,7 +413,7 @@ class ListFilterMixin(FilterMixin):
         # contributors iexact because guid matching
         if field_name == 'contributors':
             if operation['value'] not in (list(), tuple()):
-                operation['source_field_name'] = '_contributors__guids___id'
+                operation['source_field_name'] = '_contributors__guid_string'
                 operation['op'] = 'iexact'
         if field_name == 'kind':
             operation['source_field_name'] = 'is_file'
@@ -425,7 +425,7 @@ class ListFilterMixin(FilterMixin):
             operation['op'] = 'exact'
         if field_name == 'id':
             operation['source_field_name'] = (
-                'guids___id'
+                'guid_string'
                 if issubclass(self.model_class, GuidMixin)
                 else self.model_class.primary_identifier_name
             )
@@ -495,7 +495,7 @@ class PreprintFilterMixin(ListFilterMixin):
             operation['source_field_name'] = 'provider___id'
 
         if field_name == 'id':
-            operation['source_field_name'] = 'guids___id'
+            operation['source_field_name'] = 'guid_string'
 
         if field_name == 'subjects':
             try:
@@ -506,18 +506,25 @@ class PreprintFilterMixin(ListFilterMixin):
                 operation['op'] = 'iexact'
 
     def preprints_queryset(self, base_queryset, auth_user, allow_contribs=True):
+        # Public listings only read the denormalized flag; the other cases check
+        # the node with subqueries, which unlike joins do not need a distinct()
+        no_user_query = Q(is_publicly_listable=True)
+        if not auth_user:
+            return base_queryset.filter(no_user_query).prefetch_related('subjects')
+
         sub_qs = Node.objects.filter(preprints=OuterRef('pk'), is_deleted=False)
-        no_user_query = Q(is_published=True, node__is_public=True)
-
-        if auth_user:
-            admin_user_query = Q(node__contributor__user_id=auth_user.id, node__contributor__admin=True)
-            reviews_user_query = Q(node__is_public=True, provider__in=get_objects_for_user(auth_user, 'view_submissions', PreprintProvider))
-            if allow_contribs:
-                contrib_user_query = ~Q(machine_state=DefaultStates.INITIAL.value) & Q(node__contributor__user_id=auth_user.id, node__contributor__read=True)
-                query = (no_user_query | contrib_user_query | admin_user_query | reviews_user_query)
-            else:
-                query = (no_user_query | admin_user_query | reviews_user_query)
+        contributors = Contributor.objects.filter(node=OuterRef('node'), user_id=auth_user.id)
+        queryset = base_queryset.annotate(
+            default=Exists(sub_qs),
+            is_node_admin=Exists(contributors.filter(admin=True)),
+            is_node_reader=Exists(contributors.filter(read=True)),
+        )
+        admin_user_query = Q(is_node_admin=True)
+        reviews_user_query = Q(node__is_public=True, provider__in=get_objects_for_user(auth_user, 'view_submissions', PreprintProvider))
+        if allow_contribs:
+            contrib_user_query = ~Q(machine_state=DefaultStates.INITIAL.value) & Q(is_node_reader=True)
+            query = (contrib_user_query | admin_user_query | reviews_user_query)
         else:
-            query = no_user_query
+            query = (admin_user_query | reviews_user_query)
 
-        return base_queryset.annotate(default=Exists(sub_qs)).filter(Q(default=True) & query).distinct('id', 'created')
+        return queryset.filter(no_user_query | (Q(default=True) & query)).prefetch_related('subjects')
@@ -12,6 +12,7 @@ from framework.postcommit_tasks.handlers import (
     postcommit_after_request,
     postcommit_before_request
 )
+from framework.auth.core import private_link_resolver_before_request
 from framework.celery_tasks.handlers import (
     celery_before_request,
     celery_after_request,
@@ -42,10 +43,12 @@ class CeleryTaskMiddleware(object):
 
 class DjangoGlobalMiddleware(object):
     """
-    Store request object on a thread-local variable for use in database caching mechanism.
+    Store request object on a thread-local variable for use in database caching mechanism,
+    and start the request with no view-only links resolved.
     """
     def process_request(self, request):
         api_globals.request = request
+        private_link_resolver_before_request()
 
     def process_exception(self, request, exception):
         sentry_exception_handler(request=request)
@@ -1,8 +1,11 @@
+import base64
+import json
+
 from django.utils import six
 from collections import OrderedDict
 from django.core.urlresolvers import reverse
 from django.core.paginator import InvalidPage, Paginator as DjangoPaginator
-from django.db.models import QuerySet
+from django.db.models import Q, QuerySet
 
 from rest_framework import pagination
 from rest_framework.exceptions import NotFound
@@ -218,6 +221,142 @@ class NodeContributorPagination(JSONAPIPagination):
         return Response(response_dict)
 
 
+class KeysetPagination(JSONAPIPagination):
+    """Paginates by position in the ordering, rather than by page number.
+
+    Fetching a page costs the same no matter how deep it is, as each page is
+    found by filtering on the ordering fields of the item it follows (through
+    an index on them) rather than by OFFSET. The links carry an opaque
+    ``page[cursor]``. Requests using ``page``, or sorting differently, are
+    still served by page number.
+
+    Subclasses set `ordering`, which must be unique (e.g. end in the pk).
+    """
+    cursor_query_param = 'page[cursor]'
+    ordering = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = not (
+            request.parser_context['kwargs'].get('is_embedded') or
+            self.page_query_param in request.query_params or
+            'sort' in request.query_params
+        )
+        if not self.keyset:
+            return super(KeysetPagination, self).paginate_queryset(queryset, request, view=view)
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.count = queryset.count()
+        self.cursor = self.decode_cursor(request.query_params.get(self.cursor_query_param))
+        reverse, position = self.cursor if self.cursor else (False, None)
+
+        ordering = [self._flip(field) for field in self.ordering] if reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(ordering, position))
+        items = list(queryset[:self.page_size + 1])
+        has_more = len(items) > self.page_size
+        items = items[:self.page_size]
+        if reverse:
+            items.reverse()
+
+        # There is always something on the other side of a cursor's position
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = has_more if reverse else position is not None
+        self.items = items
+        return items
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else '-' + field
+
+    @staticmethod
+    def _after(ordering, position):
+        """Filter for the items following `position` in `ordering`."""
+        query = Q()
+        for i, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = '{}__{}'.format(name, 'lt' if field.startswith('-') else 'gt')
+            equal = {other.lstrip('-'): value for other, value in zip(ordering[:i], position[:i])}
+            query |= Q(**dict(equal, **{lookup: position[i]}))
+        return query
+
+    def _position(self, item):
+        values = []
+        for field in self.ordering:
+            value = getattr(item, field.lstrip('-'))
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return values
+
+    def encode_cursor(self, reverse, position):
+        return base64.urlsafe_b64encode(json.dumps({'r': reverse, 'p': position}))
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(str(cursor)))
+            position = data.get('p')
+            if position is not None and len(position) != len(self.ordering):
+                raise ValueError
+            return bool(data['r']), position
+        except (TypeError, ValueError, KeyError, AttributeError):
+            raise NotFound('Invalid cursor.')
+
+    def cursor_query(self, url, cursor):
+        url = remove_query_param(self.request.build_absolute_uri(url), '_')
+        url = remove_query_param(url, self.page_query_param)
+        if cursor is None:
+            return remove_query_param(url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_keyset_links(self, url):
+        links = OrderedDict([
+            ('self', self.cursor_query(url, self.request.query_params.get(self.cursor_query_param))),
+            ('first', None),
+            ('last', None),
+            ('prev', None),
+            ('next', None),
+        ])
+        if self.has_previous:
+            links['first'] = self.cursor_query(url, None)
+            links['prev'] = self.cursor_query(url, self.encode_cursor(True, self._position(self.items[0])))
+        if self.has_next:
+            links['last'] = self.cursor_query(url, self.encode_cursor(True, None))
+            links['next'] = self.cursor_query(url, self.encode_cursor(False, self._position(self.items[-1])))
+        return links
+
+    def get_response_dict_deprecated(self, data, url):
+        if not self.keyset:
+            return super(KeysetPagination, self).get_response_dict_deprecated(data, url)
+        links = self.get_keyset_links(url)
+        del links['self']
+        links['meta'] = OrderedDict([
+            ('total', self.count),
+            ('per_page', self.page_size),
+        ])
+        return OrderedDict([
+            ('data', data),
+            ('links', links),
+        ])
+
+    def get_response_dict(self, data, url):
+        if not self.keyset:
+            return super(KeysetPagination, self).get_response_dict(data, url)
+        return OrderedDict([
+            ('data', data),
+            ('meta', OrderedDict([
+                ('total', self.count),
+                ('per_page', self.page_size),
+            ])),
+            ('links', self.get_keyset_links(url)),
+        ])
+
+
+class NodeLogPagination(KeysetPagination):
+    ordering = ('-date', '-id')
+
+
 class SearchPaginator(DjangoPaginator):
 
     def __init__(self, object_list, per_page):
@@ -5,6 +5,7 @@ from urlparse import urlparse
 import furl
 from django.core.urlresolvers import resolve, reverse, NoReverseMatch
 from django.core.exceptions import ImproperlyConfigured
+from django.db.models import QuerySet
 from django.utils import six
 
 from rest_framework import exceptions, permissions
@@ -22,7 +23,7 @@ from api.base.exceptions import RelationshipPostMakesNoChanges
 from api.base.settings import BULK_SETTINGS
 from api.base.utils import absolute_reverse, extend_querystring_params, get_user_auth, extend_querystring_if_key_exists
 from framework.auth import core as auth_core
-from osf.models import AbstractNode, MaintenanceState
+from osf.models import AbstractNode, Comment, MaintenanceState
 from website import settings
 from website import util as website_utils
 from website.util.sanitize import strip_html
@@ -1569,6 +1570,34 @@ class LinkedRegistrationsRelationshipSerializer(BaseAPISerializer):
         return self.make_instance_obj(collection)
 
 
+class UnreadCommentsCountMixin(object):
+    """Serializer mixin for objects that are commented on. Subclasses implement
+    `get_comments_root`; `find_n_unread_comments` counts the unread comments of
+    all the objects of a list being serialized the first time one is asked for.
+    """
+
+    def get_comments_root(self, obj):
+        """Return the (node, root target guid) of the comments on `obj`."""
+        raise NotImplementedError
+
+    def find_n_unread_comments(self, obj):
+        user = get_user_auth(self.context['request']).user
+        node, root_id = self.get_comments_root(obj)
+        if user is None or root_id is None:
+            return 0
+        counts = self.context.setdefault('unread_comments_counts', {})
+        if root_id not in counts:
+            siblings = []
+            if isinstance(self.parent, ser.ListSerializer) and isinstance(self.parent.instance, (list, tuple, QuerySet)):
+                siblings = self.parent.instance
+            targets = [(node, root_id)] + [
+                target for target in (self.get_comments_root(item) for item in siblings)
+                if target[1] is not None and target[1] not in counts
+            ]
+            counts.update(Comment.find_n_unread_bulk(user, targets))
+        return counts[root_id]
+
+
 class MaintenanceStateSerializer(ser.ModelSerializer):
 
     class Meta:
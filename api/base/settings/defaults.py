@@ -31,6 +31,13 @@ DATABASES = {
     }
 }
 
+# Point this at memcached/redis in local.py so the guid resolution cache is shared across workers
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
 DATABASE_ROUTERS = ['osf.db.router.PostgreSQLFailoverRouter', ]
 PASSWORD_HASHERS = [
     'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
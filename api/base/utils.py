@@ -80,8 +80,8 @@ def get_object_or_error(model_cls, query_or_pk, request, display_name=None):
     if isinstance(query_or_pk, basestring):
         # they passed a 5-char guid as a string
         if issubclass(model_cls, GuidMixin):
-            # if it's a subclass of GuidMixin we know it's primary_identifier_name
-            query = {'guids___id': query_or_pk}
+            # GuidMixin.load looks up the denormalized guid_string column first
+            obj = model_cls.load(query_or_pk, select_for_update=select_for_update)
         else:
             if hasattr(model_cls, 'primary_identifier_name'):
                 # primary_identifier_name gives us the natural key for the model
@@ -813,7 +813,7 @@ class BaseContributorList(JSONAPIBaseView, generics.ListAPIView, ListFilterMixin
     def get_default_queryset(self):
         node = self.get_node()
 
-        return node.contributor_set.all().include('user__guids')
+        return node.contributor_set.all().include('user')
 
     def get_queryset(self):
         queryset = self.get_queryset_from_request()
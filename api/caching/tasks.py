@@ -1,8 +1,14 @@
+import logging
+import threading
 import urlparse
+from collections import Counter
 
 import requests
-import logging
+from gevent.pool import Pool
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from framework.postcommit_tasks.handlers import enqueue_postcommit_side_effect
 from website import settings
 
 logger = logging.getLogger(__name__)
@@ -13,73 +19,157 @@ def get_varnish_servers():
     return settings.VARNISH_SERVERS
 
 
-def get_bannable_urls(instance):
+def get_bannable_paths(instance):
+    """Return the set of (hostname, path) whose cached responses must be banned
+    when `instance` changes.
+    """
     from osf.models import Comment
-    bannable_urls = []
-    parsed_absolute_url = {}
 
     if not hasattr(instance, 'absolute_api_v2_url'):
         logger.warning('Tried to ban {}:{} but it didn\'t have a absolute_api_v2_url method'.format(instance.__class__, instance))
-        return [], ''
-
-    for host in get_varnish_servers():
-        # add instance url
-        varnish_parsed_url = urlparse.urlparse(host)
-        parsed_absolute_url = urlparse.urlparse(instance.absolute_api_v2_url)
-        url_string = '{scheme}://{netloc}{path}.*'.format(scheme=varnish_parsed_url.scheme,
-                                                          netloc=varnish_parsed_url.netloc,
-                                                          path=parsed_absolute_url.path)
-        bannable_urls.append(url_string)
-        if isinstance(instance, Comment):
-            try:
-                parsed_target_url = urlparse.urlparse(instance.target.referent.absolute_api_v2_url)
-            except AttributeError:
-                # some referents don't have an absolute_api_v2_url
-                # I'm looking at you NodeWikiPage
-                pass
-            else:
-                url_string = '{scheme}://{netloc}{path}.*'.format(scheme=varnish_parsed_url.scheme,
-                                                                  netloc=varnish_parsed_url.netloc,
-                                                                  path=parsed_target_url.path)
-                bannable_urls.append(url_string)
-
-            try:
-                parsed_root_target_url = urlparse.urlparse(instance.root_target.referent.absolute_api_v2_url)
-            except AttributeError:
-                # some root_targets don't have an absolute_api_v2_url
-                pass
-            else:
-                url_string = '{scheme}://{netloc}{path}.*'.format(scheme=varnish_parsed_url.scheme,
-                                                              netloc=varnish_parsed_url.netloc,
-                                                              path=parsed_root_target_url.path)
-                bannable_urls.append(url_string)
-
-    return bannable_urls, parsed_absolute_url.hostname
+        return set()
+
+    parsed_absolute_url = urlparse.urlparse(instance.absolute_api_v2_url)
+    paths = {parsed_absolute_url.path}
+    if isinstance(instance, Comment):
+        try:
+            paths.add(urlparse.urlparse(instance.target.referent.absolute_api_v2_url).path)
+        except AttributeError:
+            # some referents don't have an absolute_api_v2_url
+            # I'm looking at you NodeWikiPage
+            pass
+
+        try:
+            paths.add(urlparse.urlparse(instance.root_target.referent.absolute_api_v2_url).path)
+        except AttributeError:
+            # some root_targets don't have an absolute_api_v2_url
+            pass
+
+    return {(parsed_absolute_url.hostname, path) for path in paths}
+
+
+def collapse_bans(paths, max_length=None):
+    """Collapse `paths` into as few ban regexes as possible. A path under
+    another path is already covered by its ban; the remaining paths are
+    combined into alternations of at most `max_length` characters.
+
+        >>> collapse_bans(['/v2/nodes/abc12/', '/v2/nodes/abc12/children/', '/v2/nodes/def34/'])
+        ['/v2/nodes/(abc12/|def34/).*']
+    """
+    max_length = max_length or settings.VARNISH_BAN_MAX_LENGTH
+    # Once sorted, the paths under a path directly follow it
+    kept = []
+    for path in sorted(set(paths)):
+        if not kept or not path.startswith(kept[-1]):
+            kept.append(path)
+
+    bans = []
+    group = []
+    for path in kept:
+        if group and len(_ban_regex(group + [path])) > max_length:
+            bans.append(_ban_regex(group))
+            group = []
+        group.append(path)
+    if group:
+        bans.append(_ban_regex(group))
+    return bans
+
+
+def _ban_regex(paths):
+    if len(paths) == 1:
+        return '{}.*'.format(paths[0])
+    # Paths are sorted, so the first and last share the longest common prefix
+    prefix = paths[0][:paths[0].rfind('/', 0, len(_common_prefix(paths[0], paths[-1])) + 1) + 1]
+    return '{}({}).*'.format(prefix, '|'.join(path[len(prefix):] for path in paths))
+
+
+def _common_prefix(a, b):
+    length = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        length += 1
+    return a[:length]
+
+
+class BanDispatcher(object):
+    """Sends BAN requests to every Varnish server. The paths of a batch are
+    collapsed and sent together, over pooled keep-alive connections, to all
+    servers in parallel. Counts of what was submitted and sent are kept in `stats`.
+    """
+
+    def __init__(self):
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        self._session = None
+
+    @property
+    def session(self):
+        if self._session is None:
+            retries = Retry(
+                total=settings.VARNISH_BAN_RETRIES,
+                backoff_factor=0.05,
+                status_forcelist=(500, 502, 503, 504),
+                method_whitelist=frozenset(['BAN']),
+                raise_on_status=False,
+            )
+            session = requests.Session()
+            session.mount('http://', HTTPAdapter(max_retries=retries))
+            session.mount('https://', HTTPAdapter(max_retries=retries))
+            self._session = session
+        return self._session
+
+    def submit(self, bans):
+        """Send the (hostname, path) pairs in `bans` as one batch, before returning."""
+        if not bans:
+            return
+
+        by_hostname = {}
+        for hostname, path in bans:
+            by_hostname.setdefault(hostname, []).append(path)
+        requests_to_send = [
+            (server, hostname, regex)
+            for hostname, paths in by_hostname.items()
+            for regex in collapse_bans(paths)
+            for server in get_varnish_servers()
+        ]
+        pool = Pool(max(len(get_varnish_servers()), 1))
+        failures = sum(1 for ok in pool.imap_unordered(self._send, requests_to_send) if not ok)
+
+        with self._lock:
+            self.stats['paths'] += len(bans)
+            self.stats['batches'] += 1
+            self.stats['requests'] += len(requests_to_send)
+            self.stats['failures'] += failures
+        logger.info('Banned {} paths with {} requests to {} servers, {} failed'.format(
+            len(bans), len(requests_to_send), len(get_varnish_servers()), failures
+        ))
+
+    def _send(self, request):
+        server, hostname, regex = request
+        parsed = urlparse.urlparse(server)
+        prepared = requests.Request('BAN', server, headers={'Host': hostname}).prepare()
+        # The regex is sent as is; quoting it would escape the alternation
+        prepared.url = '{}://{}{}'.format(parsed.scheme, parsed.netloc, regex)
+        try:
+            response = self.session.send(prepared, timeout=settings.VARNISH_BAN_TIMEOUT)
+        except Exception as ex:
+            logger.error('Banning {} on {} failed: {}'.format(regex, server, ex))
+            return False
+        if not response.ok:
+            logger.error('Banning {} on {} failed: {}'.format(regex, server, response.text))
+            return False
+        return True
+
+
+dispatcher = BanDispatcher()
 
 
 def ban_url(instance):
-    # TODO: Refactor; Pull url generation into postcommit_task handling so we only ban urls once per request
-    timeout = 0.3  # 300ms timeout for bans
+    """Ban the cached API responses of `instance` once the request ends. The
+    bans of every instance changed during a request are sent together; outside
+    of a request they are sent at once.
+    """
     if settings.ENABLE_VARNISH:
-        bannable_urls, hostname = get_bannable_urls(instance)
-
-        for url_to_ban in set(bannable_urls):
-            try:
-                response = requests.request('BAN', url_to_ban, timeout=timeout, headers=dict(
-                    Host=hostname
-                ))
-            except Exception as ex:
-                logger.error('Banning {} failed: {}'.format(
-                    url_to_ban,
-                    ex.message
-                ))
-            else:
-                if not response.ok:
-                    logger.error('Banning {} failed: {}'.format(
-                        url_to_ban,
-                        response.text
-                    ))
-                else:
-                    logger.info('Banning {} succeeded'.format(
-                        url_to_ban
-                    ))
+        dispatcher.stats['objects'] += 1
+        enqueue_postcommit_side_effect('ban_url', dispatcher.submit, fields=get_bannable_paths(instance))
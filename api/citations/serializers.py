@@ -16,6 +16,8 @@ class CitationSerializer(JSONAPISerializer):
 
     short_title = ser.CharField(max_length=500)
     summary = ser.CharField(max_length=200)
+    has_bibliography = ser.BooleanField(read_only=True)
+    fields_used = ser.ListField(child=ser.CharField(), read_only=True)
 
     def get_absolute_url(self, obj):
         return obj.get_absolute_url()
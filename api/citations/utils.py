@@ -1,17 +1,28 @@
+import hashlib
+import json
 import os
 import re
+import threading
 import httplib as http
+from collections import OrderedDict
 
 from citeproc import CitationStylesStyle, CitationStylesBibliography
 from citeproc import Citation, CitationItem
 from citeproc import formatter
 from citeproc.source.json import CiteProcJSON
+from django.core.cache import cache
 
 from framework.exceptions import HTTPError
 from framework.auth import utils
 from osf.models import PreprintService
 from website.citations.utils import datetime_to_csl
-from website.settings import CITATION_STYLES_PATH, BASE_PATH, CUSTOM_CITATIONS
+from website.settings import (
+    CITATION_STYLES_PATH, BASE_PATH, CUSTOM_CITATIONS, CITATION_STYLE_CACHE_SIZE, CITATION_CACHE_TIMEOUT
+)
+
+# Parsed CitationStylesStyles, most recently used last, keyed by (path, mtime)
+_parsed_styles = OrderedDict()
+_parsed_styles_lock = threading.Lock()
 
 
 def clean_up_common_errors(cit):
@@ -70,31 +81,86 @@ def process_name(node, user):
     }
 
 
-def render_citation(node, style='apa'):
-    """Given a node, return a citation"""
-    csl = None
-    if isinstance(node, PreprintService):
-        csl = preprint_csl(node, node.node)
-        data = [csl, ]
-    else:
-        data = [node.csl, ]
-
-    bib_source = CiteProcJSON(data)
+def get_style_file(style):
+    """Return the (path, mtime) of the CSL file of `style`.
 
+    :raises ValueError: if there is no such style, like citeproc does
+    """
     custom = CUSTOM_CITATIONS.get(style, False)
     path = os.path.join(BASE_PATH, 'static', custom) if custom else os.path.join(CITATION_STYLES_PATH, style)
-    bib_style = CitationStylesStyle(path, validate=False)
+    # citeproc falls back to `<path>.csl`
+    if not os.path.exists(path):
+        path = '{}.csl'.format(path)
+    try:
+        return path, os.path.getmtime(path)
+    except OSError:
+        raise ValueError("'{}' is not a known style".format(path))
+
+
+def get_style(style):
+    """Return the parsed CitationStylesStyle of `style`, from a process-wide
+    LRU keyed by the CSL file and its mtime, so an updated file is parsed again.
+    """
+    key = get_style_file(style)
+    with _parsed_styles_lock:
+        parsed = _parsed_styles.pop(key, None)
+        if parsed is not None:
+            _parsed_styles[key] = parsed
+            return parsed
+    parsed = CitationStylesStyle(key[0], validate=False)
+    with _parsed_styles_lock:
+        _parsed_styles[key] = parsed
+        while len(_parsed_styles) > CITATION_STYLE_CACHE_SIZE:
+            _parsed_styles.popitem(last=False)
+    return parsed
+
+
+def citation_cache_key(style, csl, node):
+    """Citations only depend on the style file, the CSL data of the node and
+    the names of its visible contributors, so they are cached by a hash of those.
+    """
+    names = [process_name(node, user) for user in node.visible_contributors]
+    digest = hashlib.sha1(json.dumps([csl, names], sort_keys=True, default=unicode)).hexdigest()
+    return 'citation:{}:{}:{}'.format(style, get_style_file(style)[1], digest)
 
-    bibliography = CitationStylesBibliography(bib_style, bib_source, formatter.plain)
 
-    citation = Citation([CitationItem(node._id)])
+def render_citation(node, style='apa'):
+    """Given a node, return a citation"""
+    return render_citations([node], style=style)[0]
+
+
+def render_csl(style, csl):
+    """Render the bibliography entry of `csl` through a bibliography of its own,
+    as numbered styles (ieee, vancouver...) number entries by their position in it.
+    """
+    bibliography = CitationStylesBibliography(get_style(style), CiteProcJSON([csl]), formatter.plain)
+    bibliography.register(Citation([CitationItem(csl['id'])]))
+    return unicode(bibliography.bibliography()[0])
+
+
+def render_citations(nodes, style='apa'):
+    """Given nodes or preprints, return their citations in one style. The ones
+    that are not cached share the parsed style, and are cached together.
+    """
+    entries = []
+    for node in nodes:
+        if isinstance(node, PreprintService):
+            csl, cit_node = preprint_csl(node, node.node), node.node
+        else:
+            csl, cit_node = node.csl, node
+        entries.append((citation_cache_key(style, csl, cit_node), csl, cit_node))
 
-    bibliography.register(citation)
+    citations = cache.get_many([key for key, csl, cit_node in entries])
+    missing = OrderedDict((key, (csl, cit_node)) for key, csl, cit_node in entries if key not in citations)
+    if missing:
+        for key, (csl, cit_node) in missing.items():
+            citations[key] = reformat(style, csl, cit_node, render_csl(style, csl))
+        cache.set_many({key: citations[key] for key in missing}, CITATION_CACHE_TIMEOUT)
+    return [citations[key] for key, csl, cit_node in entries]
 
-    bib = bibliography.bibliography()
-    cit = unicode(bib[0] if len(bib) else '')
 
-    title = csl['title'] if csl else node.csl['title']
+def reformat(style, csl, node, cit):
+    title = csl['title']
     if cit.count(title) == 1:
         i = cit.index(title)
         prefix = clean_up_common_errors(cit[0:i])
@@ -103,17 +169,12 @@ def render_citation(node, style='apa'):
     elif cit.count(title) == 0:
         cit = clean_up_common_errors(cit)
 
-    if isinstance(node, PreprintService):
-        cit_node = node.node
-    else:
-        cit_node = node
-
     if style == 'apa':
-        cit = apa_reformat(cit_node, cit)
+        cit = apa_reformat(node, cit)
     if style == 'chicago-author-date':
-        cit = chicago_reformat(cit_node, cit)
+        cit = chicago_reformat(node, cit)
     if style == 'modern-language-association':
-        cit = mla_reformat(cit_node, cit)
+        cit = mla_reformat(node, cit)
 
     return cit
 
@@ -24,9 +24,15 @@ class CitationStyleList(JSONAPIBaseView, generics.ListAPIView, ListFilterMixin):
         summary            string             summary of the citation style
         short_title        string             a short name or nickname for the citation style
         title              string             official name of the citation style
+        has_bibliography   boolean            whether the style defines a bibliography
+        fields_used        array of strings   the CSL variables the style uses
 
 
     Citation style may be filtered by their 'title', 'short_title', 'summary', and 'id'
+
+    ##Query Params
+
+    + `q=<Str>` -- only styles whose id, title or short title contain the string, most similar first
     '''
     permission_classes = (
         drf_permissions.IsAuthenticatedOrReadOnly,
@@ -47,7 +53,11 @@ class CitationStyleList(JSONAPIBaseView, generics.ListAPIView, ListFilterMixin):
         return CitationStyle.objects.all()
 
     def get_queryset(self):
-        return self.get_queryset_from_request()
+        queryset = self.get_queryset_from_request()
+        query = self.request.query_params.get('q')
+        if query:
+            queryset = queryset.search(query)
+        return queryset
 
 class CitationStyleDetail(JSONAPIBaseView, generics.RetrieveAPIView):
     '''Detail for a citation style *Read-only*
@@ -63,6 +73,8 @@ class CitationStyleDetail(JSONAPIBaseView, generics.RetrieveAPIView):
     summary            string             summary of the citation style
     short_title        string             a short name or nickname for the citation style
     title              string             official name of the citation style
+    has_bibliography   boolean            whether the style defines a bibliography
+    fields_used        array of strings   the CSL variables the style uses
 
     '''
     permission_classes = (
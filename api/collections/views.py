@@ -1,3 +1,5 @@
+import re
+
 from rest_framework import generics, permissions as drf_permissions
 from rest_framework.exceptions import ValidationError, NotFound, PermissionDenied
 
@@ -12,12 +14,13 @@ from api.base.views import LinkedNodesRelationship
 from api.base.views import LinkedRegistrationsRelationship
 
 from api.base.utils import get_object_or_error, is_bulk_request, get_user_auth
+from api.citations.utils import render_citations
 from api.collections.serializers import (
     CollectionSerializer,
     CollectionDetailSerializer,
     CollectionNodeLinkSerializer,
 )
-from api.nodes.serializers import NodeSerializer
+from api.nodes.serializers import NodeSerializer, NodeCitationStyleSerializer
 from api.registrations.serializers import RegistrationSerializer
 
 from api.nodes.permissions import (
@@ -144,7 +147,7 @@ class CollectionList(JSONAPIBaseView, bulk_views.BulkUpdateJSONAPIView, bulk_vie
         if is_bulk_request(self.request):
             auth = get_user_auth(self.request)
             collection_ids = [coll['id'] for coll in self.request.data]
-            collections = Collection.objects.filter(guids___id__in=collection_ids)
+            collections = Collection.objects.filter(guid_string__in=collection_ids)
             for collection in collections:
                 if not collection.can_edit(auth):
                     raise PermissionDenied
@@ -438,6 +441,44 @@ class LinkedRegistrationsList(BaseLinkedList, CollectionMixin):
         return res
 
 
+class LinkedNodesCitationList(BaseLinkedList, CollectionMixin):
+    """Citations of the nodes and registrations linked to this collection, in a specific style's format. *Read-only*.
+
+    Each page of citations is rendered with the style parsed once, and citations are cached per node.
+
+    ##Styled Citation Attributes
+
+        name                     type                description
+        =================================================================================
+        citation                 string              complete citation for the linked node in the given style
+
+    The `id` of each citation is the `id` of the linked node.
+
+    ##Links
+
+    See the [JSON-API spec regarding pagination](http://jsonapi.org/format/1.0/#fetching-pagination).
+
+    #This Request/Response
+    """
+    required_read_scopes = [CoreScopes.NODE_CITATIONS_READ]
+
+    serializer_class = NodeCitationStyleSerializer
+    view_category = 'collections'
+    view_name = 'collection-citations'
+
+    ordering = ('-modified',)
+
+    def paginate_queryset(self, queryset):
+        nodes = super(LinkedNodesCitationList, self).paginate_queryset(queryset)
+        style = self.kwargs.get('style_id')
+        try:
+            citations = render_citations(nodes, style=style)
+        except ValueError as err:  # style requested could not be found
+            csl_name = re.findall('[a-zA-Z]+\.csl', err.message)[0]
+            raise NotFound('{} is not a known style.'.format(csl_name))
+        return [{'id': node._id, 'citation': citation} for node, citation in zip(nodes, citations)]
+
+
 class NodeLinksList(JSONAPIBaseView, bulk_views.BulkDestroyJSONAPIView, bulk_views.ListBulkCreateJSONAPIView, CollectionMixin):
     """Node Links to other nodes. *Writeable*.
 
@@ -34,7 +34,7 @@ class CommentMixin(object):
 
     def get_comment(self, check_permissions=True):
         pk = self.kwargs[self.comment_lookup_url_kwarg]
-        comment = get_object_or_404(Comment, guids___id=pk, root_target__isnull=False)
+        comment = get_object_or_404(Comment, guid_string=pk, root_target__isnull=False)
 
         # Deleted root targets still appear as tuples in the database and are included in
         # the above query, requiring an additional check
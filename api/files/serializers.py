@@ -6,7 +6,7 @@ import furl
 import pytz
 
 from framework.auth.core import Auth
-from osf.models import BaseFileNode, OSFUser, Comment
+from osf.models import BaseFileNode, OSFUser
 from rest_framework import serializers as ser
 from website import settings
 from website.util import api_v2_url
@@ -22,6 +22,7 @@ from api.base.serializers import (
     NodeFileHyperLinkField,
     RelationshipField,
     TypeField,
+    UnreadCommentsCountMixin,
     WaterbutlerLink,
     VersionedDateTimeField,
 )
@@ -85,7 +86,7 @@ class CheckoutField(ser.HyperlinkedRelatedField):
         ])
 
     def get_queryset(self):
-        return OSFUser.objects.filter(guids___id=self.context['request'].user._id)
+        return OSFUser.objects.filter(guid_string=self.context['request'].user._id)
 
     def get_url(self, obj, view_name, request, format):
         if obj is None:
@@ -130,7 +131,7 @@ class FileTagField(ser.Field):
         return data
 
 
-class BaseFileSerializer(JSONAPISerializer):
+class BaseFileSerializer(UnreadCommentsCountMixin, JSONAPISerializer):
     filterable_fields = frozenset([
         'id',
         'name',
@@ -250,11 +251,12 @@ class BaseFileSerializer(JSONAPISerializer):
         auth = Auth(user if not user.is_anonymous else None)
         return obj.node.can_comment(auth)
 
+    def get_comments_root(self, obj):
+        guid = obj.get_guid()
+        return obj.node, guid._id if guid else None
+
     def get_unread_comments_count(self, obj):
-        user = self.context['request'].user
-        if user.is_anonymous:
-            return 0
-        return Comment.find_n_unread(user=user, node=obj.node, page='files', root_id=obj.get_guid()._id)
+        return self.find_n_unread_comments(obj)
 
     def user_id(self, obj):
         # NOTE: obj is the user here, the meta field for
@@ -11,6 +11,7 @@ from api.base.views import JSONAPIBaseView
 from api.base.utils import get_object_or_error, is_truthy
 from api.guids.serializers import GuidSerializer
 from osf.models import Guid
+from osf.utils import guid_resolution
 
 
 class GuidDetail(JSONAPIBaseView, generics.RetrieveAPIView):
@@ -69,11 +70,10 @@ class GuidDetail(JSONAPIBaseView, generics.RetrieveAPIView):
         raise NotFound
 
     def get_redirect_url(self, **kwargs):
-        guid = Guid.load(kwargs['guids'])
-        if guid:
-            referent = guid.referent
-            if getattr(referent, 'absolute_api_v2_url', None):
-                return referent.absolute_api_v2_url
+        resolution = guid_resolution.resolve(kwargs['guids'], url_attr='absolute_api_v2_url')
+        if resolution:
+            if resolution.url:
+                return resolution.url
             else:
                 raise EndpointNotImplementedError()
         return None
@@ -2,6 +2,7 @@
 from rest_framework import permissions
 
 from api.base.utils import get_user_auth
+from osf.models import Institution
 
 class UserIsAffiliated(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
@@ -12,3 +13,10 @@ class UserIsAffiliated(permissions.BasePermission):
             return True
         else:
             return user.is_affiliated_with_institution(obj['self'])
+
+
+class UserIsAffiliatedWithInstitution(permissions.BasePermission):
+    def has_object_permission(self, request, view, obj):
+        assert isinstance(obj, Institution)
+        user = get_user_auth(request).user
+        return bool(user) and user.is_affiliated_with_institution(obj)
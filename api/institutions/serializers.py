@@ -6,6 +6,7 @@ from website.util import permissions as osf_permissions
 
 from api.base.serializers import JSONAPISerializer, RelationshipField, LinksField, JSONAPIRelationshipSerializer, \
     BaseAPISerializer
+from api.base.utils import absolute_reverse
 from api.base.exceptions import RelationshipPostMakesNoChanges
 
 
@@ -49,6 +50,37 @@ class InstitutionSerializer(JSONAPISerializer):
         type_ = 'institutions'
 
 
+class InstitutionSummarySerializer(JSONAPISerializer):
+
+    id = ser.SerializerMethodField()
+    date = ser.DateField(read_only=True)
+    users = ser.IntegerField(read_only=True)
+    public_nodes = ser.IntegerField(read_only=True)
+    private_nodes = ser.IntegerField(read_only=True)
+    public_registrations = ser.IntegerField(read_only=True)
+    private_registrations = ser.IntegerField(read_only=True)
+    preprints = ser.IntegerField(read_only=True)
+    bytes_stored = ser.IntegerField(read_only=True)
+    links = LinksField({'self': 'get_absolute_url', })
+
+    institution = RelationshipField(
+        related_view='institutions:institution-detail',
+        related_view_kwargs={'institution_id': '<institution._id>'}
+    )
+
+    def get_id(self, obj):
+        return '{}-{}'.format(obj.institution._id, obj.date.isoformat())
+
+    def get_absolute_url(self, obj):
+        return absolute_reverse('institutions:institution-summary', kwargs={
+            'institution_id': obj.institution._id,
+            'version': self.context['request'].parser_context['kwargs']['version']
+        })
+
+    class Meta:
+        type_ = 'institution-summaries'
+
+
 class NodeRelated(JSONAPIRelationshipSerializer):
     id = ser.CharField(source='_id', required=False, allow_null=True)
     class Meta:
@@ -1,3 +1,5 @@
+import datetime
+
 from rest_framework import generics
 from rest_framework import permissions as drf_permissions
 from rest_framework import exceptions
@@ -6,7 +8,7 @@ from rest_framework.response import Response
 
 from framework.auth.oauth_scopes import CoreScopes
 
-from osf.models import OSFUser, Node, Institution, Registration
+from osf.models import OSFUser, Node, Institution, InstitutionSummary, Registration
 from website.util import permissions as osf_permissions
 
 from api.base import permissions as base_permissions
@@ -19,15 +21,15 @@ from api.base.parsers import (
     JSONAPIRelationshipParser,
     JSONAPIRelationshipParserForRegularJSON,
 )
-from api.base.exceptions import RelationshipPostMakesNoChanges
+from api.base.exceptions import InvalidQueryStringError, RelationshipPostMakesNoChanges
 from api.nodes.serializers import NodeSerializer
 from api.nodes.filters import NodesFilterMixin
 from api.users.serializers import UserSerializer
 from api.registrations.serializers import RegistrationSerializer
 
 from api.institutions.authentication import InstitutionAuthentication
-from api.institutions.serializers import InstitutionSerializer, InstitutionNodesRelationshipSerializer, InstitutionRegistrationsRelationshipSerializer
-from api.institutions.permissions import UserIsAffiliated
+from api.institutions.serializers import InstitutionSerializer, InstitutionNodesRelationshipSerializer, InstitutionRegistrationsRelationshipSerializer, InstitutionSummarySerializer
+from api.institutions.permissions import UserIsAffiliated, UserIsAffiliatedWithInstitution
 
 class InstitutionMixin(object):
     """Mixin with convenience method get_institution
@@ -193,6 +195,60 @@ class InstitutionUserList(JSONAPIBaseView, ListFilterMixin, generics.ListAPIView
         return self.get_queryset_from_request()
 
 
+class InstitutionSummaryDetail(JSONAPIBaseView, generics.RetrieveAPIView, InstitutionMixin):
+    """Counts of an institution's affiliated users, nodes, registrations, preprints and bytes stored.
+
+    ##Attributes
+
+        name                   type      description
+        =========================================================================
+        date                   date      the day the counts are as of
+        users                  integer   active users affiliated with the institution
+        public_nodes           integer   public projects and components
+        private_nodes          integer   private projects and components
+        public_registrations   integer   public registrations
+        private_registrations  integer   embargoed and pending registrations
+        preprints              integer   published preprints of affiliated nodes
+        bytes_stored           integer   bytes of the OSF Storage file versions of affiliated nodes
+
+    ##Query Params
+
+    + `date=<YYYY-MM-DD>` -- the counts as of the end of a past day, instead of now.
+
+    ##Permissions
+    Only users affiliated with the institution.
+    """
+    permission_classes = (
+        drf_permissions.IsAuthenticated,
+        base_permissions.TokenHasScope,
+        UserIsAffiliatedWithInstitution,
+    )
+
+    required_read_scopes = [CoreScopes.INSTITUTION_READ]
+    required_write_scopes = [CoreScopes.NULL]
+    model_class = InstitutionSummary
+
+    serializer_class = InstitutionSummarySerializer
+    view_category = 'institutions'
+    view_name = 'institution-summary'
+
+    # overrides RetrieveAPIView
+    def get_object(self):
+        institution = self.get_institution()
+        self.check_object_permissions(self.request, institution)
+        date = self.request.query_params.get('date')
+        if date:
+            try:
+                date = datetime.datetime.strptime(date, '%Y-%m-%d').date()
+            except ValueError:
+                raise InvalidQueryStringError('date must be formatted as YYYY-MM-DD', parameter='date')
+        summary = InstitutionSummary.get_latest(institution.id, date=date)
+        if summary is None:
+            raise exceptions.NotFound(detail='No counts for institution {} as of {}'.format(institution._id, date))
+        summary.institution = institution
+        return summary
+
+
 class InstitutionAuth(JSONAPIBaseView, generics.CreateAPIView):
     permission_classes = (
         drf_permissions.IsAuthenticated,
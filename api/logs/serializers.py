@@ -105,14 +105,14 @@ class NodeLogParamsSerializer(RestrictedDictSerializer):
     def get_params_node(self, obj):
         node_id = obj.get('node', None)
         if node_id:
-            node = AbstractNode.objects.filter(guids___id=node_id).values('title').get()
+            node = AbstractNode.objects.filter(guid_string=node_id).values('title').get()
             return {'id': node_id, 'title': node['title']}
         return None
 
     def get_params_project(self, obj):
         project_id = obj.get('project', None)
         if project_id:
-            node = AbstractNode.objects.filter(guids___id=project_id).values('title').get()
+            node = AbstractNode.objects.filter(guid_string=project_id).values('title').get()
             return {'id': project_id, 'title': node['title']}
         return None
 
@@ -120,7 +120,7 @@ class NodeLogParamsSerializer(RestrictedDictSerializer):
         user = self.context['request'].user
         pointer = obj.get('pointer', None)
         if pointer:
-            pointer_node = AbstractNode.objects.get(guids___id=pointer['id'])
+            pointer_node = AbstractNode.objects.get(guid_string=pointer['id'])
             if not pointer_node.is_deleted:
                 if pointer_node.is_public or (user.is_authenticated and pointer_node.has_permission(user, osf_permissions.READ)):
                     pointer['title'] = pointer_node.title
@@ -139,7 +139,7 @@ class NodeLogParamsSerializer(RestrictedDictSerializer):
 
         if contributor_ids:
             users = (
-                OSFUser.objects.filter(guids___id__in=contributor_ids)
+                OSFUser.objects.filter(guid_string__in=contributor_ids)
                 .only('fullname', 'given_name',
                       'middle_names', 'family_name',
                       'unclaimed_records', 'is_active')
@@ -4,18 +4,20 @@ from api.base.exceptions import (Conflict, EndpointNotImplementedError,
                                  InvalidModelValueError,
                                  RelationshipPostMakesNoChanges)
 from api.base.serializers import (VersionedDateTimeField, HideIfRegistration, IDField,
-                                  JSONAPIListField,
+                                  JSONAPIListField, JSONAPIListSerializer,
                                   JSONAPIRelationshipSerializer,
                                   JSONAPISerializer, LinksField,
                                   NodeFileHyperLinkField, RelationshipField,
                                   ShowIfVersion, TargetTypeField, TypeField,
-                                  WaterbutlerLink, relationship_diff, BaseAPISerializer)
+                                  WaterbutlerLink, relationship_diff, BaseAPISerializer,
+                                  UnreadCommentsCountMixin)
 from api.base.settings import ADDONS_FOLDER_CONFIGURABLE
 from api.base.utils import (absolute_reverse, get_object_or_error,
                             get_user_auth, is_truthy)
 from django.apps import apps
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from framework.auth.core import Auth
 from framework.exceptions import PermissionsError
 from osf.models import Tag
@@ -23,8 +25,8 @@ from rest_framework import serializers as ser
 from rest_framework import exceptions
 from addons.base.exceptions import InvalidAuthError, InvalidFolderError
 from website.exceptions import NodeStateError
-from osf.models import (Comment, DraftRegistration, Institution,
-                        MetaSchema, AbstractNode, PrivateLink)
+from osf.models import (Contributor, DraftRegistration, Institution,
+                        MetaSchema, AbstractNode, OSFUser, PrivateLink)
 from osf.models.external import ExternalAccount
 from osf.models.licenses import NodeLicense
 from osf.models.preprint_service import PreprintService
@@ -109,7 +111,7 @@ def get_license_details(node, validated_data):
         'copyrightHolders': license_holders
     }
 
-class NodeSerializer(JSONAPISerializer):
+class NodeSerializer(UnreadCommentsCountMixin, JSONAPISerializer):
     # TODO: If we have to redo this implementation in any of the other serializers, subclass ChoiceField and make it
     # handle blank choices properly. Currently DRF ChoiceFields ignore blank options, which is incorrect in this
     # instance
@@ -355,6 +357,7 @@ class NodeSerializer(JSONAPISerializer):
     def get_node_count(self, obj):
         auth = get_user_auth(self.context['request'])
         user_id = getattr(auth.user, 'id', None)
+        private_link_node_pks = getattr(auth.private_link, 'node_pks', ())
         with connection.cursor() as cursor:
             cursor.execute('''
                 WITH RECURSIVE parents AS (
@@ -372,17 +375,15 @@ class NodeSerializer(JSONAPISerializer):
                   osf_noderelation
                 JOIN osf_abstractnode ON osf_noderelation.child_id = osf_abstractnode.id
                 JOIN osf_contributor ON osf_abstractnode.id = osf_contributor.node_id
-                LEFT JOIN osf_privatelink_nodes ON osf_abstractnode.id = osf_privatelink_nodes.abstractnode_id
-                LEFT JOIN osf_privatelink ON osf_privatelink_nodes.privatelink_id = osf_privatelink.id
                 WHERE parent_id = %s AND is_node_link IS FALSE
                 AND osf_abstractnode.is_deleted IS FALSE
                 AND (
                   osf_abstractnode.is_public
                   OR (TRUE IN (SELECT TRUE FROM has_admin))
                   OR (osf_contributor.user_id = %s AND osf_contributor.read IS TRUE)
-                  OR (osf_privatelink.key = %s AND osf_privatelink.is_deleted = FALSE)
+                  OR osf_abstractnode.id = ANY(%s)
                 );
-            ''', [obj.id, obj.id, user_id, obj.id, user_id, auth.private_key])
+            ''', [obj.id, obj.id, user_id, obj.id, user_id, list(private_link_node_pks)])
 
             return int(cursor.fetchone()[0])
 
@@ -413,12 +414,12 @@ class NodeSerializer(JSONAPISerializer):
                 count += 1
         return count
 
-    def get_unread_comments_count(self, obj):
-        user = get_user_auth(self.context['request']).user
-        node_comments = Comment.find_n_unread(user=user, node=obj, page='node')
+    def get_comments_root(self, obj):
+        return obj, obj._id
 
+    def get_unread_comments_count(self, obj):
         return {
-            'node': node_comments
+            'node': self.find_n_unread_comments(obj)
         }
 
     def create(self, validated_data):
@@ -801,11 +802,75 @@ class NodeContributorsSerializer(JSONAPISerializer):
             return unclaimed_records.get('name', None)
 
 
+class NodeContributorsBulkCreateSerializer(JSONAPIListSerializer):
+    """
+    Adds registered users in a bulk request with a single call to `add_contributors`, rather than one
+    `add_contributor` per user. Requests adding unregistered contributors, or at a given index, are
+    still created one at a time.
+    """
+
+    def create(self, validated_data):
+        if any(not data.get('_id') or '_order' in data for data in validated_data):
+            return super(NodeContributorsBulkCreateSerializer, self).create(validated_data)
+
+        node = self.context['view'].get_node()
+        auth = Auth(self.context['request'].user)
+        send_email = self.context['request'].GET.get('send_email') or 'default'
+        if send_email not in self.child.email_preferences:
+            raise exceptions.ValidationError(detail='{} is not a valid email preference.'.format(send_email))
+
+        user_ids = [data['_id'] for data in validated_data]
+        for data in validated_data:
+            self.child.validate_data(node, user_id=data['_id'], email=data.get('user', {}).get('email'))
+        users = {user._id: user for user in OSFUser.objects.filter(guid_string__in=user_ids)}
+        for i, user_id in enumerate(user_ids):
+            user = users.get(user_id)
+            if not user:
+                raise exceptions.NotFound(detail='User with id {} was not found.'.format(user_id))
+            if not user.is_registered:
+                raise exceptions.NotFound(
+                    detail='Cannot add unconfirmed user {} to node {} by guid. Add an unregistered contributor with fullname and email.'
+                    .format(user_id, node._id)
+                )
+            if user_id in user_ids[:i]:
+                raise exceptions.ValidationError(detail='{} is already a contributor.'.format(user.fullname))
+        existing = node.contributor_set.filter(user__in=users.values()).select_related('user').first()
+        if existing:
+            raise exceptions.ValidationError(detail='{} is already a contributor.'.format(existing.user.fullname))
+
+        try:
+            node.add_contributors([
+                {
+                    'user': users[data['_id']],
+                    'permissions': osf_permissions.expand_permissions(data.get('permission')) or osf_permissions.DEFAULT_CONTRIBUTOR_PERMISSIONS,
+                    'visible': data.get('bibliographic'),
+                }
+                for data in validated_data
+            ], auth=auth, log=True, save=True, send_email=send_email)
+        except ValidationError as e:
+            raise exceptions.ValidationError(detail=e.messages[0])
+
+        auth.user.email_last_sent = timezone.now()
+        auth.user.save()
+
+        contributors = {
+            contributor.user._id: contributor
+            for contributor in Contributor.objects.filter(node=node, user__in=users.values()).select_related('user', 'node')
+        }
+        return [contributors[user_id] for user_id in user_ids]
+
+
 class NodeContributorsCreateSerializer(NodeContributorsSerializer):
     """
     Overrides NodeContributorsSerializer to add email, full_name, send_email, and non-required index and users field.
     """
 
+    # overrides JSONAPISerializer
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        kwargs['child'] = cls(*args, **kwargs)
+        return NodeContributorsBulkCreateSerializer(*args, **kwargs)
+
     id = IDField(source='_id', required=False, allow_null=True)
     full_name = ser.CharField(required=False)
     email = ser.EmailField(required=False, source='user.email')
@@ -825,7 +890,7 @@ class NodeContributorsCreateSerializer(NodeContributorsSerializer):
             raise Conflict(detail='Full name and/or email should not be included with a user ID.')
         if not user_id and not full_name:
             raise exceptions.ValidationError(detail='A user ID or full name must be provided to add a contributor.')
-        if index > len(node.contributors):
+        if index is not None and index > len(node.contributors):
             raise exceptions.ValidationError(detail='{} is not a valid contributor index for node with id {}'.format(index, node._id))
 
     def create(self, validated_data):
@@ -23,7 +23,7 @@ from api.base.exceptions import (
     EndpointNotImplementedError,
 )
 from api.base.filters import ListFilterMixin, PreprintFilterMixin
-from api.base.pagination import CommentPagination, NodeContributorPagination, MaxSizePagination
+from api.base.pagination import CommentPagination, NodeContributorPagination, MaxSizePagination, NodeLogPagination
 from api.base.parsers import (
     JSONAPIRelationshipParser,
     JSONAPIRelationshipParserForRegularJSON,
@@ -98,13 +98,13 @@ from api.users.views import UserMixin
 from api.users.serializers import UserSerializer
 from api.wikis.serializers import NodeWikiSerializer
 from framework.auth.oauth_scopes import CoreScopes
-from framework.postcommit_tasks.handlers import enqueue_postcommit_task
 from osf.models import AbstractNode
 from osf.models import (Node, PrivateLink, Institution, Comment, DraftRegistration,)
 from osf.models import OSFUser
 from osf.models import NodeRelation, Guid
 from osf.models import BaseFileNode
 from osf.models.files import File, Folder
+from osf.utils.guid_resolution import attach_referents
 from addons.wiki.models import NodeWikiPage
 from website import mails
 from website.exceptions import NodeStateError
@@ -287,13 +287,13 @@ class NodeList(JSONAPIBaseView, bulk_views.BulkUpdateJSONAPIView, bulk_views.Bul
         # For bulk requests, queryset is formed from request body.
         if is_bulk_request(self.request):
             auth = get_user_auth(self.request)
-            nodes = Node.objects.filter(guids___id__in=[node['id'] for node in self.request.data])
+            nodes = Node.objects.filter(guid_string__in=[node['id'] for node in self.request.data])
 
             # If skip_uneditable=True in query_params, skip nodes for which the user
             # does not have EDIT permissions.
             if is_truthy(self.request.query_params.get('skip_uneditable', False)):
-                has_permission = nodes.filter(contributor__user_id=auth.user.id, contributor__write=True).values_list('guids___id', flat=True)
-                return Node.objects.filter(guids___id__in=has_permission)
+                has_permission = nodes.filter(contributor__user_id=auth.user.id, contributor__write=True).values_list('guid_string', flat=True)
+                return Node.objects.filter(guid_string__in=has_permission)
 
             for node in nodes:
                 if not node.can_edit(auth):
@@ -679,7 +679,7 @@ class NodeContributorsList(BaseContributorList, bulk_views.BulkUpdateJSONAPIView
                     raise ValidationError('Contributor identifier not provided.')
                 except IndexError:
                     raise ValidationError('Contributor identifier incorrectly formatted.')
-            queryset = queryset.filter(user__guids___id__in=contrib_ids)
+            queryset = queryset.filter(user__guid_string__in=contrib_ids)
         return queryset
 
     # Overrides BulkDestroyJSONAPIView
@@ -703,7 +703,7 @@ class NodeContributorsList(BaseContributorList, bulk_views.BulkUpdateJSONAPIView
             except IndexError:
                 raise ValidationError('Contributor identifier incorrectly formatted.')
 
-        resource_object_list = OSFUser.objects.filter(guids___id__in=requested_ids)
+        resource_object_list = OSFUser.objects.filter(guid_string__in=requested_ids)
         for resource in resource_object_list:
             if getattr(resource, 'is_deleted', None):
                 raise Gone
@@ -1976,7 +1976,7 @@ class NodeFilesList(JSONAPIBaseView, generics.ListAPIView, WaterButlerMixin, Lis
             raise NotFound
 
         sub_qs = OsfStorageFolder.objects.filter(_children=OuterRef('pk'), pk=files_list.pk)
-        return files_list.children.annotate(folder=Exists(sub_qs)).filter(folder=True).prefetch_related('node__guids', 'versions', 'tags', 'guids')
+        return files_list.children.annotate(folder=Exists(sub_qs)).filter(folder=True).prefetch_related('node', 'versions', 'tags', 'guids')
 
     # overrides ListAPIView
     def get_queryset(self):
@@ -2521,6 +2521,9 @@ class NodeLogList(JSONAPIBaseView, generics.ListAPIView, NodeMixin, ListFilterMi
 
     See the [JSON-API spec regarding pagination](http://jsonapi.org/format/1.0/#fetching-pagination).
 
+    Pagination links use an opaque `page[cursor]` parameter, so that deep pages are as cheap to fetch as the first.
+    Requests using `page` or `sort` are paginated by page number instead.
+
     ##Actions
 
     ##Query Params
@@ -2543,6 +2546,7 @@ class NodeLogList(JSONAPIBaseView, generics.ListAPIView, NodeMixin, ListFilterMi
     log_lookup_url_kwarg = 'node_id'
 
     ordering = ('-date', )
+    pagination_class = NodeLogPagination
 
     permission_classes = (
         drf_permissions.IsAuthenticatedOrReadOnly,
@@ -2557,7 +2561,7 @@ class NodeLogList(JSONAPIBaseView, generics.ListAPIView, NodeMixin, ListFilterMi
 
     def get_queryset(self):
         return self.get_queryset_from_request().include(
-            'node__guids', 'user__guids', 'original_node__guids', limit_includes=10
+            'node', 'user', 'original_node', limit_includes=10
         )
 
 
@@ -2676,14 +2680,25 @@ class NodeCommentsList(JSONAPIBaseView, generics.ListCreateAPIView, ListFilterMi
 
     def get_queryset(self):
         comments = self.get_queryset_from_request()
+        root_targets = list(Guid.objects.filter(id__in=comments.values('root_target_id')))
+        attach_referents(root_targets)
+        root_targets = {guid.id: guid for guid in root_targets}
         for comment in comments:
             # Deleted root targets still appear as tuples in the database,
             # but need to be None in order for the query to be correct.
+            comment.root_target = root_targets[comment.root_target_id]
             if comment.root_target.referent.is_deleted:
                 comment.root_target = None
                 comment.save()
         return comments
 
+    def paginate_queryset(self, queryset):
+        comments = super(NodeCommentsList, self).paginate_queryset(queryset.select_related('target'))
+        if comments is not None:
+            # Each comment is serialized with its target's referent
+            attach_referents([comment.target for comment in comments])
+        return comments
+
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return CommentCreateSerializer
@@ -2912,7 +2927,7 @@ class NodeWikiList(JSONAPIBaseView, generics.ListAPIView, NodeMixin, ListFilterM
     def get_default_queryset(self):
         node = self.get_node()
         node_wiki_pages = node.wiki_pages_current.values() if node.wiki_pages_current else []
-        return NodeWikiPage.objects.filter(guids___id__in=node_wiki_pages)
+        return NodeWikiPage.objects.filter(guid_string__in=node_wiki_pages).select_related('snapshot')
 
     def get_queryset(self):
         return self.get_queryset_from_request()
@@ -3361,7 +3376,7 @@ class NodeViewOnlyLinkDetail(JSONAPIBaseView, generics.RetrieveUpdateDestroyAPIV
         assert isinstance(link, PrivateLink), 'link must be a PrivateLink'
         link.is_deleted = True
         link.save()
-        enqueue_postcommit_task(ban_url, (self.get_node(),), {}, celery=True, once_per_request=True)
+        ban_url(self.get_node())
 
 
 class NodeIdentifierList(NodeMixin, IdentifierList):
@@ -185,13 +185,13 @@ class RegistrationList(JSONAPIBaseView, generics.ListAPIView, bulk_views.BulkUpd
         # For bulk requests, queryset is formed from request body.
         if is_bulk_request(self.request):
             auth = get_user_auth(self.request)
-            registrations = Registration.objects.filter(guids___id__in=[registration['id'] for registration in self.request.data])
+            registrations = Registration.objects.filter(guid_string__in=[registration['id'] for registration in self.request.data])
 
             # If skip_uneditable=True in query_params, skip nodes for which the user
             # does not have EDIT permissions.
             if is_truthy(self.request.query_params.get('skip_uneditable', False)):
-                has_permission = registrations.filter(contributor__user_id=auth.user.id, contributor__write=True).values_list('guids___id', flat=True)
-                return Registration.objects.filter(guids___id__in=has_permission)
+                has_permission = registrations.filter(contributor__user_id=auth.user.id, contributor__write=True).values_list('guid_string', flat=True)
+                return Registration.objects.filter(guid_string__in=has_permission)
 
             for registration in registrations:
                 if not registration.can_edit(auth):
@@ -413,7 +413,7 @@ class RegistrationContributorsList(BaseContributorList, RegistrationMixin, UserM
 
     def get_default_queryset(self):
         node = self.get_node(check_object_permissions=False)
-        return node.contributor_set.all().include('user__guids')
+        return node.contributor_set.all().include('user')
 
 
 class RegistrationContributorDetail(BaseContributorDetail, RegistrationMixin, UserMixin):
@@ -1,7 +1,6 @@
-from django.db.models import Count
-
 def optimize_subject_query(subject_queryset):
     """
-    Optimize subject queryset for TaxonomySerializer
+    Optimize subject queryset for TaxonomySerializer. Child counts come from
+    the provider's in-memory subject tree.
     """
-    return subject_queryset.prefetch_related('parent', 'provider').annotate(children_count=Count('children'))
+    return subject_queryset.prefetch_related('parent', 'provider')
@@ -543,7 +543,7 @@ class UserNodes(JSONAPIBaseView, generics.ListAPIView, UserMixin, NodesFilterMix
         return (
             self.get_queryset_from_request()
             .select_related('node_license')
-            .include('contributor__user__guids', 'root__guids', limit_includes=10)
+            .include('contributor__user', 'root', limit_includes=10)
         )
 
 
@@ -571,7 +571,7 @@ class UserQuickFiles(JSONAPIBaseView, generics.ListAPIView, WaterButlerMixin, Us
         self.kwargs[self.provider_lookup_url_kwarg] = 'osfstorage'
         files_list = self.fetch_from_waterbutler()
 
-        return files_list.children.prefetch_related('node__guids', 'versions', 'tags').include('guids')
+        return files_list.children.prefetch_related('node', 'versions', 'tags').include('guids')
 
     # overrides ListAPIView
     def get_queryset(self):
@@ -603,7 +603,7 @@ class UserPreprints(JSONAPIBaseView, generics.ListAPIView, UserMixin, PreprintFi
         target_user = self.get_user(check_permissions=False)
 
         # Permissions on the list objects are handled by the query
-        default_qs = PreprintService.objects.filter(node___contributors__guids___id=target_user._id)
+        default_qs = PreprintService.objects.filter(node___contributors__guid_string=target_user._id)
         return self.preprints_queryset(default_qs, auth_user, allow_contribs=False)
 
     def get_queryset(self):
@@ -741,7 +741,7 @@ class UserRegistrations(JSONAPIBaseView, generics.ListAPIView, UserMixin, NodesF
 
     # overrides ListAPIView
     def get_queryset(self):
-        return self.get_queryset_from_request().select_related('node_license').include('contributor__user__guids', 'root__guids', limit_includes=10)
+        return self.get_queryset_from_request().select_related('node_license').include('contributor__user', 'root', limit_includes=10)
 
 
 class UserInstitutionsRelationship(JSONAPIBaseView, generics.RetrieveDestroyAPIView, UserMixin):
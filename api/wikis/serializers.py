@@ -9,6 +9,7 @@ from api.base.serializers import (
     Link,
     LinksField,
     RelationshipField,
+    UnreadCommentsCountMixin,
     VersionedDateTimeField,
 )
 from api.base.utils import absolute_reverse
@@ -16,7 +17,7 @@ from api.base.utils import absolute_reverse
 from framework.auth.core import Auth
 
 
-class WikiSerializer(JSONAPISerializer):
+class WikiSerializer(UnreadCommentsCountMixin, JSONAPISerializer):
 
     filterable_fields = frozenset([
         'name',
@@ -69,6 +70,12 @@ class WikiSerializer(JSONAPISerializer):
     def get_content_type(self, obj):
         return 'text/markdown'
 
+    def get_comments_root(self, obj):
+        return obj.node, obj._id
+
+    def get_unread_comments_count(self, obj):
+        return self.find_n_unread_comments(obj)
+
     def get_extra(self, obj):
         return {
             'version': obj.version
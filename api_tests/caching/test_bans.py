@@ -0,0 +1,154 @@
+import urlparse
+
+import mock
+import pytest
+
+from api.base.settings.defaults import API_BASE
+from api.caching import tasks
+from api.caching.tasks import BanDispatcher, ban_url, collapse_bans
+from framework.postcommit_tasks.handlers import (
+    flush_postcommit_side_effects,
+    postcommit_before_request,
+    postcommit_teardown_request,
+)
+from osf_tests.factories import AuthUserFactory, CommentFactory, PrivateLinkFactory, ProjectFactory
+from tests.varnish_server import VarnishServer
+from website import settings
+
+
+@pytest.fixture()
+def varnishes():
+    with VarnishServer() as first, VarnishServer() as second:
+        with mock.patch.object(settings, 'ENABLE_VARNISH', True), \
+                mock.patch.object(settings, 'VARNISH_SERVERS', [first.url, second.url]):
+            yield first, second
+
+
+@pytest.fixture()
+def dispatcher():
+    dispatcher = BanDispatcher()
+    with mock.patch.object(tasks, 'dispatcher', dispatcher):
+        yield dispatcher
+
+
+@pytest.fixture()
+def nodes():
+    return [ProjectFactory() for _ in range(3)]
+
+
+@pytest.fixture()
+def in_request():
+    postcommit_before_request()
+    with mock.patch('framework.postcommit_tasks.handlers.in_request_context', return_value=True):
+        yield
+    postcommit_teardown_request()
+
+
+def path(obj):
+    return urlparse.urlparse(obj.absolute_api_v2_url).path
+
+
+class TestCollapseBans:
+
+    def test_single_path(self):
+        assert collapse_bans(['/v2/nodes/abc12/']) == ['/v2/nodes/abc12/.*']
+
+    def test_paths_under_another_are_dropped(self):
+        assert collapse_bans(['/v2/nodes/abc12/children/', '/v2/nodes/abc12/']) == ['/v2/nodes/abc12/.*']
+
+    def test_paths_are_combined(self):
+        assert collapse_bans(['/v2/nodes/def34/', '/v2/comments/xyz56/', '/v2/nodes/abc12/']) == [
+            '/v2/(comments/xyz56/|nodes/abc12/|nodes/def34/).*'
+        ]
+
+    def test_long_bans_are_split(self):
+        paths = ['/v2/nodes/{:05d}/'.format(i) for i in range(100)]
+        bans = collapse_bans(paths, max_length=100)
+        assert len(bans) > 1
+        assert all(len(ban) <= 100 for ban in bans)
+        assert sum(ban.count('|') + 1 for ban in bans) == 100
+
+
+@pytest.mark.django_db
+class TestBanDispatcher:
+
+    def test_disabled(self, dispatcher):
+        with VarnishServer() as varnish, mock.patch.object(settings, 'VARNISH_SERVERS', [varnish.url]):
+            ban_url(ProjectFactory())
+        assert not varnish.requests
+
+    def test_ban_sent_to_every_server(self, varnishes, dispatcher):
+        node = ProjectFactory()
+        ban_url(node)
+        for varnish in varnishes:
+            (request, ) = varnish.requests
+            assert request['headers']['host'] == urlparse.urlparse(node.absolute_api_v2_url).hostname
+            assert varnish.is_banned(path(node) + 'children/')
+
+    def test_comment_bans_its_targets(self, varnishes, dispatcher):
+        comment = CommentFactory()
+        ban_url(comment)
+        for varnish in varnishes:
+            assert len(varnish.requests) == 1
+            assert varnish.is_banned(path(comment))
+            assert varnish.is_banned(path(comment.node))
+
+    def test_bans_sent_once_per_request(self, varnishes, dispatcher, nodes, in_request):
+        for node in nodes + nodes:
+            ban_url(node)
+        assert not any(varnish.requests for varnish in varnishes)
+
+        flush_postcommit_side_effects()
+        for varnish in varnishes:
+            assert len(varnish.requests) == 1
+            assert all(varnish.is_banned(path(node)) for node in nodes)
+            assert not varnish.is_banned('/{}nodes/abcde/'.format(API_BASE))
+        assert dispatcher.stats['objects'] == 6
+        assert dispatcher.stats['paths'] == 3
+        assert dispatcher.stats['requests'] == 2
+        assert dispatcher.stats['batches'] == 1
+
+    def test_bans_sent_at_once_outside_of_requests(self, varnishes, dispatcher, nodes):
+        for node in nodes:
+            ban_url(node)
+        for varnish in varnishes:
+            assert len(varnish.requests) == len(nodes)
+            assert all(varnish.is_banned(path(node)) for node in nodes)
+        assert dispatcher.stats['batches'] == len(nodes)
+
+    def test_retries_server_errors(self, varnishes, dispatcher):
+        first, second = varnishes
+        first.statuses = [503]
+        node = ProjectFactory()
+        ban_url(node)
+        assert len(first.requests) == 2
+        assert len(second.requests) == 1
+        assert first.is_banned(path(node))
+        assert dispatcher.stats['failures'] == 0
+
+    def test_gives_up_after_retries(self, varnishes, dispatcher):
+        first, second = varnishes
+        first.statuses = [503] * (settings.VARNISH_BAN_RETRIES + 1)
+        ban_url(ProjectFactory())
+        assert len(first.requests) == settings.VARNISH_BAN_RETRIES + 1
+        assert len(second.requests) == 1
+        assert dispatcher.stats['failures'] == 1
+
+
+@pytest.mark.django_db
+class TestBansPerNodeUpdate:
+
+    def test_delete_view_only_link(self, app, varnishes, dispatcher):
+        user = AuthUserFactory()
+        node = ProjectFactory(creator=user, is_public=True)
+        link = PrivateLinkFactory(creator=user)
+        link.nodes.add(node)
+        url = '/{}nodes/{}/view_only_links/{}/'.format(API_BASE, node._id, link._id)
+
+        res = app.delete(url, auth=user.auth)
+        assert res.status_code == 204
+        for varnish in varnishes:
+            assert len(varnish.requests) == 1
+            assert varnish.is_banned(path(node))
+        assert dispatcher.stats['objects'] == 1
+        assert dispatcher.stats['requests'] == len(varnishes)
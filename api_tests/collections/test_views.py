@@ -1,7 +1,9 @@
+import mock
 import pytest
 from urlparse import urlparse
 
 from api.base.settings.defaults import API_BASE
+from api.citations import utils as citation_utils
 from framework.auth.core import Auth
 from osf_tests.factories import (
     CollectionFactory,
@@ -3591,3 +3593,39 @@ class TestCollectionLinkedNodes:
             auth=None, expect_errors=True
         )
         assert res.status_code == 401
+
+
+@pytest.mark.django_db
+class TestCollectionCitations:
+
+    @pytest.fixture()
+    def collection(self, user_one):
+        collection = CollectionFactory(creator=user_one)
+        for _ in range(3):
+            collection.add_pointer(ProjectFactory(is_public=True), auth=Auth(user_one))
+        collection.add_pointer(RegistrationFactory(is_public=True), auth=Auth(user_one))
+        return collection
+
+    @pytest.fixture()
+    def url(self, collection):
+        return '/{}collections/{}/citation/apa/'.format(API_BASE, collection._id)
+
+    def test_citations_of_linked_nodes(self, app, collection, url, user_one):
+        with mock.patch('api.citations.utils.CitationStylesBibliography', side_effect=citation_utils.CitationStylesBibliography) as mock_bibliography:
+            res = app.get(url, auth=user_one.auth)
+        assert res.status_code == 200
+        assert mock_bibliography.call_count == 1
+        linked = collection.linked_nodes.order_by('-modified')
+        assert [item['id'] for item in res.json['data']] == [node._id for node in linked]
+        assert [item['attributes']['citation'] for item in res.json['data']] == [
+            citation_utils.render_citation(node, 'apa') for node in linked
+        ]
+
+    def test_unknown_style(self, app, collection, user_one):
+        url = '/{}collections/{}/citation/not-a-style/'.format(API_BASE, collection._id)
+        res = app.get(url, auth=user_one.auth, expect_errors=True)
+        assert res.status_code == 404
+
+    def test_private_collection(self, app, url):
+        res = app.get(url, auth=AuthUserFactory().auth, expect_errors=True)
+        assert res.status_code == 403
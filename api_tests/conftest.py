@@ -1,5 +1,6 @@
 import logging
 import pytest
+from django.core.cache import cache
 
 from website.app import init_app
 from tests.json_api_test_app import JSONAPITestApp
@@ -25,6 +26,11 @@ for logger_name in SILENT_LOGGERS:
     logging.getLogger(logger_name).setLevel(logging.CRITICAL)
 
 
+@pytest.fixture(autouse=True)
+def clear_shared_cache():
+    """The shared cache outlives the per-test transaction, so start each test empty"""
+    cache.clear()
+
 @pytest.fixture()
 def app():
     return JSONAPITestApp()
@@ -0,0 +1,72 @@
+import datetime
+
+import pytest
+from django.utils import timezone
+
+from api.base.settings.defaults import API_BASE
+from osf.models import InstitutionSummary
+from osf_tests.factories import (
+    AuthUserFactory,
+    InstitutionFactory,
+    ProjectFactory,
+)
+
+
+@pytest.mark.django_db
+class TestInstitutionSummary:
+
+    @pytest.fixture()
+    def institution(self):
+        return InstitutionFactory()
+
+    @pytest.fixture()
+    def user(self, institution):
+        user = AuthUserFactory()
+        user.affiliated_institutions.add(institution)
+        return user
+
+    @pytest.fixture()
+    def url(self, institution):
+        return '/{}institutions/{}/summary/'.format(API_BASE, institution._id)
+
+    def test_counts(self, app, institution, user, url):
+        ProjectFactory(creator=user, is_public=True).affiliated_institutions.add(institution)
+        ProjectFactory(creator=user).affiliated_institutions.add(institution)
+
+        res = app.get(url, auth=user.auth)
+        assert res.status_code == 200
+        data = res.json['data']
+        assert data['id'] == '{}-{}'.format(institution._id, timezone.now().date().isoformat())
+        assert data['type'] == 'institution-summaries'
+        assert data['attributes']['users'] == 1
+        assert data['attributes']['public_nodes'] == 1
+        assert data['attributes']['private_nodes'] == 1
+        assert data['relationships']['institution']['links']['related']['href'].endswith('/institutions/{}/'.format(institution._id))
+
+        ProjectFactory(creator=user).affiliated_institutions.add(institution)
+        res = app.get(url, auth=user.auth)
+        assert res.json['data']['attributes']['private_nodes'] == 2
+
+    def test_counts_as_of_date(self, app, institution, user, url):
+        InstitutionSummary.get_latest(institution.id)
+        yesterday = timezone.now().date() - datetime.timedelta(days=1)
+        InstitutionSummary.objects.filter(institution=institution).update(date=yesterday)
+        ProjectFactory(creator=user).affiliated_institutions.add(institution)
+
+        res = app.get(url + '?date={}'.format(yesterday.isoformat()), auth=user.auth)
+        assert res.status_code == 200
+        assert res.json['data']['attributes']['date'] == yesterday.isoformat()
+        assert res.json['data']['attributes']['private_nodes'] == 0
+
+        res = app.get(url + '?date={}'.format((yesterday - datetime.timedelta(days=1)).isoformat()), auth=user.auth, expect_errors=True)
+        assert res.status_code == 404
+
+        res = app.get(url + '?date=yesterday', auth=user.auth, expect_errors=True)
+        assert res.status_code == 400
+
+    def test_only_affiliated_users(self, app, url):
+        res = app.get(url, expect_errors=True)
+        assert res.status_code == 401
+
+        res = app.get(url, auth=AuthUserFactory().auth, expect_errors=True)
+        assert res.status_code == 403
@@ -1,5 +1,9 @@
 # -*- coding: utf-8 -*-
+import re
+
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from addons.wiki.tests.factories import NodeWikiFactory
 from api.base.settings import osf_settings
@@ -156,6 +160,24 @@ class TestNodeCommentsList(NodeCommentsListMixin):
             'comment': comment_registration,
             'url': url_registration}
 
+    def test_targets_are_loaded_in_bulk(self, app, user, project_public_dict):
+        def target_lookups(ctx):
+            # One guid or comment fetched by id, as a target or its referent
+            return [
+                query for query in ctx.captured_queries
+                if re.search(r'FROM "osf_(guid|comment)" WHERE "osf_(guid|comment)"\."id" = ', query['sql'])
+            ]
+
+        with CaptureQueriesContext(connection) as few:
+            app.get(project_public_dict['url'])
+        target = Guid.load(project_public_dict['comment']._id)
+        for _ in range(3):
+            CommentFactory(node=project_public_dict['project'], user=user, target=target)
+        with CaptureQueriesContext(connection) as many:
+            res = app.get(project_public_dict['url'])
+        assert len(res.json['data']) == 4
+        assert len(target_lookups(many)) == len(target_lookups(few))
+
 
 @pytest.mark.django_db
 class TestNodeCommentsListFiles(NodeCommentsListMixin):
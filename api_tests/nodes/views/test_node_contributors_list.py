@@ -4,6 +4,9 @@ import mock
 import pytest
 import random
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 from api.base.exceptions import Conflict
 from api.base.settings.defaults import API_BASE
 from api.nodes.serializers import NodeContributorsCreateSerializer
@@ -1710,6 +1713,44 @@ class TestNodeContributorBulkCreate(NodeCRUDTestCase):
         res = app.get(url_public, auth=user.auth)
         assert len(res.json['data']) == 1
 
+    def test_node_contributor_bulk_create_duplicate_users(
+            self, app, user, payload_one, url_public):
+        res = app.post_json_api(
+            url_public,
+            {'data': [payload_one, payload_one]},
+            auth=user.auth,
+            expect_errors=True, bulk=True)
+        assert res.status_code == 400
+        assert 'is already a contributor' in res.json['errors'][0]['detail']
+
+        res = app.get(url_public, auth=user.auth)
+        assert len(res.json['data']) == 1
+
+    def test_node_contributor_bulk_create_is_batched(
+            self, app, user, project_public, payload_one, url_public):
+        users = [AuthUserFactory() for _ in range(10)]
+        payloads = []
+        for new_user in users:
+            payload = dict(payload_one, relationships={'users': {'data': {'id': new_user._id, 'type': 'users'}}})
+            payloads.append(payload)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = app.post_json_api(url_public, {'data': payloads}, auth=user.auth, bulk=True)
+        assert res.status_code == 201
+        assert [contrib['embeds']['users']['data']['id'] for contrib in res.json['data']] == [u._id for u in users]
+
+        def inserts(table):
+            return [q for q in ctx.captured_queries if q['sql'].startswith('INSERT INTO "{}"'.format(table))]
+        assert len(inserts('osf_contributor')) == 1
+        assert len(inserts('osf_nodelog')) == 1
+        assert len(inserts('osf_recentlyaddedcontributor')) == 1
+
+        project_public.reload()
+        assert list(project_public.contributors)[1:] == users
+        log = project_public.logs.latest()
+        assert log.action == NodeLog.CONTRIB_ADDED
+        assert log.params['contributors'] == [u._id for u in users]
+
 
 @pytest.mark.django_db
 class TestNodeContributorBulkUpdate(NodeCRUDTestCase):
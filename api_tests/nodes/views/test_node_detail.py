@@ -938,6 +938,59 @@ class TestNodeUpdate(NodeCRUDTestCase):
             target_object._id, status='unavailable')
 
 
+@pytest.mark.django_db
+class TestNodeUpdateSideEffects(NodeCRUDTestCase):
+
+    @staticmethod
+    def node_updated_tasks(enqueue_task):
+        return [
+            call[0][0] for call in enqueue_task.call_args_list
+            if call[0][0].task == 'website.project.tasks.on_node_updated'
+        ]
+
+    @mock.patch('osf.models.node.enqueue_task')
+    def test_patch_enqueues_one_node_update(
+            self, enqueue_task, app, user, project_public,
+            url_public, title_new, description_new, make_node_payload):
+        res = app.patch_json_api(
+            url_public,
+            make_node_payload(project_public, {
+                'title': title_new,
+                'description': description_new,
+                'tags': ['one', 'two'],
+            }),
+            auth=user.auth)
+        assert res.status_code == 200
+
+        (task, ) = self.node_updated_tasks(enqueue_task)
+        assert task.args[0] == project_public._id
+        assert {'title', 'description'}.issubset(task.args[3])
+
+    @mock.patch('osf.models.node.enqueue_task')
+    def test_make_public_enqueues_one_node_update(
+            self, enqueue_task, app, user, project_private,
+            url_private, make_node_payload):
+        res = app.patch_json_api(
+            url_private,
+            make_node_payload(project_private, {'public': True}),
+            auth=user.auth)
+        assert res.status_code == 200
+
+        (task, ) = self.node_updated_tasks(enqueue_task)
+        assert 'is_public' in task.args[3]
+
+    @mock.patch('osf.models.node.enqueue_task')
+    def test_failed_patch_enqueues_nothing(
+            self, enqueue_task, app, user, project_public,
+            url_public, make_node_payload):
+        res = app.patch_json_api(
+            url_public,
+            make_node_payload(project_public, {'title': ''}),
+            auth=user.auth, expect_errors=True)
+        assert res.status_code == 400
+        assert not self.node_updated_tasks(enqueue_task)
+
+
 @pytest.mark.django_db
 class TestNodeDelete(NodeCRUDTestCase):
 
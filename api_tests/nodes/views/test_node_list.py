@@ -1,4 +1,6 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from api.base.settings.defaults import API_BASE, MAX_PAGE_SIZE
 from api_tests.nodes.filters.test_filters import NodesListFilteringMixin, NodesListDateFilteringMixin
@@ -6,6 +8,7 @@ from framework.auth.core import Auth
 from osf.models import AbstractNode, Node, NodeLog
 from osf_tests.factories import (
     CollectionFactory,
+    CommentFactory,
     ProjectFactory,
     NodeFactory,
     RegistrationFactory,
@@ -139,6 +142,43 @@ class TestNodeList:
         assert res.status_code == 200
 
 
+    def test_node_ids_do_not_query_guids(self, app, user, url):
+        ProjectFactory(is_public=True, creator=user)
+        with CaptureQueriesContext(connection) as few:
+            app.get(url)
+        for _ in range(5):
+            ProjectFactory(is_public=True, creator=user)
+        with CaptureQueriesContext(connection) as many:
+            res = app.get(url)
+        assert res.status_code == 200
+
+        def guid_queries(ctx):
+            return [query for query in ctx.captured_queries if 'osf_guid' in query['sql']]
+        assert len(guid_queries(many)) == len(guid_queries(few))
+
+    def test_unread_comments_counted_together(self, app, user, url):
+        def comment_queries(ctx):
+            return [query for query in ctx.captured_queries if 'osf_comment' in query['sql']]
+
+        commenter = UserFactory()
+        ProjectFactory(is_public=True, creator=user)
+        with CaptureQueriesContext(connection) as few:
+            app.get('{}?related_counts=comments'.format(url), auth=user.auth)
+        for _ in range(5):
+            project = ProjectFactory(is_public=True, creator=user)
+            project.add_contributor(commenter, save=True)
+            CommentFactory(node=project, user=commenter)
+        with CaptureQueriesContext(connection) as many:
+            res = app.get('{}?related_counts=comments'.format(url), auth=user.auth)
+        assert res.status_code == 200
+
+        unread = sorted(
+            node['relationships']['comments']['links']['related']['meta']['unread']['node'] for node in res.json['data']
+        )
+        assert unread == [0, 1, 1, 1, 1, 1]
+        assert len(comment_queries(many)) == len(comment_queries(few))
+
+
 @pytest.mark.django_db
 class TestNodeFiltering:
 
@@ -6,6 +6,7 @@ from api.base.settings.defaults import API_BASE
 from framework.auth.core import Auth
 from osf_tests.factories import (
     AuthUserFactory,
+    NodeFactory,
     ProjectFactory,
     RegistrationFactory,
     EmbargoFactory,
@@ -328,3 +329,61 @@ class TestNodeLogFiltering(TestNodeLogList):
         assert res.status_code == 200
         assert len(res.json['data']) == 1
         assert res.json['data'][API_LATEST]['attributes']['action'] == 'project_created'
+
+
+@pytest.mark.django_db
+class TestNodeLogKeysetPagination:
+
+    @pytest.fixture()
+    def project(self, user):
+        project = ProjectFactory(creator=user, is_public=True)
+        for i in range(4):
+            project.add_tag('tag{}'.format(i), auth=Auth(user))
+        component = NodeFactory(creator=user, parent=project, is_public=True)
+        for i in range(4):
+            component.add_tag('tag{}'.format(i), auth=Auth(user))
+        return project
+
+    @pytest.fixture()
+    def url(self, project):
+        return '/{}nodes/{}/logs/?version=2.2&page[size]=3'.format(API_BASE, project._id)
+
+    @pytest.fixture()
+    def expected(self, user, project):
+        logs = project.get_aggregate_logs_queryset(Auth(user)).order_by('-date', '-id')
+        return [log._id for log in logs]
+
+    def test_next_links_walk_every_log(self, app, user, url, expected):
+        seen = []
+        res = app.get(url, auth=user.auth)
+        assert res.json['meta']['total'] == len(expected)
+        assert res.json['links']['prev'] is None
+        while True:
+            seen.extend(log['id'] for log in res.json['data'])
+            if not res.json['links']['next']:
+                break
+            assert 'page[cursor]' in res.json['links']['next']
+            res = app.get(res.json['links']['next'], auth=user.auth)
+        assert seen == expected
+
+    def test_prev_link(self, app, user, url, expected):
+        first = app.get(url, auth=user.auth)
+        second = app.get(first.json['links']['next'], auth=user.auth)
+        assert [log['id'] for log in second.json['data']] == expected[3:6]
+        back = app.get(second.json['links']['prev'], auth=user.auth)
+        assert [log['id'] for log in back.json['data']] == expected[:3]
+
+    def test_last_link(self, app, user, url, expected):
+        res = app.get(url, auth=user.auth)
+        last = app.get(res.json['links']['last'], auth=user.auth)
+        assert [log['id'] for log in last.json['data']] == expected[-3:]
+        assert last.json['links']['next'] is None
+
+    def test_page_number_still_supported(self, app, user, url, expected):
+        res = app.get(url + '&page=2', auth=user.auth)
+        assert [log['id'] for log in res.json['data']] == expected[3:6]
+        assert 'page=3' in res.json['links']['next']
+
+    def test_invalid_cursor(self, app, user, url):
+        res = app.get(url + '&page[cursor]=notacursor', auth=user.auth, expect_errors=True)
+        assert res.status_code == 404
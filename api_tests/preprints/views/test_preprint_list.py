@@ -1,4 +1,6 @@
 import mock
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from nose.tools import *  # flake8: noqa
 import pytest
 
@@ -12,6 +14,7 @@ from api_tests.preprints.views.test_preprint_list_mixin import (
     PreprintIsValidListMixin,
 )
 from api_tests.reviews.mixins.filter_mixins import ReviewableFilterMixin
+from framework.auth import Auth
 from osf.models import PreprintService, Node
 from osf.utils.workflows import DefaultStates
 from osf_tests.factories import (
@@ -162,6 +165,42 @@ class TestPreprintList(ApiTestCase):
         assert_in(self.preprint._id, ids)
         assert_not_in(self.project._id, ids)
 
+    def test_public_listing_reads_the_flag(self):
+        PreprintFactory(creator=self.user, is_published=False)
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.app.get(self.url)
+        assert_equal([each['id'] for each in res.json['data']], [self.preprint._id])
+        assert_false([
+            query for query in ctx.captured_queries
+            if 'DISTINCT' in query['sql'] and 'FROM "osf_preprintservice"' in query['sql']
+        ])
+
+        self.preprint.node.set_privacy('private', auth=Auth(self.user))
+        res = self.app.get(self.url)
+        assert_equal(res.json['data'], [])
+
+    def test_subjects_are_not_queried_per_preprint(self):
+        root = SubjectFactory()
+        child = SubjectFactory(parent=root)
+
+        def subject_queries(ctx):
+            return [query for query in ctx.captured_queries if 'osf_subject' in query['sql']]
+
+        PreprintFactory(creator=self.user, subjects=[[root._id, child._id]])
+        with CaptureQueriesContext(connection) as few:
+            self.app.get(self.url)
+        for _ in range(5):
+            PreprintFactory(creator=self.user, subjects=[[root._id, child._id]])
+        with CaptureQueriesContext(connection) as many:
+            res = self.app.get(self.url)
+
+        assert_equal(len(res.json['data']), 7)
+        assert_less_equal(len(subject_queries(many)), len(subject_queries(few)))
+        hierarchy = [{'id': root._id, 'text': root.text}, {'id': child._id, 'text': child.text}]
+        assert_equal(
+            sum(each['attributes']['subjects'] == [hierarchy] for each in res.json['data']), 6
+        )
+
 
 class TestPreprintsListFiltering(PreprintsListFilteringMixin):
 
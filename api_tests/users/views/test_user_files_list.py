@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from osf_tests.factories import AuthUserFactory
 from api.base.settings.defaults import API_BASE
@@ -52,6 +54,20 @@ class TestUserQuickFiles:
 
         assert len(ids) == OsfStorageFile.objects.count()
 
+    def test_file_listing_does_not_query_node_guids(self, app, quickfiles, url):
+        with CaptureQueriesContext(connection) as few:
+            app.get(url)
+        root = quickfiles.get_addon('osfstorage').get_root()
+        for name in ('Eat.txt', 'Dead.txt', 'Bodies.txt'):
+            root.append_file(name)
+        with CaptureQueriesContext(connection) as many:
+            res = app.get(url)
+        assert len(res.json['data']) == 6
+
+        def guid_queries(ctx):
+            return [query for query in ctx.captured_queries if 'osf_guid' in query['sql']]
+        assert len(guid_queries(many)) == len(guid_queries(few))
+
     def test_get_files_not_logged_in(self, app, url):
         res = app.get(url)
         node_json = res.json['data']
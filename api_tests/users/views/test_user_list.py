@@ -6,6 +6,9 @@ import unittest
 import urlparse
 from uuid import UUID
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 from api.base.settings.defaults import API_BASE
 from framework.auth.cas import CasResponse
 from osf.models import OSFUser, Session, ApiOAuth2PersonalToken
@@ -35,6 +38,20 @@ class TestUsers:
         assert res.status_code == 200
         assert res.content_type == 'application/vnd.api+json'
 
+    def test_user_ids_do_not_query_guids(self, app, user_one, user_two):
+        url = '/{}users/'.format(API_BASE)
+        with CaptureQueriesContext(connection) as few:
+            app.get(url)
+        for _ in range(5):
+            UserFactory()
+        with CaptureQueriesContext(connection) as many:
+            res = app.get(url)
+        assert len(res.json['data']) == OSFUser.objects.count()
+
+        def guid_queries(ctx):
+            return [query for query in ctx.captured_queries if 'osf_guid' in query['sql']]
+        assert len(guid_queries(many)) == len(guid_queries(few))
+
     def test_find_user_in_users(self, app, user_one, user_two):
         url = '/{}users/'.format(API_BASE)
 
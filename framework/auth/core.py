@@ -3,6 +3,7 @@
 import datetime as dt
 
 import logging
+import threading
 
 from django.utils import timezone
 from django.db.models import Q
@@ -25,6 +26,7 @@ name_formatters = {
 }
 
 logger = logging.getLogger(__name__)
+_local = threading.local()
 
 
 def generate_verification_key(verification_type=None):
@@ -142,13 +144,51 @@ def get_user(email=None, password=None, token=None, external_id_provider=None, e
         return None
 
 
+class PrivateLinkResolver(object):
+    """Resolves view-only link keys to their links, each key once."""
+
+    def __init__(self):
+        self._links = {}
+
+    def resolve(self, key):
+        """The link with `key`, deleted or not, or None."""
+        # Avoid circular import
+        from osf.models import PrivateLink
+        if key not in self._links:
+            self._links[key] = PrivateLink.resolve(key)
+        return self._links[key]
+
+    def forget(self, key):
+        self._links.pop(key, None)
+
+
+def get_private_link_resolver():
+    """The resolver of the current request, or a new one outside of requests."""
+    from framework.celery_tasks.handlers import in_request_context
+    if not in_request_context():
+        return PrivateLinkResolver()
+    if getattr(_local, 'private_link_resolver', None) is None:
+        _local.private_link_resolver = PrivateLinkResolver()
+    return _local.private_link_resolver
+
+
+def private_link_resolver_before_request():
+    _local.private_link_resolver = None
+
+
+handlers = {
+    'before_request': private_link_resolver_before_request,
+}
+
+
 class Auth(object):
 
     def __init__(self, user=None, api_node=None,
-                 private_key=None):
+                 private_key=None, private_link_resolver=None):
         self.user = user
         self.api_node = api_node
         self.private_key = private_key
+        self.private_link_resolver = private_link_resolver or get_private_link_resolver()
 
     def __repr__(self):
         return ('<Auth(user="{self.user}", '
@@ -159,20 +199,17 @@ class Auth(object):
         return self.user is not None
 
     @property
-    def private_link(self):
+    def any_private_link(self):
+        """The link with `private_key`, even if it was deleted."""
         if not self.private_key:
             return None
-        # Avoid circular import
-        from osf.models import PrivateLink
-        try:
-            private_link = PrivateLink.objects.get(key=self.private_key)
-
-            if private_link.is_deleted:
-                return None
+        return self.private_link_resolver.resolve(self.private_key)
 
-        except PrivateLink.DoesNotExist:
+    @property
+    def private_link(self):
+        private_link = self.any_private_link
+        if private_link is None or private_link.is_deleted:
             return None
-
         return private_link
 
     @classmethod
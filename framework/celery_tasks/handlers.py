@@ -42,15 +42,17 @@ def celery_teardown_request(error=None):
                 task.apply()
 
 
+def in_request_context():
+    """Whether a Flask or Django request is being handled."""
+    return context_stack.top is not None or getattr(api_globals, 'request', None) is not None
+
+
 def enqueue_task(signature):
     """If working in a request context, push task signature to thread-local
     queue to run after request is complete; else run signature immediately.
     :param signature: Celery task signature
     """
-    if (
-        context_stack.top is None and
-        getattr(api_globals, 'request', None) is None
-    ):  # Not in a request context
+    if not in_request_context():
         signature()
     else:
         if signature not in queue():
@@ -1,8 +1,8 @@
-import smtplib
 import logging
-from email.mime.text import MIMEText
+from collections import OrderedDict
 
 from framework.celery_tasks import app
+from framework.email import transport
 from framework.sentry import sentry
 from website import settings
 import sendgrid
@@ -57,6 +57,53 @@ def send_email(from_addr, to_addr, subject, message, mimetype='html', ttls=True,
             password=password
         )
 
+
+@app.task
+def send_emails(messages, ttls=True, login=True, username=None, password=None):
+    """Send many emails in one go. Over SMTP all messages share a single pooled
+    session; over the Sendgrid API, messages that only differ by recipient (and
+    substitutions) are sent as one API call.
+
+    :param list messages: dicts with the keys ``from_addr``, ``to_addr``,
+        ``subject``, ``message`` and optionally ``mimetype`` (default 'html'),
+        ``categories`` and ``substitutions``. ``substitutions`` maps
+        placeholders in the subject and message to this recipient's values.
+
+    :return int: The number of messages sent
+    """
+    if not settings.USE_EMAIL or not messages:
+        return 0
+    if settings.SENDGRID_API_KEY:
+        return _send_batch_with_sendgrid(messages)
+    return _send_batch_with_smtp(messages, ttls=ttls, login=login, username=username, password=password)
+
+
+def _substitute(text, substitutions):
+    for key, value in (substitutions or {}).items():
+        text = text.replace(key, value)
+    return text
+
+
+def _send_batch_with_smtp(messages, ttls=True, login=True, username=None, password=None):
+    username = username or settings.MAIL_USERNAME
+    password = password or settings.MAIL_PASSWORD
+
+    if login and (username is None or password is None):
+        logger.error('Mail username and password not set; skipping send.')
+        return 0
+
+    pool = transport.get_pool(settings.MAIL_SERVER, username=username, password=password, ttls=ttls, login=login)
+    return pool.send_messages(
+        transport.build_message(
+            each['from_addr'],
+            each['to_addr'],
+            _substitute(each['subject'], each.get('substitutions')),
+            _substitute(each['message'], each.get('substitutions')),
+            mimetype=each.get('mimetype', 'html'),
+        ) for each in messages
+    )
+
+
 def _send_with_smtp(from_addr, to_addr, subject, message, mimetype='html', ttls=True, login=True, username=None, password=None):
     username = username or settings.MAIL_USERNAME
     password = password or settings.MAIL_PASSWORD
@@ -65,25 +112,8 @@ def _send_with_smtp(from_addr, to_addr, subject, message, mimetype='html', ttls=
         logger.error('Mail username and password not set; skipping send.')
         return
 
-    msg = MIMEText(message, mimetype, _charset='utf-8')
-    msg['Subject'] = subject
-    msg['From'] = from_addr
-    msg['To'] = to_addr
-
-    s = smtplib.SMTP(settings.MAIL_SERVER)
-    s.ehlo()
-    if ttls:
-        s.starttls()
-        s.ehlo()
-    if login:
-        s.login(username, password)
-    s.sendmail(
-        from_addr=from_addr,
-        to_addrs=[to_addr],
-        msg=msg.as_string()
-    )
-    s.quit()
-    return True
+    pool = transport.get_pool(settings.MAIL_SERVER, username=username, password=password, ttls=ttls, login=login)
+    return pool.sendmail(*transport.build_message(from_addr, to_addr, subject, message, mimetype=mimetype))
 
 def _send_with_sendgrid(from_addr, to_addr, subject, message, mimetype='html', categories=None, attachment_name=None, attachment_content=None, client=None):
     if (settings.SENDGRID_WHITELIST_MODE and to_addr in settings.SENDGRID_EMAIL_WHITELIST) or settings.SENDGRID_WHITELIST_MODE is False:
@@ -107,3 +137,54 @@ def _send_with_sendgrid(from_addr, to_addr, subject, message, mimetype='html', c
         sentry.log_message(
             'SENDGRID_WHITELIST_MODE is True. Failed to send emails to non-whitelisted recipient {}.'.format(to_addr)
         )
+
+
+def _send_batch_with_sendgrid(messages, client=None):
+    client = client or sendgrid.SendGridClient(settings.SENDGRID_API_KEY)
+    # Group messages that only differ by recipient, keeping the original order
+    groups = OrderedDict()
+    for each in messages:
+        if settings.SENDGRID_WHITELIST_MODE and each['to_addr'] not in settings.SENDGRID_EMAIL_WHITELIST:
+            sentry.log_message(
+                'SENDGRID_WHITELIST_MODE is True. Failed to send emails to non-whitelisted recipient {}.'.format(each['to_addr'])
+            )
+            continue
+        key = (
+            each['from_addr'],
+            each['subject'],
+            each['message'],
+            each.get('mimetype', 'html'),
+            tuple(each.get('categories') or ()),
+            tuple(sorted((each.get('substitutions') or {}).keys())),
+        )
+        groups.setdefault(key, []).append(each)
+
+    sent = 0
+    for (from_addr, subject, message, mimetype, categories, substitution_keys), group in groups.items():
+        for start in range(0, len(group), settings.SENDGRID_BATCH_SIZE):
+            chunk = group[start:start + settings.SENDGRID_BATCH_SIZE]
+            recipients = [each['to_addr'] for each in chunk]
+            mail = sendgrid.Mail()
+            mail.set_from(from_addr)
+            # The X-SMTPAPI recipient list sends each recipient a separate copy;
+            # the regular recipient is required by the API but ignored.
+            mail.add_to(recipients[0])
+            mail.smtpapi.set_tos(recipients)
+            mail.set_subject(subject)
+            if mimetype == 'html':
+                mail.set_html(message)
+            else:
+                mail.set_text(message)
+            if categories:
+                mail.set_categories(categories)
+            if substitution_keys:
+                mail.set_substitutions({
+                    key: [each['substitutions'][key] for each in chunk]
+                    for key in substitution_keys
+                })
+            status, msg = client.send(mail)
+            if status < 400:
+                sent += len(chunk)
+            else:
+                logger.error('Sendgrid batch of {} emails failed: {}'.format(len(chunk), msg))
+    return sent
@@ -0,0 +1,195 @@
+"""Pooled SMTP delivery.
+
+Opening an SMTP session (connect, EHLO, STARTTLS, AUTH) costs several round
+trips, which dominates when sending digests or other bulk mail one message at a
+time. Connections are instead kept in a small per-process pool, checked with
+NOOP before reuse once they have sat idle for a while, and transparently
+re-established when the server has dropped them.
+
+Usage: ::
+
+    from framework.email import transport
+
+    pool = transport.get_pool(settings.MAIL_SERVER, username, password)
+    pool.send_messages([transport.build_message(from_addr, to_addr, subject, body)])
+"""
+import os
+import socket
+import smtplib
+import logging
+import threading
+import time
+from collections import deque
+from email.mime.text import MIMEText
+
+from website import settings
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean the session is unusable and should be re-established
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, socket.error)
+# Errors that only affect the message being sent
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+
+def build_message(from_addr, to_addr, subject, message, mimetype='html'):
+    """Build the MIME message for a single email.
+
+    :return tuple: (from_addr, [to_addr], serialized message)
+    """
+    msg = MIMEText(message, mimetype, _charset='utf-8')
+    msg['Subject'] = subject
+    msg['From'] = from_addr
+    msg['To'] = to_addr
+    return from_addr, [to_addr], msg.as_string()
+
+
+class SMTPConnectionPool(object):
+    """A pool of authenticated SMTP sessions to a single server.
+
+    :param str host: The SMTP server, as accepted by `smtplib.SMTP`
+    :param int size: Maximum number of idle sessions kept open
+    :param int noop_after: Seconds a session may sit idle before it is
+        checked with NOOP on checkout
+    :param int max_idle: Seconds after which an idle session is discarded
+        without being checked
+    """
+
+    def __init__(self, host, username=None, password=None, ttls=True, login=True,
+                 size=None, noop_after=None, max_idle=None, timeout=None):
+        self.host = host
+        self.username = username
+        self.password = password
+        self.ttls = ttls
+        self.login = login
+        self.size = settings.MAIL_POOL_SIZE if size is None else size
+        self.noop_after = settings.MAIL_POOL_NOOP_AFTER if noop_after is None else noop_after
+        self.max_idle = settings.MAIL_POOL_MAX_IDLE if max_idle is None else max_idle
+        self.timeout = settings.MAIL_TIMEOUT if timeout is None else timeout
+        self._idle = deque()
+        self._lock = threading.Lock()
+        # Number of sessions opened; useful for monitoring connection reuse
+        self.connects = 0
+
+    def _connect(self):
+        conn = smtplib.SMTP(self.host, timeout=self.timeout)
+        conn.ehlo()
+        if self.ttls:
+            conn.starttls()
+            conn.ehlo()
+        if self.login:
+            conn.login(self.username, self.password)
+        self.connects += 1
+        return conn
+
+    def _close(self, conn):
+        try:
+            conn.quit()
+        except CONNECTION_ERRORS + (smtplib.SMTPException, ):
+            conn.close()
+
+    def _is_usable(self, conn, idle_since):
+        idle = time.time() - idle_since
+        if idle > self.max_idle:
+            return False
+        if idle < self.noop_after:
+            return True
+        try:
+            return conn.noop()[0] == 250
+        except CONNECTION_ERRORS + (smtplib.SMTPException, ):
+            return False
+
+    def acquire(self):
+        """Check out a healthy session, opening a new one if none is idle."""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn, idle_since = self._idle.pop()
+            if self._is_usable(conn, idle_since):
+                return conn
+            self._close(conn)
+        return self._connect()
+
+    def release(self, conn, discard=False):
+        """Return a session to the pool, or close it if the pool is full."""
+        if not discard:
+            with self._lock:
+                if len(self._idle) < self.size:
+                    self._idle.append((conn, time.time()))
+                    return
+        self._close(conn)
+
+    def send_messages(self, messages, raise_message_errors=False):
+        """Send many messages over a single session, reconnecting once if the
+        server drops the connection part way through.
+
+        :param iterable messages: (from_addr, to_addrs, msg) tuples, see `build_message`
+        :param bool raise_message_errors: Raise `MESSAGE_ERRORS` rather than
+            logging them and moving on to the next message
+        :return int: The number of messages accepted by the server
+        """
+        sent = 0
+        conn = self.acquire()
+        try:
+            for from_addr, to_addrs, msg in messages:
+                try:
+                    try:
+                        conn.sendmail(from_addr, to_addrs, msg)
+                    except CONNECTION_ERRORS:
+                        logger.info('SMTP session to {} dropped; reconnecting'.format(self.host))
+                        self._close(conn)
+                        conn = self._connect()
+                        conn.sendmail(from_addr, to_addrs, msg)
+                except MESSAGE_ERRORS as err:
+                    if raise_message_errors:
+                        raise
+                    # The session is still usable; don't let one bad message sink the batch
+                    logger.error('Failed to send email to {}: {}'.format(to_addrs, err))
+                    continue
+                sent += 1
+        except MESSAGE_ERRORS:
+            self.release(conn)
+            raise
+        except Exception:
+            # Including a failed reconnect, which leaves `conn` closed
+            self.release(conn, discard=True)
+            raise
+        self.release(conn)
+        return sent
+
+    def sendmail(self, from_addr, to_addrs, msg):
+        """Send a single message; errors are raised as they would be by `smtplib`."""
+        return self.send_messages([(from_addr, to_addrs, msg)], raise_message_errors=True) == 1
+
+    def close(self):
+        """Close every idle session."""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn, _ in idle:
+            self._close(conn)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(host, username=None, password=None, ttls=True, login=True):
+    """Return the pool for the given server and credentials.
+
+    Pools are per process: sockets must not be shared by forked celery workers.
+    """
+    key = (os.getpid(), host, username, password, ttls, login)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = SMTPConnectionPool(host, username=username, password=password, ttls=ttls, login=login)
+    return pool
+
+
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
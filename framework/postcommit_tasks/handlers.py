@@ -11,6 +11,7 @@ import os
 from celery import chain
 from celery.canvas import Signature
 from framework.celery_tasks import app
+from framework.celery_tasks.handlers import in_request_context
 from celery.local import PromiseProxy
 from gevent.pool import Pool
 
@@ -29,9 +30,21 @@ def postcommit_celery_queue():
         _local.postcommit_celery_queue = OrderedDict()
     return _local.postcommit_celery_queue
 
+def postcommit_side_effects():
+    """The side effects deferred to the end of the current request, or None
+    if `postcommit_before_request` did not run for it.
+    """
+    return getattr(_local, 'postcommit_side_effects', None)
+
 def postcommit_before_request():
     _local.postcommit_queue = OrderedDict()
     _local.postcommit_celery_queue = OrderedDict()
+    _local.postcommit_side_effects = OrderedDict()
+
+def postcommit_teardown_request(error=None):
+    # Side effects are no longer deferred, including after requests that failed
+    # before postcommit_after_request could flush them
+    _local.postcommit_side_effects = None
 
 @app.task(max_retries=5, default_retry_delay=60)
 def postcommit_celery_task_wrapper(queue):
@@ -45,8 +58,14 @@ def postcommit_after_request(response, base_status_error_code=500):
     if response.status_code >= base_status_error_code:
         _local.postcommit_queue = OrderedDict()
         _local.postcommit_celery_queue = OrderedDict()
+        _local.postcommit_side_effects = None
         return response
     try:
+        try:
+            flush_postcommit_side_effects()
+        finally:
+            _local.postcommit_side_effects = None
+
         if postcommit_queue():
             number_of_threads = 30  # one db connection per greenlet, let's share
             pool = Pool(number_of_threads)
@@ -83,9 +102,41 @@ def enqueue_postcommit_task(fn, args, kwargs, celery=False, once_per_request=Tru
     else:
         postcommit_queue().update({key: functools.partial(fn, *args, **kwargs)})
 
+def enqueue_postcommit_side_effect(key, flush, fields=None):
+    """Run `flush` once at the end of the request, however many times the
+    side effect identified by `key` is enqueued during it. If `fields` are
+    given, `flush` is called with the set of every field enqueued for `key`.
+    Outside of a request that ran `postcommit_before_request`, e.g. in a test
+    or script that only pushed a request context, `flush` is called immediately.
+
+    :param key: Hashable identifying the side effect, e.g. (node id, effect name)
+    :param flush: Callable performing the side effect
+    :param fields: Iterable of names to merge, e.g. the fields that were saved
+    """
+    effects = postcommit_side_effects()
+    if effects is None or not in_request_context():
+        return flush() if fields is None else flush(set(fields))
+    if key in effects:
+        if fields is not None:
+            effects[key][1].update(fields)
+    else:
+        effects[key] = (flush, None if fields is None else set(fields))
+
+def flush_postcommit_side_effects():
+    # Side effects enqueued while flushing are deferred again, and flushed in the next pass
+    while postcommit_side_effects():
+        effects = postcommit_side_effects()
+        _local.postcommit_side_effects = OrderedDict()
+        for flush, fields in effects.values():
+            if fields is None:
+                flush()
+            else:
+                flush(fields)
+
 handlers = {
     'before_request': postcommit_before_request,
     'after_request': postcommit_after_request,
+    'teardown_request': postcommit_teardown_request,
 }
 
 def run_postcommit(once_per_request=True, celery=False):
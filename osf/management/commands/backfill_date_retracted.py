@@ -23,7 +23,7 @@ def set_date_retracted(*args):
         Registration.objects.filter(retraction__state=Sanction.APPROVED, retraction__date_retracted=None)
         .select_related('retraction')
         .include('registered_from__logs')
-        .include('registered_from__guids')
+        .include('registered_from')
     )
     total = registrations.count()
     logger.info('Migrating {} retractions.'.format(total))
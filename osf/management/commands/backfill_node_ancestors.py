@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# This is a management command, rather than a migration script, because it
+# may need to be ran more than once: to repair the closure table after raw SQL
+# writes to osf_noderelation (see check_node_ancestors).
+
+from __future__ import unicode_literals
+import logging
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from osf.utils.migrations import backfill_node_ancestors
+from scripts import utils as script_utils
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Add any missing rows to the NodeAncestor closure table
+    """
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            '--dry',
+            action='store_true',
+            dest='dry_run',
+            help='Run migration and roll back changes to db',
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            dest='rebuild',
+            help='Delete every row and build the table from scratch',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            dest='batch_size',
+            help='Number of descendant ids to backfill per query',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options.get('dry_run', False)
+        if not dry_run:
+            script_utils.add_file_logger(logger, __file__)
+        with transaction.atomic():
+            if options.get('rebuild', False):
+                deleted, _ = apps.get_model('osf.NodeAncestor').objects.all().delete()
+                logger.info('Deleted {} node ancestor rows'.format(deleted))
+            backfill_node_ancestors(apps, batch_size=options['batch_size'])
+            if dry_run:
+                raise RuntimeError('Dry run, transaction rolled back.')
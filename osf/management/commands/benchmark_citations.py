@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import time
+import uuid
+
+import mock
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache.backends.dummy import DummyCache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.citations import utils as citation_utils
+from api.citations.utils import render_citation, render_citations
+from osf.models import Contributor, Guid, Node, OSFUser
+from osf.models.base import generate_guids
+
+STYLES = ['apa', 'modern-language-association', 'chicago-author-date']
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """
+    Measure how long rendering citations takes with and without the parsed
+    style and rendered citation caches, and through the batch API. The nodes
+    are created in a transaction that is always rolled back.
+    """
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument('--renders', type=int, default=1000, help='Number of citations rendered, across APA, MLA and Chicago')
+
+    def measure(self, name, count, func):
+        start = time.time()
+        func()
+        elapsed = time.time() - start
+        self.stdout.write('  {:<20} {:>6} renders {:>9.1f} ms {:>9.2f} ms/render'.format(
+            name, count, elapsed * 1000, elapsed * 1000 / count
+        ))
+
+    def build_nodes(self, creator, count):
+        nodes = Node.objects.bulk_create([
+            Node(title='Benchmark node {}'.format(i), creator=creator, is_public=True, guid_string=guid)
+            for i, guid in enumerate(generate_guids(count))
+        ])
+        content_type = ContentType.objects.get_for_model(Node)
+        Guid.objects.bulk_create([Guid(_id=node.guid_string, content_type=content_type, object_id=node.id) for node in nodes])
+        Contributor.objects.bulk_create([
+            Contributor(node=node, user=creator, read=True, write=True, admin=True, visible=True, _order=0) for node in nodes
+        ])
+        return nodes
+
+    def render_each(self, nodes):
+        for style in STYLES:
+            for node in nodes:
+                render_citation(node, style)
+
+    def render_batches(self, nodes):
+        for style in STYLES:
+            render_citations(nodes, style)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                user = OSFUser.objects.create(
+                    username='{}@benchmark.osf.io'.format(uuid.uuid4().hex), fullname='Benchmark User',
+                    given_name='Benchmark', family_name='User'
+                )
+                nodes = self.build_nodes(user, options['renders'] // len(STYLES))
+                count = len(nodes) * len(STYLES)
+
+                with mock.patch.object(citation_utils, 'cache', DummyCache('dummy', {})):
+                    with mock.patch.object(citation_utils, 'CITATION_STYLE_CACHE_SIZE', 0):
+                        self.measure('no caches', count, lambda: self.render_each(nodes))
+                    citation_utils._parsed_styles.clear()
+                    self.measure('parsed styles', count, lambda: self.render_each(nodes))
+                    self.measure('batches', count, lambda: self.render_batches(nodes))
+                self.render_batches(nodes)
+                self.measure('cached citations', count, lambda: self.render_each(nodes))
+                raise Rollback
+        except Rollback:
+            pass
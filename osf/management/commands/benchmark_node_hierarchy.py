@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from framework.auth import Auth
+from osf.models import AbstractNode, Contributor, Node, NodeRelation, OSFUser
+from website.notifications.emails import get_node_lineage
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """
+    Time the node hierarchy helpers on a deep and on a wide tree. The trees are
+    created in a transaction that is always rolled back.
+    """
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument('--depth', type=int, default=10, help='Number of levels in the deep tree')
+        parser.add_argument('--width', type=int, default=1000, help='Number of children in the wide tree')
+
+    def build_tree(self, creator, parents):
+        """Create a node below each of `parents` (None for a root), returning the nodes."""
+        nodes = Node.objects.bulk_create([
+            Node(title='Benchmark node', creator=creator, is_public=False) for _ in parents
+        ])
+        for order, (parent, node) in enumerate(zip(parents, nodes)):
+            if parent is not None:
+                NodeRelation.objects.create(parent=parent, child=node, is_node_link=False, _order=order)
+        return nodes
+
+    def measure(self, name, func):
+        start = time.time()
+        with CaptureQueriesContext(connection) as ctx:
+            func()
+        self.stdout.write('  {:<32} {:>5} queries {:>9.1f} ms'.format(name, len(ctx.captured_queries), (time.time() - start) * 1000))
+
+    def benchmark(self, title, root, leaf, admin, stranger):
+        self.stdout.write(title)
+        self.measure('parents', lambda: leaf.parents)
+        self.measure('get_root', lambda: leaf.get_root())
+        self.measure('is_admin_parent', lambda: leaf.is_admin_parent(admin))
+        self.measure('admin_contributor_ids', lambda: leaf.admin_contributor_ids)
+        self.measure('get_node_lineage', lambda: get_node_lineage(leaf))
+        self.measure('get_children', lambda: list(AbstractNode.objects.get_children(root, active=True)))
+        self.measure('has_permission_on_children', lambda: root.has_permission_on_children(stranger, 'read'))
+        self.measure('find_readable_descendants', lambda: list(root.find_readable_descendants(Auth(admin))))
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                admin, stranger = [
+                    OSFUser.objects.create(username='{}@benchmark.osf.io'.format(uuid.uuid4().hex), fullname='Benchmark')
+                    for _ in range(2)
+                ]
+
+                # A single chain of nodes, `depth` levels deep
+                chain = self.build_tree(admin, [None])
+                for _ in range(options['depth'] - 1):
+                    chain += self.build_tree(admin, chain[-1:])
+                # A root with `width` children
+                root = self.build_tree(admin, [None])[0]
+                children = self.build_tree(admin, [root] * options['width'])
+
+                Contributor.objects.bulk_create([
+                    Contributor(node=node, user=admin, read=True, write=True, admin=True, visible=True)
+                    for node in (chain[0], root)
+                ])
+
+                self.benchmark('{} levels deep'.format(options['depth']), chain[0], chain[-1], admin, stranger)
+                self.benchmark('{} nodes wide'.format(options['width']), root, children[-1], admin, stranger)
+                raise Rollback
+        except Rollback:
+            pass
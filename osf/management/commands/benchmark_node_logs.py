@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import datetime
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.request import Request
+
+from api.base.pagination import NodeLogPagination
+from framework.auth import Auth
+from osf.models import Contributor, Node, NodeAncestor, NodeLog, NodeRelation, OSFUser
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """
+    Time aggregating the logs of a project with many components, comparing
+    deep pages fetched by page number to those fetched by cursor. The project
+    is created in a transaction that is always rolled back.
+    """
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument('--components', type=int, default=5000, help='Number of components of the project')
+        parser.add_argument('--logs', type=int, default=1000000, help='Number of logs, spread over the components')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Number of logs created per query')
+        parser.add_argument('--page', type=int, default=1000, help='Deep page to fetch')
+
+    def measure(self, name, func):
+        start = time.time()
+        with CaptureQueriesContext(connection) as ctx:
+            result = func()
+        self.stdout.write('  {:<32} {:>5} queries {:>9.1f} ms'.format(name, len(ctx.captured_queries), (time.time() - start) * 1000))
+        return result
+
+    def paginate(self, queryset, **params):
+        request = Request(RequestFactory().get('/', params))
+        request.parser_context = {'kwargs': {}}
+        paginator = NodeLogPagination()
+        return paginator.paginate_queryset(queryset, request), paginator
+
+    def build_project(self, creator, components):
+        root = Node.objects.create(title='Benchmark project', creator=creator, is_public=False)
+        Contributor.objects.create(node=root, user=creator, read=True, write=True, admin=True, visible=True)
+        nodes = Node.objects.bulk_create([
+            Node(title='Benchmark component', creator=creator, is_public=False) for _ in range(components)
+        ])
+        NodeRelation.objects.bulk_create([
+            NodeRelation(parent=root, child=node, is_node_link=False, _order=order) for order, node in enumerate(nodes)
+        ])
+        NodeAncestor.objects.bulk_create([NodeAncestor(ancestor=root, descendant=node, depth=1) for node in nodes])
+        return root, [root] + nodes
+
+    def build_logs(self, user, nodes, count, batch_size):
+        start = timezone.now()
+        for offset in range(0, count, batch_size):
+            NodeLog.objects.bulk_create([
+                NodeLog(
+                    action=NodeLog.FILE_ADDED,
+                    user=user,
+                    node=nodes[i % len(nodes)],
+                    original_node=nodes[i % len(nodes)],
+                    date=start - datetime.timedelta(seconds=i),
+                    params={},
+                )
+                for i in range(offset, min(offset + batch_size, count))
+            ])
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                user = OSFUser.objects.create(username='{}@benchmark.osf.io'.format(uuid.uuid4().hex), fullname='Benchmark')
+                root, nodes = self.build_project(user, options['components'])
+                self.build_logs(user, nodes, options['logs'], options['batch_size'])
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE osf_nodelog')
+
+                logs = root.get_aggregate_logs_queryset(Auth(user))
+                size = NodeLogPagination.page_size
+                self.stdout.write('{} components, {} logs'.format(options['components'], options['logs']))
+                self.measure('count', lambda: logs.count())
+                self.measure('first page', lambda: self.paginate(logs))
+                self.measure('page {} by number'.format(options['page']), lambda: self.paginate(logs, page=options['page']))
+
+                # Start from the item preceding the deep page, as if following next links
+                previous = logs.order_by('-date', '-id')[(options['page'] - 1) * size - 1]
+                paginator = NodeLogPagination()
+                cursor = paginator.encode_cursor(False, paginator._position(previous))
+                self.measure('page {} by cursor'.format(options['page']), lambda: self.paginate(logs, **{'page[cursor]': cursor}))
+                raise Rollback
+        except Rollback:
+            pass
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import time
+import uuid
+
+import mock
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from osf.models import Contributor, Guid, Node, OSFUser, ShareOutboxEntry
+from osf.models.base import generate_guids
+from tests.share_server import ShareServer
+from website import settings
+from website.project.tasks import drain_share_outbox, update_node_share
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """
+    Measure the throughput of sending node updates to SHARE through the
+    outbox, compared to one request per node, against a local stand-in for
+    SHARE. The nodes are created in a transaction that is always rolled back.
+    """
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument('--updates', type=int, default=10000, help='Number of updated nodes')
+        parser.add_argument('--batch-size', type=int, default=settings.SHARE_OUTBOX_BATCH_SIZE, help='Nodes per SHARE request')
+        parser.add_argument('--sample', type=int, default=500, help='Number of nodes sent one request at a time')
+
+    def measure(self, name, count, func):
+        start = time.time()
+        with CaptureQueriesContext(connection) as ctx:
+            func()
+        elapsed = time.time() - start
+        self.stdout.write('  {:<24} {:>6} nodes {:>7} queries {:>9.1f} ms {:>9.1f} nodes/s'.format(
+            name, count, len(ctx.captured_queries), elapsed * 1000, count / elapsed if elapsed else float('inf')
+        ))
+
+    def build_nodes(self, creator, count):
+        nodes = Node.objects.bulk_create([
+            Node(title='Benchmark node', creator=creator, is_public=True, guid_string=guid)
+            for guid in generate_guids(count)
+        ])
+        content_type = ContentType.objects.get_for_model(Node)
+        Guid.objects.bulk_create([Guid(_id=node.guid_string, content_type=content_type, object_id=node.id) for node in nodes])
+        Contributor.objects.bulk_create([
+            Contributor(node=node, user=creator, read=True, write=True, admin=True, visible=True, _order=0) for node in nodes
+        ])
+        return nodes
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic(), ShareServer() as share, \
+                    mock.patch.object(settings, 'SHARE_URL', share.url), \
+                    mock.patch.object(settings, 'SHARE_API_TOKEN', 'benchmark'):
+                user = OSFUser.objects.create(username='{}@benchmark.osf.io'.format(uuid.uuid4().hex), fullname='Benchmark')
+                nodes = self.build_nodes(user, options['updates'])
+
+                sample = nodes[:options['sample']]
+                self.measure('one request per node', len(sample), lambda: [update_node_share(node) for node in sample])
+
+                ShareOutboxEntry.objects.bulk_create([ShareOutboxEntry(node=node) for node in nodes])
+                self.measure('outbox', len(nodes), lambda: drain_share_outbox(batch_size=options['batch_size']))
+                self.stdout.write('{} requests received'.format(len(share.requests)))
+                raise Rollback
+        except Rollback:
+            pass
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import time
+import uuid
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from framework.auth import Auth
+from osf.models import Contributor, Guid, Node, NodeAncestor, NodeRelation, OSFUser
+from osf.models.base import generate_guids
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """
+    Time creating a project from a template with many components, comparing
+    the batch copy of `use_as_template` to copying one node at a time. The
+    template is created in a transaction that is always rolled back.
+    """
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument('--nodes', type=int, default=200, help='Number of nodes of the template, including its root')
+        parser.add_argument('--fanout', type=int, default=10, help='Number of components of each node')
+
+    def measure(self, name, func):
+        start = time.time()
+        with CaptureQueriesContext(connection) as ctx:
+            result = func()
+        self.stdout.write('  {:<32} {:>5} queries {:>9.1f} ms'.format(name, len(ctx.captured_queries), (time.time() - start) * 1000))
+        return result
+
+    def build_template(self, creator, count, fanout):
+        nodes = Node.objects.bulk_create([
+            Node(
+                title='Benchmark template {}'.format(i),
+                category='project' if i == 0 else 'data',
+                creator=creator,
+                is_public=False,
+                guid_string=guid,
+            )
+            for i, guid in enumerate(generate_guids(count))
+        ])
+        content_type = ContentType.objects.get_for_model(Node)
+        Guid.objects.bulk_create([Guid(_id=node.guid_string, content_type=content_type, object_id=node.id) for node in nodes])
+        Contributor.objects.bulk_create([
+            Contributor(node=node, user=creator, read=True, write=True, admin=True, visible=True, _order=0) for node in nodes
+        ])
+        # Breadth first, so that each node's parent precedes it
+        ancestors = {nodes[0].id: []}
+        relations = []
+        for i, node in enumerate(nodes[1:], 1):
+            parent = nodes[(i - 1) // fanout]
+            relations.append(NodeRelation(parent=parent, child=node, is_node_link=False, _order=(i - 1) % fanout))
+            ancestors[node.id] = [parent.id] + ancestors[parent.id]
+        NodeRelation.objects.bulk_create(relations)
+        NodeAncestor.objects.bulk_create([
+            NodeAncestor(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=depth)
+            for descendant_id, ancestor_ids in ancestors.items()
+            for depth, ancestor_id in enumerate(ancestor_ids, 1)
+        ])
+        Node.objects.filter(id__in=[node.id for node in nodes]).update(root=nodes[0])
+        return nodes[0]
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                user = OSFUser.objects.create(username='{}@benchmark.osf.io'.format(uuid.uuid4().hex), fullname='Benchmark')
+                template = self.build_template(user, options['nodes'], options['fanout'])
+                auth = Auth(user)
+
+                self.stdout.write('{} nodes, {} components each'.format(options['nodes'], options['fanout']))
+                self.measure('use_as_template', lambda: template.use_as_template(auth))
+                self.measure('one node at a time', lambda: template._use_as_template_recursive(auth))
+                raise Rollback
+        except Rollback:
+            pass
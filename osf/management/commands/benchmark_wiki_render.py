@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from addons.wiki.models import NodeWikiPage
+from osf.models import Node, OSFUser
+
+
+SECTION = '''
+## Section {i}
+
+Some *emphasis*, a [link](https://osf.io/) and a link to [[page {i}]].
+
+```python
+def section_{i}():
+    return {i}
+```
+
+| column | value |
+| ------ | ----- |
+| {i}    | {i}   |
+'''
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """
+    Measure how long wiki pages take to render with and without the rendered
+    output cache. The pages are created in a transaction that is always
+    rolled back.
+    """
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument('--pages', type=int, default=20, help='Number of wiki pages')
+        parser.add_argument('--sections', type=int, default=50, help='Markdown sections per page')
+        parser.add_argument('--views', type=int, default=10, help='Number of times each page is rendered')
+
+    def measure(self, name, count, func):
+        start = time.time()
+        func()
+        elapsed = time.time() - start
+        self.stdout.write('  {:<12} {:>6} renders {:>9.1f} ms {:>9.2f} ms/render'.format(
+            name, count, elapsed * 1000, elapsed * 1000 / count
+        ))
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                user = OSFUser.objects.create(username='{}@benchmark.osf.io'.format(uuid.uuid4().hex), fullname='Benchmark')
+                node = Node.objects.create(title='Benchmark node', creator=user)
+                # Make every page unique so the cache starts out cold
+                pages = [
+                    NodeWikiPage.objects.create(
+                        page_name='page {}'.format(i), node=node, user=user,
+                        content='# {}\n'.format(uuid.uuid4().hex) + ''.join(SECTION.format(i=j) for j in range(options['sections']))
+                    ) for i in range(options['pages'])
+                ]
+                count = len(pages) * options['views']
+
+                self.measure('uncached', count, lambda: [page._render_html(node) for page in pages for _ in range(options['views'])])
+                self.measure('cached', count, lambda: [page.html(node) for page in pages for _ in range(options['views'])])
+                raise Rollback
+        except Rollback:
+            pass
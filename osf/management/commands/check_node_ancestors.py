@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from osf.models import NodeAncestor, NodeRelation
+
+logger = logging.getLogger(__name__)
+
+# Rows the closure table should have, computed from osf_noderelation, compared
+# against the rows it does have
+INCONSISTENCIES_SQL = """
+    WITH RECURSIVE expected (ancestor_id, descendant_id, depth, path) AS (
+        SELECT parent_id, child_id, 1, ARRAY[child_id, parent_id]
+        FROM "{noderelation}"
+        WHERE is_node_link IS FALSE
+      UNION ALL
+        SELECT R.parent_id, E.descendant_id, E.depth + 1, E.path || R.parent_id
+        FROM expected AS E
+          JOIN "{noderelation}" AS R ON R.child_id = E.ancestor_id
+        WHERE R.is_node_link IS FALSE
+          AND NOT R.parent_id = ANY(E.path)
+    )
+    SELECT
+        COALESCE(E.ancestor_id, A.ancestor_id),
+        COALESCE(E.descendant_id, A.descendant_id),
+        E.depth,
+        A.depth
+    FROM (SELECT DISTINCT ancestor_id, descendant_id, depth FROM expected) AS E
+      FULL OUTER JOIN "{nodeancestor}" AS A
+        ON A.ancestor_id = E.ancestor_id AND A.descendant_id = E.descendant_id
+    WHERE E.depth IS DISTINCT FROM A.depth
+    ORDER BY 2, 1
+"""
+
+
+def find_inconsistencies():
+    """Compare NodeAncestor against the closure of the primary NodeRelations.
+
+    :return list: (ancestor_id, descendant_id, expected depth, actual depth)
+        tuples. The expected depth is None for rows that should not exist, the
+        actual depth None for rows that are missing.
+    """
+    sql = INCONSISTENCIES_SQL.format(
+        noderelation=NodeRelation._meta.db_table,
+        nodeancestor=NodeAncestor._meta.db_table,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+        return cursor.fetchall()
+
+
+class Command(BaseCommand):
+    """
+    Verify that the NodeAncestor closure table matches osf_noderelation
+    """
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=100,
+            dest='limit',
+            help='Maximum number of inconsistent rows to log',
+        )
+
+    def handle(self, *args, **options):
+        inconsistencies = find_inconsistencies()
+        for ancestor_id, descendant_id, expected, actual in inconsistencies[:options['limit']]:
+            if actual is None:
+                logger.warn('Missing: ancestor={} descendant={} depth={}'.format(ancestor_id, descendant_id, expected))
+            elif expected is None:
+                logger.warn('Extra: ancestor={} descendant={} depth={}'.format(ancestor_id, descendant_id, actual))
+            else:
+                logger.warn('Wrong depth: ancestor={} descendant={} depth={}, expected {}'.format(ancestor_id, descendant_id, actual, expected))
+        if inconsistencies:
+            raise CommandError(
+                '{} inconsistent node ancestor rows. Run `backfill_node_ancestors --rebuild` to repair.'.format(len(inconsistencies))
+            )
+        logger.info('Node ancestors are consistent')
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import logging
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from osf.models import AbstractNode, PreprintService
+from osf.utils.migrations import backfill_preprint_publicly_listable
+
+logger = logging.getLogger(__name__)
+
+# Preprints whose is_publicly_listable differs from the value computed from
+# is_published and the node's is_public and is_deleted
+DRIFT_SQL = """
+    SELECT P.id, P.is_publicly_listable
+    FROM "{preprint}" AS P
+      LEFT JOIN "{node}" AS N ON N.id = P.node_id
+    WHERE P.is_publicly_listable IS DISTINCT FROM COALESCE(P.is_published AND N.is_public AND NOT N.is_deleted, FALSE)
+    ORDER BY P.id
+"""
+
+
+def find_drift():
+    """Compare PreprintService.is_publicly_listable against its inputs.
+
+    :return list: (preprint id, stored is_publicly_listable) tuples for the
+        preprints whose flag is wrong.
+    """
+    sql = DRIFT_SQL.format(
+        preprint=PreprintService._meta.db_table,
+        node=AbstractNode._meta.db_table,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+        return cursor.fetchall()
+
+
+class Command(BaseCommand):
+    """
+    Verify that PreprintService.is_publicly_listable matches the preprints'
+    publication state and their nodes' visibility
+    """
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=100,
+            dest='limit',
+            help='Maximum number of drifted preprints to log',
+        )
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            dest='fix',
+            help='Recompute the flag of every preprint',
+        )
+
+    def handle(self, *args, **options):
+        drift = find_drift()
+        for preprint_id, listable in drift[:options['limit']]:
+            logger.warn('Drift: preprint={} is_publicly_listable={}, expected {}'.format(preprint_id, listable, not listable))
+        if drift and options['fix']:
+            backfill_preprint_publicly_listable(apps)
+            logger.info('Recomputed is_publicly_listable of {} drifted preprints'.format(len(drift)))
+        elif drift:
+            raise CommandError(
+                '{} preprints with a wrong is_publicly_listable. Run `check_preprint_listing --fix` to repair.'.format(len(drift))
+            )
+        else:
+            logger.info('Preprint listing flags are consistent')
@@ -30,6 +30,6 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         guids = options.get('guids', [])
-        for node in AbstractNode.objects.filter(guids___id__in=guids):
+        for node in AbstractNode.objects.filter(guid_string__in=guids):
             logger.info('Marking AbstractNode {} as spam...'.format(node._id))
             confirm_spam(node)
@@ -41,7 +41,7 @@ class Command(BaseCommand):
         if user_guid is None:
             user = OSFUser.objects.first()
         else:
-            user = OSFUser.objects.get(guids___id=user_guid)
+            user = OSFUser.objects.get(guid_string=user_guid)
 
         fake = Faker()
         triggers = [a.value for a in DefaultTriggers]
@@ -106,7 +106,7 @@ def export_wikis(node, current_dir):
     wikis_dir = os.path.join(current_dir, 'wikis')
     os.mkdir(wikis_dir)
     for wiki_name, wiki_id in node.wiki_pages_current.iteritems():
-        wiki = NodeWikiPage.objects.get(guids___id=wiki_id)
+        wiki = NodeWikiPage.objects.get(guid_string=wiki_id)
         if wiki.content:
             with io.open(os.path.join(wikis_dir, '{}.md'.format(wiki_name)), 'w', encoding='utf-8') as f:
                 f.write(wiki.content)
@@ -166,8 +166,8 @@ def export_nodes(nodes_to_export, user, dir, nodes_type):
         progress.stop()
 
 def get_usage(user):
-    nodes = user.nodes.filter(is_deleted=False).exclude(type='osf.collection').values_list('guids___id', flat=True)
-    files = OsfStorageFile.objects.filter(node__guids___id__in=nodes).values_list('id', flat=True)
+    nodes = user.nodes.filter(is_deleted=False).exclude(type='osf.collection').values_list('guid_string', flat=True)
+    files = OsfStorageFile.objects.filter(node__guid_string__in=nodes).values_list('id', flat=True)
     versions = FileVersion.objects.filter(basefilenode__in=files)
     return sum([v.size or 0 for v in versions]) / GBs
 
@@ -210,7 +210,7 @@ def export_account(user_id, only_private=False, only_admin=False, export_files=T
             *same as projects*
 
     """
-    user = OSFUser.objects.get(guids___id=user_id)
+    user = OSFUser.objects.get(guid_string=user_id)
     proceed = raw_input('\nUser has {:.2f} GB of data in OSFStorage that will be exported.\nWould you like to continue? [y/n] '.format(get_usage(user)))
     if not proceed or proceed.lower() != 'y':
         print('Exiting...')
@@ -227,14 +227,14 @@ def export_account(user_id, only_private=False, only_admin=False, export_files=T
     os.mkdir(registrations_dir)
 
     preprints_to_export = (PreprintService.objects
-        .filter(node___contributors__guids___id=user_id)
+        .filter(node___contributors__guid_string=user_id)
         .select_related('node')
     )
 
-    preprint_projects_exported = preprints_to_export.values_list('node__guids___id', flat=True)
+    preprint_projects_exported = preprints_to_export.values_list('node__guid_string', flat=True)
     projects_to_export = (user.nodes
         .filter(is_deleted=False, type='osf.node')
-        .exclude(guids___id__in=preprint_projects_exported)
+        .exclude(guid_string__in=preprint_projects_exported)
         .get_roots()
     )
 
@@ -64,7 +64,7 @@ def update(dry_run=False):
     for old, new in BEPRESS_CHANGES['rename'].items():
         logger.info('Renaming `{}`->`{}`'.format(old, new))
         to_update = Subject.objects.filter(text=old)
-        affected_preprints = set(to_update.exclude(preprint_services__isnull=True).values_list('preprint_services__guids___id', flat=True))
+        affected_preprints = set(to_update.exclude(preprint_services__isnull=True).values_list('preprint_services__guid_string', flat=True))
         to_update.update(text=new)
         for preprint_id in affected_preprints:
             logger.info('Notifying SHARE about preprint {} change'.format(preprint_id))
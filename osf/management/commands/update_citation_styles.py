@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import logging
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from website import settings
+from website.citations.utils import update_citation_styles
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Update the citation style catalog from the CSL files, parsing only the
+    files that changed since they were last parsed
+    """
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            '--path',
+            default=settings.CITATION_STYLES_PATH,
+            help='Directory of the CSL files',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            dest='force',
+            help='Parse every file, changed or not',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            counts = update_citation_styles(options['path'], force=options['force'])
+        logger.info('Citation styles: {added} added, {updated} updated, {unchanged} unchanged, {removed} removed'.format(**counts))
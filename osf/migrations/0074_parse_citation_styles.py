@@ -16,7 +16,6 @@ import os
 from django.db import migrations
 from lxml import etree
 
-from osf.models.citation import CitationStyle
 from website import settings
 
 logger = logging.getLogger(__file__)
@@ -25,7 +24,10 @@ def get_style_files(path):
     files = (os.path.join(path, x) for x in os.listdir(path))
     return (f for f in files if os.path.isfile(f))
 
-def parse_citation_styles(*args):
+def parse_citation_styles(state, schema):
+    # The historical model, as fields added later do not exist yet
+    CitationStyle = state.get_model('osf', 'citationstyle')
+
     # drop all styles
     CitationStyle.objects.all().delete()
 
@@ -63,8 +65,9 @@ def parse_citation_styles(*args):
             style = CitationStyle(**fields)
             style.save()
 
-def revert(*args):
+def revert(state, schema):
     # The revert of this migration simply removes all CitationStyle instances.
+    CitationStyle = state.get_model('osf', 'citationstyle')
     CitationStyle.objects.all().delete()
 
 class Migration(migrations.Migration):
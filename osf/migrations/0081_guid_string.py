@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+import osf.utils.fields
+from osf.utils.migrations import backfill_guid_string
+
+GUID_MODELS = ('abstractnode', 'osfuser', 'preprintservice', 'comment')
+
+
+def add_guid_strings(state, schema):
+    for model_name in GUID_MODELS:
+        backfill_guid_string(state, 'osf', model_name)
+
+
+def remove_guid_strings(state, schema):
+    # The columns are dropped by reversing the AddField operations
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('osf', '0080_ensure_schemas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='abstractnode',
+            name='guid_string',
+            field=osf.utils.fields.LowercaseCharField(blank=True, db_index=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='guid_string',
+            field=osf.utils.fields.LowercaseCharField(blank=True, db_index=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='osfuser',
+            name='guid_string',
+            field=osf.utils.fields.LowercaseCharField(blank=True, db_index=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='preprintservice',
+            name='guid_string',
+            field=osf.utils.fields.LowercaseCharField(blank=True, db_index=True, max_length=255, null=True),
+        ),
+        migrations.RunPython(add_guid_strings, remove_guid_strings),
+    ]
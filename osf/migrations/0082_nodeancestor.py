@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from osf.utils.migrations import backfill_node_ancestors
+
+
+def add_node_ancestors(state, schema):
+    backfill_node_ancestors(state)
+
+
+def remove_node_ancestors(state, schema):
+    # The table is dropped by reversing the CreateModel operation
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('osf', '0081_guid_string'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NodeAncestor',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField()),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_relations', to='osf.AbstractNode')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_relations', to='osf.AbstractNode')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='nodeancestor',
+            unique_together=set([('ancestor', 'descendant')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='nodeancestor',
+            index_together=set([('descendant', 'depth')]),
+        ),
+        migrations.RunPython(add_node_ancestors, remove_node_ancestors),
+    ]
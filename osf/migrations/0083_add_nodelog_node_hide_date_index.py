@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    atomic = False  # CREATE INDEX CONCURRENTLY cannot be run in a txn
+
+    dependencies = [
+        ('osf', '0082_nodeancestor'),
+    ]
+
+    operations = [
+        # Serves aggregate log listings, which filter on node and should_hide
+        # and are ordered (and keyset paginated) by date then id
+        migrations.RunSQL([
+            'CREATE INDEX CONCURRENTLY osf_nodelog_node_hide_date ON osf_nodelog (node_id, should_hide, date DESC, id DESC);',
+        ], [
+            'DROP INDEX IF EXISTS osf_nodelog_node_hide_date, RESTRICT;'
+        ])
+    ]
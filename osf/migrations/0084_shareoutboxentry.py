@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import django_extensions.db.fields
+import osf.utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('osf', '0083_add_nodelog_node_hide_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShareOutboxEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt', osf.utils.fields.NonNaiveDateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('node', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='share_outbox_entry', to='osf.AbstractNode')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import django.contrib.postgres.fields
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('osf', '0085_pendingspamcheck'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='citationstyle',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='citationstyle',
+            name='fields_used',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=255), blank=True, default=list, size=None),
+        ),
+        # Match the UPPER(...) LIKE UPPER(...) that icontains lookups compile to
+        migrations.RunSQL([
+            'CREATE INDEX osf_citationstyle__id_trgm ON osf_citationstyle USING gin (UPPER(_id::text) gin_trgm_ops);',
+            'CREATE INDEX osf_citationstyle_title_trgm ON osf_citationstyle USING gin (UPPER(title::text) gin_trgm_ops);',
+            'CREATE INDEX osf_citationstyle_short_title_trgm ON osf_citationstyle USING gin (UPPER(short_title::text) gin_trgm_ops);',
+        ], [
+            'DROP INDEX IF EXISTS osf_citationstyle__id_trgm;',
+            'DROP INDEX IF EXISTS osf_citationstyle_title_trgm;',
+            'DROP INDEX IF EXISTS osf_citationstyle_short_title_trgm;',
+        ]),
+    ]
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django_extensions.db.fields
+import osf.utils.fields
+
+from osf.utils.migrations import copy_comments_viewed_timestamps, restore_comments_viewed_timestamps
+
+
+def add_comment_read_states(state, schema):
+    copy_comments_viewed_timestamps(state)
+
+
+def remove_comment_read_states(state, schema):
+    restore_comments_viewed_timestamps(state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('osf', '0086_citationstyle_catalog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentReadState',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('last_viewed', osf.utils.fields.NonNaiveDateTimeField()),
+                ('root_target', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='osf.Guid')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comment_read_states', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='commentreadstate',
+            unique_together=set([('user', 'root_target')]),
+        ),
+        migrations.RunPython(add_comment_read_states, remove_comment_read_states),
+        migrations.RemoveField(
+            model_name='osfuser',
+            name='comments_viewed_timestamp',
+        ),
+    ]
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+from osf.utils.migrations import backfill_preprint_publicly_listable
+
+
+def add_is_publicly_listable(state, schema):
+    backfill_preprint_publicly_listable(state)
+
+
+def remove_is_publicly_listable(state, schema):
+    # The column is dropped by reversing the AddField operation
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('osf', '0087_commentreadstate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='preprintservice',
+            name='is_publicly_listable',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.RunPython(add_is_publicly_listable, remove_is_publicly_listable),
+    ]
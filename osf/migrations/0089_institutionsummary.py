@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django_extensions.db.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('osf', '0088_preprintservice_is_publicly_listable'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InstitutionSummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('date', models.DateField()),
+                ('users', models.IntegerField(default=0)),
+                ('public_nodes', models.IntegerField(default=0)),
+                ('private_nodes', models.IntegerField(default=0)),
+                ('public_registrations', models.IntegerField(default=0)),
+                ('private_registrations', models.IntegerField(default=0)),
+                ('preprints', models.IntegerField(default=0)),
+                ('bytes_stored', models.BigIntegerField(default=0)),
+                ('institution', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='summaries', to='osf.Institution')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='institutionsummary',
+            unique_together=set([('institution', 'date')]),
+        ),
+    ]
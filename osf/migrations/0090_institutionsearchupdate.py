@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django_extensions.db.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('osf', '0089_institutionsummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InstitutionSearchUpdate',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('processed', models.PositiveIntegerField(default=0)),
+                ('done', models.BooleanField(default=False)),
+                ('institution', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='search_update', to='osf.Institution')),
+            ],
+        ),
+    ]
@@ -3,13 +3,14 @@ from osf.models.base import Guid, BlackListGuid  # noqa
 from osf.models.user import OSFUser, Email  # noqa
 from osf.models.contributor import Contributor, RecentlyAddedContributor  # noqa
 from osf.models.session import Session  # noqa
-from osf.models.institution import Institution  # noqa
+from osf.models.institution import Institution, InstitutionSearchUpdate  # noqa
+from osf.models.institution_summary import InstitutionSummary  # noqa
 from osf.models.node import AbstractNode, Node, Collection  # noqa
 from osf.models.sanctions import Sanction, Embargo, Retraction, RegistrationApproval, DraftRegistrationApproval, EmbargoTerminationApproval  # noqa
 from osf.models.registrations import Registration, DraftRegistrationLog, DraftRegistration  # noqa
 from osf.models.nodelog import NodeLog  # noqa
 from osf.models.tag import Tag  # noqa
-from osf.models.comment import Comment  # noqa
+from osf.models.comment import Comment, CommentReadState  # noqa
 from osf.models.conference import Conference, MailRecord  # noqa
 from osf.models.citation import CitationStyle  # noqa
 from osf.models.archive import ArchiveJob, ArchiveTarget  # noqa
@@ -19,7 +20,7 @@ from osf.models.oauth import ApiOAuth2Application, ApiOAuth2PersonalToken, ApiOA
 from osf.models.licenses import NodeLicense, NodeLicenseRecord  # noqa
 from osf.models.private_link import PrivateLink  # noqa
 from osf.models.notifications import NotificationDigest, NotificationSubscription  # noqa
-from osf.models.spam import SpamStatus, SpamMixin  # noqa
+from osf.models.spam import SpamStatus, SpamMixin, PendingSpamCheck  # noqa
 from osf.models.subject import Subject  # noqa
 from osf.models.preprint_provider import PreprintProvider  # noqa
 from osf.models.preprint_service import PreprintService  # noqa
@@ -29,10 +30,11 @@ from osf.models.files import (  # noqa
     File, Folder,  # noqa
     FileVersion, TrashedFile, TrashedFileNode, TrashedFolder,  # noqa
 )  # noqa
-from osf.models.node_relation import NodeRelation  # noqa
+from osf.models.node_relation import NodeAncestor, NodeRelation  # noqa
 from osf.models.analytics import UserActivityCounter, PageCounter  # noqa
 from osf.models.admin_profile import AdminProfile  # noqa
 from osf.models.admin_log_entry import AdminLogEntry  # noqa
 from osf.models.maintenance_state import MaintenanceState  # noqa
 from osf.models.quickfiles import QuickFilesNode  # noqa
 from osf.models.action import ReviewAction  # noqa
+from osf.models.share import ShareOutboxEntry  # noqa
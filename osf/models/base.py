@@ -9,11 +9,12 @@ from django.core.exceptions import MultipleObjectsReturned
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import models
 from django.db.models import ForeignKey
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django_extensions.db.models import TimeStampedModel
 from include import IncludeQuerySet
 
+from osf.utils import guid_resolution
 from osf.utils.caching import cached_property
 from osf.exceptions import ValidationError
 from osf.utils.fields import LowercaseCharField, NonNaiveDateTimeField
@@ -39,6 +40,19 @@ def generate_guid(length=5):
                 return guid_id
 
 
+def generate_guids(count, length=5):
+    """Generate `count` distinct, unused guids, checking candidates in bulk
+    rather than one at a time as `generate_guid` does.
+    """
+    guids = set()
+    while len(guids) < count:
+        candidates = set(''.join(random.sample(ALPHABET, length)) for _ in range(count - len(guids))) - guids
+        taken = set(BlackListGuid.objects.filter(guid__in=candidates).values_list('guid', flat=True))
+        taken.update(Guid.objects.filter(_id__in=candidates).values_list('_id', flat=True))
+        guids.update(candidates - taken)
+    return list(guids)
+
+
 def generate_object_id():
     return str(bson.ObjectId())
 
@@ -246,12 +260,9 @@ class OptionalGuidMixin(BaseIDMixin):
 
 
 class GuidMixinQuerySet(IncludeQuerySet):
-
-    def _filter_or_exclude(self, negate, *args, **kwargs):
-        return super(GuidMixinQuerySet, self)._filter_or_exclude(negate, *args, **kwargs).include('guids')
-
-    def all(self):
-        return super(GuidMixinQuerySet, self).all().include('guids')
+    # The primary guid is denormalized onto GuidMixin.guid_string, so there is
+    # no need to force `.include('guids')` on every query anymore. Callers that
+    # need every guid of an object can still `.include('guids')` explicitly.
 
     def count(self):
         return super(GuidMixinQuerySet, self.include(None)).count()
@@ -262,6 +273,9 @@ class GuidMixin(BaseIDMixin):
 
     guids = GenericRelation(Guid, related_name='referent', related_query_name='referents')
     content_type_pk = models.PositiveIntegerField(null=True, blank=True)
+    # Denormalized copy of the primary (most recently created) Guid._id.
+    # Maintained by `update_primary_guid_string` and `clear_deleted_guid_string`.
+    guid_string = LowercaseCharField(max_length=255, null=True, blank=True, db_index=True)
 
     objects = GuidMixinQuerySet.as_manager()
     # TODO: use pre-delete signal to disable delete cascade
@@ -271,6 +285,9 @@ class GuidMixin(BaseIDMixin):
 
     @cached_property
     def _id(self):
+        if self.guid_string:
+            return self.guid_string
+        # Rows that have not been backfilled yet fall back to the generic relation
         try:
             guid = self.guids.all()[0]
         except IndexError:
@@ -287,6 +304,7 @@ class GuidMixin(BaseIDMixin):
             guid.object_id = self.pk
             guid.content_type = ContentType.objects.get_for_model(self)
             guid.save()
+            self.guid_string = guid._id
         elif guid.content_type == ContentType.objects.get_for_model(self) and guid.object_id == self.pk:
             # TODO should this up the created for the guid until now so that it appears as the first guid
             # for this object?
@@ -301,13 +319,24 @@ class GuidMixin(BaseIDMixin):
         # Minor optimization--no need to query if q is None or ''
         if not q:
             return None
-        try:
-            # guids___id__isnull=False forces an INNER JOIN
-            if select_for_update:
-                return cls.objects.filter(guids___id__isnull=False, guids___id=q).select_for_update().first()
-            return cls.objects.filter(guids___id__isnull=False, guids___id=q).first()
-        except cls.DoesNotExist:
-            return None
+        qs = cls.objects.filter(guid_string=q)
+        if select_for_update:
+            qs = qs.select_for_update()
+        obj = qs.first()
+        if obj is not None:
+            return obj
+        # Objects may be loaded by a guid other than their primary one
+        # guids___id__isnull=False forces an INNER JOIN
+        qs = cls.objects.filter(guids___id__isnull=False, guids___id=q)
+        if select_for_update:
+            qs = qs.select_for_update()
+        return qs.first()
+
+    def clone(self):
+        copy = super(GuidMixin, self).clone()
+        # The copy gets its own guid when it is first saved
+        copy.guid_string = None
+        return copy
 
     @property
     def deep_url(self):
@@ -327,5 +356,58 @@ def ensure_guid(sender, instance, created, **kwargs):
         # Clear query cache of instance.guids
         if has_cached_guids:
             del instance._prefetched_objects_cache['guids']
-        Guid.objects.create(object_id=instance.pk, content_type=ContentType.objects.get_for_model(instance),
-                            _id=generate_guid(instance.__guid_min_length__))
+        guid = Guid.objects.create(object_id=instance.pk, content_type=ContentType.objects.get_for_model(instance),
+                                   _id=generate_guid(instance.__guid_min_length__))
+        instance.guid_string = guid._id
+
+
+def _sync_guid_string(content_type_id, object_id):
+    """Set GuidMixin.guid_string of a referent to its primary guid, the most
+    recently created one matching the ordering on Guid, or None if it has none left.
+    """
+    if content_type_id is None or object_id is None:
+        return
+    model = ContentType.objects.get_for_id(content_type_id).model_class()
+    if model is None or not issubclass(model, GuidMixin):
+        return
+    primary = Guid.objects.filter(
+        content_type_id=content_type_id,
+        object_id=object_id
+    ).order_by('-created').values_list('_id', flat=True).first()
+    model._base_manager.filter(pk=object_id).exclude(guid_string=primary).update(guid_string=primary)
+
+
+@receiver(pre_save, sender=Guid)
+def remember_guid_referent(sender, instance, **kwargs):
+    # A guid repointed by saving it may have been the primary guid of its previous referent
+    if instance.pk:
+        instance._previous_referent = Guid.objects.filter(pk=instance.pk).values_list('content_type_id', 'object_id').first()
+
+
+@receiver(post_save, sender=Guid)
+def update_primary_guid_string(sender, instance, created, **kwargs):
+    """Keep GuidMixin.guid_string in sync with the primary guid of its referent.
+    Guids repointed with queryset updates are not noticed.
+    """
+    _sync_guid_string(instance.content_type_id, instance.object_id)
+    previous = getattr(instance, '_previous_referent', None)
+    if previous and previous != (instance.content_type_id, instance.object_id):
+        _sync_guid_string(*previous)
+
+
+@receiver(post_delete, sender=Guid)
+def clear_deleted_guid_string(sender, instance, **kwargs):
+    _sync_guid_string(instance.content_type_id, instance.object_id)
+
+
+@receiver(post_save, sender=Guid)
+@receiver(post_delete, sender=Guid)
+def invalidate_guid_resolution(sender, instance, **kwargs):
+    guid_resolution.invalidate_guid(instance._id)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_referent_resolution(sender, instance, **kwargs):
+    if isinstance(instance, (GuidMixin, OptionalGuidMixin)):
+        guid_resolution.invalidate_referent(instance)
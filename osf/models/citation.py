@@ -1,9 +1,32 @@
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.search import TrigramSimilarity
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Greatest
 from django.utils import timezone
 from osf.models.base import BaseModel
 from osf.utils.fields import NonNaiveDateTimeField
 
 
+class CitationStyleQuerySet(models.QuerySet):
+
+    def search(self, query):
+        """Styles whose id, title or short title contain `query`, most similar
+        first. The substring matches are served by trigram indexes.
+        """
+        return self.filter(
+            Q(_id__icontains=query) |
+            Q(title__icontains=query) |
+            Q(short_title__icontains=query)
+        ).annotate(
+            similarity=Greatest(
+                TrigramSimilarity('_id', query),
+                TrigramSimilarity('title', query),
+                TrigramSimilarity('short_title', query),
+            )
+        ).order_by('-similarity', '_id')
+
+
 class CitationStyle(BaseModel):
     """Persistent representation of a CSL style.
 
@@ -12,6 +35,8 @@ class CitationStyle(BaseModel):
 
     primary_identifier_name = '_id'
 
+    objects = CitationStyleQuerySet.as_manager()
+
     # The name of the citation file, sans extension
     _id = models.CharField(max_length=255, db_index=True)
 
@@ -25,6 +50,11 @@ class CitationStyle(BaseModel):
     summary = models.CharField(max_length=4200, null=True, blank=True)  # longest value was 3,812 8/23/2016
     has_bibliography = models.BooleanField(default=False)
 
+    # The CSL variables the style uses, e.g. ['author', 'issued', 'title']
+    fields_used = ArrayField(models.CharField(max_length=255), default=list, blank=True)
+    # SHA-256 of the file the style was last parsed from
+    content_hash = models.CharField(max_length=64, null=True, blank=True)
+
     class Meta:
         ordering = ['_id']
 
@@ -34,5 +64,6 @@ class CitationStyle(BaseModel):
             'title': self.title,
             'short_title': self.short_title,
             'summary': self.summary,
-            'has_bibliography': self.has_bibliography
+            'has_bibliography': self.has_bibliography,
+            'fields_used': self.fields_used,
         }
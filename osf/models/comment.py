@@ -1,14 +1,15 @@
 
-import pytz
-from django.db import models
-from django.db.models import Q
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, Q
 from django.utils import timezone
 from osf.models import Node
 from osf.models import NodeLog
 from osf.models.base import GuidMixin, Guid, BaseModel
+from osf.models.contributor import Contributor
 from osf.models.mixins import CommentableMixin
 from osf.models.spam import SpamMixin
 from osf.models import validators
+from osf.utils.fields import NonNaiveDateTimeField
 
 from framework.exceptions import PermissionsError
 from website import settings
@@ -109,26 +110,47 @@ class Comment(GuidMixin, SpamMixin, CommentableMixin, BaseModel):
 
     @classmethod
     def find_n_unread(cls, user, node, page, root_id=None):
-        if node.is_contributor(user):
-            if page == Comment.OVERVIEW:
-                view_timestamp = user.get_node_comment_timestamps(target_id=node._id)
-                root_target = Guid.load(node._id)
-            elif page == Comment.FILES or page == Comment.WIKI:
-                view_timestamp = user.get_node_comment_timestamps(target_id=root_id)
-                root_target = Guid.load(root_id)
-            else:
-                raise ValueError('Invalid page')
-
-            if not view_timestamp.tzinfo:
-                view_timestamp = view_timestamp.replace(tzinfo=pytz.utc)
-
-            return cls.objects.filter(
-                Q(node=node) & ~Q(user=user) & Q(is_deleted=False) &
-                (Q(created__gt=view_timestamp) | Q(modified__gt=view_timestamp)) &
-                Q(root_target=root_target)
-            ).count()
-
-        return 0
+        if page == Comment.OVERVIEW:
+            root_id = node._id
+        elif page != Comment.FILES and page != Comment.WIKI:
+            raise ValueError('Invalid page')
+        return cls.find_n_unread_bulk(user, [(node, root_id)])[root_id]
+
+    @classmethod
+    def find_n_unread_bulk(cls, user, targets):
+        """Return the number of comments `user` has not read on each of `targets`,
+        (node, root target guid) pairs, as a dict keyed by root target guid.
+
+        Only contributors have unread comments. The counts take three queries
+        however many targets there are.
+        """
+        counts = {root_id: 0 for node, root_id in targets}
+        if user is None or not targets:
+            return counts
+        contributed = set(Contributor.objects.filter(
+            user=user, node_id__in={node.id for node, root_id in targets}
+        ).values_list('node_id', flat=True))
+        root_ids = {root_id for node, root_id in targets if node.id in contributed}
+        if not root_ids:
+            return counts
+        last_viewed = dict(CommentReadState.objects.filter(
+            user=user, root_target___id__in=root_ids
+        ).values_list('root_target___id', 'last_viewed'))
+
+        unread = Q()
+        for root_id in root_ids:
+            target_unread = Q(root_target___id=root_id)
+            if root_id in last_viewed:
+                target_unread &= Q(created__gt=last_viewed[root_id]) | Q(modified__gt=last_viewed[root_id])
+            unread |= target_unread
+        counts.update(
+            cls.objects.filter(unread, node_id__in=contributed, is_deleted=False)
+            .exclude(user=user)
+            .order_by()
+            .values_list('root_target___id')
+            .annotate(count=Count('id'))
+        )
+        return counts
 
     @classmethod
     def create(cls, auth, **kwargs):
@@ -161,7 +183,7 @@ class Comment(GuidMixin, SpamMixin, CommentableMixin, BaseModel):
             new_mentions = get_valid_mentioned_users_guids(comment, comment.node.contributors)
             if new_mentions:
                 project_signals.mention_added.send(comment, new_mentions=new_mentions, auth=auth)
-                comment.ever_mentioned.add(*comment.node.contributors.filter(guids___id__in=new_mentions))
+                comment.ever_mentioned.add(*comment.node.contributors.filter(guid_string__in=new_mentions))
 
         comment.save()
 
@@ -195,7 +217,7 @@ class Comment(GuidMixin, SpamMixin, CommentableMixin, BaseModel):
         if save:
             if new_mentions:
                 project_signals.mention_added.send(self, new_mentions=new_mentions, auth=auth)
-                self.ever_mentioned.add(*self.node.contributors.filter(guids___id__in=new_mentions))
+                self.ever_mentioned.add(*self.node.contributors.filter(guid_string__in=new_mentions))
             self.save()
             self.node.add_log(
                 NodeLog.COMMENT_UPDATED,
@@ -248,3 +270,35 @@ class Comment(GuidMixin, SpamMixin, CommentableMixin, BaseModel):
                 save=False,
             )
             self.node.save()
+
+
+class CommentReadState(BaseModel):
+    """When a user last viewed the comments on a node, file or wiki page.
+
+    Comments on the root target created or modified since then are unread.
+    """
+    user = models.ForeignKey('OSFUser', related_name='comment_read_states', on_delete=models.CASCADE)
+    root_target = models.ForeignKey(Guid, related_name='+', on_delete=models.CASCADE)
+    last_viewed = NonNaiveDateTimeField()
+
+    class Meta:
+        unique_together = ('user', 'root_target')
+
+    def __unicode__(self):
+        return 'user={}, root_target={}, last_viewed={}'.format(self.user_id, self.root_target_id, self.last_viewed)
+
+    @classmethod
+    def mark_viewed(cls, user, root_target, timestamp=None):
+        """Record that `user` viewed the comments on `root_target`, a Guid, at
+        `timestamp` (now by default), and return the timestamp.
+        """
+        timestamp = timestamp or timezone.now()
+        if cls.objects.filter(user=user, root_target=root_target).update(last_viewed=timestamp, modified=timezone.now()):
+            return timestamp
+        try:
+            with transaction.atomic():
+                cls.objects.create(user=user, root_target=root_target, last_viewed=timestamp)
+        except IntegrityError:
+            # Viewed concurrently
+            cls.objects.filter(user=user, root_target=root_target).update(last_viewed=timestamp, modified=timezone.now())
+        return timestamp
@@ -12,7 +12,7 @@ from website.util.permissions import (
 class AbstractBaseContributor(models.Model):
     objects = IncludeManager()
 
-    primary_identifier_name = 'user__guids___id'
+    primary_identifier_name = 'user__guid_string'
 
     read = models.BooleanField(default=False)
     write = models.BooleanField(default=False)
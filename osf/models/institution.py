@@ -6,6 +6,8 @@ from django.conf import settings
 from django.contrib.postgres import fields
 from django.core.urlresolvers import reverse
 from django.db import models
+from django.db.models import F
+from django.utils import timezone
 from osf.models import base
 from osf.models.contributor import InstitutionalContributor
 from osf.models.mixins import Loggable
@@ -53,6 +55,17 @@ class Institution(DirtyFieldsMixin, Loggable, base.ObjectIDMixin, base.BaseModel
 
     is_deleted = models.BooleanField(default=False, db_index=True)
 
+    # Fields in the institution's search document
+    SEARCH_UPDATE_FIELDS = {
+        'name',
+        'logo_name',
+        'is_deleted',
+    }
+    # Fields in the search documents of affiliated nodes
+    SEARCH_UPDATE_NODE_FIELDS = {
+        'name',
+    }
+
     class Meta:
         # custom permissions for use in the OSF Admin App
         permissions = (
@@ -113,8 +126,8 @@ class Institution(DirtyFieldsMixin, Loggable, base.ObjectIDMixin, base.BaseModel
         else:
             return None
 
-    def update_search(self):
-        from website.search.search import update_institution, update_node
+    def update_search(self, saved_fields=None):
+        from website.search.search import update_institution, update_institution_nodes_async
         from website.search.exceptions import SearchUnavailableError
 
         try:
@@ -122,14 +135,51 @@ class Institution(DirtyFieldsMixin, Loggable, base.ObjectIDMixin, base.BaseModel
         except SearchUnavailableError as e:
             logger.exception(e)
 
-        saved_fields = self.get_dirty_fields()
-        if saved_fields and bool(self.pk):
-            for node in self.nodes.filter(is_deleted=False):
-                try:
-                    update_node(node, async=False)
-                except SearchUnavailableError as e:
-                    logger.exception(e)
+        if saved_fields is None or self.SEARCH_UPDATE_NODE_FIELDS.intersection(saved_fields):
+            update_institution_nodes_async(self.id)
 
     def save(self, *args, **kwargs):
-        self.update_search()
-        return super(Institution, self).save(*args, **kwargs)
+        is_new = self._state.adding
+        saved_fields = set(self.get_dirty_fields())
+        ret = super(Institution, self).save(*args, **kwargs)
+        if is_new:
+            # Nodes can only be affiliated once the institution exists
+            self.update_search(saved_fields=set())
+        elif self.SEARCH_UPDATE_FIELDS.intersection(saved_fields):
+            self.update_search(saved_fields=saved_fields)
+        return ret
+
+
+class InstitutionSearchUpdate(base.BaseModel):
+    """The progress of the latest update of the search documents of an
+    institution's nodes, written by the celery task that makes it and read by
+    the admin app. See `website.search.elastic_search.update_institution_nodes_async`.
+    """
+    institution = models.OneToOneField('Institution', related_name='search_update', on_delete=models.CASCADE)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    done = models.BooleanField(default=False)
+
+    @classmethod
+    def start(cls, institution_id, total):
+        cls.objects.update_or_create(institution_id=institution_id, defaults={
+            'total': total,
+            'processed': 0,
+            'done': False,
+        })
+
+    @classmethod
+    def advance(cls, institution_id, count):
+        # `modified` is not set by queryset updates
+        cls.objects.filter(institution_id=institution_id).update(processed=F('processed') + count, modified=timezone.now())
+
+    @classmethod
+    def finish(cls, institution_id):
+        cls.objects.filter(institution_id=institution_id).update(processed=F('total'), done=True, modified=timezone.now())
+
+    def to_json(self):
+        return {
+            'total': self.total,
+            'processed': self.processed,
+            'done': self.done,
+        }
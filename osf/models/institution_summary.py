@@ -0,0 +1,329 @@
+import collections
+
+from django.apps import apps
+from django.db import connection, models
+from django.db.models import Count, Sum
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .base import BaseModel
+
+CARRY_FORWARD_SQL = """
+    INSERT INTO "{table}" (institution_id, date, {counts}, created, modified)
+    SELECT DISTINCT ON (institution_id) institution_id, %(date)s, {counts}, now(), now()
+    FROM "{table}"
+    WHERE institution_id = ANY(%(institution_ids)s) AND date < %(date)s
+    ORDER BY institution_id, date DESC
+    ON CONFLICT (institution_id, date) DO NOTHING;
+"""
+
+APPLY_SQL = """
+    UPDATE "{table}" SET {changes}, modified = now()
+    WHERE institution_id = %(institution_id)s AND date = %(date)s;
+"""
+
+
+class InstitutionSummary(BaseModel):
+    """Counts of an institution's affiliated active users, nodes and
+    registrations by privacy, published preprints and bytes stored in
+    OSF Storage, as of the end of `date`.
+
+    Today's row is kept up to date by the receivers below and the node,
+    preprint and user save paths, which add the change to the latest row.
+    Days without changes have no row. `reconcile` recomputes the counts from
+    scratch; it runs nightly to correct changes made outside of those paths,
+    e.g. raw SQL or files moved between nodes.
+    """
+    COUNTS = (
+        'users',
+        'public_nodes',
+        'private_nodes',
+        'public_registrations',
+        'private_registrations',
+        'preprints',
+        'bytes_stored',
+    )
+
+    institution = models.ForeignKey('Institution', related_name='summaries', on_delete=models.CASCADE)
+    date = models.DateField()
+
+    users = models.IntegerField(default=0)
+    public_nodes = models.IntegerField(default=0)
+    private_nodes = models.IntegerField(default=0)
+    public_registrations = models.IntegerField(default=0)
+    private_registrations = models.IntegerField(default=0)
+    preprints = models.IntegerField(default=0)
+    bytes_stored = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('institution', 'date')
+
+    def __unicode__(self):
+        return 'institution={}, date={}'.format(self.institution_id, self.date)
+
+    @property
+    def counts(self):
+        return {count: getattr(self, count) for count in self.COUNTS}
+
+    @classmethod
+    def compute(cls, institution_id):
+        """Count from scratch, as of now."""
+        AbstractNode = apps.get_model('osf.AbstractNode')
+        OSFUser = apps.get_model('osf.OSFUser')
+        PreprintService = apps.get_model('osf.PreprintService')
+
+        counts = dict.fromkeys(cls.COUNTS, 0)
+        counts['users'] = OSFUser.objects.filter(affiliated_institutions=institution_id, is_active=True).count()
+        for node_type, is_public, count in (
+            AbstractNode.objects.filter(affiliated_institutions=institution_id, is_deleted=False)
+            .values_list('type', 'is_public').annotate(count=Count('id')).order_by()
+        ):
+            for field, value in _node_counts(node_type, is_public).items():
+                counts[field] += value * count
+        counts['preprints'] = PreprintService.objects.filter(
+            node__affiliated_institutions=institution_id, node__is_deleted=False, is_published=True
+        ).count()
+        counts['bytes_stored'] = _stored_versions().filter(
+            basefilenode__node__affiliated_institutions=institution_id, basefilenode__node__is_deleted=False
+        ).aggregate(bytes=Sum('fileversion__size'))['bytes'] or 0
+        return counts
+
+    @classmethod
+    def reconcile(cls, institution_id):
+        """Replace today's counts of an institution with recomputed ones.
+
+        :return dict: The counts that had drifted, by name, as (kept, recomputed) tuples
+        """
+        counts = cls.compute(institution_id)
+        latest = cls.objects.filter(institution_id=institution_id).order_by('-date').first()
+        drift = {
+            field: (getattr(latest, field), value) for field, value in counts.items()
+            if latest and getattr(latest, field) != value
+        }
+        cls.objects.update_or_create(institution_id=institution_id, date=timezone.now().date(), defaults=counts)
+        return drift
+
+    @classmethod
+    def get_latest(cls, institution_id, date=None):
+        """The counts of an institution as of `date`, today by default.
+        Counted from scratch if the institution has no counts yet.
+        """
+        summaries = cls.objects.filter(institution_id=institution_id).order_by('-date')
+        if date:
+            summaries = summaries.filter(date__lte=date)
+        summary = summaries.first()
+        if summary is None and not cls.objects.filter(institution_id=institution_id).exists():
+            cls.reconcile(institution_id)
+            summary = summaries.first()
+        return summary
+
+    @classmethod
+    def apply_changes(cls, changes):
+        """Add changes to today's counts.
+
+        :param dict changes: Dicts of changes to counts, by institution primary key
+        """
+        changes = {
+            institution_id: {field: value for field, value in counts.items() if value}
+            for institution_id, counts in changes.items()
+        }
+        changes = {institution_id: counts for institution_id, counts in changes.items() if counts}
+        if not changes:
+            return
+        table = cls._meta.db_table
+        date = timezone.now().date()
+        with connection.cursor() as cursor:
+            # Institutions without counts yet are counted from scratch on first read
+            cursor.execute(
+                CARRY_FORWARD_SQL.format(table=table, counts=', '.join(cls.COUNTS)),
+                {'institution_ids': list(changes), 'date': date}
+            )
+            for institution_id, counts in changes.items():
+                params = {'institution_id': institution_id, 'date': date}
+                params.update(counts)
+                cursor.execute(APPLY_SQL.format(
+                    table=table,
+                    changes=', '.join('{0} = {0} + %({0})s'.format(field) for field in sorted(counts))
+                ), params)
+
+    @classmethod
+    def record_affiliations(cls, pairs, sign=1):
+        """Count nodes being affiliated with (`sign` 1) or unaffiliated from
+        (`sign` -1) institutions.
+
+        :param list pairs: (node primary key, institution primary key) tuples
+        """
+        AbstractNode = apps.get_model('osf.AbstractNode')
+
+        pairs = list(pairs)
+        nodes = {
+            node_id: (node_type, is_public)
+            for node_id, node_type, is_public in AbstractNode.objects.filter(
+                id__in={node_id for node_id, _ in pairs}, is_deleted=False
+            ).values_list('id', 'type', 'is_public')
+        }
+        contents = _node_contents(nodes.keys())
+        changes = collections.defaultdict(collections.Counter)
+        for node_id, institution_id in pairs:
+            if node_id in nodes:
+                changes[institution_id].update(_node_counts(*nodes[node_id]))
+                changes[institution_id].update(contents[node_id])
+        cls.apply_changes({
+            institution_id: {field: sign * value for field, value in counts.items()}
+            for institution_id, counts in changes.items()
+        })
+
+    @classmethod
+    def record_node_saved(cls, node, saved_fields):
+        """Count a change to `node`'s privacy or deletion.
+
+        :param dict saved_fields: The node's dirty fields, with their previous values
+        """
+        was_public = saved_fields.get('is_public', node.is_public)
+        was_deleted = saved_fields.get('is_deleted', node.is_deleted)
+        counts = collections.Counter()
+        if not was_deleted:
+            counts.subtract(_node_counts(node.type, was_public))
+        if not node.is_deleted:
+            counts.update(_node_counts(node.type, node.is_public))
+        if was_deleted != node.is_deleted:
+            contents = _node_contents([node.id])[node.id]
+            counts.update({
+                field: value if was_deleted else -value for field, value in contents.items()
+            })
+        cls._record_node(node.id, counts)
+
+    @classmethod
+    def record_preprint_published(cls, preprint):
+        if not preprint.node.is_deleted:
+            cls._record_node(preprint.node_id, {'preprints': 1})
+
+    @classmethod
+    def record_versions(cls, file_id, version_ids, sign=1):
+        """Count file versions being added to (`sign` 1) or removed from
+        (`sign` -1) a file.
+        """
+        versions = _stored_versions().filter(
+            basefilenode_id=file_id, fileversion_id__in=version_ids, basefilenode__node__is_deleted=False
+        )
+        node_id, size = None, 0
+        for node_id, version_size in versions.values_list('basefilenode__node_id', 'fileversion__size'):
+            size += version_size
+        if size:
+            cls._record_node(node_id, {'bytes_stored': sign * size})
+
+    @classmethod
+    def record_user_affiliations(cls, pairs, sign=1):
+        """Count active users being affiliated with (`sign` 1) or
+        unaffiliated from (`sign` -1) institutions.
+
+        :param list pairs: (user primary key, institution primary key) tuples
+        """
+        OSFUser = apps.get_model('osf.OSFUser')
+
+        pairs = list(pairs)
+        active = set(OSFUser.objects.filter(id__in={user_id for user_id, _ in pairs}, is_active=True).values_list('id', flat=True))
+        changes = collections.defaultdict(collections.Counter)
+        for user_id, institution_id in pairs:
+            if user_id in active:
+                changes[institution_id]['users'] += sign
+        cls.apply_changes(changes)
+
+    @classmethod
+    def record_user_activity(cls, user):
+        """Count `user` becoming active or inactive."""
+        sign = 1 if user.is_active else -1
+        cls.apply_changes({
+            institution_id: {'users': sign} for institution_id in user.affiliated_institutions.values_list('id', flat=True)
+        })
+
+    @classmethod
+    def _record_node(cls, node_id, counts):
+        AbstractNode = apps.get_model('osf.AbstractNode')
+
+        counts = {field: value for field, value in counts.items() if value}
+        if not counts:
+            return
+        institution_ids = AbstractNode.affiliated_institutions.through.objects.filter(
+            abstractnode_id=node_id
+        ).values_list('institution_id', flat=True)
+        cls.apply_changes({institution_id: counts for institution_id in institution_ids})
+
+
+def _node_counts(node_type, is_public):
+    if node_type == 'osf.node':
+        return {'public_nodes' if is_public else 'private_nodes': 1}
+    if node_type == 'osf.registration':
+        return {'public_registrations' if is_public else 'private_registrations': 1}
+    return {}
+
+
+def _stored_versions():
+    BaseFileNode = apps.get_model('osf.BaseFileNode')
+
+    # Versions whose size is unknown are stored as -1
+    return BaseFileNode.versions.through.objects.filter(basefilenode__provider='osfstorage', fileversion__size__gt=0)
+
+
+def _node_contents(node_ids):
+    """The published preprints and stored bytes of nodes, by node primary key."""
+    PreprintService = apps.get_model('osf.PreprintService')
+
+    contents = {node_id: collections.Counter() for node_id in node_ids}
+    if not contents:
+        return contents
+    for node_id, count in (
+        PreprintService.objects.filter(node_id__in=contents, is_published=True)
+        .values_list('node_id').annotate(count=Count('id')).order_by()
+    ):
+        contents[node_id]['preprints'] = count
+    for node_id, size in (
+        _stored_versions().filter(basefilenode__node_id__in=contents)
+        .values_list('basefilenode__node_id').annotate(size=Sum('fileversion__size')).order_by()
+    ):
+        contents[node_id]['bytes_stored'] = size
+    return contents
+
+
+def _changed_pairs(through, instance, reverse, pk_set, action, source, target):
+    """The (source, target) primary key pairs an m2m_changed signal of
+    `through` is about, or None if it is about none.
+    Removals are limited to the pairs that exist.
+    """
+    if action == 'post_add':
+        pairs = [(instance.pk, pk) for pk in pk_set]
+    elif action in ('pre_remove', 'pre_clear'):
+        existing = through.objects.filter(**{target if reverse else source: instance.pk})
+        if action == 'pre_remove':
+            existing = existing.filter(**{'{}__in'.format(source if reverse else target): pk_set})
+        pairs = list(existing.values_list(*((target, source) if reverse else (source, target))))
+    else:
+        return None
+    return [(pk, other) for other, pk in pairs] if reverse else pairs
+
+
+@receiver(m2m_changed, sender='osf.AbstractNode_affiliated_institutions')
+def count_node_affiliations(sender, instance, action, reverse, pk_set, **kwargs):
+    pairs = _changed_pairs(sender, instance, reverse, pk_set, action, 'abstractnode_id', 'institution_id')
+    if pairs:
+        InstitutionSummary.record_affiliations(pairs, sign=1 if action == 'post_add' else -1)
+
+
+@receiver(m2m_changed, sender='osf.OSFUser_affiliated_institutions')
+def count_user_affiliations(sender, instance, action, reverse, pk_set, **kwargs):
+    pairs = _changed_pairs(sender, instance, reverse, pk_set, action, 'osfuser_id', 'institution_id')
+    if pairs:
+        InstitutionSummary.record_user_affiliations(pairs, sign=1 if action == 'post_add' else -1)
+
+
+@receiver(m2m_changed, sender='osf.BaseFileNode_versions')
+def count_file_versions(sender, instance, action, reverse, pk_set, **kwargs):
+    pairs = _changed_pairs(sender, instance, reverse, pk_set, action, 'basefilenode_id', 'fileversion_id')
+    if not pairs:
+        return
+    versions = collections.defaultdict(list)
+    for file_id, version_id in pairs:
+        versions[file_id].append(version_id)
+    for file_id, version_ids in versions.items():
+        InstitutionSummary.record_versions(file_id, version_ids, sign=1 if action == 'post_add' else -1)
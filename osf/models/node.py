@@ -1,15 +1,18 @@
+import collections
 import functools
 import itertools
 import logging
 import re
 import urlparse
 import warnings
+from copy import deepcopy
 
 import bson
-from django.db.models import Q
+from django.db.models import F, Q
 from dirtyfields import DirtyFieldsMixin
 from django.apps import apps
 from django.contrib.contenttypes.fields import GenericRelation
+from django.contrib.contenttypes.models import ContentType
 from django.core.paginator import Paginator
 from django.core.exceptions import ValidationError
 from django.core.urlresolvers import reverse
@@ -19,12 +22,13 @@ from django.dispatch import receiver
 from django.utils import timezone
 from django.utils.functional import cached_property
 from keen import scoped_keys
-from psycopg2._psycopg import AsIs
 from typedmodels.models import TypedModel, TypedModelManager
 from include import IncludeManager
 
 from framework import status
-from framework.celery_tasks.handlers import enqueue_task
+from framework.analytics import increment_user_activity_counters
+from framework.celery_tasks.handlers import enqueue_task, in_request_context
+from framework.postcommit_tasks.handlers import enqueue_postcommit_side_effect
 from framework.exceptions import PermissionsError
 from framework.sentry import log_exception
 from addons.wiki.utils import to_mongo_key
@@ -35,15 +39,15 @@ from osf.models.identifiers import Identifier, IdentifierMixin
 from osf.models.licenses import NodeLicenseRecord
 from osf.models.mixins import (AddonModelMixin, CommentableMixin, Loggable,
                                NodeLinkMixin, Taggable)
-from osf.models.node_relation import NodeRelation
+from osf.models.node_relation import NodeAncestor, NodeRelation
 from osf.models.nodelog import NodeLog
 from osf.models.sanctions import RegistrationApproval
 from osf.models.private_link import PrivateLink
-from osf.models.spam import SpamMixin
+from osf.models.spam import SpamMixin, SpamStatus
 from osf.models.tag import Tag
 from osf.models.user import OSFUser
 from osf.models.validators import validate_doi, validate_title
-from framework.auth.core import Auth, get_user
+from framework.auth.core import Auth, get_private_link_resolver, get_user
 from osf.utils.datetime_aware_jsonfield import DateTimeAwareJSONField
 from osf.utils.fields import NonNaiveDateTimeField
 from osf.utils.requests import DummyRequest, get_request_and_user_id
@@ -65,7 +69,7 @@ from website.util.permissions import (ADMIN, CREATOR_PERMISSIONS,
                                       DEFAULT_CONTRIBUTOR_PERMISSIONS, READ,
                                       WRITE, expand_permissions,
                                       reduce_permissions)
-from .base import BaseModel, Guid, GuidMixin, GuidMixinQuerySet
+from .base import BaseModel, Guid, GuidMixin, GuidMixinQuerySet, generate_guids
 
 
 logger = logging.getLogger(__name__)
@@ -78,62 +82,26 @@ class AbstractNodeQuerySet(GuidMixinQuerySet):
 
     def get_children(self, root, active=False):
         # If `root` is a root node, we can use the 'descendants' related name
-        # rather than doing a recursive query
+        # rather than going through the closure table
         if root.id == root.root_id:
             query = root.descendants.exclude(id=root.id)
-            if active:
-                query = query.filter(is_deleted=False)
-            return query
         else:
-            sql = """
-                WITH RECURSIVE descendants AS (
-                SELECT
-                    parent_id,
-                    child_id,
-                    1 AS LEVEL,
-                    ARRAY[parent_id] as pids
-                FROM %s
-                %s
-                WHERE is_node_link IS FALSE AND parent_id = %s %s
-                UNION ALL
-                SELECT
-                    d.parent_id,
-                    s.child_id,
-                    d.level + 1,
-                    d.pids || s.parent_id
-                FROM descendants AS d
-                    JOIN %s AS s
-                    ON d.child_id = s.parent_id
-                WHERE s.is_node_link IS FALSE AND %s = ANY(pids)
-                ) SELECT array_agg(DISTINCT child_id)
-                FROM descendants
-                WHERE parent_id = %s;
-            """
-            with connection.cursor() as cursor:
-                node_relation_table = AsIs(NodeRelation._meta.db_table)
-                cursor.execute(sql, [
-                    node_relation_table,
-                    AsIs('LEFT JOIN osf_abstractnode ON {}.child_id = osf_abstractnode.id'.format(node_relation_table) if active else ''),
-                    root.pk,
-                    AsIs('AND osf_abstractnode.is_deleted IS FALSE' if active else ''),
-                    node_relation_table,
-                    root.pk,
-                    root.pk])
-                row = cursor.fetchone()[0]
-                if not row:
-                    return AbstractNode.objects.none()
-                return AbstractNode.objects.filter(id__in=row)
+            query = self.filter(ancestor_relations__ancestor=root)
+        if active:
+            query = query.filter(is_deleted=False)
+        return query
 
     def can_view(self, user=None, private_link=None):
         qs = self.filter(is_public=True)
 
         if private_link is not None:
-            if isinstance(private_link, PrivateLink):
-                private_link = private_link.key
-            if not isinstance(private_link, basestring):
+            if isinstance(private_link, basestring):
+                private_link = get_private_link_resolver().resolve(private_link)
+            elif not isinstance(private_link, PrivateLink):
                 raise TypeError('"private_link" must be either {} or {}. Got {!r}'.format(str, PrivateLink, private_link))
 
-            qs |= self.filter(private_links__is_deleted=False, private_links__key=private_link)
+            if private_link is not None and not private_link.is_deleted:
+                qs |= self.filter(id__in=private_link.node_pks)
 
         if user is not None:
             if isinstance(user, OSFUser):
@@ -145,19 +113,18 @@ class AbstractNodeQuerySet(GuidMixinQuerySet):
             qs |= self.annotate(can_view=models.Exists(sqs)).filter(can_view=True)
             qs |= self.extra(where=['''
                 "osf_abstractnode".id in (
-                    WITH RECURSIVE implicit_read AS (
-                        SELECT "osf_contributor"."node_id"
-                        FROM "osf_contributor"
-                        WHERE "osf_contributor"."user_id" = %s
-                        AND "osf_contributor"."admin" is TRUE
-                    UNION ALL
-                        SELECT "osf_noderelation"."child_id"
-                        FROM "implicit_read"
-                        LEFT JOIN "osf_noderelation" ON "osf_noderelation"."parent_id" = "implicit_read"."node_id"
-                        WHERE "osf_noderelation"."is_node_link" IS FALSE
-                    ) SELECT * FROM implicit_read
+                    SELECT "osf_contributor"."node_id"
+                    FROM "osf_contributor"
+                    WHERE "osf_contributor"."user_id" = %s
+                    AND "osf_contributor"."admin" is TRUE
+                UNION ALL
+                    SELECT "osf_nodeancestor"."descendant_id"
+                    FROM "osf_contributor"
+                    JOIN "osf_nodeancestor" ON "osf_nodeancestor"."ancestor_id" = "osf_contributor"."node_id"
+                    WHERE "osf_contributor"."user_id" = %s
+                    AND "osf_contributor"."admin" is TRUE
                 )
-            '''], params=(user, ))
+            '''], params=(user, user))
 
         return qs
 
@@ -194,7 +161,7 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
 
     FIELD_ALIASES = {
         # TODO: Find a better way
-        '_id': 'guids___id',
+        '_id': 'guid_string',
         'nodes': '_nodes',
         'contributors': '_contributors',
     }
@@ -235,6 +202,14 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
         'wiki_pages_current',
     }
 
+    # Node fields a spam verdict may change, besides spam_data; see finish_spam_check
+    SPAM_VERDICT_FIELDS = (
+        'spam_status',
+        'spam_pro_tip',
+        'is_public',
+        'keenio_read_key',
+    )
+
     # Fields that are writable by Node.update
     WRITABLE_WHITELIST = [
         'title',
@@ -248,6 +223,9 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
     PRIVATE = 'private'
     PUBLIC = 'public'
 
+    # Length of a user's list of recently added contributors
+    MAX_RECENT_LENGTH = 15
+
     LICENSE_QUERY = re.sub('\s+', ' ', '''WITH RECURSIVE ascendants AS (
             SELECT
                 N.node_license_id,
@@ -345,7 +323,7 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
 
     @property
     def node_ids(self):
-        return list(self._nodes.all().values_list('guids___id', flat=True))
+        return list(self._nodes.all().values_list('guid_string', flat=True))
 
     @property
     def linked_from(self):
@@ -692,6 +670,10 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
             log_exception()
 
     def update_search(self):
+        # Reindexed once per request, however many times the node changes
+        enqueue_postcommit_side_effect((self.id, 'update_search'), self._update_search)
+
+    def _update_search(self):
         from website import search
 
         try:
@@ -765,15 +747,16 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
         return False
 
     def can_view(self, auth):
-        if auth and getattr(auth.private_link, 'anonymous', False):
-            return auth.private_link.nodes.filter(pk=self.pk).exists()
+        private_link = auth.private_link if auth else None
+        if private_link is not None and private_link.anonymous:
+            return private_link.has_node(self)
 
         if not auth and not self.is_public:
             return False
 
         return (self.is_public or
                 (auth.user and self.has_permission(auth.user, 'read')) or
-                auth.private_key in self.private_link_keys_active or
+                (private_link is not None and private_link.has_node(self)) or
                 self.is_admin_parent(auth.user))
 
     def can_edit(self, auth=None, user=None):
@@ -798,16 +781,17 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
         )
 
     def get_aggregate_logs_query(self, auth):
-        return (
-            (
-                Q(node_id__in=list(Node.objects.get_children(self).can_view(user=auth.user, private_link=auth.private_link).values_list('id', flat=True)) + [self.id])
-            ) & Q(should_hide=False)
-        )
+        # Kept as a subquery so that the planner can semi-join it against the
+        # (node_id, should_hide, date) index, rather than being handed a list of
+        # every viewable component id
+        children = Node.objects.get_children(self).can_view(user=auth.user, private_link=auth.private_link)
+        node_ids = AbstractNode.objects.filter(Q(id=self.id) | Q(id__in=children.values('id'))).values('id')
+        return Q(node_id__in=node_ids) & Q(should_hide=False)
 
     def get_aggregate_logs_queryset(self, auth):
         query = self.get_aggregate_logs_query(auth)
         return NodeLog.objects.filter(query).order_by('-date').include(
-            'node__guids', 'user__guids', 'original_node__guids', limit_includes=10
+            'node', 'user', 'original_node', limit_includes=10
         )
 
     def get_absolute_url(self):
@@ -852,39 +836,68 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
         """
         if self.has_permission(user, permission):
             return True
-        for node in self.nodes_primary.filter(is_deleted=False):
-            if node.has_permission_on_children(user, permission):
-                return True
-        return False
+        if not user:
+            return False
+        return user.contributor_set.filter(node__in=self._get_active_descendants(), **{permission: True}).exists()
 
     def is_admin_parent(self, user):
-        if self.has_permission(user, 'admin', check_parent=False):
-            return True
-        parent = self.parent_node
-        if parent:
-            return parent.is_admin_parent(user)
-        return False
+        if not user:
+            return False
+        ancestor_ids = NodeAncestor.objects.filter(descendant=self).values('ancestor_id')
+        return user.contributor_set.filter(Q(node=self) | Q(node__in=ancestor_ids), admin=True).exists()
+
+    def _get_active_descendants(self):
+        """Descendants that are neither deleted nor below a deleted descendant."""
+        deleted_ids = NodeAncestor.objects.filter(ancestor=self, descendant__is_deleted=True).values('descendant_id')
+        return AbstractNode.objects.filter(
+            ancestor_relations__ancestor=self,
+            is_deleted=False
+        ).exclude(ancestor_relations__ancestor__in=deleted_ids)
 
     def find_readable_descendants(self, auth):
         """ Returns a generator of first descendant node(s) readable by <user>
         in each descendant branch.
         """
-        new_branches = []
-        for node in self.nodes_primary.filter(is_deleted=False):
-            if node.can_view(auth):
-                yield node
-            else:
-                new_branches.append(node)
+        descendants = self._get_active_descendants()
+        if auth and getattr(auth.private_link, 'anonymous', False):
+            readable = descendants.filter(private_links=auth.private_link)
+        elif auth:
+            readable = descendants.can_view(user=auth.user, private_link=auth.private_key)
+        else:
+            readable = descendants.can_view()
+        readable_ids = set(readable.values_list('id', flat=True))
+        if not readable_ids:
+            return
+
+        children = collections.defaultdict(list)
+        relations = NodeRelation.objects.filter(
+            child__in=descendants,
+            is_node_link=False
+        ).order_by('parent_id', '_order').values_list('parent_id', 'child_id')
+        for parent_id, child_id in relations:
+            children[parent_id].append(child_id)
+
+        def find(node_id):
+            new_branches = []
+            for child_id in children[node_id]:
+                if child_id in readable_ids:
+                    yield child_id
+                else:
+                    new_branches.append(child_id)
+            for branch_id in new_branches:
+                for found_id in find(branch_id):
+                    yield found_id
 
-        for bnode in new_branches:
-            for node in bnode.find_readable_descendants(auth):
-                yield node
+        found_ids = list(find(self.id))
+        nodes = AbstractNode.objects.in_bulk(found_ids)
+        for node_id in found_ids:
+            yield nodes[node_id]
 
     @property
     def parents(self):
-        if self.parent_node:
-            return [self.parent_node] + self.parent_node.parents
-        return []
+        return list(
+            AbstractNode.objects.filter(descendant_relations__descendant=self).order_by('descendant_relations__depth')
+        )
 
     @property
     def admin_contributor_ids(self):
@@ -895,30 +908,33 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
         return self._get_admin_contributor_ids()
 
     def _get_admin_contributor_ids(self, include_self=False):
-        def get_admin_contributor_ids(node):
-            return Contributor.objects.select_related('user').filter(
-                node=node,
-                user__is_active=True,
-                admin=True
-            ).values_list('user__guids___id', flat=True)
-
-        contributor_ids = set(self.contributors.values_list('guids___id', flat=True))
-        admin_ids = set(get_admin_contributor_ids(self)) if include_self else set()
-        for parent in self.parents:
-            admins = get_admin_contributor_ids(parent)
-            admin_ids.update(set(admins).difference(contributor_ids))
+        nodes = Q(node__in=NodeAncestor.objects.filter(descendant=self).values('ancestor_id'))
+        if include_self:
+            nodes |= Q(node=self)
+        admins = Contributor.objects.filter(
+            nodes,
+            user__is_active=True,
+            admin=True
+        ).values_list('node_id', 'user__guid_string')
+
+        contributor_ids = set(self.contributors.values_list('guid_string', flat=True))
+        admin_ids = set()
+        for node_id, user_id in admins:
+            # Admins on parents only count if they are not contributors here
+            if node_id == self.id or user_id not in contributor_ids:
+                admin_ids.add(user_id)
         return admin_ids
 
     @property
     def admin_contributors(self):
         return OSFUser.objects.filter(
-            guids___id__in=self.admin_contributor_ids
+            guid_string__in=self.admin_contributor_ids
         ).order_by('family_name')
 
     @property
     def parent_admin_contributors(self):
         return OSFUser.objects.filter(
-            guids___id__in=self.parent_admin_contributor_ids
+            guid_string__in=self.parent_admin_contributor_ids
         ).order_by('family_name')
 
     def set_permissions(self, user, permissions, validate=True, save=False):
@@ -1021,7 +1037,7 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
     def visible_contributor_ids(self):
         return self.contributor_set.filter(visible=True) \
             .order_by('_order') \
-            .values_list('user__guids___id', flat=True)
+            .values_list('user__guid_string', flat=True)
 
     @property
     def all_tags(self):
@@ -1124,8 +1140,6 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
         :param bool save: Save after adding contributor
         :returns: Whether contributor was added
         """
-        MAX_RECENT_LENGTH = 15
-
         # If user is merged into another account, use master account
         contrib_to_add = contributor.merged_by if contributor.is_merged else contributor
         if contrib_to_add.is_disabled:
@@ -1144,18 +1158,7 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
 
             # Add contributor to recently added list for user
             if auth is not None:
-                user = auth.user
-                recently_added_contributor_obj, created = RecentlyAddedContributor.objects.get_or_create(
-                    user=user,
-                    contributor=contrib_to_add
-                )
-                recently_added_contributor_obj.date_added = timezone.now()
-                recently_added_contributor_obj.save()
-                count = user.recently_added.count()
-                if count > MAX_RECENT_LENGTH:
-                    difference = count - MAX_RECENT_LENGTH
-                    for each in user.recentlyaddedcontributor_set.order_by('date_added')[:difference]:
-                        each.delete()
+                self._update_recently_added(auth.user, [contrib_to_add])
             if log:
                 self.add_log(
                     action=NodeLog.CONTRIB_ADDED,
@@ -1189,9 +1192,29 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
         else:
             return False
 
-    def add_contributors(self, contributors, auth=None, log=True, save=False):
+    def _update_recently_added(self, user, contributors):
+        """Move `contributors` to the top of `user`'s recently added list,
+        trimming it to MAX_RECENT_LENGTH.
+        """
+        now = timezone.now()
+        contributor_ids = [contributor.id for contributor in contributors]
+        recent = RecentlyAddedContributor.objects.filter(user=user)
+        recent.filter(contributor_id__in=contributor_ids).update(date_added=now)
+        existing = set(recent.filter(contributor_id__in=contributor_ids).values_list('contributor_id', flat=True))
+        RecentlyAddedContributor.objects.bulk_create([
+            RecentlyAddedContributor(user=user, contributor_id=contributor_id, date_added=now)
+            for contributor_id in contributor_ids if contributor_id not in existing
+        ])
+        keep = recent.order_by('-date_added', '-id').values('id')[:self.MAX_RECENT_LENGTH]
+        recent.exclude(id__in=keep).delete()
+
+    def add_contributors(self, contributors, auth=None, log=True, save=False, send_email='default'):
         """Add multiple contributors
 
+        Unlike calling `add_contributor` for each user, the contributors are
+        inserted together and the node is reindexed, logged and signalled
+        once, regardless of the number of contributors.
+
         :param list contributors: A list of dictionaries of the form:
             {
                 'user': <User object>,
@@ -1201,29 +1224,62 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
         :param auth: All the auth information including user, API key.
         :param log: Add log to self
         :param save: Save after adding contributor
+        :param str send_email: Email preference for notifying added contributors
+        :returns: The list of users that were added
         """
+        to_add = collections.OrderedDict()
         for contrib in contributors:
-            self.add_contributor(
-                contributor=contrib['user'], permissions=contrib['permissions'],
-                visible=contrib['visible'], auth=auth, log=False, save=False,
-            )
-        if log and contributors:
-            self.add_log(
-                action=NodeLog.CONTRIB_ADDED,
-                params={
-                    'project': self.parent_id,
-                    'node': self._primary_key,
-                    'contributors': [
-                        contrib['user']._id
-                        for contrib in contributors
-                    ],
-                },
-                auth=auth,
-                save=False,
-            )
+            # If user is merged into another account, use master account
+            user = contrib['user'].merged_by if contrib['user'].is_merged else contrib['user']
+            if user.is_disabled:
+                raise ValidationValueError('Deactivated users cannot be added as contributors.')
+            to_add.setdefault(user.id, (user, contrib))
+
+        existing = set(self.contributor_set.filter(user_id__in=to_add.keys()).values_list('user_id', flat=True))
+        added = []
+        for user_id, (user, contrib) in to_add.items():
+            if user_id not in existing:
+                added.append((user, contrib))
+            # Permissions must be overridden if changed when contributor is
+            # added to parent he/she is already on a child of.
+            elif contrib.get('permissions') is not None:
+                self.set_permissions(user, contrib['permissions'])
+
+        if added:
+            # bulk_create bypasses order_with_respect_to, so number the rows as save() would
+            start = self.contributor_set.count()
+            Contributor.objects.bulk_create([
+                Contributor(
+                    node=self, user=user, visible=contrib.get('visible', True), _order=start + i,
+                    **{perm: True for perm in contrib.get('permissions') or DEFAULT_CONTRIBUTOR_PERMISSIONS}
+                )
+                for i, (user, contrib) in enumerate(added)
+            ])
+            if auth is not None:
+                self._update_recently_added(auth.user, [user for user, _ in added])
+            if log:
+                self.add_log(
+                    action=NodeLog.CONTRIB_ADDED,
+                    params={
+                        'project': self.parent_id,
+                        'node': self._primary_key,
+                        'contributors': [user._id for user, _ in added],
+                    },
+                    auth=auth,
+                    save=False,
+                )
         if save:
             self.save()
 
+        if added:
+            if self._id:
+                project_signals.contributors_added.send(self,
+                                                        contributors=[user for user, _ in added],
+                                                        auth=auth, email_template=send_email)
+            self.update_search()
+            self.save_node_preprints()
+        return [user for user, _ in added]
+
     def add_unregistered_contributor(self, fullname, email, auth, send_email='default',
                                      visible=True, permissions=None, save=False, existing_user=None):
         """Add a non-registered contributor to the project.
@@ -1589,39 +1645,10 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
         return self.private_links.filter(is_deleted=True).values_list('key', flat=True)
 
     def get_root(self):
-        sql = """
-            WITH RECURSIVE ascendants AS (
-              SELECT
-                parent_id,
-                child_id,
-                1 AS LEVEL,
-                ARRAY[child_id] as cids
-              FROM %s
-              WHERE is_node_link IS FALSE and child_id = %s
-              UNION ALL
-              SELECT
-                S.parent_id,
-                D.child_id,
-                D.level + 1,
-                D.cids || S.child_id
-              FROM ascendants AS D
-                JOIN %s AS S
-                  ON D.parent_id = S.child_id
-              WHERE S.is_node_link IS FALSE
-                AND %s = ANY(cids)
-            ) SELECT parent_id
-              FROM ascendants
-              WHERE child_id = %s
-              ORDER BY level DESC
-              LIMIT 1;
-        """
-        with connection.cursor() as cursor:
-            node_relation_table = AsIs(NodeRelation._meta.db_table)
-            cursor.execute(sql, [node_relation_table, self.pk, node_relation_table, self.pk, self.pk])
-            res = cursor.fetchone()
-            if res:
-                return AbstractNode.objects.get(pk=res[0])
-            return self
+        root = AbstractNode.objects.filter(
+            descendant_relations__descendant=self
+        ).order_by('-descendant_relations__depth').first()
+        return root or self
 
     def find_readable_antecedent(self, auth):
         """ Returns first antecendant node readable by <user>.
@@ -1657,6 +1684,21 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
             )
         if self.is_collection:
             raise NodeStateError('Folders may not be registered')
+        if parent is None:
+            if self.is_deleted:
+                raise NodeStateError('Cannot register deleted node.')
+            return self._register_tree(schema, auth, data)
+        return self._register_node_recursive(schema, auth, data, parent=parent)
+
+    def _register_node_recursive(self, schema, auth, data, parent=None):
+        """Register this node, then each of its components in turn, one node
+        at a time. Used to register a node below an existing registration.
+        """
+        if not self.can_edit(auth=auth) and not self.is_admin_parent(user=auth.user):
+            raise PermissionsError(
+                'User {} does not have permission '
+                'to register this node'.format(auth.user._id)
+            )
         original = self
 
         # Note: Cloning a node will clone each node wiki page version and add it to
@@ -1708,7 +1750,7 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
             node_contained = node_relation.child
             # Register child nodes
             if not node_relation.is_node_link:
-                registered_child = node_contained.register_node(  # noqa
+                registered_child = node_contained._register_node_recursive(  # noqa
                     schema=schema,
                     auth=auth,
                     data=data,
@@ -1732,6 +1774,286 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
 
         return registered
 
+    def _get_component_tree(self):
+        """Snapshot the component tree below this node, skipping deleted components.
+
+        :return tuple: (nodes, parents, relations, links) where `nodes` are this
+            node and its components in the order a depth-first walk of their
+            relations visits them, `parents` and `relations` map a component's
+            id to its parent's id and to its relation, and `links` lists node
+            links as (parent id, linked node id, order) tuples.
+        """
+        tree_relations = collections.defaultdict(list)
+        for relation in NodeRelation.objects.filter(
+            Q(parent=self) | Q(parent__ancestor_relations__ancestor=self)
+        ).select_related('child').order_by('parent_id', '_order'):
+            tree_relations[relation.parent_id].append(relation)
+
+        nodes, parents, relations, links = [], {}, {}, []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            children = []
+            active = [relation for relation in tree_relations[node.id] if not relation.child.is_deleted]
+            for order, relation in enumerate(active):
+                if relation.is_node_link:
+                    # Node links are numbered as they would be when appended one at a time
+                    links.append((node.id, relation.child_id, order))
+                else:
+                    parents[relation.child_id] = node.id
+                    relations[relation.child_id] = relation
+                    children.append(relation.child)
+            # Depth first, in the order of each node's relations
+            stack.extend(reversed(children))
+        return nodes, parents, relations, links
+
+    def _get_component_permissions(self, user, nodes, parents):
+        """The permissions of `user` on each node of a tree from `_get_component_tree`.
+
+        :return dict: maps each node's id to a (read, write, admin_parent) tuple,
+            where `admin_parent` is whether `user` is an admin on the node or on
+            one of its ancestors, which also grants read access.
+        """
+        if not user:
+            return {node.id: (False, False, False) for node in nodes}
+        direct = {
+            node_id: (read, write, admin) for node_id, read, write, admin in
+            Contributor.objects.filter(node__in=nodes, user=user).values_list('node_id', 'read', 'write', 'admin')
+        }
+        above = user.contributor_set.filter(
+            node__in=NodeAncestor.objects.filter(descendant=self).values('ancestor_id'),
+            admin=True
+        ).exists()
+        permissions = {}
+        for node in nodes:
+            read, write, admin = direct.get(node.id, (False, False, False))
+            admin_parent = admin or (permissions[parents[node.id]][2] if node.id in parents else above)
+            permissions[node.id] = (read or admin_parent, write, admin_parent)
+        return permissions
+
+    def _copy_tree_licenses(self, nodes, parents):
+        """Copy the license of each node of a tree from `_get_component_tree`,
+        resolving inherited licenses in memory.
+
+        :return dict: maps the id of each licensed node to its license's copy
+        """
+        records = NodeLicenseRecord.objects.in_bulk([node.node_license_id for node in nodes if node.node_license_id])
+        licenses = {}
+        for node in nodes:
+            if node.node_license_id:
+                licenses[node.id] = records[node.node_license_id]
+            elif node.id == self.id:
+                licenses[node.id] = self.license
+            else:
+                licenses[node.id] = licenses[parents[node.id]]
+        licensed = [node for node in nodes if licenses[node.id]]
+        return dict(zip(
+            [node.id for node in licensed],
+            NodeLicenseRecord.objects.bulk_create([
+                NodeLicenseRecord(
+                    node_license_id=licenses[node.id].node_license_id,
+                    year=licenses[node.id].year,
+                    copyright_holders=licenses[node.id].copyright_holders
+                )
+                for node in licensed
+            ])
+        ))
+
+    @staticmethod
+    def _clone_values(model, node):
+        """The column values `clone` copies from `node` to a new `model`: all but the keys."""
+        values = {}
+        for field in model._meta.concrete_fields:
+            if field.primary_key or field.is_relation or field.attname in ('type', 'guid_string'):
+                continue
+            value = getattr(node, field.attname)
+            # Don't share mutable JSON values with the original
+            values[field.attname] = deepcopy(value) if isinstance(value, (dict, list)) else value
+        return values
+
+    def _insert_tree_copies(self, originals, copies, parents, relations, links=()):
+        """Insert unsaved copies of a tree from `_get_component_tree`, giving
+        each a guid and relating them as their originals are related. The
+        first copy becomes the root of the others.
+
+        :return dict: maps the id of each original to its copy
+        """
+        model = type(copies[0])
+        for copy, guid in zip(copies, generate_guids(len(copies), model.__guid_min_length__)):
+            copy.guid_string = guid
+        model.objects.bulk_create(copies)
+        copied = {node.id: copy for node, copy in zip(originals, copies)}
+        root = copies[0]
+
+        content_type = ContentType.objects.get_for_model(model)
+        Guid.objects.bulk_create([
+            Guid(_id=copy.guid_string, content_type=content_type, object_id=copy.id)
+            for copy in copies
+        ])
+        model.objects.filter(id__in=[copy.id for copy in copies]).update(root=root)
+        for copy in copies:
+            copy.root = root
+
+        NodeRelation.objects.bulk_create([
+            NodeRelation(
+                parent=copied[parents[node.id]],
+                child=copied[node.id],
+                is_node_link=False,
+                _order=relations[node.id]._order
+            )
+            for node in originals[1:]
+        ] + [
+            NodeRelation(parent=copied[parent_id], child_id=child_id, is_node_link=True, _order=order)
+            for parent_id, child_id, order in links
+        ])
+        # bulk_create skips the post_save receiver that maintains the closure table
+        ancestors = {root.id: []}
+        for node in originals[1:]:
+            parent = copied[parents[node.id]]
+            ancestors[copied[node.id].id] = [parent.id] + ancestors[parent.id]
+        NodeAncestor.objects.bulk_create([
+            NodeAncestor(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=depth)
+            for descendant_id, ancestor_ids in ancestors.items()
+            for depth, ancestor_id in enumerate(ancestor_ids, 1)
+        ])
+        return copied
+
+    def _register_tree(self, schema, auth, data):
+        """Register this node and all of its components.
+
+        The tree is read in a single pass and each kind of row (nodes, guids,
+        relations, contributors, tags, institutions, logs) is inserted for the
+        whole tree at once, producing the same registrations as
+        `_register_node_recursive` without a round trip per component.
+        """
+        Registration = apps.get_model('osf.Registration')
+        user = auth.user
+        originals, parents, relations, links = self._get_component_tree()
+        permissions = self._get_component_permissions(user, originals, parents)
+        for node in originals[1:]:
+            # NOTE: Admins can register child nodes even if they don't have write access them
+            _, write, admin_parent = permissions[node.id]
+            if not (write or admin_parent):
+                raise PermissionsError(
+                    'User {} does not have permission '
+                    'to register this node'.format(user._id)
+                )
+        ids = [node.id for node in originals]
+        license_copies = self._copy_tree_licenses(originals, parents)
+
+        registrations = []
+        for node in originals:
+            registered = Registration(**self._clone_values(Registration, node))
+            registered.registered_date = timezone.now()
+            registered.registered_user = user
+            registered.registered_from = node
+            registered.registered_meta = dict(node.registered_meta or {})
+            registered.registered_meta[schema._id] = data
+            registered.forked_from_id = node.forked_from_id
+            registered.creator_id = node.creator_id
+            registered.node_license = license_copies.get(node.id)
+            registered.wiki_private_uuids = {}
+            registered.is_public = False
+            registrations.append(registered)
+        registered_ids = self._insert_tree_copies(originals, registrations, parents, relations, links)
+        root = registrations[0]
+
+        through, source, target = self._get_m2m_through(Registration, 'registered_schema')
+        through.objects.bulk_create([
+            through(**{source: registered.id, target: schema.id}) for registered in registrations
+        ])
+        # All tags, including system tags, and affiliated institutions
+        for field_name in ('tags', 'affiliated_institutions'):
+            through, source, target = self._get_m2m_through(AbstractNode, field_name)
+            through.objects.bulk_create([
+                through(**{source: registered_ids[node_id].id, target: target_id})
+                for node_id, target_id in through.objects.filter(**{source + '__in': ids}).values_list(source, target)
+            ])
+        # bulk_create skips the m2m_changed receiver that counts affiliated registrations
+        apps.get_model('osf.InstitutionSummary').record_affiliations(
+            AbstractNode.affiliated_institutions.through.objects.filter(
+                abstractnode_id__in=[registered.id for registered in registrations]
+            ).values_list('abstractnode_id', 'institution_id')
+        )
+
+        contributors = list(Contributor.objects.filter(node_id__in=ids).order_by('node_id', '_order'))
+        for contributor in contributors:
+            contributor.id = None
+            contributor.node = registered_ids[contributor.node_id]
+        Contributor.objects.bulk_create(contributors)
+        # Copy unclaimed records to unregistered users, saving each user once
+        contributed = collections.defaultdict(list)
+        for contributor in contributors:
+            contributed[contributor.user_id].append(contributor.node)
+        for contributor in OSFUser.objects.filter(id__in=contributed.keys(), is_registered=False):
+            changed = False
+            for registered in contributed[contributor.id]:
+                record = contributor.unclaimed_records.get(registered.registered_from._id)
+                if record:
+                    contributor.unclaimed_records[registered._id] = record
+                    changed = True
+            if changed:
+                contributor.save()
+
+        self._clone_tree_logs(registered_ids)
+
+        # After register callbacks, loading the settings of each addon for the whole tree at once
+        addons = collections.defaultdict(list)
+        for config in self.ADDONS_AVAILABLE:
+            try:
+                settings_model = self._settings_model(config.short_name)
+            except LookupError:
+                continue
+            if not settings_model:
+                continue
+            for addon in settings_model.objects.filter(owner_id__in=ids, deleted=False):
+                addons[addon.owner_id].append(addon)
+        for node, registered in zip(originals, registrations):
+            for addon in addons[node.id]:
+                _, message = addon.after_register(node, registered, user)
+                if message:
+                    status.push_status_message(message, kind='info', trust=False)
+
+        if settings.ENABLE_ARCHIVER:
+            # Components first, as archiving is started once the top-level registration is signalled
+            for node, registered in reversed(zip(originals, registrations)):
+                registered.refresh_from_db()
+                project_signals.after_create_registration.send(node, dst=registered, user=user)
+
+        return root
+
+    @staticmethod
+    def _get_m2m_through(model, field_name):
+        """The through model of a many-to-many field, with the names of its two foreign key columns."""
+        field = model._meta.get_field(field_name)
+        return field.remote_field.through, field.m2m_column_name(), field.m2m_reverse_name()
+
+    def _clone_tree_logs(self, copies, batch_size=1000):
+        """Clone the logs of many nodes at once; see `clone_logs`.
+
+        :param dict copies: The copy of each node, by the original's id
+        """
+        logs = NodeLog.objects.filter(node_id__in=copies.keys()).order_by('node_id', 'pk').iterator()
+        while True:
+            batch = list(itertools.islice(logs, batch_size))
+            if not batch:
+                break
+            NodeLog.objects.bulk_create([
+                NodeLog(
+                    _id=bson.ObjectId(),
+                    action=log.action,
+                    date=log.date,
+                    params=log.params,
+                    should_hide=log.should_hide,
+                    foreign_user=log.foreign_user,
+                    node_id=copies[log.node_id].pk,
+                    user_id=log.user_id,
+                    original_node_id=log.original_node_id
+                )
+                for log in batch
+            ])
+
     def path_above(self, auth):
         parents = self.parents
         return '/' + '/'.join([p.title if p.can_view(auth) else '-- private project --' for p in reversed(parents)])
@@ -1985,6 +2307,131 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
         :param Node parent: parent template. Should only be passed in during recursion
         :return: The `Node` instance created.
         """
+        if parent:
+            return self._use_as_template_recursive(auth, changes, top_level=top_level, parent=parent)
+
+        if self.is_deleted:
+            raise NodeStateError('Cannot use deleted node as template.')
+
+        # Non-contributors can't template private nodes
+        if not (self.is_public or self.has_permission(auth.user, 'read')):
+            raise PermissionsError('{0!r} does not have permission to template node {1!r}'.format(auth.user, self._id))
+
+        return self._template_tree(auth, changes or dict(), top_level=top_level)
+
+    def _template_tree(self, auth, changes, top_level=True):
+        """Create a new project from this node and the components `auth.user`
+        can read.
+
+        The tree is read in a single pass and each kind of row (nodes, guids,
+        relations, contributors, logs, default add-ons) is inserted for the
+        whole tree at once, producing the same projects as
+        `_use_as_template_recursive` without a round trip per component.
+        """
+        from addons.base.models import BaseAddonSettings  # avoid circular imports
+        user = auth.user
+        nodes, parents, relations, _ = self._get_component_tree()
+        permissions = self._get_component_permissions(user, nodes, parents)
+
+        # Components the user can't read are skipped, along with their own components
+        originals = [self]
+        included = {self.id}
+        for node in nodes[1:]:
+            if parents[node.id] in included and (node.is_public or permissions[node.id][0]):
+                originals.append(node)
+                included.add(node.id)
+        license_copies = self._copy_tree_licenses(originals, parents)
+
+        relation_fields = [field.name for field in Node._meta.fields if field.is_relation]
+        copies = []
+        for node in originals:
+            new = Node(**self._clone_values(Node, node))
+
+            # Clear quasi-foreign fields
+            new.wiki_pages_current = {}
+            new.wiki_pages_versions = {}
+            new.wiki_private_uuids = {}
+            new.file_guid_to_share_uuids = {}
+
+            # set attributes which may be overridden by `changes`
+            new.is_public = False
+            new.description = ''
+            for attr, val in changes.get(node._id, {}).iteritems():
+                setattr(new, attr, val)
+
+            # set attributes which may NOT be overridden by `changes`
+            new.creator = user
+            new.template_node = node
+            new.is_fork = False
+            new.node_license = license_copies.get(node.id)
+
+            # If the title hasn't been changed, apply the default prefix (once)
+            if (
+                node.id == self.id and top_level and new.title == node.title and
+                language.TEMPLATED_FROM_PREFIX not in new.title
+            ):
+                new.title = ''.join((language.TEMPLATED_FROM_PREFIX, new.title,))
+            new.title = new.title[:200]
+            new.clean_fields(exclude=relation_fields)
+            copies.append(new)
+        self._insert_tree_copies(originals, copies, parents, relations)
+
+        Contributor.objects.bulk_create([
+            Contributor(user=user, node=new, visible=True, read=True, write=True, admin=True, _order=0)
+            for new in copies
+        ])
+
+        # Log the creation, dated when each copy was created
+        NodeLog.objects.bulk_create([
+            NodeLog(
+                _id=bson.ObjectId(),
+                action=NodeLog.CREATED_FROM,
+                params={
+                    'node': new._id,
+                    'template_node': {
+                        'id': node._id,
+                        'url': node.url,
+                        'title': node.title,
+                    },
+                },
+                user=user,
+                node=new,
+                original_node=new,
+                date=new.created
+            )
+            for node, new in zip(originals, copies)
+        ])
+        Node.objects.filter(id__in=[new.id for new in copies]).update(last_logged=F('created'))
+        for new in copies:
+            new.last_logged = new.created
+            increment_user_activity_counters(user._primary_key, NodeLog.CREATED_FROM, new.created.isoformat())
+
+        # Add-ons that do nothing when added are inserted at once, the others one node at a time
+        for config in settings.ADDONS_AVAILABLE:
+            if 'node' not in config.added_default:
+                continue
+            settings_model = self._settings_model(config.short_name, config=config)
+            if settings_model.on_add.__func__ is BaseAddonSettings.on_add.__func__:
+                settings_model.objects.bulk_create([settings_model(owner=new) for new in copies])
+            else:
+                for new in copies:
+                    new.add_addon(config.short_name, auth=None, log=False)
+
+        # The copies were not saved one at a time, so public ones are indexed as on their first save
+        saved_fields = [field.name for field in Node._meta.concrete_fields]
+        for new in copies:
+            if new.is_public:
+                new.on_update(True, saved_fields)
+
+        for new in copies:
+            # Subscribes the creator to each new node's notifications
+            project_signals.contributor_added.send(new, contributor=user, auth=auth, email_template='false')
+        return copies[0]
+
+    def _use_as_template_recursive(self, auth, changes=None, top_level=True, parent=None):
+        """Create a new project from this node and its readable components,
+        one node at a time; see `use_as_template`.
+        """
         Registration = apps.get_model('osf.Registration')
         changes = changes or dict()
 
@@ -2076,7 +2523,7 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
             # template child nodes
             if not node_relation.is_node_link:
                 try:  # Catch the potential PermissionsError above
-                    node_contained.use_as_template(auth, changes, top_level=False, parent=new)
+                    node_contained._use_as_template_recursive(auth, changes, top_level=False, parent=new)
                 except PermissionsError:
                     pass
 
@@ -2319,15 +2766,23 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
         if saved_fields:
             self.on_update(first_save, saved_fields)
 
+        if not first_save and ('is_public' in saved_fields or 'is_deleted' in saved_fields):
+            apps.get_model('osf.PreprintService').update_publicly_listable(self)
+            apps.get_model('osf.InstitutionSummary').record_node_saved(self, saved_fields)
+
         if 'node_license' in saved_fields:
-            children = list(self.descendants.filter(node_license=None, is_public=True, is_deleted=False))
-            while len(children):
-                batch = children[:99]
-                self.bulk_update_search(batch)
-                children = children[99:]
+            enqueue_postcommit_side_effect((self.id, 'update_licensed_children_search'), self._update_licensed_children_search)
 
         return ret
 
+    def _update_licensed_children_search(self):
+        """Reindex the public children that inherit this node's license."""
+        children = list(self.descendants.filter(node_license=None, is_public=True, is_deleted=False))
+        while len(children):
+            batch = children[:99]
+            self.bulk_update_search(batch)
+            children = children[99:]
+
     def on_update(self, first_save, saved_fields):
         User = apps.get_model('osf.OSFUser')
         request, user_id = get_request_and_user_id()
@@ -2338,27 +2793,44 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
                 for k, v in get_headers_from_request(request).items()
                 if isinstance(v, basestring)
             }
-        enqueue_task(node_tasks.on_node_updated.s(self._id, user_id, first_save, saved_fields, request_headers))
+        # Saves of the same node during a request are reported once, with all of their fields
+        enqueue_postcommit_side_effect(
+            (self.id, 'on_node_updated'),
+            functools.partial(self._enqueue_on_node_updated, user_id, first_save, request_headers),
+            fields=saved_fields
+        )
 
         if self.preprint_file:
-            # avoid circular imports
-            from website.preprints.tasks import on_preprint_updated
-            PreprintService = apps.get_model('osf.PreprintService')
-            # .preprints wouldn't return a single deleted preprint
-            for preprint in PreprintService.objects.filter(node_id=self.id, is_published=True):
-                enqueue_task(on_preprint_updated.s(preprint._id))
+            enqueue_postcommit_side_effect((self.id, 'on_preprint_updated'), self._enqueue_on_preprint_updated)
 
         user = User.load(user_id)
-        if user and self.check_spam(user, saved_fields, request_headers):
-            # Specifically call the super class save method to avoid recursion into model save method.
-            super(AbstractNode, self).save()
+        if user and self._should_check_spam(user) and self._get_spam_fields(saved_fields):
+            # Checked by run_spam_checks, so that the request does not wait on the classifier
+            PendingSpamCheck = apps.get_model('osf.PendingSpamCheck')
+            PendingSpamCheck.enqueue(self, user, saved_fields, request_headers)
+            if in_request_context():
+                enqueue_task(node_tasks.run_spam_checks.s())
+
+    def _enqueue_on_node_updated(self, user_id, first_save, request_headers, saved_fields):
+        enqueue_task(node_tasks.on_node_updated.s(self._id, user_id, first_save, sorted(saved_fields), request_headers))
+
+    def _enqueue_on_preprint_updated(self):
+        # avoid circular imports
+        from website.preprints.tasks import on_preprint_updated
+        PreprintService = apps.get_model('osf.PreprintService')
+        # .preprints wouldn't return a single deleted preprint
+        for preprint in PreprintService.objects.filter(node_id=self.id, is_published=True):
+            enqueue_task(on_preprint_updated.s(preprint._id))
+
+    def _get_spam_fields(self, saved_fields):
+        if self.is_public and 'is_public' in saved_fields:
+            return self.SPAM_CHECK_FIELDS
+        return self.SPAM_CHECK_FIELDS.intersection(saved_fields)
 
     def _get_spam_content(self, saved_fields):
         NodeWikiPage = apps.get_model('addons_wiki.NodeWikiPage')
-        spam_fields = self.SPAM_CHECK_FIELDS if self.is_public and 'is_public' in saved_fields else self.SPAM_CHECK_FIELDS.intersection(
-            saved_fields)
         content = []
-        for field in spam_fields:
+        for field in self._get_spam_fields(saved_fields):
             if field == 'wiki_pages_current':
                 newest_wiki_page = None
                 for wiki_page_id in self.wiki_pages_current.values():
@@ -2375,13 +2847,18 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
             return None
         return ' '.join(content)
 
-    def check_spam(self, user, saved_fields, request_headers):
+    def _should_check_spam(self, user):
         if not settings.SPAM_CHECK_ENABLED:
             return False
         if settings.SPAM_CHECK_PUBLIC_ONLY and not self.is_public:
             return False
         if 'ham_confirmed' in user.system_tags:
             return False
+        return True
+
+    def check_spam(self, user, saved_fields, request_headers):
+        if not self._should_check_spam(user):
+            return False
 
         content = self._get_spam_content(saved_fields)
         if not content:
@@ -2399,6 +2876,56 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
             self._check_spam_user(user)
         return is_spam
 
+    def get_pending_spam_check_item(self, check):
+        """Return the item to classify for the PendingSpamCheck `check`, or
+        None if it no longer needs classifying, e.g. because the node was made
+        private or was already classified.
+        """
+        if self.is_deleted or check.user is None or not self._should_check_spam(check.user):
+            return None
+        if self.spam_status == SpamStatus.HAM or self.is_spammy:
+            return None
+        content = self._get_spam_content(check.saved_fields)
+        if not content:
+            return None
+        return self.get_spam_check_item(check.user.fullname, check.user.username, content, check.request_headers)
+
+    def finish_spam_check(self, check, item=None, is_spam=False, pro_tip=None):
+        """Apply the verdict on the PendingSpamCheck `check`, once it has been
+        removed. Updates to search and SHARE are held back while a node has a
+        pending check, so they are made here.
+
+        The node may have been edited while it was classified, so it is
+        reloaded and only the fields of the verdict are saved.
+        """
+        self.refresh_from_db()
+        original = {field: getattr(self, field) for field in self.SPAM_VERDICT_FIELDS}
+        user = check.user
+        if item is not None:
+            self.apply_spam_verdict(item, is_spam, pro_tip)
+            logger.info("Node ({}) '{}' smells like {} (tip: {})".format(
+                self._id, self.title.encode('utf-8'), 'SPAM' if is_spam else 'HAM', self.spam_pro_tip
+            ))
+        elif user and self._should_check_spam(user) and self.is_spammy:
+            # Edits of a node already flagged count against their author, as they would if checked
+            is_spam = True
+        if is_spam:
+            self._check_spam_user(user)
+        changed = [field for field in self.SPAM_VERDICT_FIELDS if getattr(self, field) != original[field]]
+        # spam_data is changed in place
+        update_fields = set(changed).union(['spam_data'] if item is not None else [])
+        saved_fields = set(check.saved_fields).union(update_fields)
+        if update_fields:
+            # Specifically call the super class save method to avoid recursion into model save method.
+            super(AbstractNode, self).save(update_fields=update_fields)
+        if 'is_public' in update_fields:
+            # Made private by flag_spam; as in save
+            apps.get_model('osf.PreprintService').update_publicly_listable(self)
+            apps.get_model('osf.InstitutionSummary').record_node_saved(self, {'is_public': original['is_public']})
+        enqueue_task(node_tasks.on_node_updated.s(
+            self._id, user._id if user else None, False, sorted(saved_fields), check.request_headers
+        ))
+
     def _check_spam_user(self, user):
         if (
             settings.SPAM_ACCOUNT_SUSPENSION_ENABLED
@@ -2708,6 +3235,7 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
         """
         NodeWikiPage = apps.get_model('addons_wiki.NodeWikiPage')
         Comment = apps.get_model('osf.Comment')
+        CommentReadState = apps.get_model('osf.CommentReadState')
 
         name = (name or '').strip()
         key = to_mongo_key(name)
@@ -2731,8 +3259,8 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
             version=version,
             user=auth.user,
             node=self,
-            content=content
         )
+        new_page.set_content(content, previous=current)
         new_page.save()
 
         if has_comments:
@@ -2740,12 +3268,9 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
             Comment.objects.filter(target=current.guids.all()[0]).update(target=Guid.load(new_page._id))
 
         if current:
-            for contrib in self.contributors:
-                if contrib.comments_viewed_timestamp.get(current._id, None):
-                    timestamp = contrib.comments_viewed_timestamp[current._id]
-                    contrib.comments_viewed_timestamp[new_page._id] = timestamp
-                    del contrib.comments_viewed_timestamp[current._id]
-                    contrib.save()
+            CommentReadState.objects.filter(root_target__in=current.guids.all()).update(
+                root_target=Guid.load(new_page._id)
+            )
 
         # check if the wiki page already exists in versions (existed once and is now deleted)
         if key not in self.wiki_pages_versions:
@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import connection, models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
 from .base import BaseModel, ObjectIDMixin
 
@@ -25,3 +27,93 @@ class NodeRelation(ObjectIDMixin, BaseModel):
         index_together = (
             ('is_node_link', 'child', 'parent'),
         )
+
+
+class NodeAncestor(models.Model):
+    """Closure table of the primary (non node link) NodeRelations.
+
+    There is a row for every ancestor of every node, `depth` being the number
+    of levels between them (1 for the parent). A node is not its own ancestor.
+    Kept in sync with NodeRelation by the receivers below; use the
+    `backfill_node_ancestors` and `check_node_ancestors` management commands to
+    repair or verify it after raw SQL writes to osf_noderelation.
+    """
+    ancestor = models.ForeignKey('AbstractNode', related_name='descendant_relations', on_delete=models.CASCADE)
+    descendant = models.ForeignKey('AbstractNode', related_name='ancestor_relations', on_delete=models.CASCADE)
+    depth = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ('ancestor', 'descendant')
+        index_together = (
+            ('descendant', 'depth'),
+        )
+
+    def __unicode__(self):
+        return 'ancestor={}, descendant={}, depth={}'.format(self.ancestor_id, self.descendant_id, self.depth)
+
+    @classmethod
+    def get_parent_id(cls, node_id):
+        return cls.objects.filter(descendant_id=node_id, depth=1).values_list('ancestor_id', flat=True).first()
+
+    @classmethod
+    def attach(cls, child_id, parent_id):
+        """Add the paths from `parent_id` and its ancestors to `child_id` and its descendants."""
+        sql = """
+            INSERT INTO "{table}" (ancestor_id, descendant_id, depth)
+            SELECT A.ancestor_id, D.descendant_id, A.depth + D.depth + 1
+            FROM (
+                SELECT %(parent)s AS ancestor_id, 0 AS depth
+              UNION ALL
+                SELECT ancestor_id, depth FROM "{table}" WHERE descendant_id = %(parent)s
+            ) AS A CROSS JOIN (
+                SELECT %(child)s AS descendant_id, 0 AS depth
+              UNION ALL
+                SELECT descendant_id, depth FROM "{table}" WHERE ancestor_id = %(child)s
+            ) AS D
+            -- Never close a cycle
+            WHERE %(parent)s != %(child)s AND NOT EXISTS (
+                SELECT 1 FROM "{table}" WHERE ancestor_id = %(child)s AND descendant_id = %(parent)s
+            )
+            ON CONFLICT (ancestor_id, descendant_id) DO NOTHING;
+        """.format(table=cls._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, {'parent': parent_id, 'child': child_id})
+
+    @classmethod
+    def detach(cls, child_id):
+        """Remove the paths from the ancestors of `child_id` to it and its descendants."""
+        sql = """
+            DELETE FROM "{table}"
+            WHERE descendant_id IN (
+                SELECT %(child)s
+              UNION ALL
+                SELECT descendant_id FROM "{table}" WHERE ancestor_id = %(child)s
+            ) AND ancestor_id IN (
+                SELECT ancestor_id FROM "{table}" WHERE descendant_id = %(child)s
+            );
+        """.format(table=cls._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, {'child': child_id})
+
+
+@receiver(post_save, sender=NodeRelation)
+def update_node_ancestors(sender, instance, created, **kwargs):
+    current_parent_id = None if created else NodeAncestor.get_parent_id(instance.child_id)
+    if instance.is_node_link:
+        # A component relation that was turned into a node link
+        if current_parent_id is not None and current_parent_id == instance.parent_id:
+            NodeAncestor.detach(instance.child_id)
+    elif current_parent_id != instance.parent_id:
+        # A new component, or one moved to another parent
+        if current_parent_id is not None:
+            NodeAncestor.detach(instance.child_id)
+        NodeAncestor.attach(instance.child_id, instance.parent_id)
+
+
+@receiver(post_delete, sender=NodeRelation)
+def remove_node_ancestors(sender, instance, **kwargs):
+    if instance.is_node_link:
+        return
+    # The parent's own rows are already gone if it is being deleted along with the relation
+    if NodeAncestor.get_parent_id(instance.child_id) in (None, instance.parent_id):
+        NodeAncestor.detach(instance.child_id)
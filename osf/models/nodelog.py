@@ -12,9 +12,9 @@ from website.util import api_v2_url
 class NodeLog(ObjectIDMixin, BaseModel):
     FIELD_ALIASES = {
         # TODO: Find a better way
-        'node': 'node__guids___id',
-        'user': 'user__guids___id',
-        'original_node': 'original_node__guids___id'
+        'node': 'node__guid_string',
+        'user': 'user__guid_string',
+        'original_node': 'original_node__guid_string'
     }
 
     objects = IncludeManager()
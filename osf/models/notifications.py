@@ -66,6 +66,32 @@ class NotificationSubscription(BaseModel):
         if save:
             self.save()
 
+    def add_users_to_subscription(self, notification_types, save=True):
+        """Add many users at once; see `add_user_to_subscription`.
+
+        :param dict notification_types: The notification type for each user
+        """
+        user_ids = {user.id: notification_type for user, notification_type in notification_types.items()}
+        for nt in NOTIFICATION_TYPES:
+            getattr(self, nt).remove(*[user_id for user_id, user_nt in user_ids.items() if user_nt != nt])
+            getattr(self, nt).add(*[user_id for user_id, user_nt in user_ids.items() if user_nt == nt])
+
+        if isinstance(self.owner, Node) and self.owner.parent_node:
+            parent = self.owner.parent_node
+            changed = False
+            for user, notification_type in notification_types.items():
+                if notification_type == 'none':
+                    continue
+                user_subs = parent.child_node_subscriptions.setdefault(user._id, [])
+                if self.owner._id not in user_subs:
+                    user_subs.append(self.owner._id)
+                    changed = True
+            if changed:
+                parent.save()
+
+        if save:
+            self.save()
+
     def remove_user_from_subscription(self, user, save=True):
         for notification_type in NOTIFICATION_TYPES:
             try:
@@ -11,7 +11,7 @@ from api.preprint_providers.permissions import GroupHelper, PERMISSIONS, GROUP_F
 from osf.models.base import BaseModel, ObjectIDMixin
 from osf.models.licenses import NodeLicense
 from osf.models.mixins import ReviewProviderMixin
-from osf.models.subject import Subject
+from osf.models.subject import Subject, get_subject_tree
 from osf.utils.datetime_aware_jsonfield import DateTimeAwareJSONField
 from osf.utils.fields import EncryptedTextField
 from website import settings
@@ -85,18 +85,18 @@ class PreprintProvider(ObjectIDMixin, ReviewProviderMixin, DirtyFieldsMixin, Bas
 
     @property
     def top_level_subjects(self):
-        if self.subjects.exists():
+        if get_subject_tree(self.id):
             return optimize_subject_query(self.subjects.filter(parent__isnull=True))
         else:
             # TODO: Delet this when all PreprintProviders have a mapping
             if len(self.subjects_acceptable) == 0:
                 return optimize_subject_query(Subject.objects.filter(parent__isnull=True, provider___id='osf'))
             tops = set([sub[0][0] for sub in self.subjects_acceptable])
-            return [Subject.load(sub) for sub in tops]
+            return optimize_subject_query(Subject.objects.filter(_id__in=tops))
 
     @property
     def all_subjects(self):
-        if self.subjects.exists():
+        if get_subject_tree(self.id):
             return self.subjects.all()
         else:
             # TODO: Delet this when all PreprintProviders have a mapping
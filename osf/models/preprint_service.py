@@ -22,6 +22,7 @@ from website import settings, mails
 
 from osf.models.base import BaseModel, GuidMixin
 from osf.models.identifiers import IdentifierMixin, Identifier
+from osf.models.institution_summary import InstitutionSummary
 
 class PreprintService(DirtyFieldsMixin, GuidMixin, IdentifierMixin, ReviewableMixin, BaseModel):
     provider = models.ForeignKey('osf.PreprintProvider',
@@ -32,6 +33,9 @@ class PreprintService(DirtyFieldsMixin, GuidMixin, IdentifierMixin, ReviewableMi
                              related_name='preprints',
                              null=True, blank=True, db_index=True)
     is_published = models.BooleanField(default=False, db_index=True)
+    # Denormalized from is_published and the node's is_public and is_deleted,
+    # for public listings. Kept up to date by the preprint and node save paths.
+    is_publicly_listable = models.BooleanField(default=False, db_index=True)
     date_published = NonNaiveDateTimeField(null=True, blank=True)
     original_publication_date = NonNaiveDateTimeField(null=True, blank=True)
     license = models.ForeignKey('osf.NodeLicenseRecord',
@@ -51,6 +55,21 @@ class PreprintService(DirtyFieldsMixin, GuidMixin, IdentifierMixin, ReviewableMi
     def __unicode__(self):
         return '{} preprint (guid={}) of {}'.format('published' if self.is_published else 'unpublished', self._id, self.node.__unicode__() if self.node else None)
 
+    @property
+    def should_be_publicly_listable(self):
+        return bool(self.is_published and self.node and self.node.is_public and not self.node.is_deleted)
+
+    @classmethod
+    def update_publicly_listable(cls, node):
+        """Update `is_publicly_listable` of the preprints of `node` after a change
+        to its `is_public` or `is_deleted`.
+        """
+        preprints = cls.objects.filter(node_id=node.id)
+        if node.is_public and not node.is_deleted:
+            preprints.filter(is_published=True, is_publicly_listable=False).update(is_publicly_listable=True)
+        else:
+            preprints.filter(is_publicly_listable=True).update(is_publicly_listable=False)
+
     @property
     def verified_publishable(self):
         return self.is_published and self.node.is_preprint and not self.node.is_deleted
@@ -79,8 +98,10 @@ class PreprintService(DirtyFieldsMixin, GuidMixin, IdentifierMixin, ReviewableMi
 
     @cached_property
     def subject_hierarchy(self):
+        subjects = self.subjects.all()
+        parent_ids = {s.parent_id for s in subjects}
         return [
-            s.object_hierarchy for s in self.subjects.exclude(children__in=self.subjects.all())
+            s.object_hierarchy for s in subjects if s.id not in parent_ids
         ]
 
     @property
@@ -238,10 +259,15 @@ class PreprintService(DirtyFieldsMixin, GuidMixin, IdentifierMixin, ReviewableMi
 
     def save(self, *args, **kwargs):
         first_save = not bool(self.pk)
-        saved_fields = self.get_dirty_fields() or []
+        saved_fields = self.get_dirty_fields(check_relationship=True) or []
         old_subjects = kwargs.pop('old_subjects', [])
+        if first_save or 'is_published' in saved_fields or 'node' in saved_fields:
+            self.is_publicly_listable = self.should_be_publicly_listable
         ret = super(PreprintService, self).save(*args, **kwargs)
 
+        if self.is_published and (first_save or 'is_published' in saved_fields):
+            InstitutionSummary.record_preprint_published(self)
+
         if (not first_save and 'is_published' in saved_fields) or self.is_published:
             enqueue_postcommit_task(on_preprint_updated, (self._id,), {'old_subjects': old_subjects}, celery=True)
         return ret
@@ -2,6 +2,7 @@ from django.db import models
 from django.dispatch import receiver
 from django.core.exceptions import ValidationError
 
+from framework.auth.core import get_private_link_resolver
 from framework.utils import iso8601format
 from website.util import sanitize
 
@@ -19,7 +20,33 @@ class PrivateLink(ObjectIDMixin, BaseModel):
 
     @property
     def node_ids(self):
-        return self.nodes.filter(is_deleted=False).values_list('guids___id', flat=True)
+        return self.nodes.filter(is_deleted=False).values_list('guid_string', flat=True)
+
+    @property
+    def node_pks(self):
+        """Primary keys of the linked nodes, including deleted ones. Loaded
+        once per instance, and with the link by `resolve`.
+        """
+        if getattr(self, '_node_pks', None) is None:
+            self._node_pks = frozenset(self.nodes.values_list('id', flat=True))
+        return self._node_pks
+
+    def has_node(self, node):
+        return node.pk in self.node_pks
+
+    @classmethod
+    def resolve(cls, key):
+        """The link with `key`, deleted or not, with its `node_pks` loaded,
+        or None. Use `framework.auth.core.get_private_link_resolver` to
+        resolve a key once per request.
+        """
+        if not key:
+            return None
+        link = cls.objects.filter(key=key).first()
+        if link is not None:
+            # Loaded now, so that links kept by the resolver need no further queries
+            link.node_pks
+        return link
 
     def node_scale(self, node):
         # node may be None if previous node's parent is deleted
@@ -51,3 +78,30 @@ def check_if_private_link_is_to_quickfiles(sender, instance, action, reverse, mo
     if action == 'pre_add' and pk_set:
         if model == AbstractNode and model.objects.get(id=list(pk_set)[0]).is_quickfiles:
             raise ValidationError('A private link cannot be added to a QuickFilesNode')
+
+
+@receiver(models.signals.post_save, sender=PrivateLink)
+@receiver(models.signals.post_delete, sender=PrivateLink)
+def forget_private_link(sender, instance, **kwargs):
+    # Resolved again if it is used later in the same request
+    get_private_link_resolver().forget(instance.key)
+
+
+@receiver(models.signals.m2m_changed, sender=PrivateLink.nodes.through)
+def forget_private_link_nodes(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if reverse:
+        # Links added to or removed from a node
+        if action == 'pre_clear':
+            keys = PrivateLink.objects.filter(nodes=instance).values_list('key', flat=True)
+        elif action in ('post_add', 'post_remove'):
+            keys = PrivateLink.objects.filter(id__in=pk_set).values_list('key', flat=True)
+        else:
+            return
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        instance._node_pks = None
+        keys = [instance.key]
+    else:
+        return
+    resolver = get_private_link_resolver()
+    for key in keys:
+        resolver.forget(key)
@@ -48,6 +48,9 @@ class QuickFilesNode(AbstractNode):
     def add_contributor(self, contributor, *args, **kwargs):
         raise NodeStateError('A QuickFilesNode may not have additional contributors.')
 
+    def add_contributors(self, contributors, *args, **kwargs):
+        raise NodeStateError('A QuickFilesNode may not have additional contributors.')
+
     def clone(self):
         raise NodeStateError('A QuickFilesNode may not be forked, used as a template, or registered.')
 
@@ -600,7 +600,7 @@ class Retraction(EmailApprovableSanction):
             registration = Registration.objects.select_related(
                 'registered_from'
             ).get(
-                guids___id=node_id
+                guid_string=node_id
             ) if node_id else self.registrations.first()
 
             return {
@@ -0,0 +1,36 @@
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+
+from osf.models.base import BaseModel
+from osf.utils.fields import NonNaiveDateTimeField
+
+
+class ShareOutboxEntry(BaseModel):
+    """A node whose metadata changed and has yet to be sent to SHARE.
+
+    There is at most one entry per node however often it changes. The
+    `drain_share_outbox` task sends the queued nodes in batches, removing the
+    entries it sent and backing off from those it could not.
+    """
+    node = models.OneToOneField('AbstractNode', related_name='share_outbox_entry', on_delete=models.CASCADE)
+    attempts = models.PositiveIntegerField(default=0)
+    # Entries are sent from this time on; pushed back while being sent and after failures
+    next_attempt = NonNaiveDateTimeField(default=timezone.now, db_index=True)
+
+    def __unicode__(self):
+        return 'node={}, attempts={}'.format(self.node_id, self.attempts)
+
+    @classmethod
+    def enqueue(cls, node):
+        """Queue `node` to be sent to SHARE with the next batch.
+
+        Touching `modified` of an entry that is being sent keeps the drainer
+        from removing it, so that the change is sent with a later batch.
+        """
+        if cls.objects.filter(node_id=node.id).update(modified=timezone.now()):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(node_id=node.id)
+        except IntegrityError:
+            pass  # Queued concurrently
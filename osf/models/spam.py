@@ -1,27 +1,20 @@
 import abc
 import logging
 
-from django.db import models
+from django.contrib.postgres.fields import ArrayField
+from django.db import IntegrityError, models, transaction
 from django.utils import timezone
 from osf.exceptions import ValidationValueError, ValidationTypeError
+from osf.models.base import BaseModel
 from osf.utils.datetime_aware_jsonfield import DateTimeAwareJSONField
 from osf.utils.fields import NonNaiveDateTimeField
 
 from website import settings
-from website.util import akismet
-from website.util.akismet import AkismetClientError
+from website.util.spam import get_classifier
 
 logger = logging.getLogger(__name__)
 
 
-def _get_client():
-    return akismet.AkismetClient(
-        apikey=settings.AKISMET_APIKEY,
-        website=settings.DOMAIN,
-        verify=True
-    )
-
-
 def _validate_reports(value, *args, **kwargs):
     from osf.models import OSFUser
     for key, val in value.iteritems():
@@ -145,15 +138,7 @@ class SpamMixin(models.Model):
             settings.SPAM_CHECK_ENABLED and
             self.spam_data and self.spam_status in [SpamStatus.FLAGGED, SpamStatus.SPAM]
         ):
-            client = _get_client()
-            client.submit_ham(
-                user_ip=self.spam_data['headers']['Remote-Addr'],
-                user_agent=self.spam_data['headers'].get('User-Agent'),
-                referrer=self.spam_data['headers'].get('Referer'),
-                comment_content=self.spam_data['content'],
-                comment_author=self.spam_data['author'],
-                comment_author_email=self.spam_data['author_email'],
-            )
+            get_classifier().submit_ham(self.spam_data)
             logger.info('confirm_ham update sent')
         self.spam_status = SpamStatus.HAM
         if save:
@@ -165,15 +150,7 @@ class SpamMixin(models.Model):
             settings.SPAM_CHECK_ENABLED and
             self.spam_data and self.spam_status in [SpamStatus.UNKNOWN, SpamStatus.HAM]
         ):
-            client = _get_client()
-            client.submit_spam(
-                user_ip=self.spam_data['headers']['Remote-Addr'],
-                user_agent=self.spam_data['headers'].get('User-Agent'),
-                referrer=self.spam_data['headers'].get('Referer'),
-                comment_content=self.spam_data['content'],
-                comment_author=self.spam_data['author'],
-                comment_author_email=self.spam_data['author_email'],
-            )
+            get_classifier().submit_spam(self.spam_data)
             logger.info('confirm_spam update sent')
         self.spam_status = SpamStatus.SPAM
         if save:
@@ -190,32 +167,79 @@ class SpamMixin(models.Model):
         if self.is_spammy:
             return True
 
-        client = _get_client()
-        remote_addr = request_headers['Remote-Addr']
-        user_agent = request_headers.get('User-Agent')
-        referer = request_headers.get('Referer')
-        try:
-            is_spam, pro_tip = client.check_comment(
-                user_ip=remote_addr,
-                user_agent=user_agent,
-                referrer=referer,
-                comment_content=content,
-                comment_author=author,
-                comment_author_email=author_email
-            )
-        except AkismetClientError:
-            logger.exception('Error performing SPAM check')
+        item = self.get_spam_check_item(author, author_email, content, request_headers)
+        verdict, = get_classifier().classify([item])
+        if verdict is None:
             return False
+        is_spam, pro_tip = verdict
         if update:
-            self.spam_pro_tip = pro_tip
-            self.spam_data['headers'] = {
-                'Remote-Addr': remote_addr,
-                'User-Agent': user_agent,
-                'Referer': referer,
-            }
-            self.spam_data['content'] = content
-            self.spam_data['author'] = author
-            self.spam_data['author_email'] = author_email
-            if is_spam:
-                self.flag_spam()
+            self.apply_spam_verdict(item, is_spam, pro_tip)
         return is_spam
+
+    def get_spam_check_item(self, author, author_email, content, request_headers):
+        """The item for a spam classifier to classify; see `website.util.spam`."""
+        return {
+            'headers': {
+                'Remote-Addr': request_headers['Remote-Addr'],
+                'User-Agent': request_headers.get('User-Agent'),
+                'Referer': request_headers.get('Referer'),
+            },
+            'content': content,
+            'author': author,
+            'author_email': author_email,
+        }
+
+    def apply_spam_verdict(self, item, is_spam, pro_tip):
+        """Record the classification of `item`, flagging this object if it is spam."""
+        self.spam_pro_tip = pro_tip
+        self.spam_data['headers'] = item['headers']
+        self.spam_data['content'] = item['content']
+        self.spam_data['author'] = item['author']
+        self.spam_data['author_email'] = item['author_email']
+        if is_spam:
+            self.flag_spam()
+
+
+class PendingSpamCheck(BaseModel):
+    """A node whose content changed and has yet to be checked for spam.
+
+    There is at most one check per node however often it is edited; the
+    fields saved by each edit are merged, and the check is made with the
+    node's content at the time it is run. The `run_spam_checks` task
+    classifies the pending nodes in batches.
+    """
+    node = models.OneToOneField('AbstractNode', related_name='pending_spam_check', on_delete=models.CASCADE)
+    # The user who last edited the node, and the headers of their request
+    user = models.ForeignKey('OSFUser', null=True, on_delete=models.SET_NULL)
+    request_headers = DateTimeAwareJSONField(default=dict, blank=True)
+    saved_fields = ArrayField(models.CharField(max_length=255), default=list, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    # Checks are run from this time on; pushed back while being run and after failures
+    next_attempt = NonNaiveDateTimeField(default=timezone.now, db_index=True)
+
+    def __unicode__(self):
+        return 'node={}, attempts={}'.format(self.node_id, self.attempts)
+
+    @classmethod
+    def enqueue(cls, node, user, saved_fields, request_headers):
+        """Queue a check of `node`, edited by `user`, with the next batch.
+
+        Saving a check that is being run keeps the task from removing it, so
+        that the node is checked again with a later batch.
+        """
+        with transaction.atomic():
+            check = cls.objects.select_for_update().filter(node_id=node.id).first()
+            if check is None:
+                try:
+                    with transaction.atomic():
+                        return cls.objects.create(
+                            node_id=node.id, user=user, saved_fields=sorted(saved_fields), request_headers=request_headers
+                        )
+                except IntegrityError:
+                    # Queued concurrently
+                    check = cls.objects.select_for_update().get(node_id=node.id)
+            check.user = user
+            check.request_headers = request_headers
+            check.saved_fields = sorted(set(check.saved_fields).union(saved_fields))
+            check.save()
+            return check
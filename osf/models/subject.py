@@ -1,11 +1,16 @@
 # -*- coding: utf-8 -*-
+import time
+import uuid
+from collections import defaultdict
+
 from dirtyfields import DirtyFieldsMixin
-from django.db import models
-from django.db.models import Q
+from django.core.cache import cache
+from django.db import models, router, transaction
 from django.core.exceptions import ValidationError
 from django.utils.functional import cached_property
 from include import IncludeQuerySet
 
+from website import settings
 from website.util import api_v2_url
 
 from osf.models.base import BaseModel, ObjectIDMixin
@@ -13,9 +18,11 @@ from osf.models.validators import validate_subject_hierarchy_length, validate_su
 
 class SubjectQuerySet(IncludeQuerySet):
     def include_children(self):
-        # It would be more efficient to OR self with the latter two Q's,
-        # but this breaks for certain querysets when relabeling aliases.
-        return Subject.objects.filter(Q(id__in=self.values_list('id', flat=True)) | Q(parent__in=self) | Q(parent__parent__in=self))
+        subject_ids = set()
+        for subject_id, provider_id in self.values_list('id', 'provider_id'):
+            subject_ids.add(subject_id)
+            subject_ids.update(get_subject_tree(provider_id).descendant_ids(subject_id))
+        return Subject.objects.filter(id__in=subject_ids)
 
 class Subject(ObjectIDMixin, BaseModel, DirtyFieldsMixin):
     """A subject discipline that may be attached to a preprint."""
@@ -45,29 +52,55 @@ class Subject(ObjectIDMixin, BaseModel, DirtyFieldsMixin):
     @property
     def child_count(self):
         """For v1 compat."""
+        tree = self._tree
+        if tree is not None:
+            return len(tree.children[self.id])
         return self.children.count()
 
     def get_absolute_url(self):
         return self.absolute_api_v2_url
 
+    @property
+    def _tree(self):
+        """The provider's taxonomy, if it agrees with this subject's unsaved state."""
+        if not self.pk:
+            return None
+        tree = get_subject_tree(self.provider_id)
+        row = tree.rows.get(self.id)
+        if row is None or (row['text'], row['parent_id'], row['bepress_subject_id']) != (self.text, self.parent_id, self.bepress_subject_id):
+            return None
+        return tree
+
     @cached_property
     def path(self):
+        tree = self._tree
+        if tree is not None:
+            return tree.path(self.id)
         return '{}|{}'.format(self.provider.share_title, '|'.join([s.text for s in self.object_hierarchy]))
 
     @cached_property
     def bepress_text(self):
+        tree = self._tree
+        if tree is not None:
+            return tree.rows[self.id]['bepress_subject__text'] or self.text
         if self.bepress_subject:
             return self.bepress_subject.text
         return self.text
 
     @cached_property
     def hierarchy(self):
+        tree = self._tree
+        if tree is not None:
+            return [tree.rows[subject_id]['_id'] for subject_id in tree.ancestor_ids(self.id)] + [self._id]
         if self.parent:
             return self.parent.hierarchy + [self._id]
         return [self._id]
 
     @cached_property
     def object_hierarchy(self):
+        tree = self._tree
+        if tree is not None:
+            return [tree.subject(subject_id) for subject_id in tree.ancestor_ids(self.id)] + [self]
         if self.parent:
             return self.parent.object_hierarchy + [self]
         return [self]
@@ -78,9 +111,104 @@ class Subject(ObjectIDMixin, BaseModel, DirtyFieldsMixin):
         validate_subject_highlighted_count(self.provider, bool('highlighted' in saved_fields and self.highlighted))
         if 'text' in saved_fields and self.pk and self.preprint_services.exists():
             raise ValidationError('Cannot edit a used Subject')
-        return super(Subject, self).save()
+        ret = super(Subject, self).save()
+        invalidate_subject_tree(self.provider_id)
+        return ret
 
     def delete(self, *args, **kwargs):
         if self.preprint_services.exists():
             raise ValidationError('Cannot delete a used Subject')
-        return super(Subject, self).delete()
+        ret = super(Subject, self).delete()
+        invalidate_subject_tree(self.provider_id)
+        return ret
+
+
+class SubjectTree(object):
+    """The taxonomy of a provider, loaded in one query: its subjects, their
+    parents and children, and the bepress subjects they are aliases of.
+
+    `get_subject_tree` keeps one per provider in memory, so that hierarchies,
+    paths and children are found without recursing through `parent`.
+    """
+    fields = ('id', '_id', 'text', 'parent_id', 'bepress_subject_id', 'provider_id', 'highlighted')
+
+    def __init__(self, provider_id, generation=None):
+        self.provider_id = provider_id
+        self.generation = generation
+        self.loaded = time.time()
+        self.share_title = None
+        self.rows = {}
+        # Children of each subject by id; top level subjects under None
+        self.children = defaultdict(list)
+        rows = Subject.objects.filter(provider_id=provider_id).order_by('text').values(
+            'provider__share_title', 'bepress_subject__text', *self.fields
+        )
+        for row in rows:
+            self.share_title = row.pop('provider__share_title')
+            self.rows[row['id']] = row
+            self.children[row['parent_id']].append(row['id'])
+
+    def __len__(self):
+        return len(self.rows)
+
+    def subject(self, subject_id):
+        """Return the subject with `subject_id`, built without a query."""
+        row = self.rows[subject_id]
+        field_names = [field.attname for field in Subject._meta.concrete_fields if field.attname in self.fields]
+        return Subject.from_db(router.db_for_read(Subject), field_names, [row[name] for name in field_names])
+
+    def ancestor_ids(self, subject_id):
+        """Return the ids of the ancestors of `subject_id`, top level first."""
+        ancestors = []
+        parent_id = self.rows[subject_id]['parent_id']
+        while parent_id in self.rows and parent_id not in ancestors:
+            ancestors.insert(0, parent_id)
+            parent_id = self.rows[parent_id]['parent_id']
+        return ancestors
+
+    def descendant_ids(self, subject_id):
+        descendants, to_visit = [], list(self.children.get(subject_id, ()))
+        while to_visit:
+            child_id = to_visit.pop()
+            if child_id not in descendants:
+                descendants.append(child_id)
+                to_visit.extend(self.children.get(child_id, ()))
+        return descendants
+
+    def path(self, subject_id):
+        texts = [self.rows[ancestor_id]['text'] for ancestor_id in self.ancestor_ids(subject_id)]
+        return '{}|{}'.format(self.share_title, '|'.join(texts + [self.rows[subject_id]['text']]))
+
+
+_subject_trees = {}
+
+
+def _subject_tree_generation_key(provider_id):
+    return 'subject-tree-generation:{}'.format(provider_id)
+
+
+def get_subject_tree(provider_id):
+    """Return the SubjectTree of the provider with `provider_id`.
+
+    Trees are kept by each process and reloaded once the provider's generation,
+    a token in the shared cache replaced whenever one of its subjects is saved,
+    changes or `settings.SUBJECT_TREE_TIMEOUT` passes.
+    """
+    key = _subject_tree_generation_key(provider_id)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        generation = cache.get(key)
+    tree = _subject_trees.get(provider_id)
+    if tree is None or tree.generation != generation or tree.loaded + settings.SUBJECT_TREE_TIMEOUT < time.time():
+        tree = _subject_trees[provider_id] = SubjectTree(provider_id, generation)
+    return tree
+
+
+def invalidate_subject_tree(provider_id):
+    """Reload the provider's SubjectTree in this process, and in the others
+    once the current transaction commits.
+    """
+    _subject_trees.pop(provider_id, None)
+    key = _subject_tree_generation_key(provider_id)
+    transaction.on_commit(lambda: cache.set(key, uuid.uuid4().hex, None))
@@ -37,6 +37,7 @@ from osf.exceptions import reraise_django_validation_errors, MaxRetriesError
 from osf.models.base import BaseModel, GuidMixin, GuidMixinQuerySet
 from osf.models.contributor import Contributor, RecentlyAddedContributor
 from osf.models.institution import Institution
+from osf.models.institution_summary import InstitutionSummary
 from osf.models.mixins import AddonModelMixin
 from osf.models.session import Session
 from osf.models.tag import Tag
@@ -112,7 +113,7 @@ class Email(BaseModel):
 
 class OSFUser(DirtyFieldsMixin, GuidMixin, BaseModel, AbstractBaseUser, PermissionsMixin, AddonModelMixin):
     FIELD_ALIASES = {
-        '_id': 'guids___id',
+        '_id': 'guid_string',
         'system_tags': 'tags',
     }
     settings_type = 'user'  # Needed for addons
@@ -331,13 +332,6 @@ class OSFUser(DirtyFieldsMixin, GuidMixin, BaseModel, AbstractBaseUser, Permissi
     # When the user was disabled.
     date_disabled = NonNaiveDateTimeField(db_index=True, null=True, blank=True)
 
-    # when comments were last viewed
-    comments_viewed_timestamp = DateTimeAwareJSONField(default=dict, blank=True)
-    # Format: {
-    #   'Comment.root_target._id': 'timestamp',
-    #   ...
-    # }
-
     # timezone for user's locale (e.g. 'America/New_York')
     timezone = models.CharField(blank=True, default='Etc/UTC', max_length=255)
 
@@ -613,11 +607,13 @@ class OSFUser(DirtyFieldsMixin, GuidMixin, BaseModel, AbstractBaseUser, Permissi
                 # clear subscriptions for merged user
                 signals.user_merged.send(user, list_name=key, subscription=False, send_goodbye=False)
 
-        for target_id, timestamp in user.comments_viewed_timestamp.iteritems():
-            if not self.comments_viewed_timestamp.get(target_id):
-                self.comments_viewed_timestamp[target_id] = timestamp
-            elif timestamp > self.comments_viewed_timestamp[target_id]:
-                self.comments_viewed_timestamp[target_id] = timestamp
+        from osf.models import CommentReadState
+        last_viewed = dict(self.comment_read_states.values_list('root_target_id', 'last_viewed'))
+        for root_target_id, timestamp in user.comment_read_states.values_list('root_target_id', 'last_viewed'):
+            if root_target_id not in last_viewed or timestamp > last_viewed[root_target_id]:
+                CommentReadState.objects.update_or_create(
+                    user=self, root_target_id=root_target_id, defaults={'last_viewed': timestamp}
+                )
 
         # Give old user's emails to self
         user.emails.update(user=self)
@@ -801,8 +797,11 @@ class OSFUser(DirtyFieldsMixin, GuidMixin, BaseModel, AbstractBaseUser, Permissi
     def save(self, *args, **kwargs):
         self.update_is_active()
         self.username = self.username.lower().strip() if self.username else None
+        first_save = not bool(self.pk)
         dirty_fields = set(self.get_dirty_fields(check_relationship=True))
         ret = super(OSFUser, self).save(*args, **kwargs)
+        if 'is_active' in dirty_fields and not first_save:
+            InstitutionSummary.record_user_activity(self)
         if self.SEARCH_UPDATE_FIELDS.intersection(dirty_fields) and self.is_confirmed:
             self.update_search()
             self.update_search_nodes_contributors()
@@ -1154,7 +1153,7 @@ class OSFUser(DirtyFieldsMixin, GuidMixin, BaseModel, AbstractBaseUser, Permissi
 
         # If another user has this email as its username, get it
         try:
-            unregistered_user = OSFUser.objects.exclude(guids___id=self._id).get(username=email)
+            unregistered_user = OSFUser.objects.exclude(guid_string=self._id).get(username=email)
         except OSFUser.DoesNotExist:
             unregistered_user = None
 
@@ -1197,13 +1196,12 @@ class OSFUser(DirtyFieldsMixin, GuidMixin, BaseModel, AbstractBaseUser, Permissi
         search.update_contributors_async(self.id)
 
     def update_search_nodes(self):
-        """Call `update_search` on all nodes on which the user is a
-        contributor. Needed to add self to contributor lists in search upon
-        registration or claiming.
+        """Update the contributor lists in search of all nodes on which the
+        user is a contributor. Needed to add self to contributor lists in
+        search upon registration or claiming.
 
         """
-        for node in self.contributor_to:
-            node.update_search()
+        self.update_search_nodes_contributors()
 
     def update_date_last_login(self):
         self.date_last_login = timezone.now()
@@ -1473,7 +1471,9 @@ class OSFUser(DirtyFieldsMixin, GuidMixin, BaseModel, AbstractBaseUser, Permissi
         """ Returns the timestamp for when comments were last viewed on a node, file or wiki.
         """
         default_timestamp = dt.datetime(1970, 1, 1, 12, 0, 0, tzinfo=pytz.utc)
-        return self.comments_viewed_timestamp.get(target_id, default_timestamp)
+        return self.comment_read_states.filter(
+            root_target___id=target_id
+        ).values_list('last_viewed', flat=True).first() or default_timestamp
 
     class Meta:
         # custom permissions for use in the OSF Admin App
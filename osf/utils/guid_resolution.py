@@ -0,0 +1,157 @@
+"""
+A shared cache for resolving guids to their referents.
+
+Resolving ``/<guid>/`` normally costs a ``Guid`` lookup, a content type lookup
+and a fetch of the referent row, just to find out where the guid should be
+routed. The cache splits that information into two entries:
+
+* ``guid:<_id>`` maps a guid to its ``(content_type_id, object_id)``. It only
+  changes when the ``Guid`` row itself is repointed or deleted.
+* ``guid-referent:<content_type_id>:<object_id>`` holds the deleted flag and
+  the URLs (e.g. ``deep_url``, ``absolute_api_v2_url``) of the referent. It is
+  invalidated whenever the referent is saved or deleted.
+
+Both the Flask resolver (``website.views.resolve_guid``) and the API
+``GuidDetail`` view resolve through here; lists of rows pointing to guids load
+their referents in bulk with `attach_referents`.
+"""
+from collections import defaultdict
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+
+from website import settings
+
+GUID_KEY = 'guid:{}'
+REFERENT_KEY = 'guid-referent:{}:{}'
+
+
+class GuidResolution(object):
+    """The cached routing information for a single guid. The referent itself
+    is only fetched when it is actually needed.
+    """
+
+    def __init__(self, guid, content_type_id, object_id, deleted, url, referent=None):
+        self.guid = guid
+        self.content_type_id = content_type_id
+        self.object_id = object_id
+        self.deleted = deleted
+        self.url = url
+        self._referent = referent
+
+    @property
+    def model(self):
+        return ContentType.objects.get_for_id(self.content_type_id).model_class()
+
+    @property
+    def referent(self):
+        if self._referent is None:
+            self._referent = self.model._base_manager.filter(pk=self.object_id).first()
+        return self._referent
+
+
+def _guid_key(guid):
+    # Guid._id is a LowercaseCharField, so lookups are case insensitive
+    return GUID_KEY.format(guid.lower())
+
+
+def _referent_key(content_type_id, object_id):
+    return REFERENT_KEY.format(content_type_id, object_id)
+
+
+def resolve(guid, url_attr='deep_url'):
+    """Resolve ``guid`` to a `GuidResolution`, filling the cache on first use.
+
+    :param str guid: The guid to resolve
+    :param str url_attr: The referent attribute holding the URL to route to
+    :return: A `GuidResolution`, or None if the guid or its referent does not exist
+    """
+    Guid = apps.get_model('osf.Guid')
+    if not guid:
+        return None
+
+    pointer = cache.get(_guid_key(guid))
+    if pointer is None:
+        guid_object = Guid.load(guid)
+        if guid_object is None or guid_object.object_id is None:
+            return None
+        pointer = (guid_object.content_type_id, guid_object.object_id)
+        cache.set(_guid_key(guid), pointer, settings.GUID_RESOLUTION_CACHE_TIMEOUT)
+
+    content_type_id, object_id = pointer
+    referent_key = _referent_key(content_type_id, object_id)
+    entry = cache.get(referent_key) or {}
+    referent = None
+    if url_attr not in entry:
+        resolution = GuidResolution(guid, content_type_id, object_id, None, None)
+        referent = resolution.referent
+        if referent is None:
+            return None
+        entry['deleted'] = bool(getattr(referent, 'is_deleted', False))
+        entry[url_attr] = getattr(referent, url_attr, None)
+        cache.set(referent_key, entry, settings.GUID_RESOLUTION_CACHE_TIMEOUT)
+
+    return GuidResolution(guid, content_type_id, object_id, entry['deleted'], entry[url_attr], referent=referent)
+
+
+def load_referents(guids):
+    """Resolve many guids at once, with one query per content type rather than
+    one per guid.
+
+    :param list guids: The guids to resolve
+    :return dict: Mapping of (lower-cased) guid to referent; unresolvable guids are omitted
+    """
+    Guid = apps.get_model('osf.Guid')
+    guids = [guid.lower() for guid in guids]
+    pointers = cache.get_many([_guid_key(guid) for guid in guids])
+    by_content_type = defaultdict(dict)
+    missing = []
+    for guid in guids:
+        pointer = pointers.get(_guid_key(guid))
+        if pointer is None:
+            missing.append(guid)
+        else:
+            by_content_type[pointer[0]][pointer[1]] = guid
+
+    if missing:
+        found = list(Guid.objects.filter(_id__in=missing, object_id__isnull=False).values_list('_id', 'content_type_id', 'object_id'))
+        for guid, content_type_id, object_id in found:
+            by_content_type[content_type_id][object_id] = guid
+        cache.set_many(
+            {_guid_key(guid): (content_type_id, object_id) for guid, content_type_id, object_id in found},
+            settings.GUID_RESOLUTION_CACHE_TIMEOUT
+        )
+
+    referents = {}
+    for content_type_id, guids_by_object_id in by_content_type.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        if model is None:
+            continue
+        for obj in model._base_manager.filter(pk__in=guids_by_object_id.keys()):
+            referents[guids_by_object_id[obj.pk]] = obj
+    return referents
+
+
+def attach_referents(guids):
+    """Load the referents of many `Guid` objects with `load_referents`, so that
+    reading their ``referent`` needs no further query, e.g. for a page of rows
+    that each point to a guid.
+
+    :param list guids: `Guid` objects; ``None`` entries are skipped
+    """
+    guids = [guid for guid in guids if guid is not None]
+    referents = load_referents([guid._id for guid in guids])
+    for guid in guids:
+        referent = referents.get(guid._id.lower())
+        if referent is not None:
+            guid.referent = referent
+
+
+def invalidate_guid(guid):
+    cache.delete(_guid_key(guid))
+
+
+def invalidate_referent(instance):
+    content_type = ContentType.objects.get_for_model(instance)
+    cache.delete(_referent_key(content_type.id, instance.pk))
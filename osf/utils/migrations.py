@@ -133,3 +133,212 @@ def remove_schemas(*args):
     MetaSchema.objects.all().delete()
 
     logger.info('Removed {} schemas from the database'.format(pre_count))
+
+
+def backfill_guid_string(state, app_label, model_name, batch_size=10000):
+    """Copy the primary Guid._id of every row of a GuidMixin model onto its
+    denormalized `guid_string` column, in batches of primary keys.
+    """
+    from django.db import connection
+
+    ContentType = state.get_model('contenttypes', 'contenttype')
+    Model = state.get_model(app_label, model_name)
+    content_type = ContentType.objects.filter(app_label=app_label, model=model_name).first()
+    if content_type is None:
+        return
+    table = Model._meta.db_table
+    sql = """
+        UPDATE {table}
+        SET guid_string = primary_guid._id
+        FROM (
+            SELECT DISTINCT ON (object_id) object_id, _id
+            FROM osf_guid
+            WHERE content_type_id = %s AND object_id >= %s AND object_id < %s
+            ORDER BY object_id, created DESC
+        ) AS primary_guid
+        WHERE {table}.id = primary_guid.object_id;
+    """.format(table=table)
+    max_id = Model.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    with connection.cursor() as cursor:
+        for start in range(0, max_id + 1, batch_size):
+            cursor.execute(sql, [content_type.id, start, start + batch_size])
+            logger.info('Backfilled {}.guid_string for ids [{}, {})'.format(table, start, start + batch_size))
+
+
+def backfill_node_ancestors(state, batch_size=10000):
+    """(Re)build the NodeAncestor closure table from the primary NodeRelations,
+    in batches of descendant ids. Existing rows are kept; missing ones are added.
+    """
+    from django.db import connection
+
+    NodeAncestor = state.get_model('osf', 'nodeancestor')
+    NodeRelation = state.get_model('osf', 'noderelation')
+    AbstractNode = state.get_model('osf', 'abstractnode')
+    sql = """
+        WITH RECURSIVE ancestors (ancestor_id, descendant_id, depth, path) AS (
+            SELECT parent_id, child_id, 1, ARRAY[child_id, parent_id]
+            FROM {noderelation}
+            WHERE is_node_link IS FALSE AND child_id >= %s AND child_id < %s
+          UNION ALL
+            SELECT R.parent_id, A.descendant_id, A.depth + 1, A.path || R.parent_id
+            FROM ancestors AS A
+              JOIN {noderelation} AS R ON R.child_id = A.ancestor_id
+            WHERE R.is_node_link IS FALSE
+              -- Guard against cycles in bad data
+              AND NOT R.parent_id = ANY(A.path)
+        )
+        INSERT INTO {nodeancestor} (ancestor_id, descendant_id, depth)
+        SELECT DISTINCT ON (ancestor_id, descendant_id) ancestor_id, descendant_id, depth
+        FROM ancestors
+        ORDER BY ancestor_id, descendant_id, depth
+        ON CONFLICT (ancestor_id, descendant_id) DO NOTHING;
+    """.format(noderelation=NodeRelation._meta.db_table, nodeancestor=NodeAncestor._meta.db_table)
+    max_id = AbstractNode.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    with connection.cursor() as cursor:
+        for start in range(0, max_id + 1, batch_size):
+            cursor.execute(sql, [start, start + batch_size])
+            logger.info('Backfilled node ancestors for descendant ids [{}, {})'.format(start, start + batch_size))
+
+
+def compress_wiki_versions(state, batch_size=500):
+    """Store wiki page versions as deltas against periodic full snapshots, as
+    NodeWikiPage.set_content does for new versions, in batches of node ids.
+    Versions that are already deltas are left alone.
+    """
+    from django.db import connection
+    from addons.wiki.utils import make_delta
+
+    AbstractNode = state.get_model('osf', 'abstractnode')
+    NodeWikiPage = state.get_model('addons_wiki', 'nodewikipage')
+    sql = """
+        UPDATE {table}
+        SET content = '', delta = %s, snapshot_id = %s
+        WHERE id = %s;
+    """.format(table=NodeWikiPage._meta.db_table)
+    max_id = AbstractNode.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    with connection.cursor() as cursor:
+        for start in range(0, max_id + 1, batch_size):
+            chains = [
+                versions
+                for node_versions in AbstractNode.objects.filter(
+                    id__gte=start, id__lt=start + batch_size
+                ).exclude(wiki_pages_versions={}).values_list('wiki_pages_versions', flat=True)
+                for versions in node_versions.values()
+            ]
+            pages = {
+                page['guid_string']: page
+                for page in NodeWikiPage.objects.filter(
+                    guid_string__in=[wiki_id for versions in chains for wiki_id in versions]
+                ).values('id', 'guid_string', 'version', '_content', 'snapshot_id')
+            }
+            updates = []
+            for versions in chains:
+                snapshot = None
+                for wiki_id in versions:
+                    page = pages.get(wiki_id)
+                    if page is None or page['snapshot_id'] is not None:
+                        continue
+                    delta = snapshot and make_delta(page['_content'], page['version'], snapshot['_content'], snapshot['version'])
+                    if delta is None:
+                        snapshot = page
+                    else:
+                        updates.append([connection.Database.Binary(delta), snapshot['id'], page['id']])
+            cursor.executemany(sql, updates)
+            logger.info('Compressed {} wiki versions for node ids [{}, {})'.format(len(updates), start, start + batch_size))
+
+
+def decompress_wiki_versions(state, batch_size=10000):
+    """Store every wiki page version in full again."""
+    from addons.wiki.utils import patch_content
+
+    NodeWikiPage = state.get_model('addons_wiki', 'nodewikipage')
+    max_id = NodeWikiPage.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    for start in range(0, max_id + 1, batch_size):
+        pages = NodeWikiPage.objects.filter(
+            id__gte=start, id__lt=start + batch_size, snapshot__isnull=False
+        ).select_related('snapshot')
+        for page in pages:
+            NodeWikiPage.objects.filter(id=page.id).update(
+                _content=patch_content(page.snapshot._content, page.delta), delta=None, snapshot=None
+            )
+        logger.info('Decompressed wiki versions for ids [{}, {})'.format(start, start + batch_size))
+
+
+def copy_comments_viewed_timestamps(state, batch_size=10000):
+    """Copy OSFUser.comments_viewed_timestamp into the CommentReadState table,
+    in batches of user ids. Timestamps of root targets that no longer exist are
+    dropped.
+    """
+    from django.db import connection
+
+    OSFUser = state.get_model('osf', 'osfuser')
+    CommentReadState = state.get_model('osf', 'commentreadstate')
+    Guid = state.get_model('osf', 'guid')
+    sql = """
+        INSERT INTO {readstate} (created, modified, user_id, root_target_id, last_viewed)
+        SELECT now(), now(), U.id, G.id, MAX((V.value ->> 'value')::timestamptz)
+        FROM {user} AS U
+          CROSS JOIN LATERAL jsonb_each(U.comments_viewed_timestamp) AS V
+          JOIN {guid} AS G ON G._id = lower(V.key)
+        WHERE U.id >= %s AND U.id < %s
+          AND jsonb_typeof(V.value) = 'object'
+          AND V.value ->> 'type' = 'encoded_datetime'
+        GROUP BY U.id, G.id
+        ON CONFLICT (user_id, root_target_id) DO NOTHING;
+    """.format(readstate=CommentReadState._meta.db_table, user=OSFUser._meta.db_table, guid=Guid._meta.db_table)
+    max_id = OSFUser.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    with connection.cursor() as cursor:
+        for start in range(0, max_id + 1, batch_size):
+            cursor.execute(sql, [start, start + batch_size])
+            logger.info('Copied comment read state for user ids [{}, {})'.format(start, start + batch_size))
+
+
+def restore_comments_viewed_timestamps(state, batch_size=10000):
+    """Rebuild OSFUser.comments_viewed_timestamp from the CommentReadState table."""
+    from django.db import connection
+
+    OSFUser = state.get_model('osf', 'osfuser')
+    CommentReadState = state.get_model('osf', 'commentreadstate')
+    Guid = state.get_model('osf', 'guid')
+    sql = """
+        UPDATE {user} AS U
+        SET comments_viewed_timestamp = R.viewed
+        FROM (
+            SELECT S.user_id, jsonb_object_agg(G._id, jsonb_build_object(
+                'type', 'encoded_datetime',
+                'value', to_char(S.last_viewed AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS.US"+00:00"')
+            )) AS viewed
+            FROM {readstate} AS S
+              JOIN {guid} AS G ON G.id = S.root_target_id
+            WHERE S.user_id >= %s AND S.user_id < %s
+            GROUP BY S.user_id
+        ) AS R
+        WHERE U.id = R.user_id;
+    """.format(readstate=CommentReadState._meta.db_table, user=OSFUser._meta.db_table, guid=Guid._meta.db_table)
+    max_id = OSFUser.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    with connection.cursor() as cursor:
+        for start in range(0, max_id + 1, batch_size):
+            cursor.execute(sql, [start, start + batch_size])
+            logger.info('Restored comments_viewed_timestamp for user ids [{}, {})'.format(start, start + batch_size))
+
+
+def backfill_preprint_publicly_listable(state, batch_size=10000):
+    """Compute PreprintService.is_publicly_listable from is_published and the
+    node's is_public and is_deleted, in batches of preprint ids.
+    """
+    from django.db import connection
+
+    PreprintService = state.get_model('osf', 'preprintservice')
+    AbstractNode = state.get_model('osf', 'abstractnode')
+    sql = """
+        UPDATE {preprint} AS P
+        SET is_publicly_listable = COALESCE(P.is_published AND (
+            SELECT N.is_public AND NOT N.is_deleted FROM {node} AS N WHERE N.id = P.node_id
+        ), FALSE)
+        WHERE P.id >= %s AND P.id < %s;
+    """.format(preprint=PreprintService._meta.db_table, node=AbstractNode._meta.db_table)
+    max_id = PreprintService.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    with connection.cursor() as cursor:
+        for start in range(0, max_id + 1, batch_size):
+            cursor.execute(sql, [start, start + batch_size])
+            logger.info('Backfilled is_publicly_listable for preprint ids [{}, {})'.format(start, start + batch_size))
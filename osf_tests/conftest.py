@@ -1,6 +1,7 @@
 import logging
 
 import pytest
+from django.core.cache import cache
 from faker import Factory
 
 from framework.django.handlers import handlers as django_handlers
@@ -74,6 +75,11 @@ def patched_settings():
     settings.ENABLE_EMAIL_SUBSCRIPTIONS = False
     settings.BCRYPT_LOG_ROUNDS = 1
 
+@pytest.fixture(autouse=True)
+def clear_shared_cache():
+    """The shared cache outlives the per-test transaction, so start each test empty"""
+    cache.clear()
+
 @pytest.fixture()
 def fake():
     return Factory.create()
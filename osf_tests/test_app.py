@@ -38,6 +38,7 @@ def test_attach_handlers():
         framework.django.handlers.close_old_django_db_connections,
         framework.celery_tasks.handlers.celery_teardown_request,
         framework.transactions.handlers.transaction_teardown_request,
+        framework.postcommit_tasks.handlers.postcommit_teardown_request,
     }
 
     # Check that necessary handlers are attached and correctly ordered
@@ -2,6 +2,8 @@ import pytest
 from collections import OrderedDict
 
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from addons.box.models import BoxFile
 from addons.dropbox.models import DropboxFile
@@ -16,7 +18,7 @@ from website.project.views.comment import update_file_guid_referent
 from website.project.signals import comment_added, mention_added, contributor_added
 from framework.exceptions import PermissionsError
 from tests.base import capture_signals
-from osf.models import Comment, NodeLog, Guid, BaseFileNode
+from osf.models import Comment, CommentReadState, NodeLog, Guid, BaseFileNode
 from framework.auth.core import Auth
 from .factories import (
     CommentFactory,
@@ -384,6 +386,40 @@ class TestCommentModel:
         n_unread = Comment.find_n_unread(user=user, node=project, page='node')
         assert n_unread == 0
 
+    def test_find_unread_since_last_viewed(self):
+        project = ProjectFactory()
+        user = UserFactory()
+        project.add_contributor(user, save=True)
+        CommentFactory(node=project, user=project.creator)
+        CommentReadState.mark_viewed(user, Guid.load(project._id))
+        assert Comment.find_n_unread(user=user, node=project, page='node') == 0
+
+        CommentFactory(node=project, user=project.creator)
+        assert Comment.find_n_unread(user=user, node=project, page='node') == 1
+
+    def test_find_unread_bulk(self):
+        user = UserFactory()
+        projects = [ProjectFactory() for _ in range(4)]
+        for project in projects[:3]:
+            project.add_contributor(user, save=True)
+        for project in projects:
+            CommentFactory(node=project, user=project.creator)
+            CommentFactory(node=project, user=project.creator)
+        CommentFactory(node=projects[1], user=user)
+        CommentReadState.mark_viewed(user, Guid.load(projects[2]._id))
+        CommentFactory(node=projects[2], user=projects[2].creator)
+
+        with CaptureQueriesContext(connection) as ctx:
+            counts = Comment.find_n_unread_bulk(user, [(project, project._id) for project in projects])
+        assert len(ctx.captured_queries) == 3
+        assert counts == {
+            projects[0]._id: 2,
+            projects[1]._id: 2,
+            projects[2]._id: 1,
+            # Not a contributor
+            projects[3]._id: 0,
+        }
+
 
 # copied from tests/test_comments.py
 class FileCommentMoveRenameTestMixin(object):
@@ -37,6 +37,76 @@ class TestGuid:
         assert obj._id
         assert len(obj._id) == 5
 
+    @pytest.mark.parametrize('Factory',
+    [
+        UserFactory,
+        NodeFactory,
+        PreprintFactory,
+    ])
+    def test_guid_string_is_denormalized_on_creation(self, Factory):
+        obj = Factory()
+        guid = Guid.objects.get(object_id=obj.id, content_type__model=obj._meta.concrete_model._meta.model_name)
+        assert obj.guid_string == guid._id
+        obj.refresh_from_db()
+        assert obj.guid_string == guid._id
+        assert obj._id == guid._id
+
+    @pytest.mark.parametrize('Factory',
+    [
+        UserFactory,
+        NodeFactory,
+    ])
+    def test_newest_guid_becomes_primary(self, Factory):
+        obj = Factory()
+        old_id = obj._id
+        new_guid = Guid.objects.create(referent=obj)
+
+        obj = Factory._meta.model.objects.get(id=obj.id)
+        assert obj.guid_string == new_guid._id
+        assert obj._id == new_guid._id
+        # Secondary guids still resolve
+        assert Factory._meta.model.load(old_id) == obj
+        assert Factory._meta.model.load(new_guid._id) == obj
+
+    def test_deleted_guid_is_no_longer_primary(self):
+        obj = UserFactory()
+        old_id = obj._id
+        new_guid = Guid.objects.create(referent=obj)
+        new_guid.delete()
+
+        obj = OSFUser.objects.get(id=obj.id)
+        assert obj.guid_string == old_id
+        assert OSFUser.load(new_guid._id) is None
+
+        Guid.objects.get(_id=old_id).delete()
+        assert OSFUser.objects.get(id=obj.id).guid_string is None
+
+    def test_repointed_guid_is_no_longer_primary(self):
+        user, other = UserFactory(), UserFactory()
+        old_id = user._id
+        new_guid = Guid.objects.create(referent=user)
+        new_guid.referent = other
+        new_guid.save()
+
+        assert OSFUser.objects.get(id=user.id).guid_string == old_id
+        assert OSFUser.objects.get(id=other.id).guid_string == new_guid._id
+        assert OSFUser.load(new_guid._id) == other
+
+    @pytest.mark.django_assert_num_queries
+    def test_load_uses_guid_string(self, django_assert_num_queries):
+        user = UserFactory()
+        with django_assert_num_queries(1):
+            loaded = OSFUser.load(user._id)
+            assert loaded._id == user._id
+
+    def test_cloned_node_gets_its_own_guid_string(self):
+        node = NodeFactory()
+        fork = node.clone()
+        assert fork.guid_string is None
+        fork.save()
+        assert fork.guid_string
+        assert fork.guid_string != node.guid_string
+
 @pytest.mark.django_db
 class TestReferent:
 
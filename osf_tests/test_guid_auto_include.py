@@ -19,7 +19,7 @@ class TestGuidAutoInclude:
     @pytest.mark.parametrize('Factory', guid_factories)
     def test_filter_object(self, Factory):
         obj = Factory()
-        assert '__guids' in str(obj._meta.model.objects.filter(id=obj.id).query), 'Guids were not included in filter query for {}'.format(obj._meta.model.__name__)
+        assert '__guids' not in str(obj._meta.model.objects.filter(id=obj.id).query), 'Guids were needlessly included in filter query for {}'.format(obj._meta.model.__name__)
 
     @pytest.mark.parametrize('Factory', guid_factories)
     @pytest.mark.django_assert_num_queries
@@ -0,0 +1,101 @@
+import pytest
+
+from osf.models import Guid
+from osf.utils import guid_resolution
+from osf_tests.factories import (
+    CommentFactory,
+    NodeFactory,
+    PreprintFactory,
+    ProjectFactory,
+    UserFactory,
+)
+
+
+@pytest.mark.django_db
+class TestGuidResolution:
+
+    def test_resolve_node(self):
+        node = NodeFactory()
+        resolution = guid_resolution.resolve(node._id)
+        assert resolution.object_id == node.id
+        assert resolution.url == node.deep_url
+        assert resolution.deleted is False
+        assert resolution.referent == node
+
+    def test_resolve_is_case_insensitive(self):
+        node = NodeFactory()
+        assert guid_resolution.resolve(node._id.upper()).object_id == node.id
+
+    def test_resolve_api_url(self):
+        user = UserFactory()
+        resolution = guid_resolution.resolve(user._id, url_attr='absolute_api_v2_url')
+        assert resolution.url == user.absolute_api_v2_url
+
+    def test_resolve_unknown_guid(self):
+        assert guid_resolution.resolve('notaguid') is None
+        assert guid_resolution.resolve(None) is None
+
+    @pytest.mark.django_assert_num_queries
+    def test_cached_resolution_does_not_query(self, django_assert_num_queries):
+        node = NodeFactory()
+        guid_resolution.resolve(node._id)
+        with django_assert_num_queries(0):
+            resolution = guid_resolution.resolve(node._id)
+            assert resolution.url == node.deep_url
+
+    def test_saving_referent_invalidates(self):
+        node = NodeFactory()
+        assert guid_resolution.resolve(node._id).deleted is False
+        node.is_deleted = True
+        node.save()
+        assert guid_resolution.resolve(node._id).deleted is True
+
+    def test_repointing_guid_invalidates(self):
+        node = NodeFactory()
+        other = NodeFactory()
+        guid_resolution.resolve(node._id)
+
+        guid = Guid.load(node._id)
+        guid.object_id = other.id
+        guid.save()
+        assert guid_resolution.resolve(guid._id).object_id == other.id
+
+    def test_deleting_guid_invalidates(self):
+        node = NodeFactory()
+        guid_id = node._id
+        guid_resolution.resolve(guid_id)
+        Guid.load(guid_id).delete()
+        assert guid_resolution.resolve(guid_id) is None
+
+
+@pytest.mark.django_db
+class TestLoadReferents:
+
+    def test_load_referents(self):
+        nodes = [ProjectFactory() for _ in range(3)]
+        users = [UserFactory() for _ in range(2)]
+        preprint = PreprintFactory()
+        guids = [obj._id for obj in nodes + users + [preprint]]
+
+        referents = guid_resolution.load_referents(guids + ['notaguid'])
+        assert set(referents.keys()) == set(guids)
+        for obj in nodes + users + [preprint]:
+            assert referents[obj._id] == obj
+
+    @pytest.mark.django_assert_num_queries
+    def test_load_referents_groups_by_content_type(self, django_assert_num_queries):
+        objects = [ProjectFactory() for _ in range(3)] + [UserFactory() for _ in range(3)] + [CommentFactory()]
+        guids = [obj._id for obj in objects]
+        # One query for the guids, then one per content type
+        with django_assert_num_queries(4):
+            guid_resolution.load_referents(guids)
+        # Guid pointers are cached, leaving one query per content type
+        with django_assert_num_queries(3):
+            guid_resolution.load_referents(guids)
+
+    def test_attach_referents(self, django_assert_num_queries):
+        objects = [ProjectFactory(), UserFactory(), CommentFactory()]
+        guids = list(Guid.objects.filter(_id__in=[obj._id for obj in objects]))
+        guid_resolution.attach_referents(guids + [None])
+        with django_assert_num_queries(0):
+            assert {guid.referent for guid in guids} == set(objects)
@@ -0,0 +1,156 @@
+import datetime
+
+import mock
+import pytest
+from django.utils import timezone
+
+from framework.auth import Auth
+from osf.models import InstitutionSummary
+from website.institutions.tasks import reconcile_institution_summaries
+from api_tests.utils import create_test_file
+
+from .factories import (
+    AuthUserFactory,
+    InstitutionFactory,
+    PreprintFactory,
+    ProjectFactory,
+    RegistrationFactory,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture()
+def institution():
+    institution = InstitutionFactory()
+    # Start counting from an empty summary
+    InstitutionSummary.get_latest(institution.id)
+    return institution
+
+
+@pytest.fixture()
+def user(institution):
+    user = AuthUserFactory()
+    user.affiliated_institutions.add(institution)
+    return user
+
+
+@pytest.fixture()
+def project(institution, user):
+    project = ProjectFactory(creator=user)
+    project.affiliated_institutions.add(institution)
+    return project
+
+
+def assert_counted(institution, **expected):
+    """The incremental counts match a recount, and the `expected` counts."""
+    summary = InstitutionSummary.get_latest(institution.id)
+    assert summary.date == timezone.now().date()
+    recount = InstitutionSummary.compute(institution.id)
+    assert summary.counts == recount
+    for field, value in expected.items():
+        assert recount[field] == value
+
+
+class TestInstitutionSummary:
+
+    def test_new_institution_is_counted_on_first_read(self):
+        institution = InstitutionFactory()
+        project = ProjectFactory(is_public=True)
+        project.affiliated_institutions.add(institution)
+        assert not InstitutionSummary.objects.filter(institution=institution).exists()
+        assert_counted(institution, public_nodes=1)
+
+    def test_users(self, institution, user):
+        other = AuthUserFactory()
+        institution.osfuser_set.add(other)
+        assert_counted(institution, users=2)
+
+        other.is_disabled = True
+        other.save()
+        assert_counted(institution, users=1)
+
+        user.affiliated_institutions.remove(institution)
+        user.affiliated_institutions.remove(institution)
+        assert_counted(institution, users=0)
+
+    def test_nodes(self, institution, project):
+        assert_counted(institution, private_nodes=1)
+
+        project.set_privacy('public', auth=Auth(project.creator))
+        assert_counted(institution, public_nodes=1, private_nodes=0)
+
+        component = ProjectFactory(creator=project.creator, parent=project)
+        institution.nodes.add(component)
+        assert_counted(institution, public_nodes=1, private_nodes=1)
+
+        component.remove_node(Auth(project.creator))
+        assert_counted(institution, public_nodes=1, private_nodes=0)
+
+        project.affiliated_institutions.clear()
+        assert_counted(institution, public_nodes=0)
+
+    def test_registrations(self, institution, project):
+        registration = RegistrationFactory(project=project, creator=project.creator)
+        assert registration.affiliated_institutions.filter(id=institution.id).exists()
+        assert_counted(institution, private_nodes=1, private_registrations=1)
+
+        registration.is_public = True
+        registration.save()
+        assert_counted(institution, public_registrations=1, private_registrations=0)
+
+    def test_preprints(self, institution, user):
+        preprint = PreprintFactory(creator=user, is_published=False)
+        preprint.node.affiliated_institutions.add(institution)
+        assert_counted(institution, preprints=0)
+
+        preprint.set_published(True, auth=Auth(user), save=True)
+        assert_counted(institution, preprints=1)
+
+        preprint.node.is_deleted = True
+        preprint.node.save()
+        assert_counted(institution, preprints=0, public_nodes=0)
+
+    def test_bytes_stored(self, institution, project, user):
+        test_file = create_test_file(project, user)
+        assert_counted(institution, bytes_stored=1337)
+
+        version = test_file.versions.first()
+        test_file.versions.remove(version)
+        assert_counted(institution, bytes_stored=0)
+
+        test_file.versions.add(version)
+        other = ProjectFactory(creator=user)
+        create_test_file(other, user)
+        other.affiliated_institutions.add(institution)
+        assert_counted(institution, bytes_stored=2 * 1337)
+
+        other.affiliated_institutions.remove(institution)
+        project.is_deleted = True
+        project.save()
+        assert_counted(institution, bytes_stored=0, private_nodes=0)
+
+    def test_changes_carry_forward_the_latest_counts(self, institution, project):
+        summary = InstitutionSummary.get_latest(institution.id)
+        yesterday = summary.date - datetime.timedelta(days=1)
+        summary.date = yesterday
+        summary.save()
+
+        ProjectFactory(creator=project.creator).affiliated_institutions.add(institution)
+        assert list(InstitutionSummary.objects.filter(institution=institution).order_by('date').values_list('private_nodes', flat=True)) == [1, 2]
+        assert InstitutionSummary.get_latest(institution.id, date=yesterday).private_nodes == 1
+        assert_counted(institution, private_nodes=2)
+
+    def test_reconcile_corrects_drift(self, institution, project):
+        InstitutionSummary.objects.filter(institution=institution).update(private_nodes=5)
+        assert InstitutionSummary.reconcile(institution.id) == {'private_nodes': (5, 1)}
+        assert InstitutionSummary.reconcile(institution.id) == {}
+        assert_counted(institution, private_nodes=1)
+
+    def test_reconcile_task(self, institution, project):
+        InstitutionFactory()
+        InstitutionSummary.objects.filter(institution=institution).update(users=0)
+        with mock.patch('website.institutions.tasks.logger.warning') as mock_warning:
+            assert reconcile_institution_summaries() == 1
+        assert mock_warning.call_count == 1
+        assert_counted(institution, users=1)
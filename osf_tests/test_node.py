@@ -1,5 +1,7 @@
 import datetime
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 import mock
 import pytest
@@ -7,16 +9,17 @@ import pytz
 import random
 import string
 from framework.celery_tasks import handlers
+from framework.postcommit_tasks import handlers as postcommit_handlers
 from framework.exceptions import PermissionsError
 from framework.sessions import set_session
 from website.util.permissions import READ, WRITE, ADMIN, expand_permissions, DEFAULT_CONTRIBUTOR_PERMISSIONS
 from website.project.model import has_anonymous_link
-from website.project.signals import contributor_added, contributor_removed, after_create_registration
+from website.project.signals import contributor_added, contributors_added, contributor_removed, after_create_registration
 from website.exceptions import NodeStateError
 from website.util import permissions, disconnected_from_listeners, api_url_for, web_url_for
 from website.citations.utils import datetime_to_csl
 from website import language, settings
-from website.project.tasks import on_node_updated
+from website.project.tasks import on_node_updated, drain_share_outbox
 
 from osf.models import (
     AbstractNode,
@@ -27,6 +30,9 @@ from osf.models import (
     MetaSchema,
     Sanction,
     NodeRelation,
+    NodeAncestor,
+    Guid,
+    ShareOutboxEntry,
     Registration,
     DraftRegistration,
     DraftRegistrationApproval,
@@ -849,6 +855,49 @@ class TestContributorMethods:
             [user1._id, user2._id]
         )
 
+    def test_add_contributors_appends_in_order(self, node, auth):
+        users = [UserFactory() for _ in range(3)]
+        node.add_contributors(
+            [{'user': user, 'permissions': ['read'], 'visible': True} for user in users],
+            auth=auth
+        )
+        assert list(node.contributors)[-3:] == users
+        orders = list(node.contributor_set.order_by('_order').values_list('_order', flat=True))
+        assert orders == range(len(orders))
+
+    def test_add_contributors_skips_existing(self, node, auth):
+        user = UserFactory()
+        node.add_contributor(user, permissions=['read'], auth=auth)
+        added = node.add_contributors(
+            [{'user': user, 'permissions': ['read', 'write'], 'visible': True}],
+            auth=auth
+        )
+        assert added == []
+        assert node.contributor_set.filter(user=user).count() == 1
+        assert node.get_permissions(user) == [permissions.READ, permissions.WRITE]
+
+    def test_add_contributors_trims_recently_added(self, node, user, auth):
+        users = [UserFactory() for _ in range(node.MAX_RECENT_LENGTH + 5)]
+        node.add_contributors(
+            [{'user': u, 'permissions': ['read'], 'visible': True} for u in users],
+            auth=auth
+        )
+        assert user.recently_added.count() == node.MAX_RECENT_LENGTH
+
+    def test_add_contributors_query_count_is_constant(self, node, auth):
+        def count_queries(n):
+            contributors = [
+                {'user': UserFactory(), 'permissions': ['read', 'write'], 'visible': True}
+                for _ in range(n)
+            ]
+            with CaptureQueriesContext(connection) as ctx:
+                node.add_contributors(contributors, auth=auth, save=True)
+            return len(ctx.captured_queries)
+
+        # Warm up caches, e.g. of content types
+        count_queries(1)
+        assert count_queries(2) == count_queries(20)
+
     def test_cant_add_creator_as_contributor_twice(self, node, user):
         node.add_contributor(contributor=user)
         node.save()
@@ -1189,7 +1238,7 @@ class TestContributorAddedSignal:
         return None
 
     @mock.patch('website.project.views.contributor.mails.send_mail')
-    def test_add_contributors_sends_contributor_added_signal(self, mock_send_mail, node, auth):
+    def test_add_contributors_sends_contributors_added_signal(self, mock_send_mail, node, auth):
         user = UserFactory()
         contributors = [{
             'user': user,
@@ -1200,7 +1249,7 @@ class TestContributorAddedSignal:
             node.add_contributors(contributors=contributors, auth=auth)
             node.save()
             assert node.is_contributor(user)
-            assert mock_signals.signals_sent() == set([contributor_added])
+            assert mock_signals.signals_sent() == set([contributors_added])
 
 
 class TestContributorVisibility:
@@ -3031,6 +3080,12 @@ class TestLogMethods:
         # one more log for adding the node link
         assert n_logs_after == n_logs_before + 1
 
+    def test_get_aggregate_logs_queryset_uses_subquery(self, parent, node, auth):
+        sql = str(parent.get_aggregate_logs_queryset(auth).query)
+        # Child ids are resolved by the database, not inlined into the query
+        assert 'SELECT' in sql.split('WHERE', 1)[1]
+        assert '{})'.format(node.id) not in sql
+
 # copied from tests/test_notifications.py
 class TestHasPermissionOnChildren:
 
@@ -3344,11 +3399,16 @@ class TestOnNodeUpdate:
 
     def teardown_method(self, method):
         handlers.celery_before_request()
+        postcommit_handlers.postcommit_before_request()
+        postcommit_handlers.postcommit_teardown_request()
 
     @mock.patch('osf.models.node.enqueue_task')
     def test_enqueue_called(self, enqueue_task, node, user, request_context):
+        postcommit_handlers.postcommit_before_request()
         node.title = 'A new title'
         node.save()
+        assert not enqueue_task.called
+        postcommit_handlers.flush_postcommit_side_effects()
 
         (task, ) = enqueue_task.call_args[0]
 
@@ -3358,11 +3418,52 @@ class TestOnNodeUpdate:
         assert task.args[2] is False
         assert 'title' in task.args[3]
 
+    @mock.patch('osf.models.node.enqueue_task')
+    def test_enqueue_called_once_per_request(self, enqueue_task, node, user, request_context):
+        postcommit_handlers.postcommit_before_request()
+        node.title = 'A new title'
+        node.save()
+        node.description = 'A new description'
+        node.save()
+        node.update_search()
+        postcommit_handlers.flush_postcommit_side_effects()
+
+        (task, ) = enqueue_task.call_args[0]
+        assert enqueue_task.call_count == 1
+        assert task.task == 'website.project.tasks.on_node_updated'
+        assert {'title', 'description'}.issubset(task.args[3])
+
+    @mock.patch('osf.models.node.enqueue_task')
+    def test_enqueue_called_immediately_without_postcommit_request(self, enqueue_task, node, user, request_context):
+        node.title = 'A new title'
+        node.save()
+
+        (task, ) = enqueue_task.call_args[0]
+        assert task.task == 'website.project.tasks.on_node_updated'
+        assert 'title' in task.args[3]
+
+    def test_side_effects_enqueued_while_flushing_run(self, request_context):
+        postcommit_handlers.postcommit_before_request()
+        calls = []
+
+        def second():
+            calls.append('second')
+
+        def first():
+            calls.append('first')
+            postcommit_handlers.enqueue_postcommit_side_effect('second', second)
+
+        postcommit_handlers.enqueue_postcommit_side_effect('first', first)
+        assert calls == []
+        postcommit_handlers.flush_postcommit_side_effects()
+        assert calls == ['first', 'second']
+
     @mock.patch('website.project.tasks.settings.SHARE_URL', 'https://share.osf.io')
     @mock.patch('website.project.tasks.settings.SHARE_API_TOKEN', 'Token')
     @mock.patch('website.project.tasks.requests')
     def test_updates_share(self, requests, node, user):
         on_node_updated(node._id, user._id, False, {'is_public'})
+        drain_share_outbox()
 
         kwargs = requests.post.call_args[1]
         graph = kwargs['json']['data']['attributes']['data']['@graph']
@@ -3396,6 +3497,8 @@ class TestOnNodeUpdate:
 
             on_node_updated(node._id, user._id, False, {'is_public'})
 
+            drain_share_outbox()
+
             kwargs = requests.post.call_args[1]
             graph = kwargs['json']['data']['attributes']['data']['@graph']
             assert graph[1]['is_deleted'] == case['is_deleted']
@@ -3426,6 +3529,8 @@ class TestOnNodeUpdate:
 
             on_node_updated(registration._id, user._id, False, {'is_public'})
 
+            drain_share_outbox()
+
             assert registration.is_registration
             kwargs = requests.post.call_args[1]
             graph = kwargs['json']['data']['attributes']['data']['@graph']
@@ -3438,6 +3543,7 @@ class TestOnNodeUpdate:
     def test_update_share_correctly_for_projects_with_qa_tags(self, requests, node, user, request_context):
         node.add_tag(settings.DO_NOT_INDEX_LIST['tags'][0], auth=Auth(user))
         on_node_updated(node._id, user._id, False, {'is_public'})
+        drain_share_outbox()
         kwargs = requests.post.call_args[1]
         graph = kwargs['json']['data']['attributes']['data']['@graph']
         payload = (item for item in graph if 'is_deleted' in item.keys()).next()
@@ -3445,6 +3551,7 @@ class TestOnNodeUpdate:
 
         node.remove_tag(settings.DO_NOT_INDEX_LIST['tags'][0], auth=Auth(user), save=True)
         on_node_updated(node._id, user._id, False, {'is_public'})
+        drain_share_outbox()
         kwargs = requests.post.call_args[1]
         graph = kwargs['json']['data']['attributes']['data']['@graph']
         payload = (item for item in graph if 'is_deleted' in item.keys()).next()
@@ -3457,6 +3564,7 @@ class TestOnNodeUpdate:
     def test_update_share_correctly_for_registrations_with_qa_tags(self, requests, registration, user, request_context):
         registration.add_tag(settings.DO_NOT_INDEX_LIST['tags'][0], auth=Auth(user))
         on_node_updated(registration._id, user._id, False, {'is_public'})
+        drain_share_outbox()
         kwargs = requests.post.call_args[1]
         graph = kwargs['json']['data']['attributes']['data']['@graph']
         payload = (item for item in graph if 'is_deleted' in item.keys()).next()
@@ -3464,6 +3572,7 @@ class TestOnNodeUpdate:
 
         registration.remove_tag(settings.DO_NOT_INDEX_LIST['tags'][0], auth=Auth(user), save=True)
         on_node_updated(registration._id, user._id, False, {'is_public'})
+        drain_share_outbox()
         kwargs = requests.post.call_args[1]
         graph = kwargs['json']['data']['attributes']['data']['@graph']
         payload = (item for item in graph if 'is_deleted' in item.keys()).next()
@@ -3476,6 +3585,7 @@ class TestOnNodeUpdate:
         node.title = settings.DO_NOT_INDEX_LIST['titles'][0].join(random.choice(string.ascii_lowercase) for i in range(5))
         node.save()
         on_node_updated(node._id, user._id, False, {'is_public'})
+        drain_share_outbox()
         kwargs = requests.post.call_args[1]
         graph = kwargs['json']['data']['attributes']['data']['@graph']
         payload = (item for item in graph if 'is_deleted' in item.keys()).next()
@@ -3485,6 +3595,7 @@ class TestOnNodeUpdate:
         node.save()
         assert node.title not in settings.DO_NOT_INDEX_LIST['titles']
         on_node_updated(node._id, user._id, False, {'is_public'})
+        drain_share_outbox()
         kwargs = requests.post.call_args[1]
         graph = kwargs['json']['data']['attributes']['data']['@graph']
         payload = (item for item in graph if 'is_deleted' in item.keys()).next()
@@ -3498,6 +3609,7 @@ class TestOnNodeUpdate:
         registration.title = settings.DO_NOT_INDEX_LIST['titles'][0].join(random.choice(string.ascii_lowercase) for i in range(5))
         registration.save()
         on_node_updated(registration._id, user._id, False, {'is_public'})
+        drain_share_outbox()
         kwargs = requests.post.call_args[1]
         graph = kwargs['json']['data']['attributes']['data']['@graph']
         payload = (item for item in graph if 'is_deleted' in item.keys()).next()
@@ -3507,6 +3619,7 @@ class TestOnNodeUpdate:
         registration.save()
         assert registration.title not in settings.DO_NOT_INDEX_LIST['titles']
         on_node_updated(registration._id, user._id, False, {'is_public'})
+        drain_share_outbox()
         kwargs = requests.post.call_args[1]
         graph = kwargs['json']['data']['attributes']['data']['@graph']
         payload = (item for item in graph if 'is_deleted' in item.keys()).next()
@@ -3517,27 +3630,35 @@ class TestOnNodeUpdate:
     @mock.patch('website.project.tasks.requests')
     def test_skips_no_settings(self, requests, node, user, request_context):
         on_node_updated(node._id, user._id, False, {'is_public'})
+        drain_share_outbox()
         assert requests.post.called is False
 
     @mock.patch('website.project.tasks.settings.SHARE_URL', 'a_real_url')
     @mock.patch('website.project.tasks.settings.SHARE_API_TOKEN', 'a_real_token')
-    @mock.patch('website.project.tasks._async_update_node_share.delay')
     @mock.patch('website.project.tasks.requests')
-    def test_call_async_update_on_500_failure(self, requests, mock_async, node, user, request_context):
+    def test_backs_off_on_500_failure(self, requests, node, user, request_context):
         requests.post.return_value = MockShareResponse(501)
         on_node_updated(node._id, user._id, False, {'is_public'})
-        assert mock_async.called
+        assert drain_share_outbox() == 0
+
+        entry = ShareOutboxEntry.objects.get(node=node)
+        assert entry.attempts == 1
+        assert entry.next_attempt > timezone.now()
+        # Not retried before it is due
+        assert requests.post.call_count == 1
+        drain_share_outbox()
+        assert requests.post.call_count == 1
 
     @mock.patch('website.project.tasks.settings.SHARE_URL', 'a_real_url')
     @mock.patch('website.project.tasks.settings.SHARE_API_TOKEN', 'a_real_token')
     @mock.patch('website.project.tasks.send_desk_share_error')
-    @mock.patch('website.project.tasks._async_update_node_share.delay')
     @mock.patch('website.project.tasks.requests')
-    def test_no_call_async_update_on_400_failure(self, requests, mock_async, mock_mail, node, user, request_context):
+    def test_no_retry_on_400_failure(self, requests, mock_mail, node, user, request_context):
         requests.post.return_value = MockShareResponse(400)
         on_node_updated(node._id, user._id, False, {'is_public'})
+        drain_share_outbox()
         assert mock_mail.called
-        assert not mock_async.called
+        assert not ShareOutboxEntry.objects.filter(node=node).exists()
 
 # copied from tests/test_models.py
 class TestRemoveNode:
@@ -3830,6 +3951,80 @@ class TestTemplateNode:
                 ['read', 'write', 'admin']
             )
 
+    def describe(self, new, root):
+        return {
+            'title': new.title,
+            'description': new.description,
+            'category': new.category,
+            'is_public': new.is_public,
+            'is_fork': new.is_fork,
+            'is_root': new.root_id == root.id,
+            'template_node': new.template_node_id,
+            'creator': new.creator_id,
+            'license': (
+                new.node_license.node_license_id,
+                new.node_license.year,
+                new.node_license.copyright_holders,
+            ) if new.node_license else None,
+            'contributors': list(new.contributor_set.order_by('_order').values_list(
+                'user_id', 'read', 'write', 'admin', 'visible', '_order'
+            )),
+            'logs': [
+                (log.action, log.params['node'] == new._id, log.params['template_node'], log.user_id, log.date == new.created)
+                for log in new.logs.order_by('pk')
+            ],
+            'last_logged': new.last_logged == new.created,
+            'addons': sorted(new.get_addon_names()),
+            'osfstorage_root': bool(new.get_addon('osfstorage').root_node),
+            'wiki_pages': new.wiki_pages_current,
+            'links': new.linked_nodes.count(),
+            'ancestors': list(NodeAncestor.objects.filter(descendant=new).order_by('depth').values_list(
+                'ancestor__template_node_id', flat=True
+            )),
+            'children': [
+                (relation._order, self.describe(relation.child, root))
+                for relation in new.node_relations.filter(is_node_link=False).order_by('_order')
+            ],
+        }
+
+    def test_matches_recursive_template(self, user, project, pointee, component, subproject):
+        project.node_license = NodeLicenseRecordFactory()
+        project.is_public = True
+        project.save()
+        NodeFactory(creator=user, parent=subproject, title='Grandchild', description='Not copied')
+        hidden = NodeFactory(creator=user, parent=project, title='Hidden')
+        NodeFactory(creator=user, parent=hidden, title='Below hidden', is_public=True)
+        deleted = NodeFactory(creator=user, parent=project, title='Deleted', is_public=True)
+        deleted.is_deleted = True
+        deleted.save()
+        subproject.is_public = True
+        subproject.save()
+        component.add_contributor(UserFactory(), auth=Auth(user), save=True)
+
+        other_user = UserFactory()
+        component.add_contributor(other_user, permissions=[READ], auth=Auth(user), save=True)
+        auth = Auth(other_user)
+        changes = {subproject._id: {'title': 'Changed', 'description': 'Kept'}}
+        new = project.use_as_template(auth=auth, changes=changes)
+        expected = project._use_as_template_recursive(auth=auth, changes=changes)
+        assert self.describe(new, new) == self.describe(expected, expected)
+        # Sanity check the tree itself
+        assert new.title == self._default_title(project)
+        assert sorted(child.title for child in new.nodes) == sorted([component.title, 'Changed'])
+
+    def test_templated_nodes_have_their_own_guids(self, auth, project, component):
+        new = project.use_as_template(auth=auth)
+        for node in [new] + list(new.get_descendants_recursive()):
+            assert Guid.load(node._id).referent == node
+
+    def test_public_templated_nodes_are_indexed(self, auth, project, component):
+        changes = {project._id: {'is_public': True}}
+        with mock.patch.object(Node, 'on_update', autospec=True) as mock_on_update:
+            new = project.use_as_template(auth=auth, changes=changes)
+        updates = [call[0] for call in mock_on_update.call_args_list if call[0][1]]
+        assert [node for node, first_save, saved_fields in updates] == [new]
+        assert 'is_public' in updates[0][2]
+
 # copied from tests/test_models.py
 class TestNodeLog:
 
@@ -0,0 +1,181 @@
+import mock
+import pytest
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from framework.auth import Auth
+from osf.management.commands.check_node_ancestors import find_inconsistencies
+from osf.models import AbstractNode, NodeAncestor, NodeRelation
+from osf.utils.migrations import backfill_node_ancestors
+from website.notifications.emails import get_node_lineage
+from osf_tests.factories import (
+    AuthUserFactory,
+    NodeFactory,
+    ProjectFactory,
+    UserFactory,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def ancestors_of(node):
+    return list(
+        NodeAncestor.objects.filter(descendant=node).order_by('depth').values_list('ancestor_id', 'depth')
+    )
+
+
+@pytest.fixture()
+def user():
+    return AuthUserFactory()
+
+
+@pytest.fixture()
+def chain(user):
+    """A project with a component 9 levels deep."""
+    nodes = [ProjectFactory(creator=user)]
+    for _ in range(9):
+        nodes.append(NodeFactory(parent=nodes[-1], creator=user))
+    return nodes
+
+
+class TestNodeAncestorSync:
+
+    def test_component_gets_ancestors(self, chain):
+        leaf = chain[-1]
+        assert ancestors_of(leaf) == [(node.id, depth) for depth, node in enumerate(reversed(chain[:-1]), 1)]
+        assert ancestors_of(chain[0]) == []
+        assert find_inconsistencies() == []
+
+    def test_node_links_are_ignored(self, user):
+        project = ProjectFactory(creator=user)
+        linked = ProjectFactory(creator=user)
+        project.add_node_link(linked, auth=Auth(user))
+        assert ancestors_of(linked) == []
+        assert find_inconsistencies() == []
+
+    def test_moving_a_subtree(self, user, chain):
+        new_parent = ProjectFactory(creator=user)
+        relation = NodeRelation.objects.get(child=chain[5], is_node_link=False)
+        relation.parent = new_parent
+        relation.save()
+
+        assert ancestors_of(chain[5]) == [(new_parent.id, 1)]
+        assert ancestors_of(chain[-1]) == [
+            (chain[8].id, 1), (chain[7].id, 2), (chain[6].id, 3), (chain[5].id, 4), (new_parent.id, 5)
+        ]
+        assert find_inconsistencies() == []
+
+    def test_deleting_a_relation_detaches_the_subtree(self, chain):
+        NodeRelation.objects.get(child=chain[5], is_node_link=False).delete()
+        assert ancestors_of(chain[5]) == []
+        assert [ancestor_id for ancestor_id, _ in ancestors_of(chain[-1])] == [node.id for node in reversed(chain[5:-1])]
+        assert find_inconsistencies() == []
+
+    def test_cycles_are_not_closed(self, chain):
+        NodeRelation.objects.create(parent=chain[-1], child=chain[0], is_node_link=False)
+        assert ancestors_of(chain[0]) == []
+
+
+class TestNodeAncestorCommands:
+
+    def test_backfill(self, chain):
+        NodeAncestor.objects.all().delete()
+        assert len(find_inconsistencies()) == 45
+        backfill_node_ancestors(apps, batch_size=3)
+        assert find_inconsistencies() == []
+
+    def test_check_reports_inconsistencies(self, chain):
+        call_command('check_node_ancestors')
+        NodeAncestor.objects.filter(descendant=chain[-1], depth=1).update(depth=4)
+        NodeAncestor.objects.create(ancestor=chain[-1], descendant=chain[0], depth=1)
+        NodeAncestor.objects.filter(descendant=chain[3], depth=2).delete()
+        assert sorted(find_inconsistencies()) == sorted([
+            (chain[8].id, chain[9].id, 1, 4),
+            (chain[9].id, chain[0].id, None, 1),
+            (chain[1].id, chain[3].id, 2, None),
+        ])
+        with pytest.raises(CommandError):
+            call_command('check_node_ancestors')
+
+    def test_rebuild(self, chain):
+        NodeAncestor.objects.filter(descendant=chain[-1], depth=1).update(depth=4)
+        with mock.patch('osf.management.commands.backfill_node_ancestors.script_utils.add_file_logger'):
+            call_command('backfill_node_ancestors', rebuild=True)
+        assert find_inconsistencies() == []
+
+
+class TestHierarchyHelpers:
+
+    def test_parents(self, chain):
+        assert chain[-1].parents == list(reversed(chain[:-1]))
+        assert chain[0].parents == []
+
+    def test_get_root(self, chain):
+        assert chain[-1].get_root() == chain[0]
+        assert chain[0].get_root() == chain[0]
+
+    def test_get_node_lineage(self, chain):
+        assert get_node_lineage(chain[-1]) == [node._id for node in chain]
+
+    def test_get_children_of_component(self, chain):
+        assert set(AbstractNode.objects.get_children(chain[5])) == set(chain[6:])
+        chain[7].is_deleted = True
+        chain[7].save()
+        assert set(AbstractNode.objects.get_children(chain[5], active=True)) == set(chain[6:]) - {chain[7]}
+
+    def test_has_permission_on_children(self, chain):
+        contributor = UserFactory()
+        chain[-1].add_contributor(contributor, auth=Auth(chain[-1].creator))
+        assert chain[0].has_permission_on_children(contributor, 'read')
+        assert not chain[0].has_permission_on_children(UserFactory(), 'read')
+        assert not chain[0].has_permission_on_children(None, 'read')
+        # Nothing below a deleted component counts
+        chain[5].is_deleted = True
+        chain[5].save()
+        assert not chain[0].has_permission_on_children(contributor, 'read')
+
+    def test_find_readable_descendants(self, user):
+        project = ProjectFactory(creator=user)
+        reader = UserFactory()
+        hidden = NodeFactory(parent=project, creator=user)
+        readable = NodeFactory(parent=hidden, creator=user)
+        readable.add_contributor(reader, auth=Auth(user))
+        NodeFactory(parent=readable, creator=user)
+        public = NodeFactory(parent=project, creator=user, is_public=True)
+
+        assert list(project.find_readable_descendants(Auth(reader))) == [public, readable]
+        assert list(project.find_readable_descendants(Auth(user))) == [hidden, public]
+        assert list(project.find_readable_descendants(None)) == [public]
+
+
+class TestHierarchyQueries:
+
+    @pytest.mark.django_assert_num_queries
+    def test_deep_tree(self, chain, user, django_assert_num_queries):
+        leaf = chain[-1]
+        stranger = UserFactory()
+        with django_assert_num_queries(1):
+            leaf.parents
+        with django_assert_num_queries(1):
+            leaf.get_root()
+        with django_assert_num_queries(1):
+            leaf.is_admin_parent(user)
+        with django_assert_num_queries(2):
+            leaf.admin_contributor_ids
+        with django_assert_num_queries(1):
+            get_node_lineage(leaf)
+        with django_assert_num_queries(2):
+            assert not chain[0].has_permission_on_children(stranger, 'write')
+
+    @pytest.mark.django_assert_num_queries
+    def test_wide_tree(self, user, django_assert_num_queries):
+        project = ProjectFactory(creator=user)
+        children = [NodeFactory(parent=project, creator=user) for _ in range(50)]
+        stranger = UserFactory()
+        # Permission on the project, admin on its parents, then the descendants
+        with django_assert_num_queries(3):
+            assert not project.has_permission_on_children(stranger, 'read')
+        # Readable ids, the tree and the nodes
+        with django_assert_num_queries(3):
+            assert list(project.find_readable_descendants(Auth(user))) == children
@@ -0,0 +1,72 @@
+import mock
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from framework.auth import Auth
+from osf.management.commands.check_preprint_listing import find_drift
+from osf.models import PendingSpamCheck, PreprintService
+from website import settings
+
+from .factories import PreprintFactory, ProjectFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def listable(preprint):
+    return PreprintService.objects.filter(id=preprint.id).values_list('is_publicly_listable', flat=True).get()
+
+
+@pytest.fixture()
+def preprint():
+    return PreprintFactory()
+
+
+class TestIsPubliclyListable:
+
+    def test_published_preprint_is_listable(self, preprint):
+        assert listable(preprint)
+        assert not listable(PreprintFactory(is_published=False))
+
+    def test_node_made_private(self, preprint):
+        preprint.node.set_privacy('private', auth=Auth(preprint.node.creator))
+        assert not listable(preprint)
+
+        preprint.node.set_privacy('public', auth=Auth(preprint.node.creator))
+        assert listable(preprint)
+
+    def test_node_deleted(self, preprint):
+        preprint.node.is_deleted = True
+        preprint.node.save()
+        assert not listable(preprint)
+
+    @mock.patch.object(settings, 'SPAM_FLAGGED_MAKE_NODE_PRIVATE', True)
+    def test_node_flagged_as_spam(self, preprint):
+        node = preprint.node
+        check = PendingSpamCheck(node=node, user=node.creator, saved_fields=['title'])
+        item = node.get_spam_check_item(node.creator.fullname, node.creator.username, 'Buy cheap pills', {})
+        node.finish_spam_check(check, item, True, 'keywords: cheap pills')
+        assert not node.is_public
+        assert not listable(preprint)
+
+    def test_moved_to_private_node(self, preprint):
+        preprint.node = ProjectFactory(creator=preprint.node.creator, is_public=False)
+        preprint.save()
+        assert not listable(preprint)
+
+    def test_unpublished(self, preprint):
+        preprint.is_published = False
+        preprint.save()
+        assert not listable(preprint)
+
+    def test_check_reports_and_fixes_drift(self, preprint):
+        unpublished = PreprintFactory(is_published=False)
+        call_command('check_preprint_listing')
+        PreprintService.objects.filter(id=preprint.id).update(is_publicly_listable=False)
+        PreprintService.objects.filter(id=unpublished.id).update(is_publicly_listable=True)
+        assert find_drift() == [(preprint.id, False), (unpublished.id, True)]
+        with pytest.raises(CommandError):
+            call_command('check_preprint_listing')
+
+        call_command('check_preprint_listing', fix=True)
+        assert find_drift() == []
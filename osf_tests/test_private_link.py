@@ -1,11 +1,16 @@
 import pytest
 
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
+from framework.auth.core import (
+    Auth, PrivateLinkResolver, get_private_link_resolver, private_link_resolver_before_request
+)
 from website.project import new_private_link
 
 from .factories import PrivateLinkFactory, NodeFactory, AuthUserFactory
-from osf.models import MetaSchema, DraftRegistration, NodeLog, QuickFilesNode
+from osf.models import AbstractNode, MetaSchema, DraftRegistration, NodeLog, PrivateLink, QuickFilesNode
 
 @pytest.mark.django_db
 def test_factory():
@@ -140,3 +145,79 @@ class TestPrivateLinkNodeLogs:
             'anonymous_link': True,
             'user': node.creator._id
         }
+
+
+@pytest.mark.django_db
+class TestPrivateLinkResolution:
+
+    @pytest.fixture(autouse=True)
+    def private_link_resolver(self):
+        private_link_resolver_before_request()
+        yield
+        private_link_resolver_before_request()
+
+    @pytest.fixture()
+    def node(self):
+        return NodeFactory()
+
+    @pytest.fixture()
+    def link(self, node):
+        link = PrivateLinkFactory()
+        link.nodes.add(node)
+        return link
+
+    def test_resolve_loads_link_with_nodes(self, link, node):
+        with CaptureQueriesContext(connection) as ctx:
+            resolved = PrivateLink.resolve(link.key)
+            assert resolved == link
+            assert resolved.has_node(node)
+        assert len(ctx.captured_queries) == 2
+        assert PrivateLink.resolve('notakey') is None
+
+    def test_resolver_resolves_key_once(self, link, node):
+        resolver = PrivateLinkResolver()
+        with CaptureQueriesContext(connection) as ctx:
+            for _ in range(3):
+                auth = Auth(private_key=link.key, private_link_resolver=resolver)
+                assert auth.private_link == link
+                assert node.can_view(auth)
+        assert len(ctx.captured_queries) == 2
+
+    def test_link_deleted_elsewhere_is_not_granted(self, link, node):
+        assert node.can_view(Auth(private_key=link.key))
+        # e.g. by another process
+        PrivateLink.objects.filter(id=link.id).update(is_deleted=True)
+        assert not node.can_view(Auth(private_key=link.key))
+        assert Auth(private_key=link.key).any_private_link == link
+
+    @pytest.mark.usefixtures('request_context')
+    def test_saved_link_is_resolved_again(self, link):
+        assert get_private_link_resolver() is get_private_link_resolver()
+        assert Auth(private_key=link.key).private_link == link
+        link.is_deleted = True
+        link.save()
+        assert Auth(private_key=link.key).private_link is None
+
+    @pytest.mark.usefixtures('request_context')
+    def test_added_and_removed_nodes_are_resolved_again(self, link, node):
+        other = NodeFactory()
+        resolver = get_private_link_resolver()
+        resolver.resolve(link.key)
+        link.nodes.add(other)
+        assert resolver.resolve(link.key).node_pks == {node.pk, other.pk}
+        node.private_links.remove(link)
+        assert resolver.resolve(link.key).node_pks == {other.pk}
+
+    def test_anonymous_link_can_view(self, node):
+        link = PrivateLinkFactory(anonymous=True)
+        link.nodes.add(node)
+        assert node.can_view(Auth(private_key=link.key))
+        assert not NodeFactory().can_view(Auth(private_key=link.key))
+
+    def test_queryset_can_view_with_key(self, link, node):
+        other = NodeFactory()
+        nodes = AbstractNode.objects.filter(id__in=[node.id, other.id])
+        assert set(nodes.can_view(private_link=link.key)) == {node}
+        link.is_deleted = True
+        link.save()
+        assert not nodes.can_view(private_link=link.key).exists()
@@ -4,7 +4,8 @@ import datetime
 
 from django.utils import timezone
 from framework.auth.core import Auth
-from osf.models import Node, Registration, Sanction, MetaSchema, NodeLog
+from framework.exceptions import PermissionsError
+from osf.models import Guid, Node, NodeAncestor, Registration, Sanction, MetaSchema, NodeLog
 from addons.wiki.models import NodeWikiPage
 
 from website import settings
@@ -341,6 +342,98 @@ class TestRegisterNodeContributors:
         assert component_registration._id in contributor_unregistered_no_email.unclaimed_records
 
 
+class TestRegisterTree:
+    """Registering a tree at once must produce the same registrations as
+    registering it one node at a time."""
+
+    @pytest.fixture()
+    def tree(self, user, auth, project):
+        project.add_system_tag('system tag')
+        project.node_license = factories.NodeLicenseRecordFactory()
+        project.save()
+        institution = factories.InstitutionFactory()
+        user.affiliated_institutions.add(institution)
+        project.add_affiliated_institution(institution, user)
+        project.add_unregistered_contributor(fullname='Unregistered', email='unreg@example.com', auth=auth)
+        NodeWikiFactory(node=project)
+
+        first = factories.NodeFactory(creator=user, parent=project, title='First')
+        first.add_tag('component', auth=auth)
+        factories.NodeFactory(creator=user, parent=first, title='Grandchild')
+        deleted = factories.NodeFactory(creator=user, parent=project, title='Deleted')
+        factories.NodeFactory(creator=user, parent=deleted, title='Below deleted')
+        deleted.remove_node(auth)
+        project.add_node_link(factories.ProjectFactory(creator=user), auth=auth)
+        second = factories.NodeFactory(creator=user, parent=project, title='Second')
+        second.add_contributor(factories.UserFactory(), permissions=[READ], auth=auth, visible=False, save=True)
+        project.save()
+        return project
+
+    def describe(self, registration, root):
+        unregistered = registration.contributors.filter(is_registered=False)
+        return {
+            'title': registration.title,
+            'description': registration.description,
+            'category': registration.category,
+            'is_public': registration.is_public,
+            'is_root': registration.root_id == root.id,
+            'registered_from': registration.registered_from_id,
+            'registered_user': registration.registered_user_id,
+            'registered_meta': registration.registered_meta,
+            'schemas': list(registration.registered_schema.values_list('id', flat=True)),
+            'creator': registration.creator_id,
+            'forked_from': registration.forked_from_id,
+            'license': (
+                registration.node_license.node_license_id,
+                registration.node_license.year,
+                registration.node_license.copyright_holders,
+            ) if registration.node_license else None,
+            'contributors': list(registration.contributor_set.order_by('_order').values_list(
+                'user_id', 'read', 'write', 'admin', 'visible', '_order'
+            )),
+            'unclaimed_records': [registration._id in user.unclaimed_records for user in unregistered],
+            'tags': sorted(registration.all_tags.values_list('name', 'system')),
+            'institutions': sorted(registration.affiliated_institutions.values_list('id', flat=True)),
+            'logs': list(registration.logs.order_by('pk').values_list(
+                'action', 'date', 'params', 'should_hide', 'user_id', 'original_node_id'
+            )),
+            'addons': sorted(registration.get_addon_names()),
+            'wiki_pages': sorted(registration.wiki_pages_current.keys()),
+            'links': list(registration.node_relations.filter(is_node_link=True).values_list('child_id', '_order')),
+            'ancestors': list(NodeAncestor.objects.filter(descendant=registration).order_by('depth').values_list(
+                'ancestor__registered_from_id', flat=True
+            )),
+            'children': [
+                (relation._order, self.describe(relation.child, root))
+                for relation in registration.node_relations.filter(is_node_link=False).order_by('_order')
+            ],
+        }
+
+    @mock.patch('website.settings.ENABLE_ARCHIVER', False)
+    def test_matches_recursive_registration(self, tree, auth):
+        schema = get_default_metaschema()
+        data = {'some': 'data'}
+        registered = tree.register_node(schema, auth, data)
+        expected = tree._register_node_recursive(schema, auth, data)
+        assert self.describe(registered, registered) == self.describe(expected, expected)
+        # Sanity check the tree itself
+        assert [child.title for child in registered.nodes] == ['First', 'Second']
+        assert registered.nodes[0].nodes[0].title == 'Grandchild'
+
+    @mock.patch('website.settings.ENABLE_ARCHIVER', False)
+    def test_registrations_have_their_own_guids(self, tree, auth):
+        registered = tree.register_node(get_default_metaschema(), auth, {})
+        for registration in [registered] + list(registered.get_descendants_recursive()):
+            assert Guid.load(registration._id).referent == registration
+
+    def test_requires_permission_on_components(self, user, auth, project):
+        writer = factories.UserFactory()
+        project.add_contributor(writer, permissions=[READ, WRITE], auth=auth, save=True)
+        factories.NodeFactory(creator=user, parent=project)
+        with pytest.raises(PermissionsError):
+            project.register_node(get_default_metaschema(), Auth(writer), {})
+
+
 # copied from tests/test_registrations
 class TestNodeSanctionStates:
 
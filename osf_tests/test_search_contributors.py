@@ -0,0 +1,94 @@
+import mock
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from osf.models import Contributor, Guid, Node, NodeRelation
+from osf.models.base import generate_guids
+from website.search import elastic_search
+from tests.elastic_transport import RecordedTransport
+
+from .factories import ProjectFactory, UserFactory
+
+
+def build_nodes(creator, count, **kwargs):
+    nodes = Node.objects.bulk_create([
+        Node(title='Node {}'.format(i), creator=creator, guid_string=guid, **kwargs)
+        for i, guid in enumerate(generate_guids(count))
+    ])
+    content_type = ContentType.objects.get_for_model(Node)
+    Guid.objects.bulk_create([Guid(_id=node.guid_string, content_type=content_type, object_id=node.id) for node in nodes])
+    Contributor.objects.bulk_create([
+        Contributor(node=node, user=creator, read=True, write=True, admin=True, visible=True, _order=0) for node in nodes
+    ])
+    return nodes
+
+
+@pytest.fixture()
+def transport():
+    transport = RecordedTransport()
+    with mock.patch.object(elastic_search, 'client', return_value=transport.client()):
+        yield transport
+
+
+@pytest.fixture()
+def user():
+    return UserFactory(fullname='Prolific Author')
+
+
+def updates(transport):
+    return {action['update']['_id']: (action['update']['_type'], source['doc']) for action, source in transport.actions}
+
+
+@pytest.mark.django_db
+class TestUpdateContributors:
+
+    def test_user_on_many_nodes(self, transport, user):
+        nodes = build_nodes(user, 5000, is_public=True)
+        build_nodes(user, 10, is_public=False)
+        user.fullname = 'Renamed Author'
+        user.save()
+        del transport.requests[:]
+
+        with CaptureQueriesContext(connection) as ctx:
+            elastic_search.update_contributors_async(user.id)
+
+        # A few queries and one bulk request per 500 nodes
+        assert len(ctx.captured_queries) <= 5 * 10 + 5
+        assert len(transport.bulk_requests) == 10
+        docs = updates(transport)
+        assert set(docs) == {node._id for node in nodes}
+        assert docs[nodes[0]._id] == ('project', {'contributors': [{'fullname': 'Renamed Author', 'url': '/{}/'.format(user._id)}]})
+
+    def test_contributors_in_order(self, transport, user):
+        project = ProjectFactory(creator=user, is_public=True)
+        other = UserFactory()
+        hidden = UserFactory()
+        project.add_contributor(other, visible=True, save=True)
+        project.add_contributor(hidden, visible=False, save=True)
+
+        elastic_search.update_contributors_async(user.id)
+        doc_type, doc = updates(transport)[project._id]
+        assert [contributor['url'] for contributor in doc['contributors']] == ['/{}/'.format(user._id), '/{}/'.format(other._id)]
+
+    def test_document_types(self, transport, user):
+        project = ProjectFactory(creator=user, is_public=True)
+        component, other = build_nodes(user, 2, is_public=True, category='data')
+        NodeRelation.objects.create(parent=project, child=component, is_node_link=False)
+
+        elastic_search.update_contributors_async(user.id)
+        docs = updates(transport)
+        assert docs[project._id][0] == elastic_search.get_doctype_from_node(project) == 'project'
+        assert docs[component._id][0] == elastic_search.get_doctype_from_node(component) == 'component'
+        assert docs[other._id][0] == elastic_search.get_doctype_from_node(other) == 'project'
+
+    def test_unindexed_nodes_are_not_created(self, user):
+        node = ProjectFactory(creator=user, is_public=True)
+        transport = RecordedTransport(missing=[node._id])
+        with mock.patch.object(elastic_search, 'client', return_value=transport.client()), \
+                mock.patch.object(elastic_search.logger, 'error') as mock_error:
+            elastic_search.update_contributors_async(user.id)
+        (action, source), = transport.actions
+        assert 'doc_as_upsert' not in source
+        assert not mock_error.called
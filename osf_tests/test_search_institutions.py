@@ -0,0 +1,117 @@
+import datetime
+
+import mock
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from osf.models import InstitutionSearchUpdate
+from website import settings
+from website.search import elastic_search
+from tests.elastic_transport import RecordedTransport
+
+from .factories import InstitutionFactory, ProjectFactory, UserFactory
+from .test_search_contributors import build_nodes, updates
+
+
+@pytest.fixture()
+def transport():
+    transport = RecordedTransport()
+    with mock.patch.object(elastic_search, 'client', return_value=transport.client()):
+        yield transport
+
+
+@pytest.fixture()
+def institution():
+    return InstitutionFactory(name='Old Name University')
+
+
+def affiliate(institution, nodes):
+    institution.nodes.through.objects.bulk_create([
+        institution.nodes.through(abstractnode_id=node.id, institution_id=institution.id) for node in nodes
+    ])
+
+
+@pytest.mark.django_db
+class TestUpdateInstitutionNodes:
+
+    def test_institution_with_many_nodes(self, transport, institution):
+        user = UserFactory()
+        nodes = build_nodes(user, 5000, is_public=True)
+        affiliate(institution, nodes + build_nodes(user, 10, is_public=False))
+        other = InstitutionFactory(name='Other University')
+        affiliate(other, nodes[:1])
+        institution.name = 'New Name University'
+        institution.save()
+        del transport.requests[:]
+
+        with CaptureQueriesContext(connection) as ctx:
+            elastic_search.update_institution_nodes_async(institution.id)
+
+        # A few queries and one bulk request per 500 nodes
+        assert len(ctx.captured_queries) <= 5 * 10 + 5
+        assert len(transport.bulk_requests) == 10
+        docs = updates(transport)
+        assert set(docs) == {node._id for node in nodes}
+        assert docs[nodes[0]._id] == ('project', {'affiliated_institutions': ['New Name University', 'Other University']})
+        assert docs[nodes[1]._id] == ('project', {'affiliated_institutions': ['New Name University']})
+
+    def test_progress(self, transport, institution):
+        nodes = build_nodes(UserFactory(), 5, is_public=True)
+        affiliate(institution, nodes)
+        reported = []
+        bulk_update = elastic_search.bulk_update_institutions
+
+        def bulk_update_institutions(node_ids, chunk_size, progress):
+            def record(count):
+                progress(count)
+                reported.append(elastic_search.get_institution_nodes_progress(institution.id))
+            return bulk_update(node_ids, chunk_size=chunk_size, progress=record)
+
+        with mock.patch.object(elastic_search, 'bulk_update_institutions', side_effect=bulk_update_institutions):
+            elastic_search.update_institution_nodes_async(institution.id, chunk_size=2)
+
+        assert [(progress['processed'], progress['done']) for progress in reported] == [(2, False), (4, False), (5, False)]
+        assert elastic_search.get_institution_nodes_progress(institution.id) == {'total': 5, 'processed': 5, 'done': True}
+
+    def test_progress_is_shared_between_processes(self, transport, institution):
+        affiliate(institution, build_nodes(UserFactory(), 3, is_public=True))
+        elastic_search.update_institution_nodes_async(institution.id)
+        # As seen by another process, e.g. the admin app, with a cache of its own
+        with mock.patch('django.core.cache.cache', LocMemCache('other-process', {})):
+            assert elastic_search.get_institution_nodes_progress(institution.id) == {'total': 3, 'processed': 3, 'done': True}
+
+    def test_old_progress_is_not_shown(self, transport, institution):
+        elastic_search.update_institution_nodes_async(institution.id)
+        InstitutionSearchUpdate.objects.filter(institution=institution).update(
+            modified=timezone.now() - datetime.timedelta(seconds=settings.INSTITUTION_NODES_PROGRESS_TIMEOUT + 1)
+        )
+        assert elastic_search.get_institution_nodes_progress(institution.id) is None
+
+    @mock.patch('website.search.search.update_institution_nodes_async')
+    @mock.patch('website.search.search.update_institution')
+    def test_save_without_changes_skips_search(self, mock_update_institution, mock_update_nodes, institution):
+        institution.save()
+        institution.description = 'Not indexed'
+        institution.save()
+        assert not mock_update_institution.called
+        assert not mock_update_nodes.called
+
+    @mock.patch('website.search.search.update_institution_nodes_async')
+    @mock.patch('website.search.search.update_institution')
+    def test_logo_change_does_not_update_nodes(self, mock_update_institution, mock_update_nodes, institution):
+        institution.logo_name = 'new-logo.png'
+        institution.save()
+        assert mock_update_institution.called
+        assert not mock_update_nodes.called
+
+    @mock.patch('website.search.search.update_institution_nodes_async')
+    @mock.patch('website.search.search.update_institution')
+    def test_rename_updates_nodes(self, mock_update_institution, mock_update_nodes, institution):
+        ProjectFactory(is_public=True).affiliated_institutions.add(institution)
+        institution.name = 'New Name University'
+        institution.save()
+        assert mock_update_institution.called
+        mock_update_nodes.assert_called_once_with(institution.id)
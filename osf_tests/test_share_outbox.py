@@ -0,0 +1,104 @@
+import mock
+import pytest
+
+from osf.models import ShareOutboxEntry
+from website import settings
+from website.project import tasks
+from website.project.tasks import drain_share_outbox, enqueue_node_share
+
+from .factories import ProjectFactory, RegistrationFactory
+from tests.share_server import ShareServer
+
+
+@pytest.fixture()
+def share():
+    with ShareServer() as server:
+        with mock.patch.object(settings, 'SHARE_URL', server.url), \
+                mock.patch.object(settings, 'SHARE_API_TOKEN', 'Token'):
+            yield server
+
+
+@pytest.fixture()
+def nodes():
+    return [ProjectFactory(is_public=True) for _ in range(3)]
+
+
+def uris(graph):
+    return sorted(item['uri'] for item in graph if item['@type'] == 'workidentifier')
+
+
+@pytest.mark.django_db
+class TestShareOutbox:
+
+    def test_enqueue_once_per_node(self, share, nodes):
+        enqueue_node_share(nodes[0])
+        enqueue_node_share(nodes[0])
+        assert ShareOutboxEntry.objects.filter(node=nodes[0]).count() == 1
+
+    def test_not_enqueued_without_settings(self, nodes):
+        with mock.patch.object(settings, 'SHARE_URL', None):
+            enqueue_node_share(nodes[0])
+        assert not ShareOutboxEntry.objects.exists()
+
+    def test_drain_sends_batches(self, share, nodes):
+        for node in nodes:
+            enqueue_node_share(node)
+
+        assert drain_share_outbox(batch_size=2) == 3
+        assert len(share.requests) == 2
+        assert share.requests[0]['headers']['authorization'] == 'Bearer Token'
+        assert sorted(sum([uris(graph) for graph in share.graphs], [])) == sorted(
+            '{}{}/'.format(settings.DOMAIN, node._id) for node in nodes
+        )
+        assert not ShareOutboxEntry.objects.exists()
+
+    def test_drain_sends_registrations(self, share):
+        registration = RegistrationFactory(is_public=True)
+        enqueue_node_share(registration)
+        assert drain_share_outbox() == 1
+        (graph, ) = share.graphs
+        assert any(item['@type'] == 'registration' and item['title'] == registration.title for item in graph)
+
+    def test_server_error_backs_off(self, share, nodes):
+        share.statuses = [503]
+        for node in nodes:
+            enqueue_node_share(node)
+
+        assert drain_share_outbox() == 0
+        assert len(share.requests) == 1
+        assert list(ShareOutboxEntry.objects.values_list('attempts', flat=True)) == [1, 1, 1]
+
+    def test_gives_up_after_max_attempts(self, share, nodes):
+        share.statuses = [503]
+        enqueue_node_share(nodes[0])
+        ShareOutboxEntry.objects.update(attempts=settings.SHARE_OUTBOX_MAX_ATTEMPTS - 1)
+        with mock.patch('website.project.tasks.send_desk_share_error') as mock_mail:
+            drain_share_outbox()
+        assert mock_mail.called
+        assert not ShareOutboxEntry.objects.exists()
+
+    def test_rejected_batch_is_sent_one_at_a_time(self, share, nodes):
+        share.statuses = [400, 200, 400]
+        enqueue_node_share(nodes[0])
+        enqueue_node_share(nodes[1])
+
+        with mock.patch('website.project.tasks.send_desk_share_error') as mock_mail:
+            assert drain_share_outbox() == 1
+        assert len(share.requests) == 3
+        assert mock_mail.call_count == 1
+        assert not ShareOutboxEntry.objects.exists()
+
+    def test_node_changed_while_sending_is_sent_again(self, share, nodes):
+        enqueue_node_share(nodes[0])
+        send = tasks.send_share_node_data
+        changes = [nodes[0]]
+
+        def send_and_change(data):
+            # Changed once, during the first request
+            if changes:
+                enqueue_node_share(changes.pop())
+            return send(data)
+
+        with mock.patch('website.project.tasks.send_share_node_data', side_effect=send_and_change):
+            assert drain_share_outbox() == 2
+        assert len(share.requests) == 2
@@ -0,0 +1,191 @@
+import datetime
+
+import mock
+import pytest
+from django.utils import timezone
+
+from framework.celery_tasks import handlers
+from framework.postcommit_tasks import handlers as postcommit_handlers
+from framework.sessions import set_session
+from osf.models import AbstractNode, PendingSpamCheck, SpamStatus
+from website import settings
+from website.project.tasks import on_node_updated, run_spam_checks
+from website.util.spam import KeywordClassifier
+
+from .factories import ProjectFactory, SessionFactory, UserFactory
+
+
+@pytest.fixture()
+def user():
+    user = UserFactory()
+    user.date_confirmed = timezone.now() - datetime.timedelta(days=30)
+    user.save()
+    return user
+
+
+@pytest.fixture()
+def node(user):
+    return ProjectFactory(creator=user, is_public=True)
+
+
+@pytest.fixture()
+def spam_check(node, request_context, user):
+    set_session(SessionFactory(user=user))
+    with mock.patch.object(settings, 'SPAM_CHECK_ENABLED', True), \
+            mock.patch.object(settings, 'SPAM_CLASSIFIER', 'keywords'), \
+            mock.patch.object(settings, 'SPAM_CLASSIFIER_KEYWORDS', ['cheap pills']):
+        yield
+    handlers.celery_before_request()
+    postcommit_handlers.postcommit_before_request()
+    postcommit_handlers.postcommit_teardown_request()
+
+
+def edit(node, **fields):
+    for field, value in fields.items():
+        setattr(node, field, value)
+    node.save()
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('spam_check')
+class TestSpamChecks:
+
+    def test_edit_does_not_wait_on_classifier(self, node):
+        with mock.patch.object(KeywordClassifier, 'classify', side_effect=Exception('should not get here')):
+            edit(node, title='Buy cheap pills')
+        node.reload()
+        assert node.spam_status == SpamStatus.UNKNOWN
+        assert node.is_public
+        check = PendingSpamCheck.objects.get(node=node)
+        assert check.saved_fields == ['title']
+        assert check.request_headers['Remote-Addr'] == '146.9.219.56'
+
+    def test_edits_share_a_check(self, node):
+        edit(node, title='A new title')
+        edit(node, description='A new description')
+        check = PendingSpamCheck.objects.get(node=node)
+        assert {'title', 'description'}.issubset(check.saved_fields)
+
+    def test_edit_of_private_node_not_checked(self, node):
+        node.is_public = False
+        node.save()
+        edit(node, title='Buy cheap pills')
+        assert not PendingSpamCheck.objects.exists()
+
+    def test_edit_of_other_fields_not_checked(self, node):
+        edit(node, category='data')
+        assert not PendingSpamCheck.objects.exists()
+
+    def test_check_runs_after_the_request(self, node):
+        edit(node, title='A new title')
+        assert any(task.task == 'website.project.tasks.run_spam_checks' for task in handlers.queue())
+
+    def test_spam_is_flagged(self, node):
+        edit(node, title='Buy cheap pills')
+        assert run_spam_checks() == 1
+        node.reload()
+        assert node.spam_status == SpamStatus.FLAGGED
+        assert node.spam_pro_tip == 'keywords: cheap pills'
+        assert node.spam_data['content'] == 'Buy cheap pills'
+        assert node.spam_data['headers']['Remote-Addr'] == '146.9.219.56'
+        assert not PendingSpamCheck.objects.exists()
+
+    @mock.patch.object(settings, 'SPAM_FLAGGED_MAKE_NODE_PRIVATE', True)
+    def test_flagged_node_made_private(self, node):
+        edit(node, title='Buy cheap pills')
+        run_spam_checks()
+        node.reload()
+        assert node.is_spammy
+        assert not node.is_public
+
+    @mock.patch('osf.models.node.mails.send_mail')
+    @mock.patch.object(settings, 'SPAM_ACCOUNT_SUSPENSION_ENABLED', True)
+    def test_new_spam_user_suspended(self, mock_send_mail, node, user):
+        user.date_confirmed = timezone.now()
+        user.save()
+        edit(node, description='Buy cheap pills')
+        run_spam_checks()
+        user.reload()
+        node.reload()
+        assert user.is_disabled
+        assert not node.is_public
+
+    def test_ham_is_not_flagged(self, node):
+        edit(node, title='A new title')
+        assert run_spam_checks() == 1
+        node.reload()
+        assert node.spam_status == SpamStatus.UNKNOWN
+        assert node.spam_data['content'] == 'A new title'
+        assert not PendingSpamCheck.objects.exists()
+
+    def test_checks_are_batched(self, user):
+        nodes = [ProjectFactory(creator=user, is_public=True) for _ in range(3)]
+        for node in nodes:
+            edit(node, title='A new title')
+        with mock.patch.object(KeywordClassifier, 'classify', autospec=True, side_effect=KeywordClassifier.classify) as mock_classify:
+            assert run_spam_checks(batch_size=2) == 3
+        assert [len(call[0][1]) for call in mock_classify.call_args_list] == [2, 1]
+
+    def test_classifier_failure_backs_off(self, node):
+        edit(node, title='Buy cheap pills')
+        with mock.patch.object(KeywordClassifier, 'classify', return_value=[None]):
+            assert run_spam_checks() == 0
+        check = PendingSpamCheck.objects.get(node=node)
+        assert check.attempts == 1
+        assert check.next_attempt > timezone.now()
+
+    def test_node_edited_while_checked_is_checked_again(self, node):
+        edit(node, title='A new title')
+        classify = KeywordClassifier.classify
+
+        def classify_and_edit(self, items):
+            if not node.description:
+                edit(node, description='Buy cheap pills')
+            return classify(self, items)
+
+        with mock.patch.object(KeywordClassifier, 'classify', autospec=True, side_effect=classify_and_edit):
+            assert run_spam_checks() == 2
+        node.reload()
+        assert node.spam_status == SpamStatus.FLAGGED
+
+    @mock.patch('website.project.tasks.enqueue_node_share')
+    def test_search_updated_once_checked(self, mock_share, node, user):
+        edit(node, title='A new title')
+        with mock.patch('osf.models.AbstractNode.update_search') as mock_update_search:
+            on_node_updated(node._id, user._id, False, ['title'])
+            assert not mock_update_search.called
+
+            with mock.patch('osf.models.node.enqueue_task') as mock_enqueue_task:
+                run_spam_checks()
+            (task, ) = mock_enqueue_task.call_args[0]
+            assert task.task == 'website.project.tasks.on_node_updated'
+            assert 'title' in task.args[3]
+            task()
+            assert mock_update_search.called
+
+    def test_edits_while_classified_are_kept(self, node):
+        edit(node, title='Buy cheap pills')
+        classify = KeywordClassifier.classify
+
+        def classify_and_edit(self, items):
+            AbstractNode.objects.filter(id=node.id).update(category='data', is_deleted=True)
+            return classify(self, items)
+
+        with mock.patch.object(KeywordClassifier, 'classify', autospec=True, side_effect=classify_and_edit):
+            assert run_spam_checks() == 1
+        node.reload()
+        assert node.spam_status == SpamStatus.FLAGGED
+        assert node.category == 'data'
+        assert node.is_deleted
+
+    @mock.patch('website.project.tasks.enqueue_node_share')
+    def test_privacy_change_not_held_back(self, mock_share, node, user):
+        edit(node, title='A new title')
+        with mock.patch('osf.models.AbstractNode.update_search') as mock_update_search:
+            on_node_updated(node._id, user._id, False, ['title'])
+            assert not mock_update_search.called
+
+            node.set_privacy('private', log=False)
+            on_node_updated(node._id, user._id, False, ['is_public'])
+            assert mock_update_search.called
+            assert mock_share.called
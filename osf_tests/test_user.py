@@ -25,7 +25,7 @@ from website.project.signals import contributor_added
 from website.project.views.contributor import notify_added_contributor
 from website.views import find_bookmark_collection
 
-from osf.models import AbstractNode, OSFUser, Tag, Contributor, Session
+from osf.models import AbstractNode, CommentReadState, Guid, OSFUser, Tag, Contributor, Session
 from framework.auth.core import Auth
 from osf.utils.names import impute_names_model
 from osf.exceptions import ValidationError
@@ -1487,12 +1487,13 @@ class TestUserMerging(OsfTestCase):
         today = timezone.now()
         yesterday = today - dt.timedelta(days=1)
 
-        self.user.comments_viewed_timestamp['shared_gt'] = today
-        other_user.comments_viewed_timestamp['shared_gt'] = yesterday
-        self.user.comments_viewed_timestamp['shared_lt'] = yesterday
-        other_user.comments_viewed_timestamp['shared_lt'] = today
-        self.user.comments_viewed_timestamp['user'] = yesterday
-        other_user.comments_viewed_timestamp['other'] = yesterday
+        targets = {key: Guid.load(ProjectFactory()._id) for key in ('shared_gt', 'shared_lt', 'user', 'other')}
+        CommentReadState.mark_viewed(self.user, targets['shared_gt'], today)
+        CommentReadState.mark_viewed(other_user, targets['shared_gt'], yesterday)
+        CommentReadState.mark_viewed(self.user, targets['shared_lt'], yesterday)
+        CommentReadState.mark_viewed(other_user, targets['shared_lt'], today)
+        CommentReadState.mark_viewed(self.user, targets['user'], yesterday)
+        CommentReadState.mark_viewed(other_user, targets['other'], yesterday)
 
         self.user.email_verifications = {'user': {'email': 'a'}}
         other_user.email_verifications = {'other': {'email': 'b'}}
@@ -1564,12 +1565,6 @@ class TestUserMerging(OsfTestCase):
         ]
 
         calculated_fields = {
-            'comments_viewed_timestamp': {
-                'user': yesterday,
-                'other': yesterday,
-                'shared_gt': today,
-                'shared_lt': today,
-            },
             'email_verifications': {
                 'user': {'email': 'a'},
                 'other': {'email': 'b'},
@@ -1636,6 +1631,12 @@ class TestUserMerging(OsfTestCase):
                 assert getattr(self.user, k) == v, '{} doesn\'t match expectation'.format(k)
 
         assert sorted(self.user.system_tags) == ['other', 'shared', 'user']
+        assert dict(self.user.comment_read_states.values_list('root_target___id', 'last_viewed')) == {
+            targets['user']._id: yesterday,
+            targets['other']._id: yesterday,
+            targets['shared_gt']._id: today,
+            targets['shared_lt']._id: today,
+        }
 
         # check fields set on merged user
         assert other_user.merged_by == self.user
@@ -167,7 +167,7 @@ class Sitemap(object):
         progress.stop()
 
         # User urls
-        objs = OSFUser.objects.filter(is_active=True).values_list('guids___id', flat=True)
+        objs = OSFUser.objects.filter(is_active=True).values_list('guid_string', flat=True)
         progress.start(objs.count(), 'USER: ')
         for obj in objs:
             try:
@@ -183,22 +183,22 @@ class Sitemap(object):
         objs = (AbstractNode.objects
             .filter(is_public=True, is_deleted=False, retraction_id__isnull=True)
             .exclude(type__in=["osf.collection", "osf.quickfilesnode"])
-            .values('guids___id', 'modified'))
+            .values('guid_string', 'modified'))
         progress.start(objs.count(), 'NODE: ')
         for obj in objs:
             try:
                 config = settings.SITEMAP_NODE_CONFIG
-                config['loc'] = urlparse.urljoin(settings.DOMAIN, '/{}/'.format(obj['guids___id']))
+                config['loc'] = urlparse.urljoin(settings.DOMAIN, '/{}/'.format(obj['guid_string']))
                 config['lastmod'] = obj['modified'].strftime('%Y-%m-%d')
                 self.add_url(config)
             except Exception as e:
-                self.log_errors('NODE', obj['guids___id'], e)
+                self.log_errors('NODE', obj['guid_string'], e)
             progress.increment()
         progress.stop()
 
         # Preprint urls
         objs = (PreprintService.objects
-                    .filter(node__isnull=False, node__is_deleted=False, node__is_public=True, is_published=True)
+                    .filter(is_publicly_listable=True)
                     .select_related('node', 'provider', 'node__preprint_file'))
         progress.start(objs.count() * 2, 'PREP: ')
         osf = PreprintProvider.objects.get(_id='osf')
@@ -14,7 +14,7 @@ logger = logging.getLogger(__name__)
 
 def get_targets():
     PreprintService = apps.get_model('osf.PreprintService')
-    return PreprintService.objects.filter().values_list('guids___id', flat=True)
+    return PreprintService.objects.filter().values_list('guid_string', flat=True)
 
 def migrate(dry=True):
     assert settings.SHARE_URL, 'SHARE_URL must be set to migrate.'
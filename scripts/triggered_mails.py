@@ -34,13 +34,13 @@ def main(dry_run=True):
 
 
 def find_inactive_users_with_no_inactivity_email_sent_or_queued():
-    users_sent_ids = QueuedMail.objects.filter(email_type=NO_LOGIN_TYPE).values_list('user__guids___id')
+    users_sent_ids = QueuedMail.objects.filter(email_type=NO_LOGIN_TYPE).values_list('user__guid_string')
     return (OSFUser.objects
         .filter(
             (Q(date_last_login__lt=timezone.now() - settings.NO_LOGIN_WAIT_TIME) & ~Q(tags__name='osf4m')) |
             Q(date_last_login__lt=timezone.now() - settings.NO_LOGIN_OSF4M_WAIT_TIME, tags__name='osf4m'),
             is_active=True)
-        .exclude(guids___id__in=users_sent_ids))
+        .exclude(guid_string__in=users_sent_ids))
 
 @celery_app.task(name='scripts.triggered_mails')
 def run_main(dry_run=True):
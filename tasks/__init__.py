@@ -332,6 +332,7 @@ API_TESTS3 = [
     'api_tests/addons_tests',
     'api_tests/applications',
     'api_tests/base',
+    'api_tests/caching',
     'api_tests/collections',
     'api_tests/comments',
     'api_tests/files',
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""A recorded stand-in for the Elasticsearch transport, for tests of bulk
+requests that do not need a running Elasticsearch.
+
+    transport = RecordedTransport()
+    with mock.patch('website.search.elastic_search.client', return_value=transport.client()):
+        ...
+    assert transport.actions[0]['update']['_id'] == node._id
+"""
+import json
+
+from elasticsearch import Elasticsearch
+from elasticsearch.serializer import JSONSerializer
+
+
+def _bulk_actions(body):
+    lines = [json.loads(line) for line in body.splitlines() if line]
+    return zip(lines[::2], lines[1::2])
+
+
+class RecordedTransport(object):
+    """Records the requests it is sent. Bulk requests are answered with a
+    200 for every action, or a 404 for the ids in `missing`.
+    """
+
+    def __init__(self, missing=None):
+        self.missing = set(missing or [])
+        self.requests = []
+        self.serializer = JSONSerializer()
+
+    def client(self):
+        transport = self
+        return Elasticsearch(transport_class=lambda hosts, **kwargs: transport)
+
+    @property
+    def bulk_requests(self):
+        return [request for request in self.requests if request['url'].endswith('/_bulk')]
+
+    @property
+    def actions(self):
+        """The (action, source) pairs of every bulk request, e.g.
+        ({'update': {'_id': 'abc12', ...}}, {'doc': {...}}).
+        """
+        return sum([_bulk_actions(request['body']) for request in self.bulk_requests], [])
+
+    def perform_request(self, method, url, params=None, body=None):
+        self.requests.append({'method': method, 'url': url, 'params': params, 'body': body})
+        if not url.endswith('/_bulk'):
+            return {}
+        items = []
+        for action, _ in _bulk_actions(body):
+            (op_type, meta), = action.items()
+            status = 404 if meta['_id'] in self.missing else 200
+            items.append({op_type: dict(meta, status=status)})
+        return {'took': 1, 'errors': any(item.values()[0]['status'] >= 300 for item in items), 'items': items}
+
+    def close(self):
+        pass
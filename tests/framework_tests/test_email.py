@@ -1,4 +1,9 @@
 # -*- coding: utf-8 -*-
+import asyncore
+import logging
+import smtpd
+import threading
+import time
 import unittest
 import smtplib
 
@@ -6,7 +11,8 @@ import mock
 from nose.tools import *  # flake8: noqa (PEP8 asserts)
 import sendgrid
 
-from framework.email.tasks import send_email, _send_with_sendgrid
+from framework.email import transport
+from framework.email.tasks import send_email, send_emails, _send_with_sendgrid, _send_batch_with_sendgrid
 from website import settings
 from tests.base import fake
 from osf_tests.factories import fake_email
@@ -77,5 +83,186 @@ class TestEmail(unittest.TestCase):
         assert_false(ret)
 
 
+class SinkServer(smtpd.SMTPServer):
+    """A local SMTP server that accepts and records every message."""
+
+    def __init__(self):
+        smtpd.SMTPServer.__init__(self, ('127.0.0.1', 0), None)
+        self.port = self.socket.getsockname()[1]
+        self.connections = 0
+        self.messages = []
+
+    def handle_accept(self):
+        self.connections += 1
+        smtpd.SMTPServer.handle_accept(self)
+
+    def process_message(self, peer, mailfrom, rcpttos, data):
+        self.messages.append((mailfrom, rcpttos, data))
+
+
+class TestSMTPConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.sink = SinkServer()
+        self.thread = threading.Thread(target=asyncore.loop, kwargs={'timeout': 0.01})
+        self.thread.daemon = True
+        self.thread.start()
+        self.pool = self.make_pool()
+
+    def tearDown(self):
+        self.pool.close()
+        asyncore.close_all()
+        self.thread.join(1)
+
+    def make_pool(self, **kwargs):
+        return transport.SMTPConnectionPool('127.0.0.1:{}'.format(self.sink.port), ttls=False, login=False, **kwargs)
+
+    def messages(self, count):
+        return [
+            transport.build_message('osf@osf.io', 'user{}@example.com'.format(i), 'Subject {}'.format(i), 'Body {}'.format(i))
+            for i in range(count)
+        ]
+
+    def test_batch_uses_a_single_session(self):
+        sent = self.pool.send_messages(self.messages(50))
+        assert_equal(sent, 50)
+        assert_equal(len(self.sink.messages), 50)
+        assert_equal(self.sink.connections, 1)
+        assert_equal(self.pool.connects, 1)
+
+    def test_session_is_reused_between_sends(self):
+        for message in self.messages(5):
+            assert_true(self.pool.sendmail(*message))
+        assert_equal(len(self.sink.messages), 5)
+        assert_equal(self.sink.connections, 1)
+
+    def test_reconnects_when_session_was_dropped(self):
+        conn = self.pool.acquire()
+        conn.close()
+        self.pool.release(conn)
+
+        assert_true(self.pool.sendmail(*self.messages(1)[0]))
+        assert_equal(len(self.sink.messages), 1)
+        assert_equal(self.pool.connects, 2)
+
+    def test_failed_reconnect_does_not_pool_closed_session(self):
+        conn = self.pool.acquire()
+        conn.close()
+        self.pool.release(conn)
+
+        with mock.patch.object(self.pool, '_connect', side_effect=smtplib.SMTPAuthenticationError(535, 'Bad credentials')):
+            with assert_raises(smtplib.SMTPAuthenticationError):
+                self.pool.send_messages(self.messages(2))
+        assert_equal(len(self.pool._idle), 0)
+
+    def test_sendmail_raises_refused_message(self):
+        refused = smtplib.SMTPRecipientsRefused({'user0@example.com': (550, 'No such user')})
+        conn = self.pool.acquire()
+        self.pool.release(conn)
+        with mock.patch.object(conn, 'sendmail', side_effect=refused):
+            with assert_raises(smtplib.SMTPRecipientsRefused):
+                self.pool.sendmail(*self.messages(1)[0])
+            # Batches log the refused message and go on
+            assert_equal(self.pool.send_messages(self.messages(2)), 0)
+        # The session is still usable
+        assert_equal(len(self.pool._idle), 1)
+
+    def test_noop_health_check_discards_dead_sessions(self):
+        pool = self.make_pool(noop_after=0)
+        conn = pool.acquire()
+        conn.close()
+        pool.release(conn)
+
+        fresh = pool.acquire()
+        assert_is_not(fresh, conn)
+        assert_equal(fresh.noop()[0], 250)
+        pool.release(fresh)
+        pool.close()
+
+    def test_idle_sessions_expire(self):
+        pool = self.make_pool(max_idle=0)
+        pool.sendmail(*self.messages(1)[0])
+        time.sleep(0.01)
+        pool.sendmail(*self.messages(1)[0])
+        assert_equal(pool.connects, 2)
+        pool.close()
+
+    def test_pool_size_limits_idle_sessions(self):
+        pool = self.make_pool(size=1)
+        first, second = pool.acquire(), pool.acquire()
+        pool.release(first)
+        pool.release(second)
+        assert_equal(len(pool._idle), 1)
+        pool.close()
+
+    def test_send_emails_uses_pool(self):
+        messages = [
+            dict(from_addr='osf@osf.io', to_addr='user{}@example.com'.format(i), subject='Hi ${name}',
+                 message='Hello ${name}', substitutions={'${name}': 'User {}'.format(i)})
+            for i in range(10)
+        ]
+        with mock.patch.object(settings, 'MAIL_SERVER', '127.0.0.1:{}'.format(self.sink.port)), \
+                mock.patch.object(settings, 'SENDGRID_API_KEY', None), \
+                mock.patch.object(settings, 'USE_EMAIL', True):
+            sent = send_emails(messages, ttls=False, login=False)
+        transport.close_pools()
+        assert_equal(sent, 10)
+        assert_equal(self.sink.connections, 1)
+        assert_in('Hello User 3', self.sink.messages[3][2])
+
+    def test_throughput(self):
+        count = 200
+        unpooled = self.make_pool(size=0)
+        start = time.time()
+        for message in self.messages(count):
+            unpooled.sendmail(*message)
+        unpooled_rate = count / (time.time() - start)
+
+        start = time.time()
+        self.pool.send_messages(self.messages(count))
+        pooled_rate = count / (time.time() - start)
+
+        logging.getLogger(__name__).info(
+            'SMTP throughput: {:.0f} msg/s with a session per message, {:.0f} msg/s pooled'.format(unpooled_rate, pooled_rate)
+        )
+        assert_equal(unpooled.connects, count)
+        assert_equal(self.pool.connects, 1)
+        assert_equal(len(self.sink.messages), count * 2)
+
+
+class TestSendgridBatch(unittest.TestCase):
+
+    def test_groups_identical_messages_into_one_call(self):
+        mock_client = mock.MagicMock()
+        mock_client.send.return_value = 200, 'success'
+        messages = [
+            dict(from_addr='osf@osf.io', to_addr='user{}@example.com'.format(i), subject='Digest',
+                 message='Hello -name-', mimetype='html', categories=('digest', ),
+                 substitutions={'-name-': 'User {}'.format(i)})
+            for i in range(5)
+        ] + [dict(from_addr='osf@osf.io', to_addr='other@example.com', subject='Other', message='Other')]
+
+        sent = _send_batch_with_sendgrid(messages, client=mock_client)
+        assert_equal(sent, 6)
+        assert_equal(mock_client.send.call_count, 2)
+
+        digest = mock_client.send.call_args_list[0][0][0]
+        assert_equal(digest.smtpapi.data['to'], ['user{}@example.com'.format(i) for i in range(5)])
+        assert_equal(digest.smtpapi.data['sub'], {'-name-': ['User {}'.format(i) for i in range(5)]})
+        assert_equal(digest.html, 'Hello -name-')
+
+    def test_chunks_large_batches(self):
+        mock_client = mock.MagicMock()
+        mock_client.send.return_value = 200, 'success'
+        messages = [
+            dict(from_addr='osf@osf.io', to_addr='user{}@example.com'.format(i), subject='Digest', message='Hello')
+            for i in range(5)
+        ]
+        with mock.patch.object(settings, 'SENDGRID_BATCH_SIZE', 2):
+            sent = _send_batch_with_sendgrid(messages, client=mock_client)
+        assert_equal(sent, 5)
+        assert_equal(mock_client.send.call_count, 3)
+
+
 if __name__ == '__main__':
     unittest.main()
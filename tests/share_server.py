@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""A local stand-in for SHARE's normalizeddata endpoint, for tests and benchmarks.
+
+    with ShareServer(statuses=[503]) as share:
+        with mock.patch('website.settings.SHARE_URL', share.url):
+            ...
+        assert share.requests[0]['json']['data']['type'] == 'NormalizedData'
+"""
+import json
+import threading
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.getheader('content-length', 0)))
+        share = self.server.share
+        with share.lock:
+            share.requests.append({
+                'path': self.path,
+                'headers': dict(self.headers),
+                'json': json.loads(body) if body else None,
+            })
+            status = share.statuses.pop(0) if share.statuses else 200
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/vnd.api+json')
+        self.end_headers()
+        self.wfile.write(json.dumps({'data': {}}))
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ShareServer(object):
+    """Records the requests it is sent and answers them with `statuses`, in
+    order, then with 200s.
+    """
+
+    def __init__(self, statuses=None):
+        self.statuses = list(statuses or [])
+        self.requests = []
+        self.lock = threading.Lock()
+        self._server = HTTPServer(('127.0.0.1', 0), _Handler)
+        self._server.share = self
+        self._thread = None
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{}/'.format(self._server.server_address[1])
+
+    @property
+    def graphs(self):
+        """The @graph of each request received."""
+        return [request['json']['data']['attributes']['data']['@graph'] for request in self.requests]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -1,8 +1,17 @@
 # -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+
+import mock
 import pytest
+from django.core.management import call_command
+from django.core.cache import cache
 from django.utils import timezone
 from nose.tools import *  # noqa
 
+from api.citations import utils as citation_utils
+from api.citations.utils import render_citation, render_citations
 from framework.auth.core import Auth
 from osf_tests.factories import (
     fake,
@@ -16,7 +25,10 @@ from osf_tests.factories import (
 from scripts import parse_citation_styles
 from tests.base import OsfTestCase
 from osf.models import OSFUser
-from website.citations.utils import datetime_to_csl
+from osf.models.citation import CitationStyle
+from website import settings
+from website.citations import utils as citations_utils
+from website.citations.utils import datetime_to_csl, update_citation_styles
 from website.util import api_url_for
 
 pytestmark = pytest.mark.django_db
@@ -153,6 +165,79 @@ class CitationsUserTestCase(OsfTestCase):
         )
 
 
+class CitationsRenderTestCase(OsfTestCase):
+
+    def setUp(self):
+        super(CitationsRenderTestCase, self).setUp()
+        cache.clear()
+        citation_utils._parsed_styles.clear()
+        self.nodes = [ProjectFactory(is_public=True) for _ in range(3)]
+
+    def test_style_parsed_once(self):
+        with mock.patch.object(citation_utils, 'CitationStylesStyle', side_effect=citation_utils.CitationStylesStyle) as mock_style:
+            for node in self.nodes:
+                render_citation(node, 'apa')
+        assert_equal(mock_style.call_count, 1)
+
+    def test_style_parsed_again_when_file_changes(self):
+        render_citation(self.nodes[0], 'apa')
+        with mock.patch.object(citation_utils, 'CitationStylesStyle', side_effect=citation_utils.CitationStylesStyle) as mock_style, \
+                mock.patch('api.citations.utils.os.path.getmtime', return_value=0):
+            render_citation(self.nodes[1], 'apa')
+        assert_equal(mock_style.call_count, 1)
+
+    @mock.patch.object(citation_utils, 'CITATION_STYLE_CACHE_SIZE', 1)
+    def test_parsed_styles_bounded(self):
+        render_citation(self.nodes[0], 'apa')
+        render_citation(self.nodes[0], 'modern-language-association')
+        assert_equal(len(citation_utils._parsed_styles), 1)
+
+    def test_unknown_style(self):
+        with assert_raises(ValueError):
+            render_citation(self.nodes[0], 'not-a-style')
+
+    def test_citation_cached(self):
+        node = self.nodes[0]
+        with mock.patch.object(citation_utils, 'CitationStylesBibliography', side_effect=citation_utils.CitationStylesBibliography) as mock_bibliography:
+            citation = render_citation(node, 'apa')
+            assert_equal(render_citation(node, 'apa'), citation)
+            assert_equal(mock_bibliography.call_count, 1)
+
+            node.title = 'A new title'
+            node.save()
+            assert_in('A new title', render_citation(node, 'apa'))
+            assert_equal(mock_bibliography.call_count, 2)
+
+    def test_contributor_name_change_renders_again(self):
+        node = self.nodes[0]
+        render_citation(node, 'apa')
+        node.creator.family_name = 'Renamed'
+        node.creator.save()
+        assert_in('Renamed', render_citation(node, 'apa'))
+
+    def test_render_citations(self):
+        for style in ['apa', 'modern-language-association', 'chicago-author-date', 'ieee']:
+            expected = [render_citation(node, style) for node in self.nodes]
+            cache.clear()
+            with mock.patch.object(citation_utils, 'CitationStylesStyle', side_effect=citation_utils.CitationStylesStyle) as mock_style:
+                assert_equal(render_citations(self.nodes, style), expected)
+            assert_equal(mock_style.call_count, 0)
+
+    def test_render_citations_numbered_style(self):
+        # Each citation is the first and only entry of its own bibliography
+        citations = render_citations(self.nodes, 'ieee')
+        assert_equal(len(citations), len(self.nodes))
+        for citation in citations:
+            assert_true(citation.startswith('[1]'))
+
+    def test_render_citations_only_renders_missing(self):
+        render_citation(self.nodes[0], 'apa')
+        with mock.patch.object(citation_utils, 'CiteProcJSON', side_effect=citation_utils.CiteProcJSON) as mock_source:
+            render_citations(self.nodes, 'apa')
+        rendered = [csl['id'] for (data, ), _ in mock_source.call_args_list for csl in data]
+        assert_equal(rendered, [node._id for node in self.nodes[1:]])
+
+
 class CitationsViewsTestCase(OsfTestCase):
 
     @pytest.fixture(autouse=True)
@@ -200,3 +285,116 @@ class CitationsViewsTestCase(OsfTestCase):
         node.save()
         response = self.app.get("/api/v1" + "/project/" + node._id + "/citation/", auto_follow=True, auth=user.auth)
         assert_true(response.json)
+
+
+STYLE = u"""<?xml version="1.0" encoding="utf-8"?>
+<style xmlns="http://purl.org/net/xbiblio/csl" class="in-text" version="1.0">
+  <info>
+    <title>{title}</title>
+    <title-short>{short_title}</title-short>
+  </info>
+  <citation><layout><text variable="title"/></layout></citation>
+  {bibliography}
+</style>
+"""
+
+BIBLIOGRAPHY = u"""<bibliography>
+    <layout>
+      <names variable="author editor"/>
+      <choose><if variable="DOI"><text variable="DOI"/></if></choose>
+      <date variable="issued"/>
+    </layout>
+  </bibliography>"""
+
+
+class CitationStyleCatalogTestCase(OsfTestCase):
+
+    def setUp(self):
+        super(CitationStyleCatalogTestCase, self).setUp()
+        CitationStyle.objects.all().delete()
+        self.path = tempfile.mkdtemp()
+        self.write_style('apa', 'American Psychological Association 6th edition', 'APA')
+        self.write_style('apa-no-bib', 'American Psychological Association (note)', 'APA', bibliography='')
+        self.write_style('harvard', 'Harvard Reference format 1', 'Harvard')
+        self.write_style('vancouver', 'Vancouver', '')
+
+    def tearDown(self):
+        super(CitationStyleCatalogTestCase, self).tearDown()
+        shutil.rmtree(self.path)
+
+    def write_style(self, _id, title, short_title, bibliography=BIBLIOGRAPHY):
+        with open(os.path.join(self.path, '{}.csl'.format(_id)), 'w') as f:
+            f.write(STYLE.format(title=title, short_title=short_title, bibliography=bibliography).encode('utf-8'))
+
+    def test_styles_parsed(self):
+        counts = update_citation_styles(self.path)
+        assert_equal(counts, {'added': 4, 'updated': 0, 'unchanged': 0, 'removed': 0})
+        style = CitationStyle.objects.get(_id='apa')
+        assert_equal(style.title, 'American Psychological Association 6th edition')
+        assert_equal(style.short_title, 'APA')
+        assert_true(style.has_bibliography)
+        assert_equal(style.fields_used, ['DOI', 'author', 'editor', 'issued', 'title'])
+        assert_false(CitationStyle.objects.get(_id='apa-no-bib').has_bibliography)
+
+    def test_custom_styles_have_bibliography(self):
+        self.write_style('bluebook-inline', 'Bluebook Inline', 'Bluebook', bibliography='')
+        self.write_style('bluebook-notes', 'Bluebook Notes (unofficial)', 'Bluebook', bibliography='')
+        update_citation_styles(self.path)
+        assert_true(CitationStyle.objects.get(_id='bluebook-inline').has_bibliography)
+        assert_false(CitationStyle.objects.get(_id='bluebook-notes').has_bibliography)
+
+    def test_only_changed_files_parsed(self):
+        update_citation_styles(self.path)
+        self.write_style('harvard', 'Harvard Reference format 2', 'Harvard')
+        with mock.patch.object(citations_utils, 'parse_style', side_effect=citations_utils.parse_style) as mock_parse:
+            counts = update_citation_styles(self.path)
+        assert_equal(mock_parse.call_count, 1)
+        assert_equal(counts, {'added': 0, 'updated': 1, 'unchanged': 3, 'removed': 0})
+        assert_equal(CitationStyle.objects.get(_id='harvard').title, 'Harvard Reference format 2')
+
+    def test_force(self):
+        update_citation_styles(self.path)
+        counts = update_citation_styles(self.path, force=True)
+        assert_equal(counts['updated'], 4)
+
+    def test_removed_files(self):
+        update_citation_styles(self.path)
+        os.remove(os.path.join(self.path, 'vancouver.csl'))
+        counts = update_citation_styles(self.path)
+        assert_equal(counts['removed'], 1)
+        assert_false(CitationStyle.objects.filter(_id='vancouver').exists())
+
+    def test_invalid_file_skipped(self):
+        with open(os.path.join(self.path, 'broken.csl'), 'w') as f:
+            f.write('<style')
+        update_citation_styles(self.path)
+        assert_false(CitationStyle.objects.filter(_id='broken').exists())
+
+    def test_command(self):
+        call_command('update_citation_styles', path=self.path)
+        assert_equal(CitationStyle.objects.count(), 4)
+
+    def test_search(self):
+        update_citation_styles(self.path)
+        assert_equal(list(CitationStyle.objects.search('apa').values_list('_id', flat=True)), ['apa', 'apa-no-bib'])
+        assert_equal(list(CitationStyle.objects.search('harvard reference').values_list('_id', flat=True)), ['harvard'])
+
+    def test_list_styles_search(self):
+        update_citation_styles(self.path)
+        response = self.app.get(api_url_for('list_citation_styles', q='APA'))
+        assert_equal([style['id'] for style in response.json['styles']], ['apa'])
+        assert_equal(response.json['styles'][0]['fields_used'], ['DOI', 'author', 'editor', 'issued', 'title'])
+
+    @mock.patch.object(settings, 'CITATION_STYLES_PAGE_SIZE', 2)
+    def test_list_styles_pages(self):
+        update_citation_styles(self.path)
+        response = self.app.get(api_url_for('list_citation_styles', page=1))
+        assert_equal([style['id'] for style in response.json['styles']], ['apa', 'harvard'])
+        assert_true(response.json['more'])
+        response = self.app.get(api_url_for('list_citation_styles', page=2))
+        assert_equal([style['id'] for style in response.json['styles']], ['vancouver'])
+        assert_false(response.json['more'])
+
+    def test_list_styles_bad_page(self):
+        response = self.app.get(api_url_for('list_citation_styles', page='first'), expect_errors=True)
+        assert_equal(response.status_code, 400)
@@ -1241,6 +1241,67 @@ class TestCompileSubscriptions(NotificationTestCase):
         assert_equal(subs, {'email_transactional': [], 'email_digest': [self.user_1._id], 'none': []})
 
 
+class TestNotifyQueries(NotificationTestCase):
+
+    def _notify_on_tree(self, depth, subscribers_per_level=2):
+        creator = factories.UserFactory()
+        node = factories.ProjectFactory(creator=creator)
+        for level in range(depth):
+            if level:
+                node = factories.NodeFactory(parent=node, creator=creator)
+            for _ in range(subscribers_per_level):
+                subscriber = factories.UserFactory()
+                node.add_contributor(subscriber, permissions=['read', 'write', 'admin'], auth=Auth(creator))
+                utils.subscribe_user_to_notifications(node, subscriber)
+        context = dict(
+            profile_image_url='',
+            content='Hello',
+            page_type='project',
+            page_title=node.title,
+            provider='',
+            url=node.absolute_url,
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            sent = emails.notify('comments', creator, node, timezone.now(), **context)
+        return sent, len(ctx.captured_queries)
+
+    def test_notify_queries_do_not_grow_with_depth_or_subscribers(self):
+        sent, shallow_queries = self._notify_on_tree(2)
+        assert_equal(len(sent), 4)
+        sent, deep_queries = self._notify_on_tree(8)
+        assert_equal(len(sent), 16)
+        assert_equal(NotificationDigest.objects.filter(user__guid_string__in=sent).count(), 16)
+        assert_equal(shallow_queries, deep_queries)
+
+    def test_store_emails_localizes_per_recipient(self):
+        project = factories.ProjectFactory()
+        sender = factories.UserFactory()
+        user_1 = factories.UserFactory(timezone='America/New_York')
+        user_2 = factories.UserFactory(timezone='Asia/Tokyo', locale='de_DE')
+        timestamp = timezone.now()
+        emails.store_emails(
+            [user_1._id, user_2._id, sender._id], 'email_transactional', 'comments', sender, project, timestamp,
+            profile_image_url='', content='Hello', page_type='project', page_title='', provider='', url=project.absolute_url,
+        )
+        assert_false(NotificationDigest.objects.filter(user=sender).exists())
+        for user in [user_1, user_2]:
+            message = NotificationDigest.objects.get(user=user).message
+            assert_in(emails.localize_timestamp(timestamp, user), message)
+            assert_not_in('%%', message)
+
+    @mock.patch('website.mails.render_message')
+    def test_recipient_message_substitutes_recipient_fields(self, mock_render):
+        mock_render.side_effect = lambda template, **context: u'Hello {}, at {}'.format(
+            context['recipient'].fullname, context['localized_timestamp']
+        )
+        message = emails.RecipientMessage('comments.html.mako', user=factories.UserFactory())
+        assert_equal(mock_render.call_count, 1)
+        user_1 = factories.UserFactory(fullname='Freddie Mercury')
+        user_2 = factories.UserFactory(fullname='Brian May')
+        assert_equal(message.for_recipient(user_1, 'noon'), u'Hello Freddie Mercury, at noon')
+        assert_equal(message.for_recipient(user_2, 'midnight'), u'Hello Brian May, at midnight')
+
+
 class TestMoveSubscription(NotificationTestCase):
     def setUp(self):
         super(TestMoveSubscription, self).setUp()
@@ -1766,8 +1827,9 @@ class TestSendDigest(OsfTestCase):
         digest_ids = [d._id, d2._id, d3._id]
         remove_notifications(email_notification_ids=digest_ids)
 
-    @mock.patch('website.mails.send_mail')
-    def test_send_users_email_called_with_correct_args(self, mock_send_mail):
+    @mock.patch('framework.email.tasks.send_email')
+    @mock.patch('website.mails.render_mail', wraps=mails.render_mail)
+    def test_send_users_email_called_with_correct_args(self, mock_render_mail, mock_send_email):
         send_type = 'email_transactional'
         d = factories.NotificationDigestFactory(
             send_type=send_type,
@@ -1779,13 +1841,13 @@ class TestSendDigest(OsfTestCase):
         d.save()
         user_groups = list(get_users_emails(send_type))
         send_users_email(send_type)
-        assert_true(mock_send_mail.called)
-        assert_equals(mock_send_mail.call_count, len(user_groups))
+        assert_true(mock_send_email.called)
+        assert_equals(mock_send_email.call_count, len(user_groups))
 
         last_user_index = len(user_groups) - 1
         user = OSFUser.load(user_groups[last_user_index]['user_id'])
 
-        args, kwargs = mock_send_mail.call_args
+        args, kwargs = mock_render_mail.call_args
 
         assert_equal(kwargs['to_addr'], user.username)
         assert_equal(kwargs['mimetype'], 'html')
@@ -1794,8 +1856,12 @@ class TestSendDigest(OsfTestCase):
         message = group_by_node(user_groups[last_user_index]['info'])
         assert_equal(kwargs['message'], message)
 
-    @mock.patch('website.mails.send_mail')
-    def test_send_users_email_ignores_disabled_users(self, mock_send_mail):
+        args, kwargs = mock_send_email.call_args
+        assert_equal(kwargs['to_addr'], user.username)
+        assert_equal(kwargs['mimetype'], 'html')
+
+    @mock.patch('framework.email.tasks.send_email')
+    def test_send_users_email_ignores_disabled_users(self, mock_send_email):
         send_type = 'email_transactional'
         d = factories.NotificationDigestFactory(
             send_type=send_type,
@@ -1814,7 +1880,98 @@ class TestSendDigest(OsfTestCase):
         user.save()
 
         send_users_email(send_type)
-        assert_false(mock_send_mail.called)
+        assert_false(mock_send_email.called)
+        assert_false(NotificationDigest.objects.filter(_id=d._id).exists())
+
+    def _make_digests(self, send_type, count):
+        project = factories.ProjectFactory()
+        return [
+            factories.NotificationDigestFactory(
+                send_type=send_type,
+                event='comment_replies',
+                timestamp=timezone.now(),
+                message='Hello',
+                node_lineage=[project._id]
+            ) for _ in range(count)
+        ]
+
+    @mock.patch('framework.email.tasks.send_email')
+    def test_send_users_email_delivers_in_chunks(self, mock_send_email):
+        send_type = 'email_digest'
+        digests = self._make_digests(send_type, 5)
+        removals = []
+
+        def remove(email_notification_ids=None):
+            removals.append((mock_send_email.call_count, len(email_notification_ids)))
+            remove_notifications(email_notification_ids=email_notification_ids)
+
+        with mock.patch.object(settings, 'DIGEST_CHUNK_SIZE', 2), \
+                mock.patch.object(settings, 'DIGEST_FETCH_SIZE', 3), \
+                mock.patch('website.notifications.tasks.remove_notifications', side_effect=remove):
+            send_users_email(send_type)
+
+        assert_equal(mock_send_email.call_count, len(digests))
+        # Each chunk's digests are removed once that chunk has been delivered
+        assert_equal(removals, [(2, 2), (4, 2), (5, 1)])
+        assert_false(NotificationDigest.objects.filter(send_type=send_type).exists())
+
+    @mock.patch('framework.email.tasks.send_email')
+    def test_send_users_email_keeps_undelivered_digests(self, mock_send_email):
+        send_type = 'email_digest'
+        failed, delivered = self._make_digests(send_type, 2)
+        failed_user = failed.user
+
+        def send_email(**kwargs):
+            if kwargs['to_addr'] == failed_user.username:
+                raise Exception('Connection refused')
+            return True
+        mock_send_email.side_effect = send_email
+
+        send_users_email(send_type)
+        assert_true(NotificationDigest.objects.filter(_id=failed._id).exists())
+        assert_false(NotificationDigest.objects.filter(_id=delivered._id).exists())
+
+        # The next run picks up where the failed one left off
+        mock_send_email.reset_mock()
+        mock_send_email.side_effect = None
+        send_users_email(send_type)
+        assert_equal(mock_send_email.call_count, 1)
+        assert_equal(mock_send_email.call_args[1]['to_addr'], failed_user.username)
+        assert_false(NotificationDigest.objects.filter(send_type=send_type).exists())
+
+    @mock.patch('framework.email.tasks.send_email', return_value=False)
+    def test_send_users_email_keeps_digests_when_send_fails(self, mock_send_email):
+        send_type = 'email_digest'
+        self._make_digests(send_type, 2)
+        send_users_email(send_type)
+        assert_equal(mock_send_email.call_count, 2)
+        assert_equal(NotificationDigest.objects.filter(send_type=send_type).count(), 2)
+
+    @mock.patch('framework.email.tasks.send_email', return_value=None)
+    def test_send_users_email_removes_digests_when_email_is_disabled(self, mock_send_email):
+        send_type = 'email_digest'
+        self._make_digests(send_type, 2)
+        send_users_email(send_type)
+        assert_equal(mock_send_email.call_count, 2)
+        assert_false(NotificationDigest.objects.filter(send_type=send_type).exists())
+
+    @mock.patch('framework.email.tasks.send_email')
+    def test_send_users_email_does_not_resend(self, mock_send_email):
+        send_type = 'email_digest'
+        self._make_digests(send_type, 2)
+        send_users_email(send_type)
+        send_users_email(send_type)
+        assert_equal(mock_send_email.call_count, 2)
+
+    @mock.patch('framework.email.tasks.send_email')
+    def test_send_users_email_skips_while_another_run_holds_the_lock(self, mock_send_email):
+        send_type = 'email_digest'
+        self._make_digests(send_type, 1)
+        with mock.patch('website.notifications.tasks.digest_lock') as mock_lock:
+            mock_lock.return_value.__enter__.return_value = False
+            send_users_email(send_type)
+        assert_false(mock_send_email.called)
+        assert_true(NotificationDigest.objects.filter(send_type=send_type).exists())
 
     def test_remove_sent_digest_notifications(self):
         d = factories.NotificationDigestFactory(
@@ -1,11 +1,15 @@
 # -*- coding: utf-8 -*-
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from nose.tools import *  # flake8: noqa (PEP8 asserts)
 from osf.exceptions import ValidationValueError
 
 from tests.base import OsfTestCase
 from osf_tests.factories import SubjectFactory, PreprintFactory, PreprintProviderFactory
 
+from osf.models import PreprintService, Subject
+from osf.models.subject import get_subject_tree
 from osf.models.validators import validate_subject_hierarchy
 
 
@@ -175,3 +179,65 @@ class TestSubjectProperties(OsfTestCase):
         assert self.bepress_child.path == 'bepress|BePress Text|BePress Child'
         assert self.other_subj.path == 'asdf|Other Text'
         assert self.other_child.path == 'asdf|Other Text|Other Child'
+
+
+class TestSubjectTree(OsfTestCase):
+    def setUp(self):
+        super(TestSubjectTree, self).setUp()
+        self.provider = PreprintProviderFactory(_id='osf', share_title='bepress')
+        self.root = SubjectFactory(text='Root', provider=self.provider)
+        self.parent = SubjectFactory(text='Parent', provider=self.provider, parent=self.root)
+        self.child = SubjectFactory(text='Child', provider=self.provider, parent=self.parent)
+        self.other_root = SubjectFactory(text='Other Root', provider=self.provider)
+
+    def reloaded(self, subject):
+        return Subject.objects.get(id=subject.id)
+
+    def test_tree_is_loaded_in_one_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            tree = get_subject_tree(self.provider.id)
+        assert_equal(len(ctx.captured_queries), 1)
+        assert_equal(tree.ancestor_ids(self.child.id), [self.root.id, self.parent.id])
+        assert_equal(sorted(tree.descendant_ids(self.root.id)), sorted([self.parent.id, self.child.id]))
+        assert_equal(sorted(tree.children[None]), sorted([self.root.id, self.other_root.id]))
+
+    def test_hierarchy_does_not_query_parents(self):
+        child = self.reloaded(self.child)
+        get_subject_tree(self.provider.id)
+        with CaptureQueriesContext(connection) as ctx:
+            assert_equal(child.hierarchy, [self.root._id, self.parent._id, self.child._id])
+            assert_equal(child.object_hierarchy, [self.root, self.parent, self.child])
+            assert_equal(child.path, 'bepress|Root|Parent|Child')
+            assert_equal(self.reloaded(self.root).child_count, 1)
+        # Only the reload of the root
+        assert_equal(len(ctx.captured_queries), 1)
+
+    def test_saving_a_subject_reloads_the_tree(self):
+        get_subject_tree(self.provider.id)
+        self.child.parent = self.other_root
+        self.child.save()
+        assert_equal(self.reloaded(self.child).hierarchy, [self.other_root._id, self.child._id])
+        assert_equal(self.reloaded(self.root).child_count, 1)
+        assert_equal(self.reloaded(self.other_root).child_count, 1)
+
+    def test_unsaved_parent_is_respected(self):
+        get_subject_tree(self.provider.id)
+        child = self.reloaded(self.child)
+        child.parent = self.other_root
+        assert_equal(child.hierarchy, [self.other_root._id, self.child._id])
+
+    def test_include_children(self):
+        subjects = Subject.objects.filter(id=self.root.id).include_children()
+        assert_equal(set(subjects), {self.root, self.parent, self.child})
+
+    def test_preprint_subject_hierarchy(self):
+        preprint = PreprintFactory(provider=self.provider, subjects=[[self.root._id, self.parent._id, self.child._id], [self.other_root._id]])
+        preprint = PreprintService.objects.prefetch_related('subjects').get(id=preprint.id)
+        get_subject_tree(self.provider.id)
+        with CaptureQueriesContext(connection) as ctx:
+            hierarchy = preprint.subject_hierarchy
+        assert_equal(len(ctx.captured_queries), 0)
+        assert_equal(
+            sorted([s._id for s in hier] for hier in hierarchy),
+            sorted([[self.root._id, self.parent._id, self.child._id], [self.other_root._id]])
+        )
@@ -4373,9 +4373,8 @@ class TestCommentViews(OsfTestCase):
             'page': 'node',
             'rootId': self.project._id
         }, auth=self.user.auth)
-        self.user.reload()
 
-        user_timestamp = self.user.comments_viewed_timestamp[self.project._id]
+        user_timestamp = self.user.get_node_comment_timestamps(self.project._id)
         view_timestamp = timezone.now()
         assert_datetime_equal(user_timestamp, view_timestamp)
 
@@ -4387,8 +4386,7 @@ class TestCommentViews(OsfTestCase):
             'rootId': self.project._id
         }, auth=self.user.auth)
 
-        non_contributor.reload()
-        assert_not_in(self.project._id, non_contributor.comments_viewed_timestamp)
+        assert_false(non_contributor.comment_read_states.exists())
 
     def test_view_comments_updates_user_comments_view_timestamp_files(self):
         osfstorage = self.project.get_addon('osfstorage')
@@ -4403,14 +4401,15 @@ class TestCommentViews(OsfTestCase):
             'contentType': 'img/png'
         }).save()
 
+        file_guid = test_file.get_guid(create=True)._id
+
         url = self.project.api_url_for('update_comments_timestamp')
         res = self.app.put_json(url, {
             'page': 'files',
-            'rootId': test_file._id
+            'rootId': file_guid
         }, auth=self.user.auth)
-        self.user.reload()
 
-        user_timestamp = self.user.comments_viewed_timestamp[test_file._id]
+        user_timestamp = self.user.get_node_comment_timestamps(file_guid)
         view_timestamp = timezone.now()
         assert_datetime_equal(user_timestamp, view_timestamp)
 
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""A local stand-in for Varnish's BAN endpoint, for tests.
+
+    with VarnishServer(statuses=[503]) as varnish:
+        with mock.patch('website.settings.VARNISH_SERVERS', [varnish.url]):
+            ...
+        assert varnish.is_banned('/v2/nodes/abc12/')
+"""
+import re
+import threading
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from SocketServer import ThreadingMixIn
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive, like Varnish
+    protocol_version = 'HTTP/1.1'
+
+    def do_BAN(self):
+        varnish = self.server.varnish
+        with varnish.lock:
+            varnish.requests.append({
+                'path': self.path,
+                'headers': dict(self.headers),
+            })
+            status = varnish.statuses.pop(0) if varnish.statuses else 200
+        body = 'BAN by URL regex: {}'.format(self.path)
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class VarnishServer(object):
+    """Records the BAN requests it is sent and answers them with `statuses`,
+    in order, then with 200s.
+    """
+
+    def __init__(self, statuses=None):
+        self.statuses = list(statuses or [])
+        self.requests = []
+        self.lock = threading.Lock()
+        self._server = _ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._server.varnish = self
+        self._thread = None
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{}'.format(self._server.server_address[1])
+
+    @property
+    def bans(self):
+        """The regex of each BAN received."""
+        return [request['path'] for request in self.requests]
+
+    def is_banned(self, url):
+        """Whether a BAN received matches `url`, as Varnish matches the x-url
+        of cached objects (see tests/test_files/varnish.vcl).
+        """
+        return any(re.search(ban, url) for ban in self.bans)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -1,3 +1,87 @@
+import hashlib
+import logging
+import os
+
+from django.utils import timezone
+from lxml import etree
+
+from website import settings
+
+logger = logging.getLogger(__name__)
+
+
 def datetime_to_csl(dt):
     """Given a datetime, return a dict in CSL-JSON date-variable schema"""
     return {'date-parts': [[dt.year, dt.month, dt.day]]}
+
+
+def get_style_files(path):
+    files = (os.path.join(path, x) for x in os.listdir(path))
+    return (f for f in files if os.path.isfile(f))
+
+
+def parse_style(content, _id=None):
+    """Given the content of a CSL file, return the fields of its CitationStyle,
+    or None if it is not valid XML.
+
+    :param str _id: The id of the style, named after its file
+    """
+    try:
+        root = etree.fromstring(content)
+    except etree.XMLSyntaxError:
+        return None
+    namespace = root.nsmap.get(None)
+    selector = '{{{ns}}}info/{{{ns}}}'.format(ns=namespace)
+
+    title = root.find(selector + 'title').text
+    fields = {
+        'title': title,
+        # Custom (Bluebook) styles are rendered with a bibliography from 'website/static/bluebook.csl'
+        'has_bibliography': root.find('{{{ns}}}bibliography'.format(ns=namespace)) is not None or _id in settings.CUSTOM_CITATIONS,
+        'fields_used': sorted(set(
+            variable
+            for element in root.iter()
+            if isinstance(element.tag, basestring)
+            for variable in element.get('variable', '').split()
+        )),
+        'short_title': None,
+        'summary': None,
+    }
+    for field, tag in (('short_title', 'title-short'), ('summary', 'summary')):
+        element = root.find(selector + tag)
+        if element is not None:
+            fields[field] = element.text
+    return fields
+
+
+def update_citation_styles(path, force=False):
+    """Bring the CitationStyles in line with the CSL files in `path`. Only the
+    files whose content hash changed since they were last parsed are parsed.
+
+    :param bool force: Parse every file
+    :return dict: The number of styles added, updated, unchanged and removed
+    """
+    from osf.models.citation import CitationStyle
+
+    hashes = dict(CitationStyle.objects.values_list('_id', 'content_hash'))
+    counts = {'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0}
+    seen = set()
+    for style_file in get_style_files(path):
+        _id = os.path.splitext(os.path.basename(style_file))[0]
+        with open(style_file, 'rb') as f:
+            content = f.read()
+        content_hash = hashlib.sha256(content).hexdigest()
+        if not force and hashes.get(_id) == content_hash:
+            seen.add(_id)
+            counts['unchanged'] += 1
+            continue
+        fields = parse_style(content, _id=_id)
+        if fields is None:
+            logger.warning('Could not parse {}'.format(style_file))
+            continue
+        seen.add(_id)
+        fields.update(content_hash=content_hash, date_parsed=timezone.now())
+        _, created = CitationStyle.objects.update_or_create(_id=_id, defaults=fields)
+        counts['added' if created else 'updated'] += 1
+    counts['removed'], _ = CitationStyle.objects.exclude(_id__in=seen).delete()
+    return counts
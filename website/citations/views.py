@@ -1,10 +1,13 @@
 # -*- coding: utf-8 -*-
+import httplib as http
+
 from flask import request
-from django.db.models import Q
 
 from framework.auth.decorators import must_be_logged_in
+from framework.exceptions import HTTPError
 
 from osf.models.citation import CitationStyle
+from website import settings
 from website.project.decorators import (
     must_have_addon, must_be_addon_authorizer,
     must_have_permission, must_not_be_registration,
@@ -12,16 +15,29 @@ from website.project.decorators import (
 )
 
 def list_citation_styles():
+    """List the styles with a bibliography, optionally matching `q`. When
+    `page` is given, only that page of styles is returned.
+    """
     query = request.args.get('q')
-    citation_styles = CitationStyle.objects.all()
+    citation_styles = CitationStyle.objects.filter(has_bibliography=True)
     if query:
-        citation_styles = CitationStyle.objects.filter(
-            Q(_id__icontains=query) |
-            Q(title__icontains=query) |
-            Q(short_title__icontains=query)
-        )
+        citation_styles = citation_styles.search(query)
+    more = False
+    if 'page' in request.args:
+        try:
+            page = int(request.args['page'])
+        except ValueError:
+            raise HTTPError(http.BAD_REQUEST)
+        if page < 1:
+            raise HTTPError(http.BAD_REQUEST)
+        start = (page - 1) * settings.CITATION_STYLES_PAGE_SIZE
+        # Fetch one extra style to tell whether there is a next page
+        citation_styles = list(citation_styles[start:start + settings.CITATION_STYLES_PAGE_SIZE + 1])
+        more = len(citation_styles) > settings.CITATION_STYLES_PAGE_SIZE
+        citation_styles = citation_styles[:settings.CITATION_STYLES_PAGE_SIZE]
     return {
-        'styles': [style.to_json() for style in citation_styles if style.has_bibliography]
+        'styles': [style.to_json() for style in citation_styles],
+        'more': more,
     }
 
 
@@ -95,7 +95,7 @@ def add_poster_by_email(conference, message):
         node, node_created = Node.objects.get_or_create(
             title__iexact=message.subject,
             is_deleted=False,
-            _contributors__guids___id=user._id,
+            _contributors__guid_string=user._id,
             defaults={
                 'title': message.subject,
                 'creator': user
@@ -205,7 +205,7 @@ def redirect_to_meetings(**kwargs):
 def serialize_conference(conf):
     return {
         'active': conf.active,
-        'admins': list(conf.admins.all().values_list('guids___id', flat=True)),
+        'admins': list(conf.admins.all().values_list('guid_string', flat=True)),
         'end_date': conf.end_date,
         'endpoint': conf.endpoint,
         'field_names': conf.field_names,
@@ -0,0 +1,28 @@
+import logging
+
+from django.apps import apps
+
+from framework.celery_tasks import app as celery_app
+
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(ignore_results=True)
+def reconcile_institution_summaries():
+    """Recount every institution's summary from scratch, correcting the
+    incrementally maintained counts.
+
+    :return int: The number of institutions whose counts had drifted
+    """
+    Institution = apps.get_model('osf.Institution')
+    InstitutionSummary = apps.get_model('osf.InstitutionSummary')
+    drifted = 0
+    for institution_id, _id in Institution.objects.filter(is_deleted=False).values_list('id', '_id'):
+        drift = InstitutionSummary.reconcile(institution_id)
+        if drift:
+            drifted += 1
+            logger.warning('Corrected the summary of institution {}: {}'.format(
+                _id, ', '.join('{} {} -> {}'.format(field, *values) for field, values in sorted(drift.items()))
+            ))
+    return drifted
@@ -30,8 +30,11 @@ logger = logging.getLogger(__name__)
 
 EMAIL_TEMPLATES_DIR = os.path.join(settings.TEMPLATES_PATH, 'emails')
 
+# Compiled templates are cached by the lookup; only stat the template files
+# for changes while developing
 _tpl_lookup = TemplateLookup(
     directories=[EMAIL_TEMPLATES_DIR],
+    filesystem_checks=settings.DEBUG_MODE,
 )
 
 TXT_EXT = '.txt.mako'
@@ -51,6 +54,7 @@ class Mail(object):
     def __init__(self, tpl_prefix, subject, categories=None):
         self.tpl_prefix = tpl_prefix
         self._subject = subject
+        self._subject_template = None
         self.categories = categories
 
     def html(self, **context):
@@ -64,7 +68,9 @@ class Mail(object):
         return render_message(tpl_name, **context)
 
     def subject(self, **context):
-        return Template(self._subject).render(**context)
+        if self._subject_template is None:
+            self._subject_template = Template(self._subject)
+        return self._subject_template.render(**context)
 
 
 def render_message(tpl_name, **context):
@@ -92,8 +98,33 @@ def send_mail(to_addr, mail, mimetype='plain', from_addr=None, mailer=None, cele
          Uses celery if available
     """
 
-    from_addr = from_addr or settings.FROM_EMAIL
     mailer = mailer or tasks.send_email
+    kwargs = render_mail(
+        to_addr, mail, mimetype=mimetype, from_addr=from_addr, username=username, password=password,
+        attachment_name=attachment_name, attachment_content=attachment_content, **context
+    )
+
+    logger.debug('Preparing to send...')
+    if settings.USE_EMAIL:
+        if settings.USE_CELERY and celery:
+            logger.debug('Sending via celery...')
+            return mailer.apply_async(kwargs=kwargs, link=callback)
+        else:
+            logger.debug('Sending without celery')
+            ret = mailer(**kwargs)
+            if callback:
+                callback()
+
+            return ret
+
+
+def render_mail(to_addr, mail, mimetype='plain', from_addr=None, username=None, password=None,
+                attachment_name=None, attachment_content=None, **context):
+    """Render an email from the OSF without sending it.
+
+    :return dict: The keyword arguments for ``framework.email.tasks.send_email``
+    """
+    from_addr = from_addr or settings.FROM_EMAIL
     subject = mail.subject(**context)
     message = mail.text(**context) if mimetype in ('plain', 'txt') else mail.html(**context)
     # Don't use ttls and login in DEBUG_MODE
@@ -101,7 +132,7 @@ def send_mail(to_addr, mail, mimetype='plain', from_addr=None, mailer=None, cele
     logger.debug('Sending email...')
     logger.debug(u'To: {to_addr}\nFrom: {from_addr}\nSubject: {subject}\nMessage: {message}'.format(**locals()))
 
-    kwargs = dict(
+    return dict(
         from_addr=from_addr,
         to_addr=to_addr,
         subject=subject,
@@ -116,19 +147,6 @@ def send_mail(to_addr, mail, mimetype='plain', from_addr=None, mailer=None, cele
         attachment_content=attachment_content,
     )
 
-    logger.debug('Preparing to send...')
-    if settings.USE_EMAIL:
-        if settings.USE_CELERY and celery:
-            logger.debug('Sending via celery...')
-            return mailer.apply_async(kwargs=kwargs, link=callback)
-        else:
-            logger.debug('Sending without celery')
-            ret = mailer(**kwargs)
-            if callback:
-                callback()
-
-            return ret
-
 
 def get_english_article(word):
     """
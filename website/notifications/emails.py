@@ -1,6 +1,9 @@
+import uuid
+
 from babel import dates, core, Locale
+from django.db import connection
 
-from osf.models import AbstractNode, OSFUser, NotificationDigest, NotificationSubscription
+from osf.models import AbstractNode, Contributor, NodeAncestor, OSFUser, NotificationDigest, NotificationSubscription
 
 from website import mails
 from website.notifications import constants
@@ -53,7 +56,7 @@ def notify(event, user, node, timestamp, **context):
 
 def notify_mentions(event, user, node, timestamp, **context):
     recipient_ids = context.get('new_mentions', [])
-    recipients = OSFUser.objects.filter(guids___id__in=recipient_ids)
+    recipients = OSFUser.objects.filter(guid_string__in=recipient_ids)
     sent_users = notify_global_event(event, user, node, timestamp, recipients, context=context)
     return sent_users
 
@@ -95,55 +98,172 @@ def store_emails(recipient_ids, notification_type, event, user, node, timestamp,
     context['user'] = user
     node_lineage_ids = get_node_lineage(node) if node else []
 
-    for recipient_id in recipient_ids:
-        if recipient_id == user._id:
-            continue
-        recipient = OSFUser.load(recipient_id)
-        if recipient.is_disabled:
-            continue
-        context['localized_timestamp'] = localize_timestamp(timestamp, recipient)
-        context['recipient'] = recipient
-        message = mails.render_message(template, **context)
+    recipients = OSFUser.objects.filter(
+        guid_string__in=[recipient_id for recipient_id in recipient_ids if recipient_id != user._id],
+        date_disabled__isnull=True,
+    )
 
-        digest = NotificationDigest(
+    # The message only differs between recipients by their localized timestamp
+    # and fields of `recipient`, so render it once per locale and fill those in
+    messages = {}
+    timestamps = {}
+    digests = []
+    for recipient in recipients:
+        if recipient.locale not in messages:
+            messages[recipient.locale] = RecipientMessage(template, **context)
+        timestamp_key = (recipient.timezone, recipient.locale)
+        if timestamp_key not in timestamps:
+            timestamps[timestamp_key] = localize_timestamp(timestamp, recipient)
+        digests.append(NotificationDigest(
             timestamp=timestamp,
             send_type=notification_type,
             event=event,
             user=recipient,
-            message=message,
+            message=messages[recipient.locale].for_recipient(recipient, timestamps[timestamp_key]),
             node_lineage=node_lineage_ids
-        )
-        digest.save()
+        ))
+    NotificationDigest.objects.bulk_create(digests)
+
 
+class RecipientMessage(object):
+    """A notification rendered once for many recipients.
 
-def compile_subscriptions(node, event_type, event=None, level=0):
-    """Recurse through node and parents for subscriptions.
+    The template is rendered with placeholders standing in for
+    ``localized_timestamp`` and any attribute of ``recipient`` it uses, which
+    `for_recipient` then substitutes with each recipient's values.
+    """
+
+    def __init__(self, template, **context):
+        self._token = uuid.uuid4().hex
+        self._fields = set()
+        context['recipient'] = _RecipientPlaceholder(self)
+        context['localized_timestamp'] = self.placeholder('localized_timestamp')
+        self.message = mails.render_message(template, **context)
+
+    def placeholder(self, field):
+        return u'%%{}:{}%%'.format(self._token, field)
+
+    def for_recipient(self, recipient, localized_timestamp):
+        message = self.message.replace(self.placeholder('localized_timestamp'), localized_timestamp)
+        for field in self._fields:
+            message = message.replace(self.placeholder('recipient.' + field), u'{}'.format(getattr(recipient, field)))
+        return message
+
+
+class _RecipientPlaceholder(object):
+
+    def __init__(self, message):
+        self._message = message
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        self._message._fields.add(name)
+        return self._message.placeholder('recipient.' + name)
+
+
+# The node and its primary (non-link) parents
+ANCESTORS_CTE = """
+    WITH ancestors AS (
+        SELECT %(node_id)s AS node_id, 0 AS depth
+      UNION ALL
+        SELECT ancestor_id, depth
+        FROM "{nodeancestor}"
+        WHERE descendant_id = %(node_id)s
+    )
+"""
+
+# Whether the user `{user}` may read the node `{node}` at `{depth}` in the
+# ancestors, i.e. `AbstractNode.has_permission(user, 'read')`
+HAS_READ_SQL = """(
+    EXISTS (
+        SELECT 1 FROM "{contributor}" AS C
+        WHERE C.user_id = {user} AND C.node_id = {node} AND C.read IS TRUE
+    ) OR EXISTS (
+        SELECT 1 FROM "{contributor}" AS C
+          JOIN ancestors AS P ON P.node_id = C.node_id
+        WHERE C.user_id = {user} AND C.admin IS TRUE AND P.depth >= {depth}
+    )
+)"""
+
+COMPILE_SUBSCRIPTIONS_SQL = ANCESTORS_CTE + """
+    , levels AS (
+        SELECT node_id, depth, %(event_type)s::text AS event_name, depth + 1 AS priority
+        FROM ancestors
+      UNION ALL
+        SELECT node_id, depth, %(event)s::text, 0
+        FROM ancestors
+        WHERE depth = 0 AND %(event)s::text IS NOT NULL
+    ), subscribers AS (
+        SELECT S.user_id, S.notification_type, L.node_id, L.depth, L.priority
+        FROM levels AS L
+          JOIN "{abstractnode}" AS N ON N.id = L.node_id
+          JOIN "{notificationsubscription}" AS NS ON NS._id = N.guid_string || '_' || L.event_name
+          JOIN ({members}) AS S ON S.subscription_id = NS.id
+    ), effective AS (
+        SELECT DISTINCT ON (S.user_id) S.user_id, S.notification_type
+        FROM subscribers AS S
+        WHERE {subscriber_can_read}
+        ORDER BY S.user_id, S.priority
+    )
+    SELECT U.guid_string, E.notification_type
+    FROM effective AS E
+      JOIN "{osfuser}" AS U ON U.id = E.user_id
+    WHERE U.date_disabled IS NULL
+      AND {recipient_can_read}
+    ORDER BY U.id
+"""
+
+
+def _subscription_members_sql():
+    """Union of the users in every notification type of every subscription."""
+    members = []
+    for notification_type in constants.NOTIFICATION_TYPES:
+        field = NotificationSubscription._meta.get_field(notification_type)
+        members.append("""
+            SELECT "{subscription}" AS subscription_id, "{user}" AS user_id, '{notification_type}'::text AS notification_type
+            FROM "{table}"
+        """.format(
+            subscription=field.m2m_column_name(),
+            user=field.m2m_reverse_name(),
+            notification_type=notification_type,
+            table=field.m2m_db_table(),
+        ))
+    return ' UNION ALL '.join(members)
+
+
+def compile_subscriptions(node, event_type, event=None):
+    """Resolve the subscriptions of a node and its parents in a single query.
+
+    A user's subscription on the most specific level wins: `event` on `node`,
+    then `event_type` on `node`, then `event_type` on each parent in turn.
+    Subscriptions only count on levels the user can read, and users who can
+    not read `node` itself are left out.
 
     :param node: current node
     :param event_type: Generally node_subscriptions_available
     :param event: Particular event such a file_updated that has specific file subs
-    :param level: How deep the recursion is
     :return: a dict of notification types with lists of users.
     """
-    subscriptions = check_node(node, event_type)
-    if event:
-        subscriptions = check_node(node, event)  # Gets particular event subscriptions
-        parent_subscriptions = compile_subscriptions(node, event_type, level=level + 1)  # get node and parent subs
-    elif node.parent_id:
-        parent_subscriptions = \
-            compile_subscriptions(AbstractNode.load(node.parent_id), event_type, level=level + 1)
-    else:
-        parent_subscriptions = check_node(None, event_type)
-    for notification_type in parent_subscriptions:
-        p_sub_n = parent_subscriptions[notification_type]
-        p_sub_n.extend(subscriptions[notification_type])
-        for nt in subscriptions:
-            if notification_type != nt:
-                p_sub_n = list(set(p_sub_n).difference(set(subscriptions[nt])))
-        if level == 0:
-            p_sub_n, removed = utils.separate_users(node, p_sub_n)
-        parent_subscriptions[notification_type] = p_sub_n
-    return parent_subscriptions
+    subscriptions = {key: [] for key in constants.NOTIFICATION_TYPES}
+    tables = dict(
+        abstractnode=AbstractNode._meta.db_table,
+        contributor=Contributor._meta.db_table,
+        nodeancestor=NodeAncestor._meta.db_table,
+        notificationsubscription=NotificationSubscription._meta.db_table,
+        osfuser=OSFUser._meta.db_table,
+    )
+    sql = COMPILE_SUBSCRIPTIONS_SQL.format(
+        members=_subscription_members_sql(),
+        subscriber_can_read=HAS_READ_SQL.format(user='S.user_id', node='S.node_id', depth='S.depth', **tables),
+        recipient_can_read=HAS_READ_SQL.format(user='U.id', node='%(node_id)s', depth='0', **tables),
+        **tables
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {'node_id': node.id, 'event_type': event_type, 'event': event})
+        for user_id, notification_type in cursor.fetchall():
+            subscriptions[notification_type].append(user_id)
+    return subscriptions
 
 
 def check_node(node, event):
@@ -165,7 +285,7 @@ def get_user_subscriptions(user, event):
         return {}
     user_subscription = NotificationSubscription.load(utils.to_subscription_key(user._id, event))
     if user_subscription:
-        return {key: list(getattr(user_subscription, key).all().values_list('guids___id', flat=True)) for key in constants.NOTIFICATION_TYPES}
+        return {key: list(getattr(user_subscription, key).all().values_list('guid_string', flat=True)) for key in constants.NOTIFICATION_TYPES}
     else:
         return {key: [] for key in constants.NOTIFICATION_TYPES}
 
@@ -174,13 +294,15 @@ def get_node_lineage(node):
     """ Get a list of node ids in order from the node to top most project
         e.g. [parent._id, node._id]
     """
-    lineage = [node._id]
-
-    while node.parent_id:
-        node = node.parent_node
-        lineage = [node._id] + lineage
-
-    return lineage
+    sql = ANCESTORS_CTE.format(nodeancestor=NodeAncestor._meta.db_table) + """
+        SELECT N.guid_string
+        FROM ancestors AS A
+          JOIN "{abstractnode}" AS N ON N.id = A.node_id
+        ORDER BY A.depth DESC
+    """.format(abstractnode=AbstractNode._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {'node_id': node.id})
+        return [guid for guid, in cursor.fetchall()]
 
 
 def get_settings_url(uid, user):
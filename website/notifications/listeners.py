@@ -1,7 +1,11 @@
 import logging
 from website.notifications.exceptions import InvalidSubscriptionError
-from website.notifications.utils import subscribe_user_to_notifications, subscribe_user_to_global_notifications
-from website.project.signals import contributor_added, project_created
+from website.notifications.utils import (
+    subscribe_user_to_notifications,
+    subscribe_user_to_global_notifications,
+    subscribe_users_to_notifications,
+)
+from website.project.signals import contributor_added, contributors_added, project_created
 from framework.auth.signals import user_confirmed
 
 logger = logging.getLogger(__name__)
@@ -25,6 +29,14 @@ def subscribe_contributor(node, contributor, auth=None, *args, **kwargs):
         logger.warn('Skipping subscription of user {} to node {}'.format(contributor, node._id))
         logger.warn('Reason: {}'.format(str(err)))
 
+@contributors_added.connect
+def subscribe_contributors(node, contributors, auth=None, *args, **kwargs):
+    try:
+        subscribe_users_to_notifications(node, contributors)
+    except InvalidSubscriptionError as err:
+        logger.warn('Skipping subscription of users {} to node {}'.format([user._id for user in contributors], node._id))
+        logger.warn('Reason: {}'.format(str(err)))
+
 @user_confirmed.connect
 def subscribe_confirmed_user(user):
     try:
@@ -2,27 +2,83 @@
 Tasks for making even transactional emails consolidated.
 """
 import itertools
+import logging
+import operator
+import zlib
+from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
 
 from django.db import connection
 
 from framework.celery_tasks import app as celery_app
+from framework.email import tasks as email_tasks
 from framework.sentry import log_exception
 from osf.models import OSFUser
 from osf.models import NotificationDigest
-from website import mails
+from website import mails, settings
 from website.notifications.utils import NotificationsDict
 
+logger = logging.getLogger(__name__)
+
 
 @celery_app.task(name='website.notifications.tasks.send_users_email', max_retries=0)
 def send_users_email(send_type):
     """Find pending Emails and amalgamates them into a single Email.
 
+    Digests are streamed from the database and delivered a chunk of users at a
+    time. A chunk's digests are only removed after they have been delivered, so
+    a run that dies part way through is resumed by the next one; delivery is
+    at-least-once. Concurrent runs for the same send_type are skipped so that
+    nothing is delivered twice.
+
     :param send_type
     :return:
     """
-    grouped_emails = get_users_emails(send_type)
-    for group in grouped_emails:
-        user = OSFUser.load(group['user_id'])
+    with digest_lock(send_type) as acquired:
+        if not acquired:
+            logger.info('Another {} run is in progress; skipping'.format(send_type))
+            return
+        workers = ThreadPool(settings.DIGEST_DELIVERY_WORKERS)
+        try:
+            for chunk in _chunked(get_users_emails(send_type), settings.DIGEST_CHUNK_SIZE):
+                delivered = deliver_digests(chunk, workers)
+                remove_notifications(email_notification_ids=delivered)
+        finally:
+            workers.close()
+            workers.join()
+
+
+@contextmanager
+def digest_lock(send_type):
+    """Hold a Postgres advisory lock for the duration of a digest run."""
+    key = zlib.crc32('notification-digest:{}'.format(send_type))
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_try_advisory_lock(%s)', [key])
+        acquired = cursor.fetchone()[0]
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [key])
+
+
+def deliver_digests(groups, workers):
+    """Render and send one chunk of digest groups (see `get_users_emails`).
+
+    Rendering happens on the calling thread, since the templates hit the
+    database; only the sending is handed to the worker pool.
+
+    :return list: The ids of the NotificationDigests that were dealt with
+    """
+    users = {
+        user._id: user
+        for user in OSFUser.objects.filter(guid_string__in=[group['user_id'] for group in groups])
+    }
+    handled = []
+    pending = []
+    for group in groups:
+        user = users.get(group['user_id'])
         if not user:
             log_exception()
             continue
@@ -30,19 +86,45 @@ def send_users_email(send_type):
         notification_ids = [message['_id'] for message in info]
         sorted_messages = group_by_node(info)
         if sorted_messages:
-            if not user.is_disabled:
-                mails.send_mail(
-                    to_addr=user.username,
-                    mimetype='html',
-                    mail=mails.DIGEST,
-                    name=user.fullname,
-                    message=sorted_messages,
-                )
-            remove_notifications(email_notification_ids=notification_ids)
+            if user.is_disabled:
+                handled.extend(notification_ids)
+                continue
+            pending.append((notification_ids, mails.render_mail(
+                to_addr=user.username,
+                mimetype='html',
+                mail=mails.DIGEST,
+                name=user.fullname,
+                message=sorted_messages,
+            )))
+
+    results = workers.map(_deliver, [email for _, email in pending])
+    for (notification_ids, _), delivered in zip(pending, results):
+        if delivered:
+            handled.extend(notification_ids)
+    return handled
+
+
+def _deliver(email):
+    try:
+        # None when email is disabled, not configured or the recipient is not
+        # whitelisted, which a retry would not change; only False is a failed send
+        return email_tasks.send_email(**email) is not False
+    except Exception:
+        log_exception()
+        return False
+
+
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
 
 
 def get_users_emails(send_type):
-    """Get all emails that need to be sent.
+    """Get all emails that need to be sent, streamed from a server-side cursor.
 
     :param send_type: from NOTIFICATION_TYPES
     :return: Iterable of dicts of the form:
@@ -64,27 +146,25 @@ def get_users_emails(send_type):
     """
 
     sql = """
-    SELECT json_build_object(
-            'user_id', osf_guid._id,
-            'info', json_agg(
-                json_build_object(
-                    'message', nd.message,
-                    'node_lineage', nd.node_lineage,
-                    '_id', nd._id
-                )
-            )
-        )
+    SELECT osf_osfuser.guid_string, nd._id, nd.message, nd.node_lineage
     FROM osf_notificationdigest AS nd
-      LEFT JOIN osf_guid ON nd.user_id = osf_guid.object_id
-    WHERE send_type = %s
-    AND osf_guid.content_type_id = (SELECT id FROM django_content_type WHERE model = 'osfuser')
-    GROUP BY osf_guid.id
-    ORDER BY osf_guid.id ASC
+      JOIN osf_osfuser ON nd.user_id = osf_osfuser.id
+    WHERE nd.send_type = %s
+    ORDER BY nd.user_id ASC, nd.timestamp ASC
     """
 
-    with connection.cursor() as cursor:
+    with connection.chunked_cursor() as cursor:
         cursor.execute(sql, [send_type, ])
-        return itertools.chain.from_iterable(cursor.fetchall())
+        rows = itertools.chain.from_iterable(iter(lambda: cursor.fetchmany(settings.DIGEST_FETCH_SIZE), []))
+        for user_id, digests in itertools.groupby(rows, key=operator.itemgetter(0)):
+            yield {
+                'user_id': user_id,
+                'info': [{
+                    'message': message,
+                    'node_lineage': node_lineage,
+                    '_id': _id,
+                } for _, _id, message, node_lineage in digests]
+            }
 
 
 def group_by_node(notifications, limit=15):
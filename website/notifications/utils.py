@@ -131,9 +131,9 @@ def users_to_remove(source_event, source_node, new_node):
     for notification_type in constants.NOTIFICATION_TYPES:
         users = []
         if hasattr(old_sub, notification_type):
-            users += list(getattr(old_sub, notification_type).values_list('guids___id', flat=True))
+            users += list(getattr(old_sub, notification_type).values_list('guid_string', flat=True))
         if hasattr(old_node_sub, notification_type):
-            users += list(getattr(old_node_sub, notification_type).values_list('guids___id', flat=True))
+            users += list(getattr(old_node_sub, notification_type).values_list('guid_string', flat=True))
         subbed, removed_users[notification_type] = separate_users(new_node, users)
     return removed_users
 
@@ -469,6 +469,63 @@ def subscribe_user_to_notifications(node, user):
                 subscription.save()
 
 
+def subscribe_users_to_notifications(node, users):
+    """Subscribe many contributors at once; see `subscribe_user_to_notifications`.
+
+    Global settings are looked up for all users together, and each node
+    subscription is updated once.
+    """
+    NotificationSubscription = apps.get_model('osf.NotificationSubscription')
+    if node.is_collection:
+        raise InvalidSubscriptionError('Collections are invalid targets for subscriptions')
+
+    if node.is_deleted:
+        raise InvalidSubscriptionError('Deleted Nodes are invalid targets for subscriptions')
+
+    users = [user for user in users if user.is_registered]
+    if not users:
+        return
+    events = constants.NODE_SUBSCRIPTIONS_AVAILABLE
+
+    global_keys = {
+        to_subscription_key(user._id, 'global_' + event): (user.id, event)
+        for user in users for event in events
+    }
+    global_subscriptions = set(
+        NotificationSubscription.objects.filter(_id__in=global_keys.keys()).values_list('_id', flat=True)
+    )
+    global_types = {}
+    for notification_type in constants.NOTIFICATION_TYPES:
+        subscribed = NotificationSubscription.objects.filter(
+            _id__in=global_subscriptions, **{'{}__id__in'.format(notification_type): [user.id for user in users]}
+        ).values_list('_id', '{}__id'.format(notification_type))
+        for global_event_id, user_id in subscribed:
+            if global_keys[global_event_id][0] == user_id:
+                global_types.setdefault(global_keys[global_event_id], notification_type)
+
+    for event in events:
+        event_id = to_subscription_key(node._id, event)
+        subscription = NotificationSubscription.load(event_id)
+        subscribers = users
+        # If no subscription exists for the component, its creator adopts the parent's settings
+        if not subscription and node.parent_node:
+            subscribers = [user for user in users if user != node.creator]
+        if not subscribers:
+            continue
+        if not subscription:
+            subscription = NotificationSubscription(_id=event_id, owner=node, event_name=event)
+            # Need to save here in order to access m2m fields
+            subscription.save()
+
+        notification_types = {}
+        for user in subscribers:
+            if to_subscription_key(user._id, 'global_' + event) in global_subscriptions:
+                notification_types[user] = global_types.get((user.id, event))
+            else:
+                notification_types[user] = 'email_transactional'
+        subscription.add_users_to_subscription(notification_types)
+
+
 def format_user_and_project_subscriptions(user):
     """ Format subscriptions data for user settings page. """
     return [
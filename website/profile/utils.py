@@ -108,7 +108,7 @@ def serialize_contributors(contribs, node, **kwargs):
 
 
 def serialize_visible_contributors(node):
-    # This is optimized when node has .include('contributor__user__guids')
+    # This is optimized when node has .include('contributor__user')
     return [
         serialize_user(c, node) for c in node.contributor_set.all() if c.visible
     ]
@@ -7,6 +7,7 @@ from flask import request
 
 from framework import status
 from framework.auth import Auth, cas
+from framework.auth.core import get_private_link_resolver
 from framework.flask import redirect  # VOL-aware redirect
 from framework.exceptions import HTTPError
 from framework.auth.decorators import collect_auth
@@ -193,7 +194,7 @@ def check_can_access(node, user, key=None, api_node=None):
     if user is None:
         return False
     if not node.can_view(Auth(user=user)) and api_node != node:
-        if key in node.private_link_keys_deleted:
+        if _is_expired_key(key, node):
             status.push_status_message('The view-only links you used are expired.', trust=False)
         raise HTTPError(
             http.FORBIDDEN,
@@ -203,6 +204,12 @@ def check_can_access(node, user, key=None, api_node=None):
     return True
 
 
+def _is_expired_key(key, node):
+    """Whether `key` is of a deleted view-only link to `node`."""
+    private_link = get_private_link_resolver().resolve(key)
+    return private_link is not None and private_link.is_deleted and private_link.has_node(node)
+
+
 def check_key_expired(key, node, url):
     """check if key expired if is return url with args so it will push status message
         else return url
@@ -211,7 +218,7 @@ def check_key_expired(key, node, url):
         :param str url: the url redirect to
         :return: url with pushed message added if key expired else just url
     """
-    if key in node.private_link_keys_deleted:
+    if _is_expired_key(key, node):
         url = furl(url).add({'status': 'expired'}).url
 
     return url
@@ -241,18 +248,15 @@ def _must_be_contributor_factory(include_public, include_view_only_anon=True):
             #if not login user check if the key is valid or the other privilege
 
             kwargs['auth'].private_key = key
+            private_link = kwargs['auth'].private_link
             if not include_view_only_anon:
-                from osf.models import PrivateLink
-                try:
-                    link_anon = PrivateLink.objects.filter(key=key).values_list('anonymous', flat=True).get()
-                except PrivateLink.DoesNotExist:
-                    link_anon = None
+                link_anon = getattr(kwargs['auth'].any_private_link, 'anonymous', None)
 
             if not node.is_public or not include_public:
                 if not include_view_only_anon and link_anon:
                     if not check_can_access(node=node, user=user):
                         raise HTTPError(http.UNAUTHORIZED)
-                elif key not in node.private_link_keys_active:
+                elif private_link is None or not private_link.has_node(node):
                     if not check_can_access(node=node, user=user, key=key):
                         redirect_url = check_key_expired(key=key, node=node, url=request.url)
                         if request.headers.get('Content-Type') == 'application/json':
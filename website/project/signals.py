@@ -4,6 +4,7 @@ signals = blinker.Namespace()
 comment_added = signals.signal('comment-added')
 mention_added = signals.signal('mention-added')
 contributor_added = signals.signal('contributor-added')
+contributors_added = signals.signal('contributors-added')
 project_created = signals.signal('project-created')
 contributor_removed = signals.signal('contributor-removed')
 unreg_contributor_added = signals.signal('unreg-contributor-added')
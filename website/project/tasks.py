@@ -1,4 +1,8 @@
 from django.apps import apps
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from django.utils import timezone
+import datetime
 import logging
 import urlparse
 import random
@@ -31,8 +35,153 @@ def on_node_updated(node_id, user_id, first_save, saved_fields, request_headers=
         need_update = False
 
     if need_update:
+        # Content of public nodes is updated once checked for spam, see run_spam_checks;
+        # nodes made private or deleted are updated right away
+        if (
+            settings.SPAM_CHECK_ENABLED and node.is_public and not node.is_deleted
+            and apps.get_model('osf.PendingSpamCheck').objects.filter(node_id=node.id).exists()
+        ):
+            return
         node.update_search()
-        update_node_share(node)
+        enqueue_node_share(node)
+
+def enqueue_node_share(node):
+    """Queue `node` to be sent to SHARE with the next batch; see `drain_share_outbox`."""
+    if settings.SHARE_URL:
+        if not settings.SHARE_API_TOKEN:
+            return logger.warning('SHARE_API_TOKEN not set. Could not send "{}" to SHARE.'.format(node._id))
+        ShareOutboxEntry = apps.get_model('osf.ShareOutboxEntry')
+        ShareOutboxEntry.enqueue(node)
+
+@celery_app.task(ignore_results=True)
+def drain_share_outbox(batch_size=None):
+    """Send the nodes queued by `enqueue_node_share` to SHARE, `batch_size`
+    nodes per request, until no queued node is due.
+
+    :return int: The number of nodes sent
+    """
+    if not (settings.SHARE_URL and settings.SHARE_API_TOKEN):
+        return 0
+    batch_size = batch_size or settings.SHARE_OUTBOX_BATCH_SIZE
+    sent = 0
+    while True:
+        entries, claimed = _claim_batch(apps.get_model('osf.ShareOutboxEntry'), batch_size, settings.SHARE_OUTBOX_LEASE)
+        if not entries:
+            return sent
+        sent += _send_share_outbox_batch(entries, claimed)
+
+def _claim_batch(model, batch_size, lease):
+    # Lease the due rows of `model`, so that concurrent workers claim other ones
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            model.objects.filter(next_attempt__lte=now)
+            .select_for_update(skip_locked=True)
+            .order_by('next_attempt')[:batch_size]
+        )
+        model.objects.filter(id__in=[row.id for row in rows]).update(
+            next_attempt=now + datetime.timedelta(seconds=lease)
+        )
+    return rows, now
+
+def _retry_countdown(attempts):
+    return (random.random() + 1) * min(60 + settings.CELERY_RETRY_BACKOFF_BASE ** attempts, 60 * 10)
+
+def _send_share_outbox_batch(entries, claimed):
+    ShareOutboxEntry = apps.get_model('osf.ShareOutboxEntry')
+    AbstractNode = apps.get_model('osf.AbstractNode')
+    nodes = AbstractNode.objects.in_bulk([entry.node_id for entry in entries])
+    data = serialize_share_nodes_data([nodes[entry.node_id] for entry in entries])
+    resp = None
+    try:
+        resp = send_share_node_data(data)
+        resp.raise_for_status()
+    except Exception:
+        if resp is None:
+            logger.exception('Could not send {} nodes to SHARE'.format(len(entries)))
+    else:
+        ids = [entry.id for entry in entries]
+        # Nodes that changed while being sent are sent again
+        ShareOutboxEntry.objects.filter(id__in=ids, modified__lte=claimed).delete()
+        ShareOutboxEntry.objects.filter(id__in=ids).update(attempts=0, next_attempt=timezone.now())
+        return len(entries)
+
+    if resp is not None and resp.status_code < 500:
+        if len(entries) > 1:
+            # Find the nodes SHARE rejects by sending them one at a time
+            return sum(_send_share_outbox_batch([entry], claimed) for entry in entries)
+        send_desk_share_error(nodes[entries[0].node_id], resp, entries[0].attempts)
+        ShareOutboxEntry.objects.filter(id=entries[0].id).delete()
+        return 0
+
+    for entry in entries:
+        entry.attempts += 1
+        if entry.attempts >= settings.SHARE_OUTBOX_MAX_ATTEMPTS:
+            if resp is not None:
+                send_desk_share_error(nodes[entry.node_id], resp, entry.attempts)
+            ShareOutboxEntry.objects.filter(id=entry.id).delete()
+        else:
+            entry.next_attempt = timezone.now() + datetime.timedelta(seconds=_retry_countdown(entry.attempts))
+            entry.save(update_fields=['attempts', 'next_attempt'])
+    return 0
+
+@celery_app.task(ignore_results=True)
+def run_spam_checks(batch_size=None):
+    """Classify the nodes queued by `AbstractNode.on_update` for a spam check,
+    `batch_size` nodes at a time, until no queued check is due.
+
+    :return int: The number of nodes checked
+    """
+    if not settings.SPAM_CHECK_ENABLED:
+        return 0
+    PendingSpamCheck = apps.get_model('osf.PendingSpamCheck')
+    batch_size = batch_size or settings.SPAM_CHECK_BATCH_SIZE
+    checked = 0
+    while True:
+        checks, claimed = _claim_batch(PendingSpamCheck, batch_size, settings.SPAM_CHECK_LEASE)
+        if not checks:
+            return checked
+        checked += _run_spam_check_batch(checks, claimed)
+
+def _run_spam_check_batch(checks, claimed):
+    from website.util.spam import get_classifier
+    AbstractNode = apps.get_model('osf.AbstractNode')
+    PendingSpamCheck = apps.get_model('osf.PendingSpamCheck')
+    nodes = AbstractNode.objects.in_bulk([check.node_id for check in checks])
+    prefetch_related_objects(checks, 'user')
+
+    def finish(check, *verdict):
+        # Nodes edited while being checked are checked again
+        if PendingSpamCheck.objects.filter(id=check.id, modified__lte=claimed).delete()[0]:
+            nodes[check.node_id].finish_spam_check(check, *verdict)
+        else:
+            PendingSpamCheck.objects.filter(id=check.id).update(attempts=0, next_attempt=timezone.now())
+
+    items = []
+    for check in checks:
+        item = nodes[check.node_id].get_pending_spam_check_item(check)
+        if item is None:
+            finish(check)
+        else:
+            items.append((check, item))
+    if not items:
+        return 0
+
+    checked = 0
+    verdicts = get_classifier().classify([item for check, item in items])
+    for (check, item), verdict in zip(items, verdicts):
+        if verdict is not None:
+            finish(check, item, *verdict)
+            checked += 1
+            continue
+        check.attempts += 1
+        if check.attempts >= settings.SPAM_CHECK_MAX_ATTEMPTS:
+            logger.error('Giving up checking node {} for spam after {} attempts'.format(nodes[check.node_id]._id, check.attempts))
+            finish(check)
+        else:
+            check.next_attempt = timezone.now() + datetime.timedelta(seconds=_retry_countdown(check.attempts))
+            check.save(update_fields=['attempts', 'next_attempt'])
+    return checked
 
 def update_node_share(node):
     # Wrapper that ensures share_url and token exist
@@ -81,43 +230,61 @@ def send_share_node_data(data):
     return resp
 
 def serialize_share_node_data(node):
+    return serialize_share_nodes_data([node])
+
+def serialize_share_nodes_data(nodes):
+    """A single SHARE payload with the graphs of all of `nodes`."""
+    prefetch_share_node_data(nodes)
+    graph = []
+    for node in nodes:
+        graph.extend(format_registration(node) if node.is_registration else format_node(node))
     return {
         'data': {
             'type': 'NormalizedData',
             'attributes': {
                 'tasks': [],
                 'raw': None,
-                'data': {'@graph': format_registration(node) if node.is_registration else format_node(node)}
+                'data': {'@graph': graph}
             }
         }
     }
 
-def format_node(node):
-    is_qa_node = bool(set(settings.DO_NOT_INDEX_LIST['tags']).intersection(node.tags.all().values_list('name', flat=True))) \
+def prefetch_share_node_data(nodes):
+    """Load what `format_node` and `format_registration` read for all of `nodes` at once."""
+    Contributor = apps.get_model('osf.Contributor')
+    prefetch_related_objects(nodes, 'tags')
+    registrations = [node for node in nodes if node.is_registration]
+    prefetch_related_objects(
+        registrations,
+        'registered_schema',
+        'affiliated_institutions',
+        'retraction',
+        Prefetch('contributor_set', queryset=Contributor.objects.select_related('user').order_by('_order')),
+        'contributor_set__user__emails',
+        'contributor_set__user__affiliated_institutions',
+    )
+
+def _is_qa_node(node):
+    return bool(set(settings.DO_NOT_INDEX_LIST['tags']).intersection(tag.name for tag in node.tags.all())) \
         or any(substring in node.title for substring in settings.DO_NOT_INDEX_LIST['titles'])
+
+def format_node(node):
+    project = GraphNode('project', is_deleted=not node.is_public or node.is_deleted or node.is_spammy or _is_qa_node(node))
     return [
-        {
-            '@id': '_:123',
-            '@type': 'workidentifier',
-            'creative_work': {'@id': '_:789', '@type': 'project'},
-            'uri': '{}{}/'.format(settings.DOMAIN, node._id),
-        }, {
-            '@id': '_:789',
-            '@type': 'project',
-            'is_deleted': not node.is_public or node.is_deleted or node.is_spammy or is_qa_node
-        }
+        GraphNode('workidentifier', creative_work=project, uri='{}{}/'.format(settings.DOMAIN, node._id)).serialize(),
+        project.serialize(),
     ]
 
 def format_registration(node):
-    is_qa_node = bool(set(settings.DO_NOT_INDEX_LIST['tags']).intersection(node.tags.all().values_list('name', flat=True))) \
-        or any(substring in node.title for substring in settings.DO_NOT_INDEX_LIST['titles'])
+    is_qa_node = _is_qa_node(node)
+    schemas = sorted(node.registered_schema.all(), key=lambda schema: schema.pk)
 
     registration_graph = GraphNode('registration', **{
         'title': node.title,
         'description': node.description or '',
         'is_deleted': not node.is_public or node.is_deleted or is_qa_node,
         'date_published': node.registered_date.isoformat() if node.registered_date else None,
-        'registration_type': node.registered_schema.first().name if node.registered_schema else None,
+        'registration_type': schemas[0].name if schemas else None,
         'withdrawn': node.is_retracted,
         'justification': node.retraction.justification if node.retraction else None,
     })
@@ -132,7 +299,10 @@ def format_registration(node):
         for tag in node.tags.all() or [] if tag._id
     ]
 
-    to_visit.extend(format_contributor(registration_graph, user, bool(user._id in node.visible_contributor_ids), i) for i, user in enumerate(node.contributors))
+    to_visit.extend(
+        format_contributor(registration_graph, contributor.user, contributor.visible, i)
+        for i, contributor in enumerate(node.contributor_set.all())
+    )
     to_visit.extend(GraphNode('AgentWorkRelation', creative_work=registration_graph, agent=GraphNode('institution', name=institution.name)) for institution in node.affiliated_institutions.all())
 
     visited = set()
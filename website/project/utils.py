@@ -94,7 +94,7 @@ def activity():
                 break
 
     # New and Noteworthy projects are updated manually
-    new_and_noteworthy_projects = list(Node.objects.get(guids___id=settings.NEW_AND_NOTEWORTHY_LINKS_NODE).nodes_pointer)
+    new_and_noteworthy_projects = list(Node.objects.get(guid_string=settings.NEW_AND_NOTEWORTHY_LINKS_NODE).nodes_pointer)
 
     return {
         'new_and_noteworthy_projects': new_and_noteworthy_projects,
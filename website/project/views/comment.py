@@ -6,11 +6,10 @@ from flask import request
 
 from api.caching.tasks import ban_url
 from osf.models import Guid
-from framework.postcommit_tasks.handlers import enqueue_postcommit_task
 from website import settings
 from addons.base.signals import file_updated
 from osf.models import BaseFileNode, TrashedFileNode
-from osf.models import Comment
+from osf.models import Comment, CommentReadState
 from website.notifications.constants import PROVIDERS
 from website.notifications.emails import notify, notify_mentions
 from website.project.decorators import must_be_contributor_or_public
@@ -179,18 +178,20 @@ def is_reply(target):
 
 def _update_comments_timestamp(auth, node, page=Comment.OVERVIEW, root_id=None):
     if node.is_contributor(auth.user):
-        enqueue_postcommit_task(ban_url, (node, ), {}, celery=False, once_per_request=True)
+        ban_url(node)
         if root_id is not None:
             guid_obj = Guid.load(root_id)
             if guid_obj is not None:
-                enqueue_postcommit_task(ban_url, (guid_obj.referent, ), {}, celery=False, once_per_request=True)
+                ban_url(guid_obj.referent)
 
         # update node timestamp
         if page == Comment.OVERVIEW:
             root_id = node._id
-        auth.user.comments_viewed_timestamp[root_id] = timezone.now()
-        auth.user.save()
-        return {root_id: auth.user.comments_viewed_timestamp[root_id].isoformat()}
+        root_target = Guid.load(root_id)
+        if root_target is None:
+            return {}
+        timestamp = CommentReadState.mark_viewed(auth.user, root_target)
+        return {root_id: timestamp.isoformat()}
     else:
         return {}
 
@@ -23,7 +23,7 @@ from website.profile import utils as profile_utils
 from website.project.decorators import (must_have_permission, must_be_valid_project, must_not_be_registration,
                                         must_be_contributor_or_public, must_be_contributor)
 from website.project.model import has_anonymous_link
-from website.project.signals import unreg_contributor_added, contributor_added
+from website.project.signals import unreg_contributor_added, contributor_added, contributors_added
 from website.util import sanitize
 from website.util import web_url_for, is_json_request
 from website.util.permissions import expand_permissions, ADMIN
@@ -560,6 +560,14 @@ def notify_added_contributor(node, contributor, auth=None, throttle=None, email_
         unreg_contributor_added.send(node, contributor=contributor, auth=auth, email_template=email_template)
 
 
+@contributors_added.connect
+def notify_added_contributors(node, contributors, auth=None, email_template='default'):
+    if email_template == 'false':
+        return
+    for contributor in contributors:
+        notify_added_contributor(node, contributor, auth=auth, email_template=email_template)
+
+
 def find_preprint_provider(node):
     """
     Given a node, find the preprint and the service provider.
@@ -639,7 +639,7 @@ def _view_project(node, auth, primary=False,
     """Build a JSON object containing everything needed to render
     project.view.mako.
     """
-    node = AbstractNode.objects.filter(pk=node.pk).include('contributor__user__guids').get()
+    node = AbstractNode.objects.filter(pk=node.pk).include('contributor__user').get()
     user = auth.user
     try:
         contributor = node.contributor_set.get(user=user)
@@ -793,7 +793,7 @@ def _view_project(node, auth, primary=False,
     if embed_contributors and not anonymous:
         data['node']['contributors'] = utils.serialize_visible_contributors(node)
     else:
-        data['node']['contributors'] = list(node.contributors.values_list('guids___id', flat=True))
+        data['node']['contributors'] = list(node.contributors.values_list('guid_string', flat=True))
     if embed_descendants:
         descendants, all_readable = _get_readable_descendants(auth=auth, node=node)
         data['user']['can_sort'] = all_readable
@@ -849,7 +849,7 @@ def _get_children(node, auth):
     for which the given user has ADMIN permission.
     """
     is_admin = Contributor.objects.filter(node=OuterRef('pk'), admin=True, user=auth.user)
-    parent_node_sqs = NodeRelation.objects.filter(child=OuterRef('pk'), is_node_link=False).values('parent__guids___id')
+    parent_node_sqs = NodeRelation.objects.filter(child=OuterRef('pk'), is_node_link=False).values('parent__guid_string')
     children = (Node.objects.get_children(node)
                 .filter(is_deleted=False)
                 .annotate(parentnode_id=Subquery(parent_node_sqs[:1]))
@@ -977,12 +977,12 @@ def node_child_tree(user, node):
 
     if is_admin:
         is_admin_sqs = Contributor.objects.filter(node=OuterRef('pk'), admin=True, user=user)
-        parent_node_sqs = NodeRelation.objects.filter(child=OuterRef('pk'), is_node_link=False).values('parent__guids___id')
+        parent_node_sqs = NodeRelation.objects.filter(child=OuterRef('pk'), is_node_link=False).values('parent__guid_string')
         children = (Node.objects.get_children(node)
                     .filter(is_deleted=False)
                     .annotate(parentnode_id=Subquery(parent_node_sqs[:1]))
                     .annotate(has_admin_perm=Exists(is_admin_sqs))
-                    .include('contributor__user__guids')
+                    .include('contributor__user')
                     )
     else:
         children = []
@@ -996,7 +996,7 @@ def node_child_tree(user, node):
         'is_admin': node.has_permission(contributor.user, ADMIN),
         'is_confirmed': contributor.user.is_confirmed,
         'visible': contributor.visible
-    } for contributor in node.contributor_set.all().include('user__guids')]
+    } for contributor in node.contributor_set.all().include('user')]
 
     serialized_nodes.append({
         'node': {
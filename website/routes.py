@@ -129,12 +129,7 @@ def get_globals():
 
 
 def is_private_link_anonymous_view():
-    # Avoid circular import
-    from osf.models import PrivateLink
-    try:
-        return PrivateLink.objects.filter(key=request.args.get('view_only')).values_list('anonymous', flat=True).get()
-    except PrivateLink.DoesNotExist:
-        return False
+    return util.check_private_key_for_anonymized_link(request.args.get('view_only'))
 
 
 class OsfWebRenderer(WebRenderer):
@@ -4,7 +4,8 @@
 from __future__ import division
 
 import copy
-import functools
+import datetime
+import itertools
 import logging
 import math
 import re
@@ -14,8 +15,8 @@ from framework import sentry
 import six
 
 from django.apps import apps
-from django.core.paginator import Paginator
 from django.db.models import Q
+from django.utils import timezone
 from elasticsearch import (ConnectionError, Elasticsearch, NotFoundError,
                            RequestError, TransportError, helpers)
 from framework.celery_tasks import app as celery_app
@@ -24,6 +25,7 @@ from osf.models import AbstractNode
 from osf.models import OSFUser
 from osf.models import BaseFileNode
 from osf.models import Institution
+from osf.models import InstitutionSearchUpdate
 from osf.models import QuickFilesNode
 from website import settings
 from website.filters import profile_image_url
@@ -349,10 +351,10 @@ def serialize_node(node, category):
         'contributors': [
             {
                 'fullname': x['fullname'],
-                'url': '/{}/'.format(x['guids___id']) if x['is_active'] else None
+                'url': '/{}/'.format(x['guid_string']) if x['is_active'] else None
             }
             for x in node._contributors.filter(contributor__visible=True).order_by('contributor___order')
-            .values('fullname', 'guids___id', 'is_active')
+            .values('fullname', 'guid_string', 'is_active')
         ],
         'title': node.title,
         'normalized_title': normalized_title,
@@ -378,7 +380,7 @@ def serialize_node(node, category):
         'preprint_url': node.preprint_url,
     }
     if not node.is_retracted:
-        for wiki in NodeWikiPage.objects.filter(guids___id__in=node.wiki_pages_current.values()):
+        for wiki in NodeWikiPage.objects.filter(guid_string__in=node.wiki_pages_current.values()).select_related('snapshot'):
             # '.' is not allowed in field names in ES2
             elastic_document['wikis'][wiki.page_name.replace('.', ' ')] = wiki.raw_text(node)
 
@@ -426,28 +428,143 @@ def bulk_update_nodes(serialize, nodes, index=None):
     if actions:
         return helpers.bulk(client(), actions)
 
-def serialize_contributors(node):
-    return {
-        'contributors': [
-            {
-                'fullname': x['user__fullname'],
-                'url': '/{}/'.format(x['user__guids___id'])
-            } for x in
-            node.contributor_set.filter(visible=True, user__is_active=True).order_by('_order').values('user__fullname', 'user__guids___id')
-        ]
-    }
+def _partial_update_actions(node_ids, index, chunk_size, get_docs, progress=None):
+    """Partial updates of the nodes with `node_ids`, computed with a few
+    queries per `chunk_size` nodes.
+
+    :param function get_docs: Maps a list of node primary keys to a dict of partial documents by primary key
+    :param function progress: Called with the number of nodes in each chunk, once it has been sent
+    """
+    from osf.models import NodeRelation, PreprintService
+    from osf.utils.workflows import DefaultStates
+
+    node_ids = iter(node_ids)
+    while True:
+        chunk = list(itertools.islice(node_ids, chunk_size))
+        if not chunk:
+            return
+        nodes = list(AbstractNode.objects.filter(id__in=chunk).values(
+            'id', 'guid_string', 'type', 'category', 'is_public', 'preprint_file__node_id'
+        ))
+        # As get_doctype_from_node, without the queries per node
+        has_parent = set(NodeRelation.objects.filter(child_id__in=chunk, is_node_link=False).values_list('child_id', flat=True))
+        is_preprint = set(
+            PreprintService.objects.filter(node_id__in=[node['id'] for node in nodes if node['preprint_file__node_id'] == node['id']])
+            .exclude(machine_state=DefaultStates.INITIAL.value).values_list('node_id', flat=True)
+        )
+        docs = get_docs(chunk)
+
+        for node in nodes:
+            if node['type'] == 'osf.registration':
+                doc_type = 'registration'
+            elif node['is_public'] and node['id'] in is_preprint:
+                doc_type = 'preprint'
+            elif node['id'] not in has_parent:
+                doc_type = 'project'
+            elif node['category'] in COMPONENT_CATEGORIES:
+                doc_type = 'component'
+            else:
+                doc_type = node['category']
+            yield {
+                '_op_type': 'update',
+                '_index': index,
+                '_id': node['guid_string'],
+                '_type': doc_type,
+                'doc': docs[node['id']],
+            }
+        # helpers.bulk has sent a full chunk by the time it asks for more actions
+        if progress:
+            progress(len(chunk))
+
+def _contributor_docs(node_ids):
+    from osf.models import Contributor
+
+    docs = {node_id: {'contributors': []} for node_id in node_ids}
+    for node_id, fullname, guid in (
+        Contributor.objects.filter(node_id__in=node_ids, visible=True, user__is_active=True)
+        .order_by('node_id', '_order').values_list('node_id', 'user__fullname', 'user__guid_string')
+    ):
+        docs[node_id]['contributors'].append({'fullname': fullname, 'url': '/{}/'.format(guid)})
+    return docs
+
+def _institution_docs(node_ids):
+    docs = {node_id: {'affiliated_institutions': []} for node_id in node_ids}
+    for node_id, name in (
+        AbstractNode.affiliated_institutions.through.objects.filter(abstractnode_id__in=node_ids)
+        .order_by('id').values_list('abstractnode_id', 'institution__name')
+    ):
+        docs[node_id]['affiliated_institutions'].append(name)
+    return docs
+
+def _bulk_partial_update(node_ids, index, chunk_size, get_docs, progress=None):
+    updated, errors = helpers.bulk(
+        client(), _partial_update_actions(node_ids, index, chunk_size, get_docs, progress=progress),
+        chunk_size=chunk_size, raise_on_error=False
+    )
+    for error in errors:
+        # Nodes that are not indexed, e.g. spam or QA nodes, are not updated
+        if error['update']['status'] != 404:
+            logger.error('Could not update {}: {}'.format(error['update']['_id'], error['update'].get('error')))
+    return updated
 
+@requires_search
+def bulk_update_contributors(node_ids, index=None, chunk_size=500):
+    """Update the contributors of the indexed nodes with `node_ids`, with a
+    bulk request of partial updates per `chunk_size` nodes.
+
+    :param iterable node_ids: Primary keys of the nodes, e.g. from a server-side cursor
+    :return int: The number of documents updated
+    """
+    return _bulk_partial_update(node_ids, index or INDEX, chunk_size, _contributor_docs)
 
-bulk_update_contributors = functools.partial(bulk_update_nodes, serialize_contributors)
+@requires_search
+def bulk_update_institutions(node_ids, index=None, chunk_size=500, progress=None):
+    """Update the affiliated institutions of the indexed nodes with
+    `node_ids`, with a bulk request of partial updates per `chunk_size` nodes.
+
+    :param iterable node_ids: Primary keys of the nodes, e.g. from a server-side cursor
+    :param function progress: Called with the number of nodes in each chunk sent
+    :return int: The number of documents updated
+    """
+    return _bulk_partial_update(node_ids, index or INDEX, chunk_size, _institution_docs, progress=progress)
 
 
 @celery_app.task(bind=True, max_retries=5, default_retry_delay=60)
 def update_contributors_async(self, user_id):
-    OSFUser = apps.get_model('osf.OSFUser')
-    user = OSFUser.objects.get(id=user_id)
-    p = Paginator(user.visible_contributor_to.order_by('id'), 100)
-    for page_num in p.page_range:
-        bulk_update_contributors(p.page(page_num).object_list)
+    # Only public nodes are indexed
+    node_ids = AbstractNode.objects.filter(
+        contributor__user_id=user_id,
+        contributor__visible=True,
+        is_public=True,
+        is_deleted=False,
+        type__in=['osf.node', 'osf.registration'],
+    ).order_by('id').values_list('id', flat=True)
+    bulk_update_contributors(node_ids.iterator())
+
+def get_institution_nodes_progress(institution_id):
+    """The progress of the latest update of an institution's nodes, as a dict
+    with `total` and `processed` node counts and whether it is `done`, or None.
+    """
+    since = timezone.now() - datetime.timedelta(seconds=settings.INSTITUTION_NODES_PROGRESS_TIMEOUT)
+    update = InstitutionSearchUpdate.objects.filter(institution_id=institution_id, modified__gte=since).first()
+    return update.to_json() if update else None
+
+@celery_app.task(bind=True, max_retries=5, default_retry_delay=60)
+def update_institution_nodes_async(self, institution_id, chunk_size=500):
+    # Only public nodes are indexed
+    node_ids = AbstractNode.objects.filter(
+        affiliated_institutions=institution_id,
+        is_public=True,
+        is_deleted=False,
+        type__in=['osf.node', 'osf.registration'],
+    ).order_by('id').values_list('id', flat=True)
+    # Progress is kept in the database, where the admin app can read it
+    InstitutionSearchUpdate.start(institution_id, node_ids.count())
+    bulk_update_institutions(
+        node_ids.iterator(), chunk_size=chunk_size,
+        progress=lambda count: InstitutionSearchUpdate.advance(institution_id, count)
+    )
+    InstitutionSearchUpdate.finish(institution_id)
 
 @requires_search
 def update_user(user, index=None):
@@ -67,6 +67,20 @@ def update_contributors_async(user_id):
     else:
         search_engine.update_contributors_async(user_id)
 
+@requires_search
+def update_institution_nodes_async(institution_id):
+    """Update the affiliated institutions in the search documents of the
+    nodes affiliated with an institution, in the background.
+    """
+    if settings.USE_CELERY:
+        enqueue_task(search_engine.update_institution_nodes_async.s(institution_id))
+    else:
+        search_engine.update_institution_nodes_async(institution_id)
+
+@requires_search
+def get_institution_nodes_progress(institution_id):
+    return search_engine.get_institution_nodes_progress(institution_id)
+
 @requires_search
 def update_user(user, index=None, async=True):
     index = index or settings.ELASTIC_INDEX
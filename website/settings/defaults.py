@@ -146,6 +146,11 @@ FAKE_EMAIL_DOMAIN = 'cos.io'
 MAIL_SERVER = 'smtp.sendgrid.net'
 MAIL_USERNAME = 'osf-smtp'
 MAIL_PASSWORD = ''  # Set this in local.py
+MAIL_TIMEOUT = 30
+# Per-process SMTP connection pool, see framework.email.transport
+MAIL_POOL_SIZE = 2
+MAIL_POOL_NOOP_AFTER = 30  # Check idle sessions with NOOP after this many seconds
+MAIL_POOL_MAX_IDLE = 300  # Discard idle sessions after this many seconds
 
 # OR, if using Sendgrid's API
 # WARNING: If `SENDGRID_WHITELIST_MODE` is True,
@@ -153,6 +158,13 @@ MAIL_PASSWORD = ''  # Set this in local.py
 SENDGRID_API_KEY = None
 SENDGRID_WHITELIST_MODE = False
 SENDGRID_EMAIL_WHITELIST = []
+# Maximum number of recipients per SendGrid API call when sending in batches
+SENDGRID_BATCH_SIZE = 1000
+
+# Notification digests are streamed and delivered this many users at a time
+DIGEST_CHUNK_SIZE = 500
+DIGEST_FETCH_SIZE = 2000  # Rows fetched per round trip from the digest cursor
+DIGEST_DELIVERY_WORKERS = MAIL_POOL_SIZE
 
 # Mailchimp
 MAILCHIMP_API_KEY = None
@@ -350,6 +362,12 @@ SHARE_PREPRINT_PROVIDER_PREPEND = None
 SHARE_REGISTRATION_URL = ''
 SHARE_URL = None
 SHARE_API_TOKEN = None  # Required to send project updates to SHARE
+# Changed nodes are queued and sent to SHARE in batches by `drain_share_outbox`
+SHARE_OUTBOX_BATCH_SIZE = 100
+# Attempts before giving up on a node and notifying support
+SHARE_OUTBOX_MAX_ATTEMPTS = 5
+# Seconds a batch being sent is hidden from other drainers
+SHARE_OUTBOX_LEASE = 10 * 60
 
 CAS_SERVER_URL = 'http://localhost:8080'
 MFR_SERVER_URL = 'http://localhost:7778'
@@ -468,6 +486,7 @@ class CeleryConfig:
         'website.archiver.tasks',
         'website.search.search',
         'website.project.tasks',
+        'website.institutions.tasks',
         'scripts.populate_new_and_noteworthy_projects',
         'scripts.populate_popular_projects_and_registrations',
         'scripts.refresh_addon_tokens',
@@ -555,6 +574,18 @@ class CeleryConfig:
                 'schedule': crontab(minute=0, hour=5),  # Daily 12 a.m
                 'kwargs': {'dry_run': False},
             },
+            'drain_share_outbox': {
+                'task': 'website.project.tasks.drain_share_outbox',
+                'schedule': crontab(minute='*'),  # Every minute
+            },
+            'run_spam_checks': {
+                'task': 'website.project.tasks.run_spam_checks',
+                'schedule': crontab(minute='*'),  # Every minute
+            },
+            'reconcile_institution_summaries': {
+                'task': 'website.institutions.tasks.reconcile_institution_summaries',
+                'schedule': crontab(minute=30, hour=5),  # Daily 12:30 a.m.
+            },
             'send_queued_mails': {
                 'task': 'scripts.send_queued_mails',
                 'schedule': crontab(minute=0, hour=17),  # Daily 12 p.m.
@@ -663,8 +694,16 @@ ENABLE_INSTITUTIONS = True
 ENABLE_VARNISH = False
 ENABLE_ESI = False
 VARNISH_SERVERS = []  # This should be set in local.py or cache invalidation won't work
+VARNISH_BAN_TIMEOUT = 0.3
+VARNISH_BAN_RETRIES = 2
+# Maximum length of a ban regex, bans of more paths are split
+VARNISH_BAN_MAX_LENGTH = 2000
 ESI_MEDIA_TYPES = {'application/vnd.api+json', 'application/json'}
 
+# Seconds to keep guid -> referent routing information in the shared cache.
+# Entries are invalidated on save/delete; this bounds staleness from queryset updates.
+GUID_RESOLUTION_CACHE_TIMEOUT = 60 * 10
+
 # Used for gathering meta information about the current build
 GITHUB_API_TOKEN = None
 
@@ -1861,6 +1900,15 @@ SPAM_ACCOUNT_SUSPENSION_ENABLED = False
 SPAM_ACCOUNT_SUSPENSION_THRESHOLD = timedelta(hours=24)
 SPAM_FLAGGED_MAKE_NODE_PRIVATE = False
 SPAM_FLAGGED_REMOVE_FROM_SEARCH = False
+# Edited nodes are queued and checked for spam in batches by `run_spam_checks`
+SPAM_CLASSIFIER = 'akismet'  # See website.util.spam.CLASSIFIERS
+# Content containing any of these is spam, with the 'keywords' classifier
+SPAM_CLASSIFIER_KEYWORDS = []
+SPAM_CHECK_BATCH_SIZE = 50
+# Attempts before giving up on classifying a node
+SPAM_CHECK_MAX_ATTEMPTS = 5
+# Seconds a batch being checked is hidden from other workers
+SPAM_CHECK_LEASE = 10 * 60
 
 SHARE_API_TOKEN = None
 
@@ -1911,4 +1959,21 @@ CUSTOM_CITATIONS = {
     'bluebook-inline': 'bluebook'
 }
 
+# Number of citation styles per page of the style catalog
+CITATION_STYLES_PAGE_SIZE = 50
+# Number of parsed citation styles kept in memory by each process
+CITATION_STYLE_CACHE_SIZE = 32
+# Seconds to keep rendered citations in the shared cache. Entries are keyed by
+# the cited data, so this only bounds how long unused ones take up space.
+CITATION_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Seconds a process keeps a provider's subject taxonomy in memory. Saving a
+# subject reloads it sooner; this bounds staleness when the cache that carries
+# the reload signal is not shared between processes.
+SUBJECT_TREE_TIMEOUT = 60 * 5
+
+# Seconds the progress of updating the search documents of an
+# institution's nodes is shown on the institution's admin page
+INSTITUTION_NODES_PROGRESS_TIMEOUT = 60 * 60 * 24
+
 PREPRINTS_ASSETS = '/static/img/preprints_assets/'
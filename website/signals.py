@@ -11,6 +11,7 @@ ALL_SIGNALS = [
     project.mention_added,
     project.unreg_contributor_added,
     project.contributor_added,
+    project.contributors_added,
     project.contributor_removed,
     project.privacy_set_public,
     project.node_deleted,
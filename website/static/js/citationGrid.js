@@ -322,12 +322,14 @@ CitationGrid.prototype.initStyleSelect = function() {
             quietMillis: 200,
             data: function(term, page) {
                 return {
-                    q: term
+                    q: term,
+                    page: page
                 };
             },
             results: function(data, page) {
                 return {
-                    results: data.styles
+                    results: data.styles,
+                    more: data.more
                 };
             },
             cache: true
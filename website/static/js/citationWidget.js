@@ -44,12 +44,14 @@ CitationWidget.prototype.init = function() {
             quietMillis: 200,
             data: function(term, page) {
                 return {
-                    q: term
+                    q: term,
+                    page: page
                 };
             },
             results: function(data, page) {
                 return {
-                    results: data.styles
+                    results: data.styles,
+                    more: data.more
                 };
             },
             cache: true
@@ -170,10 +170,9 @@ def disconnected_from_listeners(signal):
 
 
 def check_private_key_for_anonymized_link(private_key):
-    from osf.models import PrivateLink
-    try:
-        link = PrivateLink.objects.get(key=private_key)
-    except PrivateLink.DoesNotExist:
+    from framework.auth.core import get_private_link_resolver
+    link = get_private_link_resolver().resolve(private_key)
+    if link is None:
         return False
     return link.anonymous
 
@@ -41,7 +41,7 @@ def format_user(user):
         'additional_name': user.middle_names,
     })
 
-    person.attrs['identifiers'] = [GraphNode('agentidentifier', agent=person, uri='mailto:{}'.format(uri)) for uri in user.emails.values_list('address', flat=True)]
+    person.attrs['identifiers'] = [GraphNode('agentidentifier', agent=person, uri='mailto:{}'.format(email.address)) for email in user.emails.all()]
     person.attrs['identifiers'].append(GraphNode('agentidentifier', agent=person, uri=user.absolute_url))
 
     if user.external_identity.get('ORCID') and user.external_identity['ORCID'].values()[0] == 'VERIFIED':
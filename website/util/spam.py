@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""Spam classifiers. The classifier in use is chosen by `settings.SPAM_CLASSIFIER`.
+
+Classifiers work on items shaped like `SpamMixin.spam_data`:
+
+    {
+        'author': 'Fake Name',
+        'author_email': 'fake@example.com',
+        'content': 'Buy cheap ...',
+        'headers': {'Remote-Addr': '127.0.0.1', 'User-Agent': '...', 'Referer': '...'},
+    }
+"""
+import logging
+
+from website import settings
+from website.util import akismet
+from website.util.akismet import AkismetClientError
+
+logger = logging.getLogger(__name__)
+
+
+class SpamClassifier(object):
+
+    def classify(self, items):
+        """Return an (is_spam, pro_tip) tuple for each of `items`, or None for
+        the items that could not be classified.
+        """
+        raise NotImplementedError
+
+    def submit_spam(self, item):
+        """Report `item` as spam that was not classified as such."""
+        pass
+
+    def submit_ham(self, item):
+        """Report `item` as ham that was classified as spam."""
+        pass
+
+
+class AkismetClassifier(SpamClassifier):
+    """Classifies with Akismet, which has no batch endpoint: the items of a
+    batch share a client whose API key is verified once.
+    """
+
+    def _get_client(self):
+        return akismet.AkismetClient(
+            apikey=settings.AKISMET_APIKEY,
+            website=settings.DOMAIN,
+            verify=True
+        )
+
+    def _comment(self, item):
+        return dict(
+            user_ip=item['headers']['Remote-Addr'],
+            user_agent=item['headers'].get('User-Agent'),
+            referrer=item['headers'].get('Referer'),
+            comment_content=item['content'],
+            comment_author=item['author'],
+            comment_author_email=item['author_email'],
+        )
+
+    def classify(self, items):
+        try:
+            client = self._get_client()
+        except AkismetClientError:
+            logger.exception('Error performing SPAM check')
+            return [None] * len(items)
+        verdicts = []
+        for item in items:
+            try:
+                verdicts.append(client.check_comment(**self._comment(item)))
+            except AkismetClientError:
+                logger.exception('Error performing SPAM check')
+                verdicts.append(None)
+        return verdicts
+
+    def submit_spam(self, item):
+        self._get_client().submit_spam(**self._comment(item))
+
+    def submit_ham(self, item):
+        self._get_client().submit_ham(**self._comment(item))
+
+
+class KeywordClassifier(SpamClassifier):
+    """Deterministic local classifier, for tests and development: content
+    containing any of `settings.SPAM_CLASSIFIER_KEYWORDS` is spam.
+    """
+
+    def classify(self, items):
+        verdicts = []
+        for item in items:
+            content = item['content'].lower()
+            keywords = [keyword for keyword in settings.SPAM_CLASSIFIER_KEYWORDS if keyword.lower() in content]
+            verdicts.append((bool(keywords), 'keywords: {}'.format(', '.join(keywords)) if keywords else None))
+        return verdicts
+
+
+CLASSIFIERS = {
+    'akismet': AkismetClassifier,
+    'keywords': KeywordClassifier,
+}
+
+
+def get_classifier():
+    return CLASSIFIERS[settings.SPAM_CLASSIFIER]()
@@ -24,6 +24,7 @@ from website import settings
 from website.institutions.views import serialize_institution
 
 from osf.models import BaseFileNode, Guid, Institution, PreprintService, AbstractNode, Node
+from osf.utils import guid_resolution
 from website.settings import EXTERNAL_EMBER_APPS, PROXY_EMBER_APPS, EXTERNAL_EMBER_SERVER_TIMEOUT, INSTITUTION_DISPLAY_NODE_THRESHOLD, DOMAIN
 from website.project.model import has_anonymous_link
 from website.util import permissions
@@ -82,7 +83,7 @@ def serialize_node_summary(node, auth, primary=True, show_path=False):
     user = auth.user
     if node.can_view(auth):
         # Re-query node with contributor guids included to prevent N contributor queries
-        node = AbstractNode.objects.filter(pk=node.pk).include('contributor__user__guids').get()
+        node = AbstractNode.objects.filter(pk=node.pk).include('contributor__user').get()
         contributor_data = serialize_contributors_for_summary(node)
         summary.update({
             'can_view': True,
@@ -242,35 +243,33 @@ def resolve_guid(guid, suffix=None):
     :return: Return value of proxied view function
     """
     try:
-        # Look up
-        guid_object = Guid.load(guid)
+        # Look up, going through the shared guid resolution cache
+        resolution = guid_resolution.resolve(guid)
     except KeyError as e:
         if e.message == 'osfstorageguidfile':  # Used when an old detached OsfStorageGuidFile object is accessed
             raise HTTPError(http.NOT_FOUND)
         else:
             raise e
-    if guid_object:
+    if resolution:
         # verify that the object implements a GuidStoredObject-like interface. If a model
         #   was once GuidStoredObject-like but that relationship has changed, it's
         #   possible to have referents that are instances of classes that don't
         #   have a deep_url attribute or otherwise don't behave as
         #   expected.
-        if not hasattr(guid_object.referent, 'deep_url'):
+        model = resolution.model
+        if model is None or not hasattr(model, 'deep_url'):
             sentry.log_message(
                 'Guid resolved to an object with no deep_url', dict(guid=guid)
             )
             raise HTTPError(http.NOT_FOUND)
-        referent = guid_object.referent
-        if referent is None:
-            logger.error('Referent of GUID {0} not found'.format(guid))
-            raise HTTPError(http.NOT_FOUND)
-        if not referent.deep_url:
+        if not resolution.url:
             raise HTTPError(http.NOT_FOUND)
 
         # Handle file `/download` shortcut with supported types.
         if suffix and suffix.rstrip('/').lower() == 'download':
             file_referent = None
-            if isinstance(referent, PreprintService) and referent.primary_file:
+            if issubclass(model, PreprintService) and resolution.referent.primary_file:
+                referent = resolution.referent
                 if not referent.is_published:
                     # TODO: Ideally, permissions wouldn't be checked here.
                     # This is necessary to prevent a logical inconsistency with
@@ -280,8 +279,8 @@ def resolve_guid(guid, suffix=None):
                     if not referent.node.has_permission(auth.user, permissions.ADMIN):
                         raise HTTPError(http.NOT_FOUND)
                 file_referent = referent.primary_file
-            elif isinstance(referent, BaseFileNode) and referent.is_file:
-                file_referent = referent
+            elif issubclass(model, BaseFileNode) and resolution.referent.is_file:
+                file_referent = resolution.referent
 
             if file_referent:
                 # Extend `request.args` adding `action=download`.
@@ -292,11 +291,11 @@ def resolve_guid(guid, suffix=None):
                 return proxy_url(url)
 
         # Handle Ember Applications
-        if isinstance(referent, PreprintService):
-            if referent.provider.domain_redirect_enabled:
+        if issubclass(model, PreprintService):
+            if resolution.referent.provider.domain_redirect_enabled:
                 # This route should always be intercepted by nginx for the branded domain,
                 # w/ the exception of `<guid>/download` handled above.
-                return redirect(referent.absolute_url, http.MOVED_PERMANENTLY)
+                return redirect(resolution.referent.absolute_url, http.MOVED_PERMANENTLY)
 
             if PROXY_EMBER_APPS:
                 resp = requests.get(EXTERNAL_EMBER_APPS['preprints']['server'], stream=True, timeout=EXTERNAL_EMBER_SERVER_TIMEOUT)
@@ -304,8 +303,8 @@ def resolve_guid(guid, suffix=None):
 
             return send_from_directory(preprints_dir, 'index.html')
 
-        if isinstance(referent, BaseFileNode) and referent.is_file and referent.node.is_quickfiles:
-            if referent.is_deleted:
+        if issubclass(model, BaseFileNode) and resolution.referent.is_file and resolution.referent.node.is_quickfiles:
+            if resolution.deleted:
                 raise HTTPError(http.GONE)
             if PROXY_EMBER_APPS:
                 resp = requests.get(EXTERNAL_EMBER_APPS['ember_osf_web']['server'], stream=True, timeout=EXTERNAL_EMBER_SERVER_TIMEOUT)
@@ -313,12 +312,11 @@ def resolve_guid(guid, suffix=None):
 
             return send_from_directory(ember_osf_web_dir, 'index.html')
 
-        url = _build_guid_url(urllib.unquote(referent.deep_url), suffix)
+        url = _build_guid_url(urllib.unquote(resolution.url), suffix)
         return proxy_url(url)
 
     # GUID not found; try lower-cased and redirect if exists
-    guid_object_lower = Guid.load(guid.lower())
-    if guid_object_lower:
+    if guid != guid.lower() and Guid.load(guid.lower()):
         return redirect(
             _build_guid_url(guid.lower(), suffix)
         )